@@ -2,6 +2,9 @@
 # See "Writing benchmarks" in the asv docs for more information.
 
 from skbio import DNA, RNA
+from skbio.alignment import (global_pairwise_align_nucleotide,
+                             local_pairwise_align_nucleotide,
+                             StripedSmithWaterman)
 import numpy as np
 
 num_bases = 1000000
@@ -25,6 +28,16 @@ rna_seq = RNA(rna_bytes)
 motif_1 = "GGTGCAAGCCGGTGGAAACA"
 motif_1_regex = '(' + motif_1 + ')'
 
+rng = np.random.RandomState(0)
+align_seq1 = DNA(rng.choice(dna_template_bytes, 1000).astype(np.uint8))
+align_seq2 = DNA(rng.choice(dna_template_bytes, 1000).astype(np.uint8))
+# a copy of align_seq1 with 2% of its positions deleted
+align_seq3 = DNA(align_seq1.values[rng.rand(1000) > 0.02])
+
+ssw_query = str(align_seq1[:50])
+ssw_targets = [str(DNA(rng.choice(dna_template_bytes, 150).astype(np.uint8)))
+               for _ in range(10000)]
+
 
 def consume_iterator(iterator):
     for _ in iterator:
@@ -63,3 +76,46 @@ class BenchmarkSuite:
     def time_search_for_motif_in_gapped(self):
         consume_iterator(
             dna_seq.find_with_regex(motif_1_regex, ignore=dna_seq.gaps()))
+
+
+class PairwiseAlignmentSuite:
+
+    def time_global_pairwise_align(self):
+        global_pairwise_align_nucleotide(align_seq1, align_seq2)
+
+    def time_local_pairwise_align(self):
+        local_pairwise_align_nucleotide(align_seq1, align_seq2)
+
+    def time_global_pairwise_align_banded(self):
+        global_pairwise_align_nucleotide(align_seq1, align_seq3,
+                                         band_width='adaptive')
+
+
+class StripedSmithWatermanSuite:
+
+    def setup(self):
+        self.query = StripedSmithWaterman(ssw_query)
+
+    def time_call(self):
+        for target in ssw_targets:
+            self.query(target)
+
+    def time_align_many(self):
+        self.query.align_many(ssw_targets)
+
+    def time_align_many_threads(self):
+        self.query.align_many(ssw_targets, n_jobs=-1)
+
+
+class ImportSuite:
+    # Each benchmark runs in a new interpreter, so that it measures the
+    # import time a short-lived script pays. Regressions of the time budget
+    # are caught by comparing runs (e.g., `asv continuous`), which unit tests
+    # cannot do reliably on loaded machines.
+
+    def timeraw_import(self):
+        return "import skbio"
+
+    def timeraw_import_read_fasta(self):
+        return ("import skbio\n"
+                "list(skbio.io.read(['>seq1\\n', 'ACGT\\n'], format='fasta'))")
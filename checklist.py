@@ -468,6 +468,16 @@ class APIRegressionValidator(RepoValidator):
                         node.module = ""
                     imports += [".".join([prefix + node.module, x.name])
                                 for x in node.names]
+                elif (isinstance(node, ast.Assign) and
+                      any(isinstance(target, ast.Name) and
+                          target.id == '_lazy_objects'
+                          for target in node.targets)):
+                    # Objects imported lazily by a package's __getattr__ are
+                    # listed in a `_lazy_objects` dict, mapping their names
+                    # to the modules they are imported from.
+                    lazy_objects = ast.literal_eval(node.value)
+                    imports += [".".join([module, name])
+                                for name, module in lazy_objects.items()]
         skbio_imports = []
         for import_ in imports:
             # Filter by skbio
@@ -86,8 +86,14 @@ extensions = [
                "skbio/alignment/_lib/ssw.c"],
               extra_compile_args=ssw_extra_compile_args,
               include_dirs=[np.get_include()]),
+    Extension("skbio.alignment.__pairwise",
+              ["skbio/alignment/__pairwise" + ext],
+              include_dirs=[np.get_include()]),
     Extension("skbio.diversity._phylogenetic",
               ["skbio/diversity/_phylogenetic" + ext],
+              include_dirs=[np.get_include()]),
+    Extension("skbio.tree.__nj",
+              ["skbio/tree/__nj" + ext],
               include_dirs=[np.get_include()])
 ]
 
@@ -116,7 +122,7 @@ setup(name='scikit-bio',
           'IPython >= 3.2.0',
           'matplotlib >= 1.4.3',
           'natsort >= 4.0.3',
-          'numpy >= 1.9.2',
+          'numpy >= 1.17.0',
           'pandas >= 0.23',
           'scipy >= 0.15.1',
           'hdmedians >= 0.13',
@@ -7,22 +7,57 @@
 # ----------------------------------------------------------------------------
 
 
-# Add skbio.io to sys.modules to prevent cycles in our imports
-import skbio.io  # noqa
-# imports included for convenience
-from skbio.sequence import Sequence, DNA, RNA, Protein, GeneticCode
-from skbio.stats.distance import DistanceMatrix
-from skbio.alignment import local_pairwise_align_ssw, TabularMSA
-from skbio.tree import TreeNode, nj
-from skbio.io import read, write
-from skbio.stats.ordination import OrdinationResults
-import skbio.diversity  # noqa
-import skbio.stats.evolve  # noqa
+import sys
+from importlib import import_module
+
+# The subpackages, and the objects which are exposed here for convenience,
+# are only imported when they are first accessed, so that `import skbio` does
+# not pay for the import of every subpackage and of their dependencies.
+_subpackages = {'alignment', 'diversity', 'io', 'metadata', 'sequence',
+                'stats', 'tree', 'util', 'workflow'}
+_lazy_objects = {
+    'Sequence': 'skbio.sequence',
+    'DNA': 'skbio.sequence',
+    'RNA': 'skbio.sequence',
+    'Protein': 'skbio.sequence',
+    'GeneticCode': 'skbio.sequence',
+    'DistanceMatrix': 'skbio.stats.distance',
+    'local_pairwise_align_ssw': 'skbio.alignment',
+    'TabularMSA': 'skbio.alignment',
+    'TreeNode': 'skbio.tree',
+    'nj': 'skbio.tree',
+    'read': 'skbio.io',
+    'write': 'skbio.io',
+    'OrdinationResults': 'skbio.stats.ordination',
+}
 
 __all__ = ['Sequence', 'DNA', 'RNA', 'Protein', 'GeneticCode',
            'DistanceMatrix', 'local_pairwise_align_ssw', 'TabularMSA',
            'TreeNode', 'nj', 'read', 'write', 'OrdinationResults']
 
+
+def __getattr__(name):
+    if name in _subpackages:
+        return import_module('skbio.' + name)
+    if name in _lazy_objects:
+        value = getattr(import_module(_lazy_objects[name]), name)
+        # cache the object, so that it is only looked up once
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | _subpackages | set(_lazy_objects))
+
+
+# Module __getattr__ is only supported from Python 3.7 (PEP 562), so the
+# objects are imported eagerly in earlier versions.
+if sys.version_info < (3, 7):
+    for _name in sorted(_subpackages) + __all__:
+        globals()[_name] = __getattr__(_name)
+    import skbio.stats.evolve  # noqa
+
 __credits__ = "https://github.com/biocore/scikit-bio/graphs/contributors"
 __version__ = "0.5.5-dev"
 
@@ -9,6 +9,36 @@
 import abc
 
 
+class _IOMethod:
+    """Placeholder for the ``read`` or ``write`` method of a class.
+
+    The I/O registry only imports the file format modules when they are
+    needed, so the ``read`` and ``write`` methods are not monkey-patched onto
+    the classes with registered readers and writers until then. Looking this
+    descriptor up monkey-patches them, and returns the patched method. Classes
+    without readers (or writers) do not have the method.
+
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        from skbio.io import io_registry
+        if not io_registry._monkey_patched:
+            io_registry.monkey_patch()
+
+        # the method is missing if the first class that defines it in the MRO
+        # still uses this descriptor
+        for cls in owner.__mro__:
+            if self.name in vars(cls):
+                if isinstance(vars(cls)[self.name], _IOMethod):
+                    raise AttributeError(
+                        "%r object has no attribute %r"
+                        % (owner.__name__, self.name))
+                break
+        return getattr(owner if instance is None else instance, self.name)
+
+
 class SkbioObject(metaclass=abc.ABCMeta):
     """Abstract base class defining core API common to all scikit-bio objects.
 
@@ -21,6 +51,11 @@ class SkbioObject(metaclass=abc.ABCMeta):
     def __str__(self):
         raise NotImplementedError
 
+    # Replaced in the subclasses which have registered readers and writers
+    # when they are first accessed (see ``_IOMethod``).
+    read = _IOMethod('read')
+    write = _IOMethod('write')
+
 
 class ElasticLines:
     """Store blocks of content separated by dashed lines.
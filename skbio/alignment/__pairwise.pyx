@@ -0,0 +1,510 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import numpy as np
+cimport numpy as np
+cimport cython
+from libc.math cimport INFINITY
+
+# Values of the traceback matrix, which must match _traceback_encoding in
+# _pairwise.py. The gap extension flags are added to the direction of a cell.
+cdef np.int8_t ALIGNMENT_END = 0
+cdef np.int8_t MATCH = 1
+cdef np.int8_t VERTICAL_GAP = 2
+cdef np.int8_t HORIZONTAL_GAP = 3
+cdef np.int8_t VERTICAL_GAP_EXTEND = 4
+cdef np.int8_t HORIZONTAL_GAP_EXTEND = 8
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef inline double _substitution_score(double[:, ::1] profile1,
+                                       double[:, ::1] profile2,
+                                       np.intp_t[::1] codes2,
+                                       double denominator,
+                                       Py_ssize_t row,
+                                       Py_ssize_t col) nogil:
+    """Substitution score of a position of each alignment
+
+    ``col`` is a position of the first (horizontal) alignment and ``row`` a
+    position of the second (vertical) alignment.
+    """
+    cdef:
+        Py_ssize_t code = codes2[row], k
+        double total = 0.0
+
+    if code >= 0:
+        return profile1[col, code] * profile2[row, code] / denominator
+    for k in range(profile2.shape[1]):
+        total += profile1[col, k] * profile2[row, k]
+    return total / denominator
+
+
+cdef inline np.int8_t _fill_cell(double diag_score, double up_score,
+                                 double up_gap_score, double left_score,
+                                 double left_gap_score,
+                                 double vertical_open_penalty,
+                                 double vertical_extend_penalty,
+                                 double horizontal_open_penalty,
+                                 double horizontal_extend_penalty,
+                                 double new_alignment_score, double *score,
+                                 double *vertical_gap_score,
+                                 double *horizontal_gap_score) nogil:
+    """Compute the scores of a cell from those of its neighbors
+
+    ``diag_score`` is the score of the upper left cell plus the substitution
+    score of the cell, ``up_score`` and ``up_gap_score`` the best score and
+    the best score ending with a vertical gap of the upper cell, and
+    ``left_score`` and ``left_gap_score`` the best score and the best score
+    ending with a horizontal gap of the left cell. The scores of the cell are
+    written to ``score``, ``vertical_gap_score`` and ``horizontal_gap_score``
+    and its traceback value is returned.
+    """
+    cdef:
+        np.int8_t direction = ALIGNMENT_END, flags = 0
+        double best_score = new_alignment_score
+
+    # vertical gap (i.e., a gap in the first alignment)
+    vertical_gap_score[0] = up_score - vertical_open_penalty
+    if up_gap_score - vertical_extend_penalty > vertical_gap_score[0]:
+        vertical_gap_score[0] = up_gap_score - vertical_extend_penalty
+        flags = flags | VERTICAL_GAP_EXTEND
+
+    # horizontal gap (i.e., a gap in the second alignment)
+    horizontal_gap_score[0] = left_score - horizontal_open_penalty
+    if left_gap_score - horizontal_extend_penalty > horizontal_gap_score[0]:
+        horizontal_gap_score[0] = left_gap_score - horizontal_extend_penalty
+        flags = flags | HORIZONTAL_GAP_EXTEND
+
+    if horizontal_gap_score[0] > best_score:
+        best_score = horizontal_gap_score[0]
+        direction = HORIZONTAL_GAP
+    if diag_score > best_score:
+        best_score = diag_score
+        direction = MATCH
+    if vertical_gap_score[0] > best_score:
+        best_score = vertical_gap_score[0]
+        direction = VERTICAL_GAP
+
+    score[0] = best_score
+    return direction | flags
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _fill_matrices(double[:, ::1] score_matrix,
+                   np.int8_t[:, ::1] traceback_matrix,
+                   double[:, ::1] profile1, double[:, ::1] profile2,
+                   np.intp_t[::1] codes2, double denominator,
+                   double gap_open_penalty, double gap_extend_penalty,
+                   double new_alignment_score, bint penalize_terminal_gaps):
+    """Fill the score and traceback matrices with affine gap penalties
+
+    Parameters
+    ----------
+    score_matrix : np.ndarray of double
+        Matrix of dimensions ``(len2 + 1, len1 + 1)``, where ``len1`` and
+        ``len2`` are the lengths of the first (horizontal) and second
+        (vertical) alignments, whose first row and column are initialized.
+        The best score of an alignment ending at each cell is written to the
+        other cells.
+    traceback_matrix : np.ndarray of int8
+        Matrix of the same dimensions, whose first row and column are
+        initialized. The direction of the last move of the best alignment
+        ending at each cell is written to the other cells, plus
+        ``VERTICAL_GAP_EXTEND`` (``HORIZONTAL_GAP_EXTEND``) if the best
+        alignment ending with a vertical (horizontal) gap at this cell
+        extends a gap.
+    profile1 : np.ndarray of double
+        Matrix of dimensions ``(len1, k)``, the sums of the substitution
+        scores of the characters at each position of the first alignment
+        with each of the ``k`` characters (including the gap) of the second
+        alignment.
+    profile2 : np.ndarray of double
+        Matrix of dimensions ``(len2, k)``, the counts of each character at
+        each position of the second alignment.
+    codes2 : np.ndarray of intp
+        The character at each position of the second alignment if it is the
+        only one at this position, or -1.
+    denominator : double
+        The number of pairs of sequences of the alignments, by which the sums
+        of substitution scores are divided.
+    gap_open_penalty, gap_extend_penalty : double
+        Penalties for the first and each following position of a gap.
+    new_alignment_score : double
+        Score of an alignment starting at a cell, i.e., 0 for a local
+        alignment and -inf for a global alignment.
+    penalize_terminal_gaps : bool
+        Whether gaps after the end of either alignment are penalized.
+
+    Notes
+    -----
+    This is Gotoh's algorithm [1]_: the best scores of alignments ending with
+    a vertical or a horizontal gap are kept in addition to the best score
+    of any alignment, so that a gap is extended whenever it is better than
+    opening a new one. Only a row of the vertical gap scores is kept. On
+    ties, an alignment ending at a cell is preferred, then one ending with a
+    horizontal gap, a match and a vertical gap, and a gap is opened rather
+    than extended.
+
+    References
+    ----------
+    .. [1] Gotoh O. "An improved algorithm for matching biological
+       sequences." J Mol Biol. 1982 Dec 15;162(3):705-8.
+    """
+    cdef:
+        Py_ssize_t n_rows = score_matrix.shape[0]
+        Py_ssize_t n_cols = score_matrix.shape[1]
+        Py_ssize_t row, col
+        double[::1] vertical_gap_scores
+        double horizontal_gap_score, diag_score
+        double horizontal_open_penalty, horizontal_extend_penalty
+        double vertical_open_penalty, vertical_extend_penalty
+
+    if (traceback_matrix.shape[0] != n_rows or
+            traceback_matrix.shape[1] != n_cols or
+            profile1.shape[0] != n_cols - 1 or
+            profile2.shape[0] != n_rows - 1 or
+            codes2.shape[0] != n_rows - 1 or
+            profile1.shape[1] != profile2.shape[1]):
+        raise ValueError("Inconsistent dimensions of the matrices.")
+
+    # no alignment ends with a vertical gap in the first row
+    vertical_gap_scores = np.full(n_cols, -np.inf)
+
+    with nogil:
+        for row in range(1, n_rows):
+            # nor with a horizontal gap in the first column
+            horizontal_gap_score = -INFINITY
+            if not penalize_terminal_gaps and row == n_rows - 1:
+                horizontal_open_penalty = 0
+                horizontal_extend_penalty = 0
+            else:
+                horizontal_open_penalty = gap_open_penalty
+                horizontal_extend_penalty = gap_extend_penalty
+            for col in range(1, n_cols):
+                if not penalize_terminal_gaps and col == n_cols - 1:
+                    vertical_open_penalty = 0
+                    vertical_extend_penalty = 0
+                else:
+                    vertical_open_penalty = gap_open_penalty
+                    vertical_extend_penalty = gap_extend_penalty
+                diag_score = score_matrix[row - 1, col - 1] + \
+                    _substitution_score(profile1, profile2, codes2,
+                                        denominator, row - 1, col - 1)
+                traceback_matrix[row, col] = _fill_cell(
+                    diag_score, score_matrix[row - 1, col],
+                    vertical_gap_scores[col], score_matrix[row, col - 1],
+                    horizontal_gap_score, vertical_open_penalty,
+                    vertical_extend_penalty, horizontal_open_penalty,
+                    horizontal_extend_penalty, new_alignment_score,
+                    &score_matrix[row, col], &vertical_gap_scores[col],
+                    &horizontal_gap_score)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _fill_block(double[::1] scores, double[::1] vertical_gap_scores,
+                double[::1] left_scores, double[::1] left_gap_scores,
+                Py_ssize_t first_row, Py_ssize_t first_col,
+                double[:, ::1] profile1, double[:, ::1] profile2,
+                np.intp_t[::1] codes2, double denominator,
+                double gap_open_penalty, double gap_extend_penalty,
+                double new_alignment_score, bint penalize_terminal_gaps,
+                np.int8_t[:, ::1] traceback_matrix=None,
+                np.intp_t[::1] labels=None, np.intp_t[::1] gap_labels=None,
+                double[::1] right_scores=None,
+                double[::1] right_gap_scores=None):
+    """Fill a block of the matrices keeping only a row of scores
+
+    The block spans ``len(left_scores)`` rows of the score matrix starting
+    at ``first_row`` and ``len(scores)`` columns starting at ``first_col``,
+    and the scores of its first row and its first column are given. Its
+    other cells have the same scores as in the matrices filled by
+    ``_fill_matrices`` from the same alignments.
+
+    Parameters
+    ----------
+    scores, vertical_gap_scores : np.ndarray of double
+        The best scores and the best scores ending with a vertical gap of the
+        first row of the block, which are overwritten with those of its last
+        row.
+    left_scores, left_gap_scores : np.ndarray of double
+        The best scores and the best scores ending with a horizontal gap of
+        the first column of the block. Their first value is ignored.
+    first_row, first_col : int
+        The position of the block in the score matrix.
+    profile1, profile2, codes2, denominator, gap_open_penalty,
+    gap_extend_penalty, new_alignment_score, penalize_terminal_gaps
+        As in ``_fill_matrices``.
+    traceback_matrix : np.ndarray of int8, optional
+        Matrix of the dimensions of the block, whose values are written to
+        the cells which are not in the first row or column.
+    labels, gap_labels : np.ndarray of intp, optional
+        Labels of the cells of the first row of the block. They are
+        propagated along the traceback, so that they are overwritten with
+        the label of the cell of the first row where the traceback from each
+        cell of the last row arrives, starting from the best alignment
+        (``labels``) or from the best alignment ending with a vertical gap
+        (``gap_labels``). A traceback which ends, or which arrives in the
+        first column below the first row, is labelled -1.
+    right_scores, right_gap_scores : np.ndarray of double, optional
+        The best scores and the best scores ending with a horizontal gap of
+        the last column of the block are written to these arrays, except for
+        the first row.
+
+    Returns
+    -------
+    best_score : float
+        The highest score of a cell of the block which is not in the first
+        row or column.
+    best_row, best_col : int
+        The position of the first cell with this score in the score matrix,
+        row by row.
+    """
+    cdef:
+        Py_ssize_t n_rows = profile2.shape[0] + 1
+        Py_ssize_t n_cols = profile1.shape[0] + 1
+        Py_ssize_t height = left_scores.shape[0]
+        Py_ssize_t width = scores.shape[0]
+        Py_ssize_t i, j, row, col, best_row = -1, best_col = -1
+        Py_ssize_t diag_label = -1, next_diag_label, vertical_label
+        Py_ssize_t horizontal_label = -1
+        double horizontal_gap_score, diag_score, next_diag_score
+        double best_score = -INFINITY
+        double horizontal_open_penalty, horizontal_extend_penalty
+        double vertical_open_penalty, vertical_extend_penalty
+        np.int8_t value, direction
+        bint has_traceback = traceback_matrix is not None
+        bint has_labels = labels is not None
+        bint has_right = right_scores is not None
+
+    if (codes2.shape[0] != n_rows - 1 or
+            profile1.shape[1] != profile2.shape[1] or
+            vertical_gap_scores.shape[0] != width or
+            left_gap_scores.shape[0] != height or
+            first_row < 0 or first_row + height > n_rows or
+            first_col < 0 or first_col + width > n_cols or
+            (has_traceback and (traceback_matrix.shape[0] != height or
+                                traceback_matrix.shape[1] != width)) or
+            (has_labels and (gap_labels is None or
+                             labels.shape[0] != width or
+                             gap_labels.shape[0] != width)) or
+            (has_right and (right_gap_scores is None or
+                            right_scores.shape[0] != height or
+                            right_gap_scores.shape[0] != height))):
+        raise ValueError("Inconsistent dimensions of the block.")
+
+    with nogil:
+        for i in range(1, height):
+            row = first_row + i
+            diag_score = scores[0]
+            scores[0] = left_scores[i]
+            horizontal_gap_score = left_gap_scores[i]
+            if has_labels:
+                diag_label = labels[0]
+                labels[0] = -1
+                horizontal_label = -1
+            if not penalize_terminal_gaps and row == n_rows - 1:
+                horizontal_open_penalty = 0
+                horizontal_extend_penalty = 0
+            else:
+                horizontal_open_penalty = gap_open_penalty
+                horizontal_extend_penalty = gap_extend_penalty
+            for j in range(1, width):
+                col = first_col + j
+                if not penalize_terminal_gaps and col == n_cols - 1:
+                    vertical_open_penalty = 0
+                    vertical_extend_penalty = 0
+                else:
+                    vertical_open_penalty = gap_open_penalty
+                    vertical_extend_penalty = gap_extend_penalty
+                next_diag_score = scores[j]
+                diag_score = diag_score + \
+                    _substitution_score(profile1, profile2, codes2,
+                                        denominator, row - 1, col - 1)
+                value = _fill_cell(
+                    diag_score, scores[j], vertical_gap_scores[j],
+                    scores[j - 1], horizontal_gap_score,
+                    vertical_open_penalty, vertical_extend_penalty,
+                    horizontal_open_penalty, horizontal_extend_penalty,
+                    new_alignment_score, &scores[j],
+                    &vertical_gap_scores[j], &horizontal_gap_score)
+                diag_score = next_diag_score
+
+                if has_traceback:
+                    traceback_matrix[i, j] = value
+                if has_labels:
+                    next_diag_label = labels[j]
+                    if value & VERTICAL_GAP_EXTEND:
+                        vertical_label = gap_labels[j]
+                    else:
+                        vertical_label = labels[j]
+                    gap_labels[j] = vertical_label
+                    if not value & HORIZONTAL_GAP_EXTEND:
+                        horizontal_label = labels[j - 1]
+                    direction = value & 3
+                    if direction == MATCH:
+                        labels[j] = diag_label
+                    elif direction == VERTICAL_GAP:
+                        labels[j] = vertical_label
+                    elif direction == HORIZONTAL_GAP:
+                        labels[j] = horizontal_label
+                    else:
+                        labels[j] = -1
+                    diag_label = next_diag_label
+                if scores[j] > best_score:
+                    best_score = scores[j]
+                    best_row = row
+                    best_col = col
+
+            if has_right:
+                right_scores[i] = scores[width - 1]
+                right_gap_scores[i] = horizontal_gap_score
+
+    return best_score, best_row, best_col
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _fill_band(double[::1] scores, double[::1] left_scores,
+               Py_ssize_t band_low, Py_ssize_t band_high,
+               np.int8_t[:, ::1] traceback_matrix,
+               double[:, ::1] profile1, double[:, ::1] profile2,
+               np.intp_t[::1] codes2, double denominator,
+               double gap_open_penalty, double gap_extend_penalty,
+               double new_alignment_score, bint penalize_terminal_gaps,
+               double[:, ::1] edge_scores=None):
+    """Fill a diagonal band of the matrices
+
+    Only the cells whose column minus row is between ``band_low`` and
+    ``band_high`` are computed, as if the other cells could not be part of
+    an alignment. The score of each column is kept for the last row where
+    the column is in the band.
+
+    Parameters
+    ----------
+    scores : np.ndarray of double
+        The first row of the score matrix, which must be -inf right of the
+        band. It is overwritten with the scores of the last cell of the band
+        in each column.
+    left_scores : np.ndarray of double
+        The first column of the score matrix.
+    band_low, band_high : int
+        The first and last diagonals of the band, where ``band_low <= 0 <=
+        band_high``.
+    traceback_matrix : np.ndarray of int8 or None
+        Matrix of dimensions ``(len2 + 1, band_high - band_low + 1)``, whose
+        first row and column are initialized. The traceback value of the cell
+        at ``(row, col)`` is written at ``(row, col - row - band_low)``.
+    profile1, profile2, codes2, denominator, gap_open_penalty,
+    gap_extend_penalty, new_alignment_score, penalize_terminal_gaps
+        As in ``_fill_matrices``.
+    edge_scores : np.ndarray of double, optional
+        Matrix of dimensions ``(len2 + 1, 2)``, which is overwritten with the
+        scores of the cells of each row on the diagonals ``band_low`` and
+        ``band_high``, or -inf if the row has no such cell.
+
+    Returns
+    -------
+    best_score : float
+        The highest score of a cell of the band which is not in the first
+        row or column.
+    best_row, best_col : int
+        The position of the first cell with this score, row by row.
+    """
+    cdef:
+        Py_ssize_t n_rows = profile2.shape[0] + 1
+        Py_ssize_t n_cols = profile1.shape[0] + 1
+        Py_ssize_t row, col, first_col, last_col
+        Py_ssize_t best_row = -1, best_col = -1
+        double[::1] vertical_gap_scores
+        double horizontal_gap_score, diag_score, next_diag_score, left_score
+        double best_score = -INFINITY
+        double horizontal_open_penalty, horizontal_extend_penalty
+        double vertical_open_penalty, vertical_extend_penalty
+        np.int8_t value
+        bint has_traceback = traceback_matrix is not None
+        bint has_edges = edge_scores is not None
+
+    if (codes2.shape[0] != n_rows - 1 or
+            profile1.shape[1] != profile2.shape[1] or
+            scores.shape[0] != n_cols or left_scores.shape[0] != n_rows or
+            band_low > 0 or band_high < 0 or band_high >= n_cols or
+            (has_traceback and
+             (traceback_matrix.shape[0] != n_rows or
+              traceback_matrix.shape[1] != band_high - band_low + 1)) or
+            (has_edges and (edge_scores.shape[0] != n_rows or
+                            edge_scores.shape[1] != 2))):
+        raise ValueError("Inconsistent dimensions of the band.")
+
+    # no alignment ends with a vertical gap in the first row
+    vertical_gap_scores = np.full(n_cols, -np.inf)
+
+    if has_edges:
+        edge_scores[:, :] = -INFINITY
+        if band_low == 0:
+            edge_scores[0, 0] = scores[0]
+        edge_scores[0, 1] = scores[band_high]
+
+    with nogil:
+        for row in range(1, n_rows):
+            first_col = max(1, row + band_low)
+            last_col = min(n_cols - 1, row + band_high)
+            if row + band_low <= 0:
+                # the first column is in the band
+                diag_score = scores[0]
+                scores[0] = left_scores[row]
+                left_score = scores[0]
+            else:
+                # the cell left of the band is not part of any alignment
+                diag_score = scores[first_col - 1]
+                left_score = -INFINITY
+            # nor does any alignment end with a horizontal gap there
+            horizontal_gap_score = -INFINITY
+            if not penalize_terminal_gaps and row == n_rows - 1:
+                horizontal_open_penalty = 0
+                horizontal_extend_penalty = 0
+            else:
+                horizontal_open_penalty = gap_open_penalty
+                horizontal_extend_penalty = gap_extend_penalty
+            for col in range(first_col, last_col + 1):
+                if not penalize_terminal_gaps and col == n_cols - 1:
+                    vertical_open_penalty = 0
+                    vertical_extend_penalty = 0
+                else:
+                    vertical_open_penalty = gap_open_penalty
+                    vertical_extend_penalty = gap_extend_penalty
+                # the cell above the band was never filled, so it is -inf
+                next_diag_score = scores[col]
+                diag_score = diag_score + \
+                    _substitution_score(profile1, profile2, codes2,
+                                        denominator, row - 1, col - 1)
+                value = _fill_cell(
+                    diag_score, scores[col], vertical_gap_scores[col],
+                    left_score, horizontal_gap_score, vertical_open_penalty,
+                    vertical_extend_penalty, horizontal_open_penalty,
+                    horizontal_extend_penalty, new_alignment_score,
+                    &scores[col], &vertical_gap_scores[col],
+                    &horizontal_gap_score)
+                if has_traceback:
+                    traceback_matrix[row, col - row - band_low] = value
+                left_score = scores[col]
+                diag_score = next_diag_score
+                if left_score > best_score:
+                    best_score = left_score
+                    best_row = row
+                    best_col = col
+            if has_edges:
+                if row + band_low >= 0:
+                    edge_scores[row, 0] = scores[row + band_low]
+                if row + band_high < n_cols:
+                    edge_scores[row, 1] = scores[row + band_high]
+
+    return best_score, best_row, best_col
@@ -6,16 +6,17 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import numbers
 from warnings import warn
-from itertools import product
 
 import numpy as np
 
 from skbio.alignment import TabularMSA
 from skbio.alignment._ssw_wrapper import StripedSmithWaterman
+from skbio.alignment.__pairwise import (_fill_matrices, _fill_block,
+                                        _fill_band)
 from skbio.sequence import DNA, RNA, Protein
 from skbio.sequence import GrammaredSequence
-from skbio.util import EfficiencyWarning
 from skbio.util._decorator import experimental, deprecated
 
 # This is temporary: blosum50 does not exist in skbio yet as per
@@ -125,7 +126,9 @@ blosum50 = \
 def local_pairwise_align_nucleotide(seq1, seq2, gap_open_penalty=5,
                                     gap_extend_penalty=2,
                                     match_score=2, mismatch_score=-3,
-                                    substitution_matrix=None):
+                                    substitution_matrix=None, score_only=False,
+                                    linear_memory=False, band_width=None,
+                                    return_exact=False):
     """Locally align exactly two nucleotide seqs with Smith-Waterman
 
     Parameters
@@ -151,6 +154,32 @@ def local_pairwise_align_nucleotide(seq1, seq2, gap_open_penalty=5,
         Lookup for substitution scores (these values are added to the
         previous best alignment score). If provided, this overrides
         ``match_score`` and ``mismatch_score``.
+    score_only : bool, optional
+        If ``True``, only the alignment score is computed, keeping a single
+        row of scores in memory, and ``None`` is returned in place of the
+        ``TabularMSA`` and of the start/end positions.
+    linear_memory : bool, optional
+        If ``True``, the alignment is traced back by divide and conquer
+        rather than from full score and traceback matrices, so that the
+        memory used grows with the lengths of the sequences rather than with
+        their product. The alignment is the same, but it takes a few times
+        longer to compute.
+    band_width : int or str, optional
+        If provided, only the cells of the score matrix within ``band_width``
+        diagonals of the diagonals between its first and its last cells are
+        computed, so that the time and memory used grow with ``band_width``
+        times the lengths of the sequences rather than with their product.
+        This is suitable for similar sequences, whose best alignment stays
+        close to the diagonal. If ``'adaptive'``, the band width starts at 16
+        and is doubled until no alignment leaving the band can score more
+        than the best alignment within it, which is then optimal. With an
+        integer band width, the alignment may not be optimal, which is
+        reported by ``return_exact`` and with a ``RuntimeWarning``.
+        ``linear_memory`` must be ``False``.
+    return_exact : bool, optional
+        If ``True``, a fourth item is returned, which is ``True`` if the
+        alignment is known to be optimal. It is always ``True`` unless
+        ``band_width`` is an integer.
 
     Returns
     -------
@@ -158,7 +187,10 @@ def local_pairwise_align_nucleotide(seq1, seq2, gap_open_penalty=5,
         ``TabularMSA`` object containing the aligned sequences, alignment score
         (float), and start/end positions of each input sequence (iterable
         of two-item tuples). Note that start/end positions are indexes into the
-        unaligned sequences.
+        unaligned sequences. If ``score_only`` is ``True``, the
+        ``TabularMSA`` and the start/end positions are ``None``. If
+        ``return_exact`` is ``True``, whether the alignment is known to be
+        optimal (bool) is also returned.
 
     See Also
     --------
@@ -193,13 +225,19 @@ def local_pairwise_align_nucleotide(seq1, seq2, gap_open_penalty=5,
             make_identity_substitution_matrix(match_score, mismatch_score)
 
     return local_pairwise_align(seq1, seq2, gap_open_penalty,
-                                gap_extend_penalty, substitution_matrix)
+                                gap_extend_penalty, substitution_matrix,
+                                score_only=score_only,
+                                linear_memory=linear_memory,
+                                band_width=band_width,
+                                return_exact=return_exact)
 
 
 @experimental(as_of="0.4.0")
 def local_pairwise_align_protein(seq1, seq2, gap_open_penalty=11,
                                  gap_extend_penalty=1,
-                                 substitution_matrix=None):
+                                 substitution_matrix=None, score_only=False,
+                                 linear_memory=False, band_width=None,
+                                 return_exact=False):
     """Locally align exactly two protein seqs with Smith-Waterman
 
     Parameters
@@ -217,6 +255,32 @@ def local_pairwise_align_protein(seq1, seq2, gap_open_penalty=11,
     substitution_matrix: 2D dict (or similar), optional
         Lookup for substitution scores (these values are added to the
         previous best alignment score); default is BLOSUM 50.
+    score_only : bool, optional
+        If ``True``, only the alignment score is computed, keeping a single
+        row of scores in memory, and ``None`` is returned in place of the
+        ``TabularMSA`` and of the start/end positions.
+    linear_memory : bool, optional
+        If ``True``, the alignment is traced back by divide and conquer
+        rather than from full score and traceback matrices, so that the
+        memory used grows with the lengths of the sequences rather than with
+        their product. The alignment is the same, but it takes a few times
+        longer to compute.
+    band_width : int or str, optional
+        If provided, only the cells of the score matrix within ``band_width``
+        diagonals of the diagonals between its first and its last cells are
+        computed, so that the time and memory used grow with ``band_width``
+        times the lengths of the sequences rather than with their product.
+        This is suitable for similar sequences, whose best alignment stays
+        close to the diagonal. If ``'adaptive'``, the band width starts at 16
+        and is doubled until no alignment leaving the band can score more
+        than the best alignment within it, which is then optimal. With an
+        integer band width, the alignment may not be optimal, which is
+        reported by ``return_exact`` and with a ``RuntimeWarning``.
+        ``linear_memory`` must be ``False``.
+    return_exact : bool, optional
+        If ``True``, a fourth item is returned, which is ``True`` if the
+        alignment is known to be optimal. It is always ``True`` unless
+        ``band_width`` is an integer.
 
     Returns
     -------
@@ -224,7 +288,10 @@ def local_pairwise_align_protein(seq1, seq2, gap_open_penalty=11,
         ``TabularMSA`` object containing the aligned sequences, alignment score
         (float), and start/end positions of each input sequence (iterable
         of two-item tuples). Note that start/end positions are indexes into the
-        unaligned sequences.
+        unaligned sequences. If ``score_only`` is ``True``, the
+        ``TabularMSA`` and the start/end positions are ``None``. If
+        ``return_exact`` is ``True``, whether the alignment is known to be
+        optimal (bool) is also returned.
 
     See Also
     --------
@@ -261,12 +328,18 @@ def local_pairwise_align_protein(seq1, seq2, gap_open_penalty=11,
         substitution_matrix = blosum50
 
     return local_pairwise_align(seq1, seq2, gap_open_penalty,
-                                gap_extend_penalty, substitution_matrix)
+                                gap_extend_penalty, substitution_matrix,
+                                score_only=score_only,
+                                linear_memory=linear_memory,
+                                band_width=band_width,
+                                return_exact=return_exact)
 
 
 @experimental(as_of="0.4.0")
 def local_pairwise_align(seq1, seq2, gap_open_penalty,
-                         gap_extend_penalty, substitution_matrix):
+                         gap_extend_penalty, substitution_matrix,
+                         score_only=False, linear_memory=False,
+                         band_width=None, return_exact=False):
     """Locally align exactly two seqs with Smith-Waterman
 
     Parameters
@@ -284,6 +357,32 @@ def local_pairwise_align(seq1, seq2, gap_open_penalty,
     substitution_matrix: 2D dict (or similar)
         Lookup for substitution scores (these values are added to the
         previous best alignment score).
+    score_only : bool, optional
+        If ``True``, only the alignment score is computed, keeping a single
+        row of scores in memory, and ``None`` is returned in place of the
+        ``TabularMSA`` and of the start/end positions.
+    linear_memory : bool, optional
+        If ``True``, the alignment is traced back by divide and conquer
+        rather than from full score and traceback matrices, so that the
+        memory used grows with the lengths of the sequences rather than with
+        their product. The alignment is the same, but it takes a few times
+        longer to compute.
+    band_width : int or str, optional
+        If provided, only the cells of the score matrix within ``band_width``
+        diagonals of the diagonals between its first and its last cells are
+        computed, so that the time and memory used grow with ``band_width``
+        times the lengths of the sequences rather than with their product.
+        This is suitable for similar sequences, whose best alignment stays
+        close to the diagonal. If ``'adaptive'``, the band width starts at 16
+        and is doubled until no alignment leaving the band can score more
+        than the best alignment within it, which is then optimal. With an
+        integer band width, the alignment may not be optimal, which is
+        reported by ``return_exact`` and with a ``RuntimeWarning``.
+        ``linear_memory`` must be ``False``.
+    return_exact : bool, optional
+        If ``True``, a fourth item is returned, which is ``True`` if the
+        alignment is known to be optimal. It is always ``True`` unless
+        ``band_width`` is an integer.
 
     Returns
     -------
@@ -291,7 +390,10 @@ def local_pairwise_align(seq1, seq2, gap_open_penalty,
         ``TabularMSA`` object containing the aligned sequences, alignment score
         (float), and start/end positions of each input sequence (iterable
         of two-item tuples). Note that start/end positions are indexes into the
-        unaligned sequences.
+        unaligned sequences. If ``score_only`` is ``True``, the
+        ``TabularMSA`` and the start/end positions are ``None``. If
+        ``return_exact`` is ``True``, whether the alignment is known to be
+        optimal (bool) is also returned.
 
     See Also
     --------
@@ -306,6 +408,9 @@ def local_pairwise_align(seq1, seq2, gap_open_penalty,
     -----
     This algorithm was originally described in [1]_. The scikit-bio
     implementation was validated against the EMBOSS water web server [2]_.
+    Affine gap penalties are computed with Gotoh's algorithm [3]_, which is
+    implemented in C. ``skbio.alignment.local_pairwise_align_ssw`` is still
+    faster.
 
     References
     ----------
@@ -313,13 +418,11 @@ def local_pairwise_align(seq1, seq2, gap_open_penalty,
        Smith TF, Waterman MS.
        J Mol Biol. 1981 Mar 25;147(1):195-7.
     .. [2] http://www.ebi.ac.uk/Tools/psa/emboss_water/
+    .. [3] An improved algorithm for matching biological sequences.
+       Gotoh O.
+       J Mol Biol. 1982 Dec 15;162(3):705-8.
 
     """
-    warn("You're using skbio's python implementation of Smith-Waterman "
-         "alignment. This will be very slow (e.g., thousands of times slower) "
-         "than skbio.alignment.local_pairwise_align_ssw.",
-         EfficiencyWarning)
-
     for seq in seq1, seq2:
         if not isinstance(seq, GrammaredSequence):
             raise TypeError(
@@ -334,6 +437,29 @@ def local_pairwise_align(seq1, seq2, gap_open_penalty,
     seq1 = _coerce_alignment_input_type(seq1)
     seq2 = _coerce_alignment_input_type(seq2)
 
+    if band_width is not None:
+        if linear_memory:
+            raise ValueError(
+                "`band_width` cannot be combined with `linear_memory`.")
+        aligned1, aligned2, score, start_end_positions, exact = \
+            _banded_align(seq1, seq2, gap_open_penalty, gap_extend_penalty,
+                          substitution_matrix, band_width, local=True)
+        if score_only:
+            return _alignment_result(None, score, None, exact, return_exact)
+        msa = TabularMSA(aligned1 + aligned2)
+        return _alignment_result(msa, score, start_end_positions, exact,
+                                 return_exact)
+
+    if score_only or linear_memory:
+        aligned1, aligned2, score, start_end_positions = _linear_space_align(
+            seq1, seq2, gap_open_penalty, gap_extend_penalty,
+            substitution_matrix, local=True, score_only=score_only)
+        if score_only:
+            return _alignment_result(None, score, None, True, return_exact)
+        msa = TabularMSA(aligned1 + aligned2)
+        return _alignment_result(msa, score, start_end_positions, True,
+                                 return_exact)
+
     score_matrix, traceback_matrix = _compute_score_and_traceback_matrices(
         seq1, seq2, gap_open_penalty, gap_extend_penalty,
         substitution_matrix, new_alignment_score=0.0,
@@ -350,7 +476,8 @@ def local_pairwise_align(seq1, seq2, gap_open_penalty,
 
     msa = TabularMSA(aligned1 + aligned2)
 
-    return msa, score, start_end_positions
+    return _alignment_result(msa, score, start_end_positions, True,
+                             return_exact)
 
 
 @experimental(as_of="0.4.0")
@@ -358,7 +485,9 @@ def global_pairwise_align_nucleotide(seq1, seq2, gap_open_penalty=5,
                                      gap_extend_penalty=2,
                                      match_score=1, mismatch_score=-2,
                                      substitution_matrix=None,
-                                     penalize_terminal_gaps=False):
+                                     penalize_terminal_gaps=False,
+                                     score_only=False, linear_memory=False,
+                                     band_width=None, return_exact=False):
     """Globally align nucleotide seqs or alignments with Needleman-Wunsch
 
     Parameters
@@ -391,6 +520,32 @@ def global_pairwise_align_nucleotide(seq1, seq2, gap_open_penalty=5,
         the sequences being aligned are of different length. This is ``False``
         by default, which is very likely to be the behavior you want in all or
         nearly all cases.
+    score_only : bool, optional
+        If ``True``, only the alignment score is computed, keeping a single
+        row of scores in memory, and ``None`` is returned in place of the
+        ``TabularMSA`` and of the start/end positions.
+    linear_memory : bool, optional
+        If ``True``, the alignment is traced back by divide and conquer
+        rather than from full score and traceback matrices, so that the
+        memory used grows with the lengths of the sequences rather than with
+        their product. The alignment is the same, but it takes a few times
+        longer to compute.
+    band_width : int or str, optional
+        If provided, only the cells of the score matrix within ``band_width``
+        diagonals of the diagonals between its first and its last cells are
+        computed, so that the time and memory used grow with ``band_width``
+        times the lengths of the sequences rather than with their product.
+        This is suitable for similar sequences, whose best alignment stays
+        close to the diagonal. If ``'adaptive'``, the band width starts at 16
+        and is doubled until no alignment leaving the band can score more
+        than the best alignment within it, which is then optimal. With an
+        integer band width, the alignment may not be optimal, which is
+        reported by ``return_exact`` and with a ``RuntimeWarning``.
+        ``linear_memory`` must be ``False``.
+    return_exact : bool, optional
+        If ``True``, a fourth item is returned, which is ``True`` if the
+        alignment is known to be optimal. It is always ``True`` unless
+        ``band_width`` is an integer.
 
     Returns
     -------
@@ -398,7 +553,10 @@ def global_pairwise_align_nucleotide(seq1, seq2, gap_open_penalty=5,
         ``TabularMSA`` object containing the aligned sequences, alignment score
         (float), and start/end positions of each input sequence (iterable
         of two-item tuples). Note that start/end positions are indexes into the
-        unaligned sequences.
+        unaligned sequences. If ``score_only`` is ``True``, the
+        ``TabularMSA`` and the start/end positions are ``None``. If
+        ``return_exact`` is ``True``, whether the alignment is known to be
+        optimal (bool) is also returned.
 
     See Also
     --------
@@ -442,14 +600,20 @@ def global_pairwise_align_nucleotide(seq1, seq2, gap_open_penalty=5,
 
     return global_pairwise_align(seq1, seq2, gap_open_penalty,
                                  gap_extend_penalty, substitution_matrix,
-                                 penalize_terminal_gaps=penalize_terminal_gaps)
+                                 penalize_terminal_gaps=penalize_terminal_gaps,
+                                 score_only=score_only,
+                                 linear_memory=linear_memory,
+                                 band_width=band_width,
+                                 return_exact=return_exact)
 
 
 @experimental(as_of="0.4.0")
 def global_pairwise_align_protein(seq1, seq2, gap_open_penalty=11,
                                   gap_extend_penalty=1,
                                   substitution_matrix=None,
-                                  penalize_terminal_gaps=False):
+                                  penalize_terminal_gaps=False,
+                                  score_only=False, linear_memory=False,
+                                  band_width=None, return_exact=False):
     """Globally align pair of protein seqs or alignments with Needleman-Wunsch
 
     Parameters
@@ -474,6 +638,32 @@ def global_pairwise_align_protein(seq1, seq2, gap_open_penalty=11,
         the sequences being aligned are of different length. This is ``False``
         by default, which is very likely to be the behavior you want in all or
         nearly all cases.
+    score_only : bool, optional
+        If ``True``, only the alignment score is computed, keeping a single
+        row of scores in memory, and ``None`` is returned in place of the
+        ``TabularMSA`` and of the start/end positions.
+    linear_memory : bool, optional
+        If ``True``, the alignment is traced back by divide and conquer
+        rather than from full score and traceback matrices, so that the
+        memory used grows with the lengths of the sequences rather than with
+        their product. The alignment is the same, but it takes a few times
+        longer to compute.
+    band_width : int or str, optional
+        If provided, only the cells of the score matrix within ``band_width``
+        diagonals of the diagonals between its first and its last cells are
+        computed, so that the time and memory used grow with ``band_width``
+        times the lengths of the sequences rather than with their product.
+        This is suitable for similar sequences, whose best alignment stays
+        close to the diagonal. If ``'adaptive'``, the band width starts at 16
+        and is doubled until no alignment leaving the band can score more
+        than the best alignment within it, which is then optimal. With an
+        integer band width, the alignment may not be optimal, which is
+        reported by ``return_exact`` and with a ``RuntimeWarning``.
+        ``linear_memory`` must be ``False``.
+    return_exact : bool, optional
+        If ``True``, a fourth item is returned, which is ``True`` if the
+        alignment is known to be optimal. It is always ``True`` unless
+        ``band_width`` is an integer.
 
     Returns
     -------
@@ -481,7 +671,10 @@ def global_pairwise_align_protein(seq1, seq2, gap_open_penalty=11,
         ``TabularMSA`` object containing the aligned sequences, alignment score
         (float), and start/end positions of each input sequence (iterable
         of two-item tuples). Note that start/end positions are indexes into the
-        unaligned sequences.
+        unaligned sequences. If ``score_only`` is ``True``, the
+        ``TabularMSA`` and the start/end positions are ``None``. If
+        ``return_exact`` is ``True``, whether the alignment is known to be
+        optimal (bool) is also returned.
 
     See Also
     --------
@@ -526,12 +719,18 @@ def global_pairwise_align_protein(seq1, seq2, gap_open_penalty=11,
 
     return global_pairwise_align(seq1, seq2, gap_open_penalty,
                                  gap_extend_penalty, substitution_matrix,
-                                 penalize_terminal_gaps=penalize_terminal_gaps)
+                                 penalize_terminal_gaps=penalize_terminal_gaps,
+                                 score_only=score_only,
+                                 linear_memory=linear_memory,
+                                 band_width=band_width,
+                                 return_exact=return_exact)
 
 
 @experimental(as_of="0.4.0")
 def global_pairwise_align(seq1, seq2, gap_open_penalty, gap_extend_penalty,
-                          substitution_matrix, penalize_terminal_gaps=False):
+                          substitution_matrix, penalize_terminal_gaps=False,
+                          score_only=False, linear_memory=False,
+                          band_width=None, return_exact=False):
     """Globally align a pair of seqs or alignments with Needleman-Wunsch
 
     Parameters
@@ -556,6 +755,32 @@ def global_pairwise_align(seq1, seq2, gap_open_penalty, gap_extend_penalty,
         the sequences being aligned are of different length. This is ``False``
         by default, which is very likely to be the behavior you want in all or
         nearly all cases.
+    score_only : bool, optional
+        If ``True``, only the alignment score is computed, keeping a single
+        row of scores in memory, and ``None`` is returned in place of the
+        ``TabularMSA`` and of the start/end positions.
+    linear_memory : bool, optional
+        If ``True``, the alignment is traced back by divide and conquer
+        rather than from full score and traceback matrices, so that the
+        memory used grows with the lengths of the sequences rather than with
+        their product. The alignment is the same, but it takes a few times
+        longer to compute.
+    band_width : int or str, optional
+        If provided, only the cells of the score matrix within ``band_width``
+        diagonals of the diagonals between its first and its last cells are
+        computed, so that the time and memory used grow with ``band_width``
+        times the lengths of the sequences rather than with their product.
+        This is suitable for similar sequences, whose best alignment stays
+        close to the diagonal. If ``'adaptive'``, the band width starts at 16
+        and is doubled until no alignment leaving the band can score more
+        than the best alignment within it, which is then optimal. With an
+        integer band width, the alignment may not be optimal, which is
+        reported by ``return_exact`` and with a ``RuntimeWarning``.
+        ``linear_memory`` must be ``False``.
+    return_exact : bool, optional
+        If ``True``, a fourth item is returned, which is ``True`` if the
+        alignment is known to be optimal. It is always ``True`` unless
+        ``band_width`` is an integer.
 
     Returns
     -------
@@ -563,7 +788,10 @@ def global_pairwise_align(seq1, seq2, gap_open_penalty, gap_extend_penalty,
         ``TabularMSA`` object containing the aligned sequences, alignment score
         (float), and start/end positions of each input sequence (iterable
         of two-item tuples). Note that start/end positions are indexes into the
-        unaligned sequences.
+        unaligned sequences. If ``score_only`` is ``True``, the
+        ``TabularMSA`` and the start/end positions are ``None``. If
+        ``return_exact`` is ``True``, whether the alignment is known to be
+        optimal (bool) is also returned.
 
     See Also
     --------
@@ -578,10 +806,13 @@ def global_pairwise_align(seq1, seq2, gap_open_penalty, gap_extend_penalty,
     -----
     This algorithm (in a slightly more basic form) was originally described
     in [1]_. The scikit-bio implementation was validated against the
-    EMBOSS needle web server [2]_.
+    EMBOSS needle web server [2]_. Affine gap penalties are computed with
+    Gotoh's algorithm [3]_, which is implemented in C.
 
     This function can be use to align either a pair of sequences, a pair of
-    alignments, or a sequence and an alignment.
+    alignments, or a sequence and an alignment. The substitution score of a
+    position of each alignment is the average of the substitution scores of
+    the pairs of characters at these positions.
 
     References
     ----------
@@ -590,14 +821,11 @@ def global_pairwise_align(seq1, seq2, gap_open_penalty, gap_extend_penalty,
        Needleman SB, Wunsch CD.
        J Mol Biol. 1970 Mar;48(3):443-53.
     .. [2] http://www.ebi.ac.uk/Tools/psa/emboss_needle/
+    .. [3] An improved algorithm for matching biological sequences.
+       Gotoh O.
+       J Mol Biol. 1982 Dec 15;162(3):705-8.
 
     """
-    warn("You're using skbio's python implementation of Needleman-Wunsch "
-         "alignment. This is known to be very slow (e.g., thousands of times "
-         "slower than a native C implementation). We'll be adding a faster "
-         "version soon (see https://github.com/biocore/scikit-bio/issues/254 "
-         "to track progress on this).", EfficiencyWarning)
-
     for seq in seq1, seq2:
         # We don't need to check the case where `seq` is a `TabularMSA` with a
         # dtype that isn't a subclass of `GrammaredSequence`, this is
@@ -615,6 +843,31 @@ def global_pairwise_align(seq1, seq2, gap_open_penalty, gap_extend_penalty,
             "`seq1` and `seq2` must have the same dtype: %r != %r"
             % (seq1.dtype.__name__, seq2.dtype.__name__))
 
+    if band_width is not None:
+        if linear_memory:
+            raise ValueError(
+                "`band_width` cannot be combined with `linear_memory`.")
+        aligned1, aligned2, score, start_end_positions, exact = \
+            _banded_align(seq1, seq2, gap_open_penalty, gap_extend_penalty,
+                          substitution_matrix, band_width,
+                          penalize_terminal_gaps=penalize_terminal_gaps)
+        if score_only:
+            return _alignment_result(None, score, None, exact, return_exact)
+        msa = TabularMSA(aligned1 + aligned2)
+        return _alignment_result(msa, score, start_end_positions, exact,
+                                 return_exact)
+
+    if score_only or linear_memory:
+        aligned1, aligned2, score, start_end_positions = _linear_space_align(
+            seq1, seq2, gap_open_penalty, gap_extend_penalty,
+            substitution_matrix, penalize_terminal_gaps=penalize_terminal_gaps,
+            score_only=score_only)
+        if score_only:
+            return _alignment_result(None, score, None, True, return_exact)
+        msa = TabularMSA(aligned1 + aligned2)
+        return _alignment_result(msa, score, start_end_positions, True,
+                                 return_exact)
+
     if penalize_terminal_gaps:
         init_matrices_f = _init_matrices_nw
     else:
@@ -638,7 +891,8 @@ def global_pairwise_align(seq1, seq2, gap_open_penalty, gap_extend_penalty,
 
     msa = TabularMSA(aligned1 + aligned2)
 
-    return msa, score, start_end_positions
+    return _alignment_result(msa, score, start_end_positions, True,
+                             return_exact)
 
 
 @experimental(as_of="0.4.0")
@@ -779,6 +1033,13 @@ def make_identity_substitution_matrix(match_score, mismatch_score,
 # less clunky.
 
 
+def _alignment_result(msa, score, start_end_positions, exact, return_exact):
+    """Return the results of a pairwise alignment, and `exact` if requested."""
+    if return_exact:
+        return msa, score, start_end_positions, exact
+    return msa, score, start_end_positions
+
+
 def _coerce_alignment_input_type(seq):
     if isinstance(seq, GrammaredSequence):
         return TabularMSA([seq])
@@ -786,14 +1047,20 @@ def _coerce_alignment_input_type(seq):
         return seq
 
 
+# The direction of the last move of the best alignment ending at each cell of
+# the traceback matrix. The flags are added to the direction of a cell if the
+# best alignment ending with a vertical (horizontal) gap at this cell extends
+# a gap rather than opening one.
 _traceback_encoding = {'match': 1, 'vertical-gap': 2, 'horizontal-gap': 3,
-                       'uninitialized': -1, 'alignment-end': 0}
+                       'uninitialized': -1, 'alignment-end': 0,
+                       'vertical-gap-extend': 4, 'horizontal-gap-extend': 8}
+_traceback_direction_mask = 3
 
 
 def _init_matrices_sw(aln1, aln2, gap_open_penalty, gap_extend_penalty):
     shape = (aln2.shape.position+1, aln1.shape.position+1)
     score_matrix = np.zeros(shape)
-    traceback_matrix = np.zeros(shape, dtype=np.int)
+    traceback_matrix = np.zeros(shape, dtype=np.int8)
     traceback_matrix += _traceback_encoding['uninitialized']
     traceback_matrix[0, :] = _traceback_encoding['alignment-end']
     traceback_matrix[:, 0] = _traceback_encoding['alignment-end']
@@ -803,7 +1070,7 @@ def _init_matrices_sw(aln1, aln2, gap_open_penalty, gap_extend_penalty):
 def _init_matrices_nw(aln1, aln2, gap_open_penalty, gap_extend_penalty):
     shape = (aln2.shape.position+1, aln1.shape.position+1)
     score_matrix = np.zeros(shape)
-    traceback_matrix = np.zeros(shape, dtype=np.int)
+    traceback_matrix = np.zeros(shape, dtype=np.int8)
     traceback_matrix += _traceback_encoding['uninitialized']
     traceback_matrix[0, 0] = _traceback_encoding['alignment-end']
 
@@ -826,7 +1093,7 @@ def _init_matrices_nw_no_terminal_gap_penalty(
         aln1, aln2, gap_open_penalty, gap_extend_penalty):
     shape = (aln2.shape.position+1, aln1.shape.position+1)
     score_matrix = np.zeros(shape)
-    traceback_matrix = np.zeros(shape, dtype=np.int)
+    traceback_matrix = np.zeros(shape, dtype=np.int8)
     traceback_matrix += _traceback_encoding['uninitialized']
     traceback_matrix[0, 0] = _traceback_encoding['alignment-end']
 
@@ -843,16 +1110,75 @@ def _init_matrices_nw_no_terminal_gap_penalty(
     return score_matrix, traceback_matrix
 
 
-def _compute_substitution_score(aln1_chars, aln2_chars, substitution_matrix,
-                                gap_substitution_score, gap_chars):
-    substitution_score = 0
-    for aln1_char, aln2_char in product(aln1_chars, aln2_chars):
-        if aln1_char in gap_chars or aln2_char in gap_chars:
-            substitution_score += gap_substitution_score
-        else:
+def _encode_alignment(aln, gap_chars):
+    """Return the alphabet of an alignment and the code of each character.
+
+    The alphabet is the sorted array of the (byte values of the) non-gap
+    characters of the alignment. The gaps are coded with the length of the
+    alphabet.
+    """
+    chars = np.empty((aln.shape.position, aln.shape.sequence), dtype=np.uint8)
+    for i, seq in enumerate(aln):
+        chars[:, i] = seq._bytes
+
+    is_gap = np.zeros(256, dtype=bool)
+    is_gap[[ord(c) for c in gap_chars]] = True
+    alphabet = np.unique(chars[~is_gap[chars]])
+    lookup = np.full(256, len(alphabet), dtype=np.intp)
+    lookup[alphabet] = np.arange(len(alphabet))
+    return alphabet, lookup[chars]
+
+
+def _count_codes(codes, n_codes):
+    """Count the occurrences of each code at each position."""
+    n_positions = codes.shape[0]
+    offsets = np.arange(n_positions)[:, np.newaxis] * n_codes
+    counts = np.bincount((codes + offsets).ravel(),
+                         minlength=n_positions * n_codes)
+    return counts.reshape(n_positions, n_codes).astype(np.double)
+
+
+def _substitution_profiles(aln1, aln2, substitution_matrix,
+                           gap_substitution_score=0):
+    """Prepare the substitution scores of two alignments for the DP kernel.
+
+    The substitution score of a position of each alignment is the average of
+    the substitution scores of the pairs of characters at these positions,
+    where a pair with a gap scores ``gap_substitution_score``. It is the dot
+    product of a row of ``profile1`` and a row of ``profile2``, divided by
+    ``denominator``.
+
+    Returns
+    -------
+    profile1 : np.ndarray of double
+        The sum of the substitution scores of the characters at each position
+        of `aln1` with each character (and the gap) of `aln2`.
+    profile2 : np.ndarray of double
+        The count of each character (and the gap) at each position of `aln2`.
+    codes2 : np.ndarray of intp
+        The code of the character at each position of `aln2` if it is the
+        only one at this position, or -1.
+    denominator : float
+        The number of pairs of sequences of the alignments.
+
+    Raises
+    ------
+    ValueError
+        If a pair of characters of the alignments is missing from
+        `substitution_matrix`.
+
+    """
+    gap_chars = aln1.dtype.gap_chars
+    alphabet1, codes1 = _encode_alignment(aln1, gap_chars)
+    alphabet2, codes2 = _encode_alignment(aln2, gap_chars)
+
+    # the last row and column are the gaps
+    scores = np.full((len(alphabet1) + 1, len(alphabet2) + 1),
+                     gap_substitution_score, dtype=np.double)
+    for i, aln1_char in enumerate(map(chr, alphabet1)):
+        for j, aln2_char in enumerate(map(chr, alphabet2)):
             try:
-                substitution_score += \
-                    substitution_matrix[aln1_char][aln2_char]
+                scores[i, j] = substitution_matrix[aln1_char][aln2_char]
             except KeyError:
                 offending_chars = \
                     [c for c in (aln1_char, aln2_char)
@@ -866,8 +1192,14 @@ def _compute_substitution_score(aln1_chars, aln2_chars, substitution_matrix,
                     "sequences)? Does your sequence contain invalid "
                     "characters? The offending character(s) is: "
                     " %s." % ', '.join(offending_chars))
-    substitution_score /= (len(aln1_chars) * len(aln2_chars))
-    return substitution_score
+
+    profile1 = _count_codes(codes1, len(alphabet1) + 1).dot(scores)
+    profile2 = _count_codes(codes2, len(alphabet2) + 1)
+    n_sequences2 = aln2.shape.sequence
+    codes2 = np.where(profile2.max(axis=1) == n_sequences2,
+                      profile2.argmax(axis=1), -1).astype(np.intp)
+    denominator = float(aln1.shape.sequence * n_sequences2)
+    return profile1, profile2, codes2, denominator
 
 
 def _compute_score_and_traceback_matrices(
@@ -889,167 +1221,527 @@ def _compute_score_and_traceback_matrices(
     that users are most likely to be looking for.
 
     """
-    aln1_length = aln1.shape.position
-    aln2_length = aln2.shape.position
-    # cache some values for quicker/simpler access
-    aend = _traceback_encoding['alignment-end']
-    match = _traceback_encoding['match']
-    vgap = _traceback_encoding['vertical-gap']
-    hgap = _traceback_encoding['horizontal-gap']
-
-    new_alignment_score = (new_alignment_score, aend)
+    profile1, profile2, codes2, denominator = _substitution_profiles(
+        aln1, aln2, substitution_matrix, gap_substitution_score)
 
     # Initialize a matrix to use for scoring the alignment and for tracing
     # back the best alignment
     score_matrix, traceback_matrix = init_matrices_f(
         aln1, aln2, gap_open_penalty, gap_extend_penalty)
 
-    # Iterate over the characters in aln2 (which corresponds to the vertical
-    # sequence in the matrix)
-    for aln2_pos, aln2_chars in enumerate(aln2.iter_positions(
-            ignore_metadata=True), 1):
-        aln2_chars = str(aln2_chars)
-
-        # Iterate over the characters in aln1 (which corresponds to the
-        # horizontal sequence in the matrix)
-        for aln1_pos, aln1_chars in enumerate(aln1.iter_positions(
-                ignore_metadata=True), 1):
-            aln1_chars = str(aln1_chars)
-
-            # compute the score for a match/mismatch
-            substitution_score = _compute_substitution_score(
-                aln1_chars, aln2_chars, substitution_matrix,
-                gap_substitution_score, aln1.dtype.gap_chars)
-
-            diag_score = \
-                (score_matrix[aln2_pos-1, aln1_pos-1] + substitution_score,
-                 match)
-
-            # compute the score for adding a gap in aln2 (vertical)
-            if not penalize_terminal_gaps and (aln1_pos == aln1_length):
-                # we've reached the end of aln1, so adding vertical gaps
-                # (which become gaps in aln1) should no longer
-                # be penalized (if penalize_terminal_gaps == False)
-                up_score = (score_matrix[aln2_pos-1, aln1_pos], vgap)
-            elif traceback_matrix[aln2_pos-1, aln1_pos] == vgap:
-                # gap extend, because the cell above was also a gap
-                up_score = \
-                    (score_matrix[aln2_pos-1, aln1_pos] - gap_extend_penalty,
-                     vgap)
-            else:
-                # gap open, because the cell above was not a gap
-                up_score = \
-                    (score_matrix[aln2_pos-1, aln1_pos] - gap_open_penalty,
-                     vgap)
-
-            # compute the score for adding a gap in aln1 (horizontal)
-            if not penalize_terminal_gaps and (aln2_pos == aln2_length):
-                # we've reached the end of aln2, so adding horizontal gaps
-                # (which become gaps in aln2) should no longer
-                # be penalized (if penalize_terminal_gaps == False)
-                left_score = (score_matrix[aln2_pos, aln1_pos-1], hgap)
-            elif traceback_matrix[aln2_pos, aln1_pos-1] == hgap:
-                # gap extend, because the cell to the left was also a gap
-                left_score = \
-                    (score_matrix[aln2_pos, aln1_pos-1] - gap_extend_penalty,
-                     hgap)
-            else:
-                # gap open, because the cell to the left was not a gap
-                left_score = \
-                    (score_matrix[aln2_pos, aln1_pos-1] - gap_open_penalty,
-                     hgap)
-
-            # identify the largest score, and use that information to populate
-            # the score and traceback matrices
-            best_score = _first_largest([new_alignment_score, left_score,
-                                         diag_score, up_score])
-            score_matrix[aln2_pos, aln1_pos] = best_score[0]
-            traceback_matrix[aln2_pos, aln1_pos] = best_score[1]
+    # The rows of the matrices correspond to the positions of aln2 (the
+    # vertical sequence in the matrix) and the columns to those of aln1 (the
+    # horizontal sequence).
+    _fill_matrices(score_matrix, traceback_matrix, profile1, profile2,
+                   codes2, denominator, gap_open_penalty, gap_extend_penalty,
+                   new_alignment_score, penalize_terminal_gaps)
 
     return score_matrix, traceback_matrix
 
 
+def _boundary_scores(length, gap_open_penalty, gap_extend_penalty,
+                     penalize_gaps):
+    """Return the scores of the first row or column of the score matrix."""
+    scores = np.zeros(length)
+    if penalize_gaps:
+        scores[1:] = \
+            -gap_open_penalty - (np.arange(length - 1) * gap_extend_penalty)
+    return scores
+
+
+def _linear_space_align(aln1, aln2, gap_open_penalty, gap_extend_penalty,
+                        substitution_matrix, local=False,
+                        penalize_terminal_gaps=True, score_only=False):
+    """Align two alignments without storing the score or traceback matrix.
+
+    The alignment score is computed keeping a single row of scores. Unless
+    `score_only` is True, the alignment is then traced back with
+    `_linear_space_traceback`, so the results are the same as those of
+    `_compute_score_and_traceback_matrices` followed by `_traceback`.
+
+    Returns
+    -------
+    tuple
+        The aligned sequences of `aln1` and `aln2` (``None`` if `score_only`
+        is True), the alignment score, and the start/end positions of `aln1`
+        and `aln2` (``None`` if `score_only` is True).
+
+    """
+    profile1, profile2, codes2, denominator = _substitution_profiles(
+        aln1, aln2, substitution_matrix)
+    n_rows = profile2.shape[0] + 1
+    n_cols = profile1.shape[0] + 1
+    new_alignment_score = 0.0 if local else -np.inf
+    kernel_args = (profile1, profile2, codes2, denominator, gap_open_penalty,
+                   gap_extend_penalty, new_alignment_score,
+                   penalize_terminal_gaps)
+
+    # the first row and column, as initialized by _init_matrices_sw,
+    # _init_matrices_nw or _init_matrices_nw_no_terminal_gap_penalty
+    penalize_gaps = penalize_terminal_gaps and not local
+    scores = _boundary_scores(n_cols, gap_open_penalty, gap_extend_penalty,
+                              penalize_gaps)
+    left_scores = _boundary_scores(n_rows, gap_open_penalty,
+                                   gap_extend_penalty, penalize_gaps)
+    gap_scores = np.full(n_cols, -np.inf)
+    left_gap_scores = np.full(n_rows, -np.inf)
+
+    last_scores = scores.copy()
+    best_score, best_row, best_col = _fill_block(
+        last_scores, gap_scores.copy(), left_scores, left_gap_scores, 0, 0,
+        *kernel_args)
+    if not local:
+        score = last_scores[-1]
+        end_row, end_col = n_rows - 1, n_cols - 1
+    elif best_score > 0:
+        score = best_score
+        end_row, end_col = best_row, best_col
+    else:
+        # as np.argmax, the first cell of the score matrix has the best score
+        score = 0.0
+        end_row, end_col = 0, 0
+
+    if score_only:
+        return None, None, score, None
+
+    positions1, positions2, start_row, start_col, _ = \
+        _linear_space_traceback(
+            0, 0, scores[:end_col + 1], gap_scores[:end_col + 1],
+            left_scores[:end_row + 1], left_gap_scores[:end_row + 1],
+            None, kernel_args)
+    if not local:
+        # follow the first row or column to the first cell
+        positions1.extend(range(start_col - 1, -1, -1))
+        positions2.extend([-1] * start_col)
+        positions1.extend([-1] * start_row)
+        positions2.extend(range(start_row - 1, -1, -1))
+        start_row = start_col = 0
+
+    aligned1 = _aligned_sequences(aln1, positions1[::-1])
+    aligned2 = _aligned_sequences(aln2, positions2[::-1])
+    start_end_positions = [(start_col, end_col - 1), (start_row, end_row - 1)]
+    return aligned1, aligned2, score, start_end_positions
+
+
+# The band width from which the adaptive band of _banded_align starts.
+_initial_band_width = 16
+
+
+def _banded_align(aln1, aln2, gap_open_penalty, gap_extend_penalty,
+                  substitution_matrix, band_width, local=False,
+                  penalize_terminal_gaps=True):
+    """Align two alignments within a diagonal band of the score matrix.
+
+    The band spans the diagonals from the first cell to the last cell of the
+    score matrix, plus `band_width` diagonals on each side. The alignment is
+    optimal if no alignment leaving the band can score more, which is
+    checked with `_band_escape_bound`. If `band_width` is ``'adaptive'``, it
+    starts at ``_initial_band_width`` and is doubled until the alignment is
+    optimal. Otherwise, a ``RuntimeWarning`` is also issued if the alignment
+    may not be optimal.
+
+    Returns
+    -------
+    tuple
+        The aligned sequences of `aln1` and `aln2`, the alignment score, the
+        start/end positions of `aln1` and `aln2`, and whether the alignment
+        is known to be optimal.
+
+    Raises
+    ------
+    ValueError
+        If `band_width` is negative, or neither an integer nor
+        ``'adaptive'``.
+
+    """
+    adaptive = isinstance(band_width, str) and band_width == 'adaptive'
+    if adaptive:
+        band_width = _initial_band_width
+    elif (not isinstance(band_width, numbers.Integral) or
+            isinstance(band_width, bool) or band_width < 0):
+        raise ValueError("`band_width` must be a non-negative integer or "
+                         "'adaptive', not %r." % (band_width,))
+
+    profile1, profile2, codes2, denominator = _substitution_profiles(
+        aln1, aln2, substitution_matrix)
+    n_rows = profile2.shape[0] + 1
+    n_cols = profile1.shape[0] + 1
+    new_alignment_score = 0.0 if local else -np.inf
+    penalize_gaps = penalize_terminal_gaps and not local
+    hgap = _traceback_encoding['horizontal-gap']
+    vgap = _traceback_encoding['vertical-gap']
+    # no substitution scores more than the best score of a character of aln1
+    # against any character of aln2
+    max_score = profile1.max(initial=0) / aln1.shape.sequence
+    gap_correction = max(gap_open_penalty - gap_extend_penalty, 0)
+    reversed_profiles = (np.ascontiguousarray(profile1[::-1]),
+                         np.ascontiguousarray(profile2[::-1]),
+                         np.ascontiguousarray(codes2[::-1]))
+
+    def fill_band(band_low, band_high, traceback_matrix, edge_scores,
+                  profile1, profile2, codes2):
+        # the first row and column, as initialized by _init_matrices_sw,
+        # _init_matrices_nw or _init_matrices_nw_no_terminal_gap_penalty
+        scores = _boundary_scores(n_cols, gap_open_penalty,
+                                  gap_extend_penalty, penalize_gaps)
+        scores[band_high + 1:] = -np.inf
+        left_scores = _boundary_scores(n_rows, gap_open_penalty,
+                                       gap_extend_penalty, penalize_gaps)
+        best_score, best_row, best_col = _fill_band(
+            scores, left_scores, band_low, band_high, traceback_matrix,
+            profile1, profile2, codes2, denominator, gap_open_penalty,
+            gap_extend_penalty, new_alignment_score, penalize_terminal_gaps,
+            edge_scores)
+        return scores[-1], best_score, best_row, best_col
+
+    while True:
+        band_low = max(min(0, n_cols - n_rows) - band_width, 1 - n_rows)
+        band_high = min(max(0, n_cols - n_rows) + band_width, n_cols - 1)
+
+        traceback_matrix = np.zeros((n_rows, band_high - band_low + 1),
+                                    dtype=np.int8)
+        if not local:
+            traceback_matrix[0, 1 - band_low:] = hgap
+            rows = np.arange(1, 1 - band_low)
+            traceback_matrix[rows, -rows - band_low] = vgap
+        forward_edges = np.empty((n_rows, 2))
+        last_score, best_score, best_row, best_col = fill_band(
+            band_low, band_high, traceback_matrix, forward_edges, profile1,
+            profile2, codes2)
+        if not local:
+            score = last_score
+            end_row, end_col = n_rows - 1, n_cols - 1
+        elif best_score > 0:
+            score = best_score
+            end_row, end_col = best_row, best_col
+        else:
+            # as np.argmax, the first cell of the score matrix has the best
+            # score
+            score = 0.0
+            end_row, end_col = 0, 0
+
+        if band_low == 1 - n_rows and band_high == n_cols - 1:
+            # the band is the whole score matrix
+            exact = True
+        else:
+            # the scores of the ends of the alignments from the edges of the
+            # band, by aligning the reversed alignments
+            backward_edges = np.empty((n_rows, 2))
+            fill_band(band_low, band_high, None, backward_edges,
+                      *reversed_profiles)
+            exact = score >= _band_escape_bound(
+                forward_edges, backward_edges, band_low, band_high, n_cols,
+                max_score, gap_correction, local)
+        if exact or not adaptive:
+            break
+        band_width *= 2
+
+    if not exact:
+        warn("The alignment may not be optimal, as an alignment leaving the "
+             "band of width %d may score more. Use a larger band_width or "
+             "band_width='adaptive'." % band_width, RuntimeWarning)
+
+    positions1, positions2, start_row, start_col, _ = \
+        _traceback_positions(traceback_matrix, end_row, end_col,
+                             band_low=band_low)
+    aligned1 = _aligned_sequences(aln1, positions1[::-1])
+    aligned2 = _aligned_sequences(aln2, positions2[::-1])
+    start_end_positions = [(start_col, end_col - 1), (start_row, end_row - 1)]
+    return aligned1, aligned2, score, start_end_positions, exact
+
+
+def _prefix_max(values, shift):
+    """Return the maximum of ``values[:i - shift + 1]`` for each index i."""
+    result = np.full(values.shape, -np.inf)
+    if shift < len(values):
+        result[shift:] = np.maximum.accumulate(values)[:len(values) - shift]
+    return result
+
+
+def _band_escape_bound(forward_edges, backward_edges, band_low, band_high,
+                       n_cols, max_score, gap_correction, local=False):
+    """Return an upper bound of the scores of the alignments leaving a band.
+
+    An alignment leaving the band first exits it at a cell of one of its
+    edges, and, unless it is local and ends outside of the band, last enters
+    it again at a cell of one of its edges. Up to the first cell, it scores
+    at most the forward score of this cell, and from the last cell, at most
+    the backward score of this cell plus `gap_correction` (the score of a gap
+    split at this cell is lower by at most this value). In between, and
+    outside of the band of a local alignment, each substitution scores at
+    most `max_score` and gaps score at most 0.
+
+    Parameters
+    ----------
+    forward_edges : np.ndarray of double
+        The scores of the cells of each row on the diagonals `band_low` and
+        `band_high`, as computed by ``_fill_band``.
+    backward_edges : np.ndarray of double
+        The same scores, for the reversed alignments. As the diagonals of the
+        band are the same for the reversed alignments, the lower edge of the
+        band is their upper edge, and conversely.
+    band_low, band_high : int
+        The first and last diagonals of the band.
+    n_cols : int
+        The number of columns of the score matrix.
+    max_score : float
+        An upper bound of the substitution scores.
+    gap_correction : float
+        The difference between the gap open and gap extend penalties.
+    local : bool, optional
+        Whether the alignments are local.
+
+    Returns
+    -------
+    float
+        The upper bound, which is -inf if no alignment can leave the band.
+
+    """
+    n_rows = forward_edges.shape[0]
+    last_row, last_col = n_rows - 1, n_cols - 1
+    rows = np.arange(n_rows)
+    low_edge = forward_edges[:, 0].copy()
+    high_edge = forward_edges[:, 1].copy()
+    back_low_edge = backward_edges[::-1, 1] + gap_correction
+    back_high_edge = backward_edges[::-1, 0] + gap_correction
+    # no alignment leaves the band across an edge of the score matrix
+    if band_low == -last_row:
+        low_edge[:] = back_low_edge[:] = -np.inf
+    if band_high == last_col:
+        high_edge[:] = back_high_edge[:] = -np.inf
+
+    # exiting at row r1 and entering at a later row r2, with at most
+    # r2 - r1 substitutions in between, or only c2 - c1 if exiting the upper
+    # edge and entering the lower edge
+    bounds = [
+        back_high_edge + max_score * rows +
+        _prefix_max(np.maximum(low_edge, high_edge) - max_score * rows, 1),
+        back_low_edge + max_score * rows +
+        _prefix_max(low_edge - max_score * rows, 1),
+        back_low_edge + max_score * (rows + band_low) +
+        _prefix_max(high_edge - max_score * (rows + band_high),
+                    band_high - band_low + 2)]
+    if local:
+        # starting or ending outside of the band
+        bounds += [
+            high_edge + max_score * np.minimum(last_row - rows,
+                                               last_col - rows - band_high),
+            low_edge + max_score * np.minimum(last_row - rows,
+                                              last_col - rows - band_low),
+            back_high_edge + max_score * rows,
+            back_low_edge + max_score * (rows + band_low)]
+        if band_high < last_col:
+            bounds.append([max_score * (last_col - band_high - 1)])
+        if band_low > -last_row:
+            bounds.append([max_score * (last_row + band_low - 1)])
+    return max(np.max(bound) for bound in bounds)
+
+
+# The largest number of cells of a block of the traceback matrix that
+# _linear_space_traceback stores.
+_traceback_block_size = 2 ** 20
+
+
+def _linear_space_traceback(first_row, first_col, scores, gap_scores,
+                            left_scores, left_gap_scores, current_gap,
+                            kernel_args):
+    """Trace back an alignment keeping a few rows of scores.
+
+    This is a divide and conquer traceback, in the spirit of Hirschberg's
+    algorithm [1]_, which returns the same alignment as `_traceback`. The
+    alignment is traced back from the last cell of a block of the score
+    matrix, whose first row (`scores` and `gap_scores`) and first column
+    (`left_scores` and `left_gap_scores`) are given, as in `_fill_block`.
+    Small blocks are traced back with a traceback matrix. Larger blocks are
+    split at their middle row: the rows of the lower half are filled while
+    propagating the cell of the middle row where the traceback from each cell
+    arrives, then the lower half, which only needs the columns from this
+    cell, and the upper half, which ends at this cell, are traced back.
+
+    Returns the positions of the alignments in each column of the alignment,
+    from the end, followed by the row, the column and the gap being extended
+    (if any) where the traceback leaves the block through its first row or
+    column, or ends.
+
+    References
+    ----------
+    .. [1] A linear space algorithm for computing maximal common
+       subsequences.
+       Hirschberg DS.
+       Commun ACM. 1975 Jun;18(6):341-3.
+
+    """
+    vgap = _traceback_encoding['vertical-gap']
+    height = len(left_scores)
+    width = len(scores)
+    last_row = first_row + height - 1
+    last_col = first_col + width - 1
+
+    if height == 1 or width == 1:
+        return [], [], last_row, last_col, current_gap
+
+    if height == 2 or (height - 1) * (width - 1) <= _traceback_block_size:
+        traceback_matrix = np.zeros((height, width), dtype=np.int8)
+        _fill_block(scores.copy(), gap_scores.copy(), left_scores,
+                    left_gap_scores, first_row, first_col, *kernel_args,
+                    traceback_matrix=traceback_matrix)
+        positions1, positions2, row, col, current_gap = \
+            _traceback_positions(traceback_matrix, height - 1, width - 1,
+                                 current_gap, stop_at_edges=True)
+        positions1 = [p if p < 0 else p + first_col for p in positions1]
+        positions2 = [p if p < 0 else p + first_row for p in positions2]
+        return (positions1, positions2, row + first_row, col + first_col,
+                current_gap)
+
+    mid = (height - 1) // 2
+    mid_scores = scores.copy()
+    mid_gap_scores = gap_scores.copy()
+    _fill_block(mid_scores, mid_gap_scores, left_scores[:mid + 1],
+                left_gap_scores[:mid + 1], first_row, first_col, *kernel_args)
+    lower_left_scores = left_scores[mid:]
+    lower_left_gap_scores = left_gap_scores[mid:]
+
+    # the label of a cell of the middle row is twice its column, plus one if
+    # the traceback arrives there extending a vertical gap
+    labels = 2 * np.arange(first_col, last_col + 1, dtype=np.intp)
+    gap_labels = labels + 1
+    _fill_block(mid_scores.copy(), mid_gap_scores.copy(), lower_left_scores,
+                lower_left_gap_scores, first_row + mid, first_col,
+                *kernel_args, labels=labels, gap_labels=gap_labels)
+    label = gap_labels[-1] if current_gap == vgap else labels[-1]
+
+    if label < 0:
+        # the traceback doesn't arrive in the middle row
+        return _linear_space_traceback(
+            first_row + mid, first_col, mid_scores, mid_gap_scores,
+            lower_left_scores, lower_left_gap_scores, current_gap,
+            kernel_args)
+
+    mid_col, extends_gap = divmod(label, 2)
+    # the lower half of the traceback doesn't go left of the column before
+    # mid_col, so the block is narrowed to this column
+    lower_first_col = max(first_col, mid_col - 1)
+    offset = lower_first_col - first_col
+    if offset > 0:
+        lower_left_scores = np.empty(height - mid)
+        lower_left_gap_scores = np.empty(height - mid)
+        lower_left_scores[0] = mid_scores[offset]
+        lower_left_gap_scores[0] = -np.inf
+        _fill_block(mid_scores[:offset + 1].copy(),
+                    mid_gap_scores[:offset + 1].copy(),
+                    left_scores[mid:], left_gap_scores[mid:],
+                    first_row + mid, first_col, *kernel_args,
+                    right_scores=lower_left_scores,
+                    right_gap_scores=lower_left_gap_scores)
+    positions1, positions2, _, _, _ = _linear_space_traceback(
+        first_row + mid, lower_first_col, mid_scores[offset:],
+        mid_gap_scores[offset:], lower_left_scores, lower_left_gap_scores,
+        current_gap, kernel_args)
+    del mid_scores, mid_gap_scores, lower_left_scores, lower_left_gap_scores
+
+    upper_width = mid_col - first_col + 1
+    upper = _linear_space_traceback(
+        first_row, first_col, scores[:upper_width], gap_scores[:upper_width],
+        left_scores[:mid + 1], left_gap_scores[:mid + 1],
+        vgap if extends_gap else None, kernel_args)
+    positions1.extend(upper[0])
+    positions2.extend(upper[1])
+    return (positions1, positions2) + upper[2:]
+
+
 def _traceback(traceback_matrix, score_matrix, aln1, aln2, start_row,
                start_col):
+    best_score = score_matrix[start_row, start_col]
+    positions1, positions2, current_row, current_col, _ = \
+        _traceback_positions(traceback_matrix, start_row, start_col)
+
+    aligned_seqs1 = _aligned_sequences(aln1, positions1[::-1])
+    aligned_seqs2 = _aligned_sequences(aln2, positions2[::-1])
+
+    return aligned_seqs1, aligned_seqs2, best_score, current_col, current_row
+
+
+def _traceback_positions(traceback_matrix, current_row, current_col,
+                         current_gap=None, stop_at_edges=False,
+                         band_low=None):
+    """Follow the traceback matrix from a cell.
+
+    Returns the positions of `aln1` and `aln2` in each column of the
+    alignment, from the end, where -1 is a gap, followed by the row, the
+    column and the gap being extended (if any) where the traceback stops. It
+    stops at the end of the alignment, or at the first row or column of the
+    matrix if `stop_at_edges` is True. If `band_low` is provided, the
+    traceback matrix holds a diagonal band starting at this diagonal, as
+    filled by `_fill_band`.
+
+    """
     # cache some values for simpler reference
-    aend = _traceback_encoding['alignment-end']
     match = _traceback_encoding['match']
     vgap = _traceback_encoding['vertical-gap']
     hgap = _traceback_encoding['horizontal-gap']
-    gap_character = aln1.dtype.default_gap_char
+    vgap_extend = _traceback_encoding['vertical-gap-extend']
+    hgap_extend = _traceback_encoding['horizontal-gap-extend']
 
-    # initialize the result alignments
-    aln1_sequence_count = aln1.shape.sequence
-    aligned_seqs1 = [[] for e in range(aln1_sequence_count)]
+    positions1 = []
+    positions2 = []
 
-    aln2_sequence_count = aln2.shape.sequence
-    aligned_seqs2 = [[] for e in range(aln2_sequence_count)]
-
-    current_row = start_row
-    current_col = start_col
-
-    best_score = score_matrix[current_row, current_col]
-    current_value = None
+    # a gap which is extended continues regardless of the direction of the
+    # best alignment ending at the next cell
+    while not (stop_at_edges and (current_row == 0 or current_col == 0)):
+        if band_low is None:
+            current_value = traceback_matrix[current_row, current_col]
+        else:
+            current_value = traceback_matrix[
+                current_row, current_col - current_row - band_low]
+        if current_value < 0:
+            raise ValueError(
+                "Invalid value in traceback matrix: %s" % current_value)
 
-    while current_value != aend:
-        current_value = traceback_matrix[current_row, current_col]
+        direction = current_gap
+        if direction is None:
+            direction = current_value & _traceback_direction_mask
 
-        if current_value == match:
-            for aligned_seq, input_seq in zip(aligned_seqs1, aln1):
-                aligned_seq.append(str(input_seq[current_col-1]))
-            for aligned_seq, input_seq in zip(aligned_seqs2, aln2):
-                aligned_seq.append(str(input_seq[current_row-1]))
+        if direction == match:
+            positions1.append(current_col - 1)
+            positions2.append(current_row - 1)
             current_row -= 1
             current_col -= 1
-        elif current_value == vgap:
-            for aligned_seq in aligned_seqs1:
-                aligned_seq.append(gap_character)
-            for aligned_seq, input_seq in zip(aligned_seqs2, aln2):
-                aligned_seq.append(str(input_seq[current_row-1]))
+            current_gap = None
+        elif direction == vgap:
+            positions1.append(-1)
+            positions2.append(current_row - 1)
             current_row -= 1
-        elif current_value == hgap:
-            for aligned_seq, input_seq in zip(aligned_seqs1, aln1):
-                aligned_seq.append(str(input_seq[current_col-1]))
-            for aligned_seq in aligned_seqs2:
-                aligned_seq.append(gap_character)
+            current_gap = vgap if current_value & vgap_extend else None
+        elif direction == hgap:
+            positions1.append(current_col - 1)
+            positions2.append(-1)
             current_col -= 1
-        elif current_value == aend:
-            continue
+            current_gap = hgap if current_value & hgap_extend else None
         else:
-            raise ValueError(
-                "Invalid value in traceback matrix: %s" % current_value)
+            # the alignment ends here
+            break
 
-    for i, (aligned_seq, original) in enumerate(zip(aligned_seqs1, aln1)):
-        aligned_seq = ''.join(aligned_seq)[::-1]
-        constructor = aln1.dtype
-        metadata = None
-        if original.has_metadata():
-            metadata = original.metadata
-        aligned_seqs1[i] = constructor(aligned_seq, metadata=metadata,
-                                       validate=False)
+    return positions1, positions2, current_row, current_col, current_gap
 
-    for i, (aligned_seq, original) in enumerate(zip(aligned_seqs2, aln2)):
-        aligned_seq = ''.join(aligned_seq)[::-1]
-        constructor = aln2.dtype
-        metadata = None
-        if original.has_metadata():
-            metadata = original.metadata
-        aligned_seqs2[i] = constructor(aligned_seq, metadata=metadata,
-                                       validate=False)
 
-    return aligned_seqs1, aligned_seqs2, best_score, current_col, current_row
+def _aligned_sequences(aln, positions):
+    """Build the aligned sequences of an alignment.
 
-
-def _first_largest(scores):
-    """ Similar to max, but returns the first element achieving the high score
-
-    If max receives a tuple, it will break a tie for the highest value
-    of entry[i] with entry[i+1]. We don't want that here - to better match
-    with the results of other tools, we want to be able to define which
-    entry is returned in the case of a tie.
+    `positions` are the positions of `aln` in each column of the new
+    alignment, where -1 is a gap.
     """
-    result = scores[0]
-    for score, direction in scores[1:]:
-        if score > result[0]:
-            result = (score, direction)
-    return result
+    positions = np.asarray(positions, dtype=np.intp)
+    is_gap = positions < 0
+    gap_character = ord(aln.dtype.default_gap_char)
+    constructor = aln.dtype
+
+    aligned_seqs = []
+    for original in aln:
+        aligned = original._bytes[positions]
+        aligned[is_gap] = gap_character
+        metadata = None
+        if original.has_metadata():
+            metadata = original.metadata
+        aligned_seqs.append(constructor(aligned, metadata=metadata,
+                                        validate=False))
+    return aligned_seqs
@@ -6,12 +6,18 @@
 #  The full license is in the file COPYING.txt, distributed with this software.
 # -----------------------------------------------------------------------------
 
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from cpython cimport bool
+cimport cython
 import numpy as np
 cimport numpy as cnp
 from skbio.sequence import Protein, Sequence
+from skbio.util._misc import resolve_n_jobs
 
-cdef extern from "_lib/ssw.h":
+cdef extern from "_lib/ssw.h" nogil:
 
     ctypedef struct s_align:
         cnp.uint16_t score1
@@ -69,6 +75,69 @@ np_nt_table = np.array([
 
 mid_table = np.array(['M', 'I', 'D'])
 
+# The fields of the results of `StripedSmithWaterman.align_many`, in the order
+# in which `_align_targets` stores them
+_alignment_fields = ['optimal_alignment_score', 'suboptimal_alignment_score',
+                     'query_begin', 'query_end', 'target_begin',
+                     'target_end_optimal', 'target_end_suboptimal']
+
+
+cdef str _cigar_string(s_align* p):
+    cigar_list = []
+    for i in range(p.cigarLen):
+        # stored the same as that in BAM format,
+        # high 28 bits: length, low 4 bits: M/I/D (0/1/2)
+
+        # Length, remove first 4 bits
+        cigar_list.append(str(p.cigar[i] >> 4))
+        # M/I/D, lookup first 4 bits in the mid_table
+        cigar_list.append(mid_table[p.cigar[i] & 0xf])
+    return "".join(cigar_list)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef Py_ssize_t _align_targets(const s_profile* profile,
+                               const cnp.int8_t* targets,
+                               const cnp.intp_t* offsets,
+                               Py_ssize_t n_targets,
+                               cnp.uint8_t gap_open_penalty,
+                               cnp.uint8_t gap_extend_penalty,
+                               cnp.uint8_t bit_flag,
+                               cnp.uint16_t score_filter,
+                               cnp.int32_t distance_filter,
+                               cnp.int32_t mask_length,
+                               cnp.int32_t[:, ::1] results,
+                               s_align** alignments) nogil:
+    """Align the encoded targets between consecutive `offsets` to `profile`
+
+    The coordinates are stored in the rows of `results`, in the order of
+    `_alignment_fields`. The alignments are kept in `alignments` if it isn't
+    NULL, and destroyed otherwise. Returns the index of the first target for
+    which ssw.c failed, or -1.
+    """
+    cdef Py_ssize_t i
+    cdef s_align* align
+    for i in range(n_targets):
+        align = ssw_align(profile, targets + offsets[i],
+                          offsets[i + 1] - offsets[i], gap_open_penalty,
+                          gap_extend_penalty, bit_flag, score_filter,
+                          distance_filter, mask_length)
+        if align is NULL:
+            return i
+        results[i, 0] = align.score1
+        results[i, 1] = align.score2
+        results[i, 2] = align.read_begin1
+        results[i, 3] = align.read_end1
+        results[i, 4] = align.ref_begin1
+        results[i, 5] = align.ref_end1
+        results[i, 6] = align.ref_end2
+        if alignments is NULL:
+            align_destroy(align)
+        else:
+            alignments[i] = align
+    return -1
+
 
 cdef class AlignmentStructure:
     """Wraps the result of an alignment c struct so it is accessible to Python
@@ -258,20 +327,9 @@ cdef class AlignmentStructure:
         .. [2] http://samtools.github.io/hts-specs/SAMv1.pdf
 
         """
-        # Memoization! (1/2)
-        if self._cigar_string is not None:
-            return self._cigar_string
-        cigar_list = []
-        for i in range(self.p.cigarLen):
-            # stored the same as that in BAM format,
-            # high 28 bits: length, low 4 bits: M/I/D (0/1/2)
-
-            # Length, remove first 4 bits
-            cigar_list.append(str(self.p.cigar[i] >> 4))
-            # M/I/D, lookup first 4 bits in the mid_table
-            cigar_list.append(mid_table[self.p.cigar[i] & 0xf])
-        # Memoization! (2/2)
-        self._cigar_string = "".join(cigar_list)
+        # Memoization!
+        if self._cigar_string is None:
+            self._cigar_string = _cigar_string(self.p)
         return self._cigar_string
 
     @property
@@ -647,6 +705,149 @@ cdef class StripedSmithWaterman:
         alignment.__constructor(align)  # Hack to get a pointer through
         return alignment
 
+    def align_many(self, target_sequences, cigar=False, n_jobs=1,
+                   chunk_size=1024):
+        """Align many target sequences to `query_sequence`
+
+        Parameters
+        ----------
+        target_sequences : iterable of str or Sequence
+            The target sequences, e.g. a list, a NumPy array of strings or a
+            generator. They are read `chunk_size` at a time.
+        cigar : bool, optional
+            Whether the cigar strings of the optimal alignments are returned.
+            Default is False.
+        n_jobs : int, optional
+            Number of threads aligning chunks of target sequences. ``-1``
+            uses all available CPUs.
+            Default is 1.
+        chunk_size : int, optional
+            Number of target sequences aligned by a thread at a time.
+            Default is 1024.
+
+        Returns
+        -------
+        np.ndarray
+            Structured array with a record per target sequence, in order. Its
+            fields are ``optimal_alignment_score``,
+            ``suboptimal_alignment_score``, ``query_begin``, ``query_end``,
+            ``target_begin``, ``target_end_optimal`` and
+            ``target_end_suboptimal`` (as 32-bit integers), and ``cigar`` (as
+            ``str`` objects) if `cigar` is True. They are the same as the
+            attributes of the ``AlignmentStructure`` returned when calling
+            this object with each target sequence.
+
+        Raises
+        ------
+        ValueError
+            If `chunk_size` is not positive.
+        Exception
+            If the alignment of a target sequence fails, e.g. because its
+            score doesn't fit with the `score_size` of this object.
+
+        Notes
+        -----
+        The target sequences are converted a chunk at a time, and the chunk
+        is then aligned without holding the GIL, so that several chunks are
+        aligned in parallel when `n_jobs` isn't 1. The query profile is
+        shared by all threads. At most twice as many chunks as threads are
+        read from `target_sequences` at any time.
+
+        Unless `cigar` is True, no cigar string is computed, even if the
+        parameters of this object would lead to one being computed when
+        calling it.
+
+        """
+        if chunk_size < 1:
+            raise ValueError("`chunk_size` must be > 0")
+        n_jobs = resolve_n_jobs(n_jobs)
+        target_sequences = iter(target_sequences)
+        chunks = iter(lambda: list(itertools.islice(target_sequences,
+                                                    chunk_size)), [])
+
+        results = []
+        if n_jobs == 1:
+            for chunk in chunks:
+                results.append(self._align_chunk(chunk, cigar))
+        else:
+            with ThreadPoolExecutor(n_jobs) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    if len(pending) >= 2 * n_jobs:
+                        results.append(pending.popleft().result())
+                    pending.append(executor.submit(self._align_chunk, chunk,
+                                                   cigar))
+                while pending:
+                    results.append(pending.popleft().result())
+
+        if not results:
+            return self._align_chunk([], cigar)
+        return np.concatenate(results)
+
+    def _align_chunk(self, target_sequences, cigar):
+        table = np_aa_table if self.is_protein else np_nt_table
+        encoded = [str(target).encode('ascii')
+                   for target in target_sequences]
+        cdef Py_ssize_t n_targets = len(encoded)
+        cdef cnp.ndarray[cnp.int8_t, ndim = 1, mode = "c"] targets
+        targets = table[np.frombuffer(b"".join(encoded),
+                                      dtype=np.uint8)].astype(np.int8)
+        cdef cnp.ndarray[cnp.intp_t, ndim = 1, mode = "c"] offsets
+        offsets = np.zeros(n_targets + 1, dtype=np.intp)
+        np.cumsum([len(target) for target in encoded], out=offsets[1:])
+
+        coordinates = np.empty((n_targets, len(_alignment_fields)),
+                               dtype=np.int32)
+        cdef cnp.int32_t[:, ::1] coordinates_view = coordinates
+        cdef cnp.ndarray[cnp.intp_t, ndim = 1, mode = "c"] alignments
+        cdef s_align** alignments_ptr = NULL
+        if cigar:
+            # NULL pointers, so that we know which alignments to destroy
+            alignments = np.zeros(n_targets, dtype=np.intp)
+            alignments_ptr = <s_align**> alignments.data
+
+        # The beginning of the alignments is computed without a cigar, unless
+        # it is required
+        cdef cnp.uint8_t bit_flag = self.bit_flag
+        if not cigar and bit_flag & 0x1:
+            bit_flag = 0x8
+
+        cdef const s_profile* profile = self.profile
+        cdef Py_ssize_t failed
+        with nogil:
+            failed = _align_targets(
+                profile, <cnp.int8_t*> targets.data,
+                <cnp.intp_t*> offsets.data, n_targets, self.gap_open_penalty,
+                self.gap_extend_penalty, bit_flag, self.score_filter,
+                self.distance_filter, self.mask_length, coordinates_view,
+                alignments_ptr)
+
+        dtype = [(field, np.int32) for field in _alignment_fields]
+        if cigar:
+            dtype.append(('cigar', object))
+        result = np.empty(n_targets, dtype=dtype)
+        try:
+            if failed >= 0:
+                raise Exception("Failed to align target sequence %r"
+                                % target_sequences[failed])
+            for i, field in enumerate(_alignment_fields):
+                result[field] = coordinates[:, i]
+            if cigar:
+                result['cigar'] = [_cigar_string(alignments_ptr[i])
+                                   for i in range(n_targets)]
+        finally:
+            if cigar:
+                for i in range(n_targets):
+                    if alignments_ptr[i] is not NULL:
+                        align_destroy(alignments_ptr[i])
+
+        for field in ('query_begin', 'target_begin'):
+            result[field][result[field] >= 0] += self.index_starts_at
+        for field in ('query_end', 'target_end_optimal',
+                      'target_end_suboptimal'):
+            result[field] += self.index_starts_at
+        return result
+
     def __dealloc__(self):
         if self.profile is not NULL:
             init_destroy(self.profile)
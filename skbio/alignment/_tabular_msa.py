@@ -11,7 +11,6 @@ import copy
 
 import numpy as np
 import pandas as pd
-import scipy.stats
 
 from skbio._base import SkbioObject
 from skbio.metadata._mixin import MetadataMixin, PositionalMetadataMixin
@@ -1423,6 +1422,9 @@ class TabularMSA(MetadataMixin, PositionalMetadataMixin, SkbioObject):
                      positional_metadata=positional_metadata)
 
     def _build_inverse_shannon_uncertainty_f(self, include_gaps):
+        # scipy.stats is slow to import, and is only needed here
+        import scipy.stats
+
         base = len(self.dtype.definite_chars)
         if include_gaps:
             # Increment the base by one to reflect the possible inclusion of
@@ -6,7 +6,7 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
-from unittest import TestCase, main
+from unittest import TestCase, main, mock
 import warnings
 
 import numpy as np
@@ -19,8 +19,8 @@ from skbio.alignment import (
     global_pairwise_align)
 from skbio.alignment._pairwise import (
     _init_matrices_sw, _init_matrices_nw,
-    _compute_score_and_traceback_matrices, _traceback, _first_largest,
-    _compute_substitution_score)
+    _compute_score_and_traceback_matrices, _traceback,
+    _substitution_profiles)
 from skbio.sequence import GrammaredSequence
 from skbio.util import classproperty
 from skbio.util._decorator import overrides
@@ -278,8 +278,9 @@ class PairwiseAlignmentTests(TestCase):
             Protein("HEAGAWGHEE"), Protein("PAWHEAE"), gap_open_penalty=10.,
             gap_extend_penalty=5., penalize_terminal_gaps=True)
 
+        # "---PAWHEAE" has the same score
         self.assertEqual(obs_msa, TabularMSA([Protein("HEAGAWGHEE"),
-                                              Protein("---PAWHEAE")]))
+                                              Protein("P---AWHEAE")]))
         self.assertEqual(obs_score, 1.0)
         self.assertEqual(obs_start_end, [(0, 9), (0, 6)])
 
@@ -424,6 +425,157 @@ class PairwiseAlignmentTests(TestCase):
         self.assertRaises(TypeError, global_pairwise_align_nucleotide,
                           DNA("ACGT"), 42)
 
+    def test_global_pairwise_align_score_only_linear_memory(self):
+        seq1 = DNA("GACCTTGACCAGGTACC", metadata={'id': "s1"})
+        seq2 = DNA("GAACTTTGACGTAAC", metadata={'id': "s2"})
+        aln1 = TabularMSA([seq1, DNA("GACCATGACCAGGTACC")])
+        for args, kwargs in [
+                ((seq1, seq2), {'gap_open_penalty': 10.}),
+                ((aln1, seq2), {'gap_open_penalty': 10.}),
+                ((seq2, aln1), {'penalize_terminal_gaps': True}),
+                ((DNA("T" * 25 + "ACCGTGGACCGTAGGATTGGACCAAGGTTA"),
+                  DNA("ACCGTGGACCGTTAGGATTGGACCCAAGGTTG")), {})]:
+            exp = global_pairwise_align_nucleotide(*args, **kwargs)
+
+            obs = global_pairwise_align_nucleotide(*args, score_only=True,
+                                                   **kwargs)
+            self.assertEqual(obs, (None, exp[1], None))
+
+            obs = global_pairwise_align_nucleotide(*args, linear_memory=True,
+                                                   **kwargs)
+            self.assertEqual(obs, exp)
+            # the traceback is split into blocks of a single cell
+            with mock.patch('skbio.alignment._pairwise._traceback_block_size',
+                            1):
+                obs = global_pairwise_align_nucleotide(
+                    *args, linear_memory=True, **kwargs)
+            self.assertEqual(obs, exp)
+
+        exp = global_pairwise_align_protein(
+            Protein("HEAGAWGHEE"), Protein("PAWHEAE"), gap_open_penalty=10.,
+            gap_extend_penalty=5., penalize_terminal_gaps=True)
+        obs = global_pairwise_align_protein(
+            Protein("HEAGAWGHEE"), Protein("PAWHEAE"), gap_open_penalty=10.,
+            gap_extend_penalty=5., penalize_terminal_gaps=True,
+            linear_memory=True)
+        self.assertEqual(obs, exp)
+
+    def test_global_pairwise_align_band_width(self):
+        seq1 = DNA("GGGGGAAAAATTTTT")
+        seq2 = DNA("AAAAATTTTTGGGGG")
+        exp = global_pairwise_align_nucleotide(seq1, seq2)
+
+        # the best alignment is on the fifth diagonal, but only a wider band
+        # ensures that it is optimal
+        for band_width in (8, 20, 'adaptive'):
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', RuntimeWarning)
+                obs = global_pairwise_align_nucleotide(seq1, seq2,
+                                                       band_width=band_width)
+            self.assertEqual(obs, exp)
+        with self.assertWarnsRegex(RuntimeWarning, 'band_width'):
+            obs = global_pairwise_align_nucleotide(seq1, seq2, band_width=5)
+        self.assertEqual(obs, exp)
+
+        with self.assertWarnsRegex(RuntimeWarning, 'not be optimal'):
+            obs = global_pairwise_align_nucleotide(seq1, seq2, band_width=2)
+        self.assertEqual(obs, (TabularMSA([DNA("GGGGGAAAAATTTTT--"),
+                                           DNA("--AAAAATTTTTGGGGG")]),
+                               -14.0, [(0, 14), (0, 14)]))
+        with self.assertWarnsRegex(RuntimeWarning, 'not be optimal'):
+            obs = global_pairwise_align_nucleotide(seq1, seq2, band_width=2,
+                                                   score_only=True)
+        self.assertEqual(obs, (None, -14.0, None))
+
+        # the band spans the diagonals between the first and last cells
+        seq1 = DNA("T" * 25 + "ACCGTGGACCGTAGGATTGGACCAAGGTTA")
+        seq2 = DNA("ACCGTGGACCGTTAGGATTGGACCCAAGGTTG")
+        for penalize_terminal_gaps in (True, False):
+            exp = global_pairwise_align_nucleotide(
+                seq1, seq2, penalize_terminal_gaps=penalize_terminal_gaps)
+            obs = global_pairwise_align_nucleotide(
+                seq1, seq2, penalize_terminal_gaps=penalize_terminal_gaps,
+                band_width=3)
+            self.assertEqual(obs, exp)
+            obs = global_pairwise_align_nucleotide(
+                seq2, seq1, penalize_terminal_gaps=penalize_terminal_gaps,
+                band_width=3)
+            self.assertEqual(obs, global_pairwise_align_nucleotide(
+                seq2, seq1, penalize_terminal_gaps=penalize_terminal_gaps))
+
+        aln1 = TabularMSA([DNA("GACCTTGACCAGGTACC"),
+                           DNA("GACCATGACCAGGTACC")])
+        exp = global_pairwise_align_nucleotide(aln1, DNA("GAACTTTGACGTAAC"))
+        obs = global_pairwise_align_nucleotide(aln1, DNA("GAACTTTGACGTAAC"),
+                                               band_width='adaptive')
+        self.assertEqual(obs, exp)
+
+    def test_pairwise_align_band_width_large_indels(self):
+        # an insertion and a deletion take the best alignment far from the
+        # diagonal, where it does not touch the edges of narrow bands
+        rng = np.random.RandomState(0)
+        seq1 = ''.join(rng.choice(list('ACGT'), 600))
+        seq2 = ''.join(rng.choice(list('ACGT'), 60))
+        seq2 = DNA(seq1[:200] + seq2 + seq1[200:450] + seq1[470:])
+        seq1 = DNA(seq1)
+        for aligner in (global_pairwise_align_nucleotide,
+                        local_pairwise_align_nucleotide):
+            exp = aligner(seq1, seq2)
+            obs = aligner(seq1, seq2, band_width='adaptive')
+            self.assertEqual(obs, exp)
+            obs = aligner(seq1, seq2, band_width='adaptive',
+                          return_exact=True)
+            self.assertEqual(obs, exp + (True,))
+            with self.assertWarnsRegex(RuntimeWarning, 'not be optimal'):
+                obs = aligner(seq1, seq2, band_width=8, return_exact=True)
+            self.assertLess(obs[1], exp[1])
+            self.assertFalse(obs[3])
+
+    def test_pairwise_align_return_exact(self):
+        seq1 = DNA("GGGGGAAAAATTTTT")
+        seq2 = DNA("AAAAATTTTTGGGGG")
+        for aligner in (global_pairwise_align_nucleotide,
+                        local_pairwise_align_nucleotide):
+            exp = aligner(seq1, seq2)
+            for kwargs in ({}, {'band_width': 8}, {'band_width': 'adaptive'},
+                           {'linear_memory': True}):
+                obs = aligner(seq1, seq2, return_exact=True, **kwargs)
+                self.assertEqual(obs, exp + (True,))
+                obs = aligner(seq1, seq2, return_exact=True, score_only=True,
+                              **kwargs)
+                self.assertEqual(obs, (None, exp[1], None, True))
+
+            # each result tells whether it is exact, whatever the warnings
+            # filters
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                for _ in range(3):
+                    obs = aligner(seq1, seq2, band_width=2, return_exact=True)
+                    self.assertEqual(len(obs), 4)
+                    self.assertFalse(obs[3])
+                    self.assertLess(obs[1], exp[1])
+            with self.assertWarnsRegex(RuntimeWarning, 'not be optimal'):
+                obs = aligner(seq1, seq2, band_width=2, return_exact=True,
+                              score_only=True)
+            self.assertEqual(obs[2:], (None, False))
+
+        obs = global_pairwise_align_protein(
+            Protein("HEAGAWGHEE"), Protein("PAWHEAE"), band_width='adaptive',
+            return_exact=True)
+        self.assertTrue(obs[3])
+        obs = local_pairwise_align_protein(
+            Protein("HEAGAWGHEE"), Protein("PAWHEAE"), return_exact=True)
+        self.assertTrue(obs[3])
+
+    def test_global_pairwise_align_band_width_invalid(self):
+        for band_width in (-1, 2.5, 'auto', True):
+            with self.assertRaisesRegex(ValueError, 'band_width'):
+                global_pairwise_align_nucleotide(
+                    DNA("ACGT"), DNA("ACGT"), band_width=band_width)
+        with self.assertRaisesRegex(ValueError, 'linear_memory'):
+            global_pairwise_align_nucleotide(
+                DNA("ACGT"), DNA("ACGT"), band_width=2, linear_memory=True)
+
     def test_global_pairwise_align_nucleotide_invalid_dtype(self):
         with self.assertRaisesRegex(TypeError,
                                     r"TabularMSA with DNA or RNA dtype.*dtype "
@@ -487,6 +639,68 @@ class PairwiseAlignmentTests(TestCase):
         self.assertRaises(TypeError, local_pairwise_align_nucleotide,
                           DNA("ACGT"), 42)
 
+    def test_local_pairwise_align_score_only_linear_memory(self):
+        for seq1, seq2 in [
+                (DNA("GACCTTGACCAGGTACC"), DNA("GAACTTTGACGTAAC")),
+                (DNA("T" * 25 + "ACCGTGGACCGTAGGATTGGACCAAGGTTA"),
+                 DNA("ACCGTGGACCGTTAGGATTGGACCCAAGGTTG")),
+                # there is no alignment with a positive score
+                (DNA("AAAA"), DNA("CCC"))]:
+            exp = local_pairwise_align_nucleotide(seq1, seq2)
+
+            obs = local_pairwise_align_nucleotide(seq1, seq2,
+                                                  score_only=True)
+            self.assertEqual(obs, (None, exp[1], None))
+
+            obs = local_pairwise_align_nucleotide(seq1, seq2,
+                                                  linear_memory=True)
+            self.assertEqual(obs, exp)
+            with mock.patch('skbio.alignment._pairwise._traceback_block_size',
+                            1):
+                obs = local_pairwise_align_nucleotide(seq1, seq2,
+                                                      linear_memory=True)
+            self.assertEqual(obs, exp)
+
+        exp = local_pairwise_align_protein(
+            Protein("HEAGAWGHEE"), Protein("PAWHEAE"), gap_open_penalty=10.,
+            gap_extend_penalty=5.)
+        obs = local_pairwise_align_protein(
+            Protein("HEAGAWGHEE"), Protein("PAWHEAE"), gap_open_penalty=10.,
+            gap_extend_penalty=5., linear_memory=True)
+        self.assertEqual(obs, exp)
+
+    def test_local_pairwise_align_band_width(self):
+        seq1 = DNA("GGGGGAAAAATTTTT")
+        seq2 = DNA("AAAAATTTTTGGGGG")
+        exp = local_pairwise_align_nucleotide(seq1, seq2)
+        for band_width in (8, 'adaptive'):
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', RuntimeWarning)
+                obs = local_pairwise_align_nucleotide(seq1, seq2,
+                                                      band_width=band_width)
+            self.assertEqual(obs, exp)
+
+        with self.assertWarnsRegex(RuntimeWarning, 'not be optimal'):
+            obs = local_pairwise_align_nucleotide(seq1, seq2, band_width=2)
+        self.assertEqual(obs, (TabularMSA([DNA("AA"), DNA("AA")]), 4.0,
+                               [(5, 6), (3, 4)]))
+        with self.assertWarnsRegex(RuntimeWarning, 'not be optimal'):
+            obs = local_pairwise_align_nucleotide(seq1, seq2, band_width=2,
+                                                  score_only=True)
+        self.assertEqual(obs, (None, 4.0, None))
+
+        exp = local_pairwise_align_protein(
+            Protein("HEAGAWGHEE"), Protein("PAWHEAE"), gap_open_penalty=10.,
+            gap_extend_penalty=5.)
+        obs = local_pairwise_align_protein(
+            Protein("HEAGAWGHEE"), Protein("PAWHEAE"), gap_open_penalty=10.,
+            gap_extend_penalty=5., band_width='adaptive')
+        self.assertEqual(obs, exp)
+
+        with self.assertRaisesRegex(ValueError, 'linear_memory'):
+            local_pairwise_align_nucleotide(
+                DNA("ACGT"), DNA("ACGT"), band_width=2, linear_memory=True)
+
     def test_nucleotide_aligners_use_substitution_matrices(self):
         alt_sub = make_identity_substitution_matrix(10, -10)
         # alternate substitution matrix yields different alignment (the
@@ -565,55 +779,57 @@ class PairwiseAlignmentTests(TestCase):
         np.testing.assert_array_equal(actual_score_m, expected_score_m)
         np.testing.assert_array_equal(actual_tback_m, expected_tback_m)
 
-    def test_compute_substitution_score(self):
+    def test_substitution_profiles(self):
         # these results were computed manually
         subs_m = make_identity_substitution_matrix(5, -4)
-        gap_chars = set('-.')
 
-        self.assertEqual(
-            _compute_substitution_score(['A'], ['A'], subs_m, 0, gap_chars),
-            5.0)
-        self.assertEqual(
-            _compute_substitution_score(['A', 'A'], ['A'], subs_m, 0,
-                                        gap_chars),
-            5.0)
-        self.assertEqual(
-            _compute_substitution_score(['A', 'C'], ['A'], subs_m, 0,
-                                        gap_chars),
-            0.5)
-        self.assertEqual(
-            _compute_substitution_score(['A', 'C'], ['A', 'C'], subs_m, 0,
-                                        gap_chars),
-            0.5)
-        self.assertEqual(
-            _compute_substitution_score(['A', 'A'], ['A', '-'], subs_m, 0,
-                                        gap_chars),
-            2.5)
-        self.assertEqual(
-            _compute_substitution_score(['A', 'A'], ['A', '-'], subs_m, 1,
-                                        gap_chars),
-            3)
+        def score(seqs1, seqs2, gap_substitution_score=0):
+            aln1 = TabularMSA([DNA(s) for s in seqs1])
+            aln2 = TabularMSA([DNA(s) for s in seqs2])
+            profile1, profile2, codes2, denominator = _substitution_profiles(
+                aln1, aln2, subs_m, gap_substitution_score)
+            return profile1[0].dot(profile2[0]) / denominator
+
+        self.assertEqual(score(['A'], ['A']), 5.0)
+        self.assertEqual(score(['A', 'A'], ['A']), 5.0)
+        self.assertEqual(score(['A', 'C'], ['A']), 0.5)
+        self.assertEqual(score(['A', 'C'], ['A', 'C']), 0.5)
+        self.assertEqual(score(['A', 'A'], ['A', '-']), 2.5)
+        self.assertEqual(score(['A', 'A'], ['A', '-'], 1), 3)
 
         # alt subs_m
         subs_m = make_identity_substitution_matrix(1, -2)
-
-        self.assertEqual(
-            _compute_substitution_score(['A', 'A'], ['A', '-'], subs_m, 0,
-                                        gap_chars),
-            0.5)
+        self.assertEqual(score(['A', 'A'], ['A', '-']), 0.5)
+
+    def test_substitution_profiles_codes(self):
+        subs_m = make_identity_substitution_matrix(2, -1)
+        aln1 = TabularMSA([DNA('AC-'), DNA('AG-')])
+        aln2 = TabularMSA([DNA('A-T'), DNA('AGT')])
+        profile1, profile2, codes2, denominator = _substitution_profiles(
+            aln1, aln2, subs_m)
+        # the characters of aln2 are A, G and T, followed by the gap
+        np.testing.assert_array_equal(profile1, [[4, -2, -2, 0],
+                                                 [-2, 1, -2, 0],
+                                                 [0, 0, 0, 0]])
+        np.testing.assert_array_equal(profile2, [[2, 0, 0, 0],
+                                                 [0, 1, 0, 1],
+                                                 [0, 0, 2, 0]])
+        np.testing.assert_array_equal(codes2, [0, -1, 2])
+        self.assertEqual(denominator, 4.0)
 
     def test_compute_score_and_traceback_matrices(self):
-        # these results were computed manually
+        # these results were computed manually; a gap which extends another
+        # gap has a flag added to its direction in the traceback matrix
         expected_score_m = [[0, -5, -7, -9],
                             [-5, 2, -3, -5],
                             [-7, -3, 4, -1],
                             [-9, -5, -1, 6],
                             [-11, -7, -3, 1]]
         expected_tback_m = [[0, 3, 3, 3],
-                            [2, 1, 3, 3],
+                            [2, 1, 3, 11],
                             [2, 2, 1, 3],
-                            [2, 2, 2, 1],
-                            [2, 2, 2, 2]]
+                            [2, 6, 2, 1],
+                            [2, 6, 6, 2]]
         m = make_identity_substitution_matrix(2, -1)
         actual_score_m, actual_tback_m = _compute_score_and_traceback_matrices(
             TabularMSA([DNA('ACG', metadata={'id': 'id'})]),
@@ -629,10 +845,10 @@ class PairwiseAlignmentTests(TestCase):
                             [-9, -5, -1, 3],
                             [-11, -7, -3, -2]]
         expected_tback_m = [[0, 3, 3, 3],
-                            [2, 1, 3, 3],
+                            [2, 1, 3, 11],
                             [2, 2, 1, 3],
-                            [2, 2, 2, 1],
-                            [2, 2, 2, 1]]
+                            [2, 6, 2, 1],
+                            [2, 6, 6, 1]]
         m = make_identity_substitution_matrix(2, -1)
         actual_score_m, actual_tback_m = _compute_score_and_traceback_matrices(
             TabularMSA([DNA('ACC', metadata={'id': 'id'})]),
@@ -648,10 +864,10 @@ class PairwiseAlignmentTests(TestCase):
                             [-9, -5, -1, 3],
                             [-11, -7, -3, -2]]
         expected_tback_m = [[0, 3, 3, 3],
-                            [2, 1, 3, 3],
+                            [2, 1, 3, 11],
                             [2, 2, 1, 3],
-                            [2, 2, 2, 1],
-                            [2, 2, 2, 1]]
+                            [2, 6, 2, 1],
+                            [2, 6, 6, 1]]
         m = make_identity_substitution_matrix(2, -1)
         actual_score_m, actual_tback_m = _compute_score_and_traceback_matrices(
             TabularMSA([DNA('ACC', metadata={'id': 's1'}),
@@ -743,20 +959,6 @@ class PairwiseAlignmentTests(TestCase):
                             3, 3)
         self.assertEqual(actual, expected)
 
-    def test_first_largest(self):
-        input = [(5, 'a'), (5, 'b'), (5, 'c')]
-        self.assertEqual(_first_largest(input), (5, 'a'))
-        input = [(5, 'c'), (5, 'b'), (5, 'a')]
-        self.assertEqual(_first_largest(input), (5, 'c'))
-        input = [(5, 'c'), (6, 'b'), (5, 'a')]
-        self.assertEqual(_first_largest(input), (6, 'b'))
-        # works for more than three entries
-        input = [(5, 'c'), (6, 'b'), (5, 'a'), (7, 'd')]
-        self.assertEqual(_first_largest(input), (7, 'd'))
-        # Note that max([(5, 'a'), (5, 'c')]) == max([(5, 'c'), (5, 'a')])
-        # but for the purposes needed here, we want the max to be the same
-        # regardless of what the second item in the tuple is.
-
 
 if __name__ == "__main__":
     main()
@@ -18,6 +18,8 @@
 
 from unittest import TestCase, main
 
+import numpy as np
+
 from skbio import (local_pairwise_align_ssw, Sequence, DNA, RNA, Protein,
                    TabularMSA)
 from skbio.alignment import StripedSmithWaterman, AlignmentStructure
@@ -555,6 +557,50 @@ class TestStripedSmithWaterman(TestSSW):
         alignment = query("CGCGCGCCGCCGGGGGGCCGGCCGGCGCCGGGGGGCGCCCCGGGCGGGGC")
         self._check_alignment(alignment, expected)
 
+    def test_align_many(self):
+        targets = ["TTATAATTTTCTTATTATTATCAATATTTATAATTTGATTTTGTTGTAAT",
+                   "AGTCGAAGGGTAATATAGGCGTGTCACCTA", "AGTCGAAGGGTAATA", "",
+                   "CTGCCTCAGGGGGAGGAAAGCGTCAGCGCGGCTGCCGTCGGCGCAGGGGC",
+                   DNA("AGGGTAATTAGGCGTGTTCACCTA"), "agggtaattaggcgnn"]
+        attributes = self.align_attributes[:7]
+        for kwargs in ({}, {'zero_index': False}, {'score_only': True},
+                       {'score_filter': 20}, {'distance_filter': 10},
+                       {'override_skip_babp': True}):
+            query = StripedSmithWaterman("AGGGTAATTAGGCGTGTTCACCTA",
+                                         **kwargs)
+            expected = [query(str(target)) for target in targets]
+            for n_jobs, chunk_size in ((1, 1024), (1, 2), (2, 3), (-1, 1)):
+                obs = query.align_many(iter(targets), n_jobs=n_jobs,
+                                       chunk_size=chunk_size)
+                self.assertEqual(set(obs.dtype.names), set(attributes))
+                for attribute in attributes:
+                    self.assertEqual(
+                        list(obs[attribute]),
+                        [alignment[attribute] for alignment in expected])
+
+                obs = query.align_many(targets, cigar=True, n_jobs=n_jobs,
+                                       chunk_size=chunk_size)
+                for attribute in attributes + ['cigar']:
+                    self.assertEqual(
+                        list(obs[attribute]),
+                        [alignment[attribute] for alignment in expected])
+
+    def test_align_many_protein(self):
+        query = StripedSmithWaterman("HEAGAWGHEE", protein=True,
+                                     substitution_matrix=blosum50)
+        obs = query.align_many(np.array(["PAWHEAE", "HEAGAW"]), cigar=True)
+        self.assertEqual(obs[0]['optimal_alignment_score'], 32)
+        self.assertEqual(obs['cigar'].tolist(), ['2M1I2M1D1M', '6M'])
+        self.assertEqual(obs[1]['query_end'], 5)
+
+    def test_align_many_empty_and_invalid(self):
+        query = StripedSmithWaterman("ACGT")
+        obs = query.align_many([], cigar=True)
+        self.assertEqual(obs.shape, (0,))
+        self.assertEqual(obs.dtype.names[-1], 'cigar')
+        with self.assertRaisesRegex(ValueError, 'chunk_size'):
+            query.align_many(["ACGT"], chunk_size=0)
+
 
 class TestAlignStripedSmithWaterman(TestSSW):
     def _check_TabularMSA_to_AlignmentStructure(self, alignment, structure,
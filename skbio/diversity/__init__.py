@@ -45,6 +45,9 @@ Some diversity metrics incorporate relationships between the OTUs in their
 computation through reference to a phylogenetic tree. These metrics
 additionally take a ``skbio.TreeNode`` object and a list of OTU identifiers
 mapping the values in the counts vector to tips in the tree.
+When the same tree is used many times, it can be indexed once into a
+``PhylogeneticIndex``, which can be passed in place of the tree and saved to
+disk for later use.
 
 The driver functions are optimized so that computing a diversity metric more
 than one time (i.e., for more than one sample for alpha diversity metrics, or
@@ -56,6 +59,12 @@ diversity metrics or two counts vectors for beta diversity metrics. The
 counts vectors in the matrix, and the ``beta_diversity`` driver function will
 compute beta diversity for all pairs of counts vectors in the matrix.
 
+When several metrics are computed on the same samples, the
+``alpha_diversity_multi`` and ``beta_diversity_multi`` driver functions compute
+all of them in one call. The input is then only validated once, and work that
+is common to several metrics (such as indexing the tree for phylogenetic
+metrics) is only done once.
+
 Input validation
 ----------------
 
@@ -162,11 +171,21 @@ Functions
 
     alpha_diversity
     beta_diversity
+    alpha_diversity_multi
+    beta_diversity_multi
     partial_beta_diversity
     block_beta_diversity
     get_alpha_diversity_metrics
     get_beta_diversity_metrics
 
+Classes
+-------
+
+.. autosummary::
+   :toctree: generated/
+
+    PhylogeneticIndex
+
 Examples
 --------
 
@@ -400,9 +419,12 @@ Faith PD            0.939336  1.000000
 # ----------------------------------------------------------------------------
 
 from ._driver import (alpha_diversity, beta_diversity, partial_beta_diversity,
-                      get_alpha_diversity_metrics, get_beta_diversity_metrics)
+                      get_alpha_diversity_metrics, get_beta_diversity_metrics,
+                      alpha_diversity_multi, beta_diversity_multi)
 from ._block import block_beta_diversity
+from ._phylogenetic_index import PhylogeneticIndex
 
 __all__ = ["alpha_diversity", "beta_diversity", "get_alpha_diversity_metrics",
            "get_beta_diversity_metrics", "partial_beta_diversity",
-           "block_beta_diversity"]
+           "block_beta_diversity", "alpha_diversity_multi",
+           "beta_diversity_multi", "PhylogeneticIndex"]
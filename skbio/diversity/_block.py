@@ -6,12 +6,20 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import functools
+import itertools
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
 import numpy as np
+import scipy.sparse
 
 from skbio.util._decorator import experimental
+from skbio.util._misc import resolve_n_jobs
 from skbio.diversity._driver import partial_beta_diversity
 from skbio.stats.distance import DistanceMatrix
 from skbio.diversity._util import _validate_counts_matrix
+from skbio.diversity._phylogenetic_index import PhylogeneticIndex
 
 
 def _generate_id_blocks(ids, k=64):
@@ -71,7 +79,7 @@ def _block_party(counts=None, row_ids=None, col_ids=None, **kwargs):
 
     Parameters
     ----------
-    counts : 2D array_like of ints or floats
+    counts : 2D array_like of ints or floats, or scipy.sparse matrix
         Matrix containing count/abundance data where each row contains counts
         of OTUs in a given sample.
     row_ids : 1D np.ndarray of int
@@ -97,15 +105,23 @@ def _block_party(counts=None, row_ids=None, col_ids=None, **kwargs):
 
     # remove from the block any empty observations
     # NOTE: this will perform an implicit copy
-    nonzero_cols = (counts_block != 0).any(axis=0)
-    counts_block = counts_block[:, nonzero_cols]
+    if scipy.sparse.issparse(counts_block):
+        # blocks are small, so the observed part is computed on densely
+        nonzero_cols = np.asarray(counts_block.getnnz(axis=0)) > 0
+        counts_block = counts_block[:, nonzero_cols].toarray()
+    else:
+        nonzero_cols = (counts_block != 0).any(axis=0)
+        counts_block = counts_block[:, nonzero_cols]
 
     kwargs['counts'] = counts_block
     kwargs['ids'] = ids_to_keep
 
     if 'tree' in kwargs and 'otu_ids' in kwargs:
         kwargs['otu_ids'] = np.asarray(kwargs['otu_ids'])[nonzero_cols]
-        kwargs['tree'] = kwargs['tree'].shear(kwargs['otu_ids'])
+        # a PhylogeneticIndex is shared by all blocks as is, since indexing
+        # a sheared tree per block is what it is meant to avoid
+        if not isinstance(kwargs['tree'], PhylogeneticIndex):
+            kwargs['tree'] = kwargs['tree'].shear(kwargs['otu_ids'])
 
     return kwargs
 
@@ -196,7 +212,111 @@ def _map(func, kw_gen):
         yield func(**kwargs)
 
 
-def _reduce(blocks):
+# keys of a block's kwargs that differ from one block to the next; everything
+# else (counts, tree, metric, ...) is shared by all of the blocks
+_per_block_keys = ('row_ids', 'col_ids', 'id_pairs')
+
+# state shared by all blocks computed within a worker process. This is set
+# once per process by _init_worker so that the counts matrix and tree are only
+# transferred to each worker once, rather than once per block.
+_worker_state = {}
+
+
+def _init_worker(func, shared):
+    _worker_state['func'] = func
+    _worker_state['shared'] = shared
+
+
+def _worker_compute(block):
+    return _worker_state['func'](**_worker_state['shared'], **block)
+
+
+def _shared_compute(func, shared, block):
+    return func(**shared, **block)
+
+
+def _pool_map(func, kw_gen, n_jobs=-1, executor='process'):
+    """Map a function over block arguments using a pool of workers
+
+    Parameters
+    ----------
+    func : callable
+        The function to apply to each block, such as ``_block_compute``.
+    kw_gen : Iterable of dict
+        The arguments describing each block, as produced by ``_block_kwargs``.
+        All entries other than the row IDs, column IDs, and ID pairs are
+        assumed to be shared by all blocks.
+    n_jobs : int, optional
+        The number of workers to use. See ``block_beta_diversity``.
+    executor : {'process', 'thread'} or concurrent.futures.Executor, optional
+        The pool to compute blocks on. See ``block_beta_diversity``.
+
+    Notes
+    -----
+    Results are yielded in the order in which they complete, not the order of
+    ``kw_gen``. This is safe for ``_reduce`` which does not depend on the
+    order of the blocks.
+    """
+    kw_gen = iter(kw_gen)
+    first = next(kw_gen, None)
+    if first is None:
+        return
+
+    shared = {k: v for k, v in first.items() if k not in _per_block_keys}
+    blocks = ({k: kw[k] for k in _per_block_keys}
+              for kw in itertools.chain([first], kw_gen))
+
+    if executor == 'process':
+        with multiprocessing.Pool(resolve_n_jobs(n_jobs),
+                                  initializer=_init_worker,
+                                  initargs=(func, shared)) as pool:
+            yield from pool.imap_unordered(_worker_compute, blocks)
+    elif executor == 'thread':
+        with ThreadPool(resolve_n_jobs(n_jobs)) as pool:
+            yield from pool.imap_unordered(
+                functools.partial(_shared_compute, func, shared), blocks)
+    elif hasattr(executor, 'map'):
+        # an externally managed executor (e.g., from concurrent.futures). We
+        # cannot hook into the startup of its workers, so the shared state
+        # is sent along with every block.
+        yield from executor.map(
+            functools.partial(_shared_compute, func, shared), blocks)
+    else:
+        raise ValueError("`executor` must be 'process', 'thread', or an "
+                         "object providing a `map` method, not %r."
+                         % (executor,))
+
+
+def _scatter_block(block, out):
+    """Add the distances of a partial distance matrix into an output matrix
+
+    Parameters
+    ----------
+    block : DistanceMatrix
+        A partial distance matrix whose IDs are integer indices into ``out``.
+    out : np.ndarray
+        Either a square, two-dimensional matrix or a one-dimensional
+        condensed vector (as defined by `scipy.spatial.distance.squareform`)
+        that is updated in place.
+    """
+    ids = np.asarray(block.ids, dtype=np.intp)
+    blk_i, blk_j = np.triu_indices(len(ids), k=1)
+    values = block.data[blk_i, blk_j]
+
+    # get the corresponding coordinates in the master matrix, making sure
+    # that they fall in the upper triangle
+    m_i = np.minimum(ids[blk_i], ids[blk_j])
+    m_j = np.maximum(ids[blk_i], ids[blk_j])
+
+    if out.ndim == 1:
+        n = int(np.ceil(np.sqrt(2 * len(out))))
+        out[n * m_i - m_i * (m_i + 1) // 2 + m_j - m_i - 1] += values
+    else:
+        out[m_i, m_j] += values
+        out[m_j, m_i] += values
+
+
+def _reduce(blocks, n_ids=None, condensed=False):
     """Reduce an iterable of partial distance matrices into a full matrix
 
     Note, the reduce doesn't actually care about what pairs are computed
@@ -204,38 +324,39 @@ def _reduce(blocks):
     added. as such, this reduction is only safe to perform if by
     the block_beta_diversity method which assures that distances are not
     computed multiple times.
-    """
-    all_blocks = list(blocks)
-
-    # Determine the maximum integer ID observed in the blocks. There exists a
-    # 1-1 mapping between the integer ID and a sample ID. We increment by 1
-    # as the integer ID space begins with zero, and we'll be using this value
-    # to determine the size of the resulting full distance matrix.
-    n_ids = max(map(lambda x: max(x.ids), all_blocks)) + 1
-
-    mat = np.zeros((n_ids, n_ids), dtype=float)
-
-    # TODO: something smarter.
-    for block in all_blocks:
-        n_blk_ids = len(block.ids)
-
-        # get the corresponding coordinates in the master matrix
-        master_idx = [(i, j) for row, i in enumerate(block.ids)
-                      for j in block.ids[row+1:]]
 
-        # get the corresponding coordinates within the current block
-        block_idx = [(i, j) for row, i in enumerate(range(n_blk_ids))
-                     for j in range(row+1, n_blk_ids)]
+    If ``n_ids``, the number of IDs in the resulting matrix, is provided the
+    blocks are added into the result as they arrive, so only a single block
+    needs to be held in memory at a time. If ``condensed`` is True, the
+    distances are added into a condensed vector, which is stored as is by
+    the resulting ``DistanceMatrix``.
+    """
+    if n_ids is None:
+        # Determine the maximum integer ID observed in the blocks. There
+        # exists a 1-1 mapping between the integer ID and a sample ID. We
+        # increment by 1 as the integer ID space begins with zero, and we'll
+        # be using this value to determine the size of the resulting full
+        # distance matrix.
+        blocks = list(blocks)
+        n_ids = max(map(lambda x: max(x.ids), blocks)) + 1
+
+    if condensed:
+        mat = np.zeros(n_ids * (n_ids - 1) // 2, dtype=float)
+    else:
+        mat = np.zeros((n_ids, n_ids), dtype=float)
 
-        for (m_i, m_j), (b_i, b_j) in zip(master_idx, block_idx):
-            mat[m_i, m_j] += block.data[b_i, b_j]
+    for block in blocks:
+        _scatter_block(block, mat)
 
-    return DistanceMatrix(mat + mat.T, list(range(n_ids)))
+    # the distances are hollow and symmetric by construction
+    return DistanceMatrix(mat, list(range(n_ids)), validate=False,
+                          condensed=condensed)
 
 
 @experimental(as_of="0.5.1")
 def block_beta_diversity(metric, counts, ids, validate=True, k=64,
-                         reduce_f=None, map_f=None, **kwargs):
+                         reduce_f=None, map_f=None, n_jobs=1,
+                         executor='process', condensed=False, **kwargs):
     """Perform a block-decomposition beta diversity calculation
 
     Parameters
@@ -244,9 +365,10 @@ def block_beta_diversity(metric, counts, ids, validate=True, k=64,
         The pairwise distance function to apply. If ``metric`` is a string, it
         must be resolvable by scikit-bio (e.g., UniFrac methods), or must be
         callable.
-    counts : 2D array_like of ints or floats
+    counts : 2D array_like of ints or floats, or scipy.sparse matrix
         Matrix containing count/abundance data where each row contains counts
-        of OTUs in a given sample.
+        of OTUs in a given sample. If sparse, only the rows and observed
+        columns of each block are converted to a dense matrix.
     ids : iterable of strs
         Identifiers for each sample in ``counts``.
     validate : bool, optional
@@ -267,6 +389,26 @@ def block_beta_diversity(metric, counts, ids, validate=True, k=64,
         able to pass around `**kwargs``.
     k : int, optional
         The blocksize used when computing distances
+    n_jobs : int, optional
+        The number of workers used to compute blocks concurrently. ``1`` (the
+        default) computes the blocks serially in the calling process. Negative
+        values are relative to the number of CPUs, e.g. ``-1`` uses all CPUs.
+        Cannot be combined with ``map_f``.
+    executor : {'process', 'thread'} or concurrent.futures.Executor, optional
+        Where blocks are computed when ``n_jobs`` is not ``1``. ``'process'``
+        (the default) uses a pool of worker processes, each of which receives
+        ``counts``, ``tree`` and ``otu_ids`` once. ``'thread'`` uses a pool of
+        threads, which avoids copying the input but only helps for metrics
+        that release the GIL. An existing executor (e.g., a
+        ``concurrent.futures.ProcessPoolExecutor``) is used as is, and is
+        not shut down afterwards; note that the full input is sent to it
+        with every block. ``metric`` must be picklable when computing blocks
+        in other processes.
+    condensed : bool, optional
+        If ``True``, the blocks are added into a vector of distances in
+        condensed form, and the resulting ``DistanceMatrix`` stores only
+        these distances (see ``DistanceMatrix``), which halves the memory
+        used by the output. Ignored if ``reduce_f`` is provided.
     kwargs : kwargs, optional
         Metric-specific parameters.
 
@@ -285,6 +427,10 @@ def block_beta_diversity(metric, counts, ids, validate=True, k=64,
     the Earth Microbiome Project [1]_ dataset which at the time spanned over
     25,000 samples and 7.5 million open reference OTUs.
 
+    Blocks are independent of one another, so with ``n_jobs`` they are
+    computed concurrently and each result is added into the output matrix as
+    soon as it completes.
+
     See Also
     --------
     skbio.diversity.beta_diversity
@@ -298,14 +444,21 @@ def block_beta_diversity(metric, counts, ids, validate=True, k=64,
         counts = _validate_counts_matrix(counts, ids=ids)
 
     if reduce_f is None:
-        reduce_f = _reduce
+        reduce_f = functools.partial(_reduce, n_ids=counts.shape[0],
+                                     condensed=condensed)
 
     if map_f is None:
-        map_f = _map
+        if resolve_n_jobs(n_jobs) == 1 and not hasattr(executor, 'map'):
+            map_f = _map
+        else:
+            map_f = functools.partial(_pool_map, n_jobs=n_jobs,
+                                      executor=executor)
+    elif n_jobs != 1:
+        raise ValueError("`n_jobs` cannot be used with a custom `map_f`.")
 
     # The block method uses numeric IDs to take advantage of fancy indexing
     # with numpy.
-    tmp_ids = np.arange(len(counts))
+    tmp_ids = np.arange(counts.shape[0])
     kwargs['ids'] = tmp_ids
 
     kwargs['metric'] = metric
@@ -10,18 +10,26 @@ import functools
 import itertools
 
 import numpy as np
+import scipy.sparse
 import sklearn.metrics
 import pandas as pd
 
 import skbio
 from skbio.diversity.alpha._faith_pd import _faith_pd, _setup_faith_pd
+from skbio.diversity.alpha._matrix import (
+    _CountsMatrix, _get_alpha_diversity_matrix_metric_map)
 from skbio.diversity.beta._unifrac import (
-    _setup_multiple_unweighted_unifrac, _setup_multiple_weighted_unifrac,
-    _normalize_weighted_unifrac_by_default)
+    _setup_multiple_unifrac, _setup_multiple_unweighted_unifrac,
+    _setup_multiple_weighted_unifrac, _unweighted_unifrac_pdist_by_node,
+    _weighted_unifrac_pdist_by_node, _unweighted_unifrac_rows_by_node,
+    _weighted_unifrac_rows_by_node, _normalize_weighted_unifrac_by_default)
 from skbio.util._decorator import experimental, deprecated
 from skbio.stats.distance import DistanceMatrix
+from skbio.stats.distance._base import (_condensed_offset,
+                                        _write_distance_rows)
 from skbio.diversity._util import (_validate_counts_matrix,
-                                   _get_phylogenetic_kwargs)
+                                   _validate_otu_ids_and_tree,
+                                   _get_phylogenetic_kwargs, _sparse_rows)
 
 
 def _get_alpha_diversity_metric_map():
@@ -59,6 +67,17 @@ def _get_alpha_diversity_metric_map():
         'lladser_ci': skbio.diversity.alpha.lladser_ci}
 
 
+# alpha diversity metrics whose value doesn't depend on the number or order of
+# zero counts in a sample. These can be computed from the nonzero counts of a
+# sparse counts matrix alone.
+_nonzero_alpha_diversity_metrics = frozenset([
+    'ace', 'chao1', 'chao1_ci', 'berger_parker_d', 'brillouin_d', 'dominance',
+    'doubles', 'enspie', 'esty_ci', 'fisher_alpha', 'goods_coverage', 'heip_e',
+    'margalef', 'mcintosh_d', 'mcintosh_e', 'menhinick', 'observed_otus',
+    'osd', 'pielou_e', 'robbins', 'shannon', 'simpson', 'simpson_e',
+    'singles'])
+
+
 @experimental(as_of="0.4.1")
 def get_alpha_diversity_metrics():
     """ List scikit-bio's alpha diversity metrics
@@ -120,10 +139,12 @@ def alpha_diversity(metric, counts, ids=None, validate=True, **kwargs):
     metric : str, callable
         The alpha diversity metric to apply to the sample(s). Passing metric as
         a string is preferable as this often results in an optimized version of
-        the metric being used.
-    counts : 1D or 2D array_like of ints or floats
+        the metric being used. Many metrics passed as a string are computed
+        for all samples of a dense ``counts`` matrix at once.
+    counts : 1D or 2D array_like of ints or floats, or scipy.sparse matrix
         Vector or matrix containing count/abundance data. If a matrix, each row
-        should contain counts of OTUs in a given sample.
+        should contain counts of OTUs in a given sample. Sparse matrices are
+        never converted to a dense matrix as a whole.
     ids : iterable of strs, optional
         Identifiers for each sample in ``counts``. By default, samples will be
         assigned integer identifiers in the order that they were provided.
@@ -159,15 +180,47 @@ def alpha_diversity(metric, counts, ids=None, validate=True, **kwargs):
     skbio.diversity.beta_diversity
 
     """
-    metric_map = _get_alpha_diversity_metric_map()
-
     if validate:
         counts = _validate_counts_matrix(counts, ids=ids)
 
+    return _alpha_diversity(metric, counts, ids, validate, kwargs)
+
+
+def _alpha_diversity(metric, counts, ids, validate, kwargs,
+                     counts_matrix=None):
+    """Compute alpha diversity of already validated counts
+
+    ``counts_matrix`` can be a ``_CountsMatrix`` of ``counts`` whose
+    statistics are shared with other metrics computed on the same counts.
+    """
+    metric_map = _get_alpha_diversity_metric_map()
+
+    matrix_metric_map = _get_alpha_diversity_matrix_metric_map()
+    if (isinstance(metric, str) and metric in matrix_metric_map and
+            not scipy.sparse.issparse(counts)):
+        if counts_matrix is None:
+            counts_matrix = _CountsMatrix(counts)
+        if counts_matrix.counts.ndim == 2:
+            # computed for all samples at once
+            results = matrix_metric_map[metric](counts_matrix, **kwargs)
+            return pd.Series(results, index=ids)
+
+    if scipy.sparse.issparse(counts):
+        counts = counts.tocsr()
+        # expand rows into dense vectors only if the metric might need zeros
+        nonzero_only = metric in _nonzero_alpha_diversity_metrics
+
     if metric == 'faith_pd':
         otu_ids, tree, kwargs = _get_phylogenetic_kwargs(counts, **kwargs)
         counts_by_node, branch_lengths = _setup_faith_pd(
             counts, otu_ids, tree, validate, single_sample=False)
+        if scipy.sparse.issparse(counts_by_node):
+            if kwargs:
+                raise TypeError("Unexpected keyword argument(s) for "
+                                "faith_pd: %s" % ", ".join(sorted(kwargs)))
+            # the stored nodes of each sample are exactly its observed nodes
+            counts_by_node.data = np.ones_like(counts_by_node.data)
+            return pd.Series(counts_by_node @ branch_lengths, index=ids)
         counts = counts_by_node
         metric = functools.partial(_faith_pd, branch_lengths=branch_lengths)
     elif callable(metric):
@@ -177,11 +230,123 @@ def alpha_diversity(metric, counts, ids=None, validate=True, **kwargs):
     else:
         raise ValueError('Unknown metric provided: %r.' % metric)
 
+    if scipy.sparse.issparse(counts):
+        counts = _sparse_rows(counts, nonzero_only=nonzero_only)
+
     # kwargs is provided here so an error is raised on extra kwargs
     results = [metric(c, **kwargs) for c in counts]
     return pd.Series(results, index=ids)
 
 
+@experimental(as_of="0.5.5")
+def alpha_diversity_multi(metrics, counts, ids=None, validate=True,
+                          otu_ids=None, tree=None, metric_kwargs=None):
+    """ Compute several alpha diversity metrics for one or more samples
+
+    This is equivalent to calling ``alpha_diversity`` once per metric, but
+    ``counts`` (and ``otu_ids`` and ``tree``, if provided) are only validated
+    once, and statistics shared between metrics (e.g., the total count or the
+    number of singletons of each sample) are only computed once.
+
+    Parameters
+    ----------
+    metrics : iterable of str or callable
+        The alpha diversity metrics to apply to the sample(s). See
+        ``alpha_diversity`` for details.
+    counts : 1D or 2D array_like of ints or floats, or scipy.sparse matrix
+        Vector or matrix containing count/abundance data. See
+        ``alpha_diversity`` for details.
+    ids : iterable of strs, optional
+        Identifiers for each sample in ``counts``. By default, samples will be
+        assigned integer identifiers in the order that they were provided.
+    validate: bool, optional
+        If `False`, validation of the input won't be performed. See
+        ``alpha_diversity`` for details.
+    otu_ids : list, np.array, optional
+        Vector of OTU ids corresponding to tip names in ``tree``. Required
+        for phylogenetic metrics.
+    tree : skbio.TreeNode, optional
+        Tree relating the OTUs in ``otu_ids``. Required for phylogenetic
+        metrics.
+    metric_kwargs : dict, optional
+        Metric-specific parameters, as a dict mapping the name of a metric to
+        a dict of its parameters.
+
+    Returns
+    -------
+    pd.DataFrame
+        Values of each metric (columns) for all vectors provided in ``counts``
+        (rows). The index will be ``ids``, if provided. Columns are named
+        after the metrics (the function name for callables).
+
+    Raises
+    ------
+    ValueError, MissingNodeError, DuplicateNodeError
+        If validation fails. Exact error will depend on what was invalid.
+        If a metric is provided more than once.
+    TypeError
+        If invalid method-specific parameters are provided.
+
+    See Also
+    --------
+    alpha_diversity
+    beta_diversity_multi
+
+    Examples
+    --------
+    >>> from skbio.diversity import alpha_diversity_multi
+    >>> data = [[23, 64, 14, 0, 0, 3, 1],
+    ...         [0, 3, 35, 42, 0, 12, 1]]
+    >>> adiv = alpha_diversity_multi(['observed_otus', 'singles'], data,
+    ...                              ids=['A', 'B'])
+    >>> adiv
+       observed_otus  singles
+    A              5        1
+    B              5        1
+
+    """
+    metrics = list(metrics)
+    names = _get_metric_names(metrics)
+    if metric_kwargs is None:
+        metric_kwargs = {}
+
+    if validate:
+        counts = _validate_counts_matrix(counts, ids=ids)
+
+    phylogenetic_kwargs = {}
+    if otu_ids is not None:
+        phylogenetic_kwargs['otu_ids'] = otu_ids
+    if tree is not None:
+        phylogenetic_kwargs['tree'] = tree
+
+    counts_matrix = None
+    if not scipy.sparse.issparse(counts):
+        counts_matrix = _CountsMatrix(counts)
+        counts = counts_matrix.counts
+
+    if ids is None:
+        ids = pd.RangeIndex(counts.shape[0])
+
+    results = pd.DataFrame(index=ids)
+    for metric, name in zip(metrics, names):
+        kwargs = dict(metric_kwargs.get(name, {}))
+        if metric == 'faith_pd':
+            kwargs.update(phylogenetic_kwargs)
+        results[name] = _alpha_diversity(metric, counts, ids, validate,
+                                         kwargs,
+                                         counts_matrix=counts_matrix).values
+
+    return results
+
+
+def _get_metric_names(metrics):
+    names = [metric if isinstance(metric, str) else metric.__name__
+             for metric in metrics]
+    if len(set(names)) != len(names):
+        raise ValueError("Each metric can only be provided once.")
+    return names
+
+
 @deprecated(as_of='0.5.0', until='0.6.0',
             reason=('The return type is unstable. Developer caution is '
                     'advised. The resulting DistanceMatrix object will '
@@ -279,9 +444,14 @@ def partial_beta_diversity(metric, counts, ids, id_pairs, validate=True,
     return DistanceMatrix(dm + dm.T, ids)
 
 
+# The number of distances computed at a time when ``beta_diversity`` writes
+# them to ``out``
+_out_block_size = 2 ** 24
+
+
 @experimental(as_of="0.4.0")
 def beta_diversity(metric, counts, ids=None, validate=True, pairwise_func=None,
-                   **kwargs):
+                   out=None, condensed=False, **kwargs):
     """Compute distances between all pairs of samples
 
     Parameters
@@ -293,7 +463,12 @@ def beta_diversity(metric, counts, ids=None, validate=True, pairwise_func=None,
         results in an optimized version of the metric being used.
     counts : 2D array_like of ints or floats or 2D pandas DataFrame
         Matrix containing count/abundance data where each row contains counts
-        of OTUs in a given sample.
+        of OTUs in a given sample. May also be a scipy.sparse matrix, which
+        is not converted to a dense matrix by the UniFrac metrics. Other
+        metrics receive the sparse matrix as is, so it must be supported by
+        ``pairwise_func`` (``sklearn.metrics.pairwise_distances`` supports
+        sparse input for metrics such as ``'euclidean'`` and
+        ``'cityblock'``).
     ids : iterable of strs, optional
         Identifiers for each sample in ``counts``. By default, samples will be
         assigned integer identifiers in the order that they were provided
@@ -313,6 +488,24 @@ def beta_diversity(metric, counts, ids=None, validate=True, pairwise_func=None,
         that can be provided are ``scipy.spatial.distance.pdist`` and
         ``sklearn.metrics.pairwise_distances``. By default,
         ``sklearn.metrics.pairwise_distances`` will be used.
+    out : str or np.ndarray, optional
+        Where to store the distances, if they should not be held in memory.
+        If a path, a ``.npy`` file storing the distances in square form (or
+        condensed form, see ``condensed``) is created at this path.
+        Otherwise, an array of floats of shape
+        ``(n, n)`` or ``(n * (n - 1) // 2,)``, where ``n`` is the number of
+        samples, storing the distances in square or condensed form
+        (typically a ``numpy.memmap``, see
+        ``numpy.lib.format.open_memmap``). The distances are computed and
+        written to ``out`` in blocks of rows, so that only a block of
+        distances is held in memory at a time. Cannot be combined with
+        ``pairwise_func``.
+    condensed : bool, optional
+        If ``True``, the distance matrix only stores the distances in
+        condensed form, which halves the memory it uses (see
+        ``DistanceMatrix``). If ``out`` is a path, the file stores the
+        distances in condensed form, which halves its size. Ignored if
+        ``out`` is an array, whose shape determines the form.
     kwargs : kwargs, optional
         Metric-specific parameters.
 
@@ -321,11 +514,17 @@ def beta_diversity(metric, counts, ids=None, validate=True, pairwise_func=None,
     skbio.DistanceMatrix
         Distances between all pairs of samples (i.e., rows). The number of
         rows and columns will be equal to the number of rows in ``counts``.
+        If ``out`` is provided, the distance matrix uses the stored distances
+        without copying them (a path is memory-mapped in read-only mode), and
+        they are not validated again. Distances stored in condensed form are
+        kept in condensed form (see ``DistanceMatrix``).
 
     Raises
     ------
     ValueError, MissingNodeError, DuplicateNodeError
         If validation fails. Exact error will depend on what was invalid.
+        If ``out`` is combined with ``pairwise_func``, or is an array of the
+        wrong shape.
     TypeError
         If invalid method-specific parameters are provided.
 
@@ -338,19 +537,69 @@ def beta_diversity(metric, counts, ids=None, validate=True, pairwise_func=None,
     scipy.spatial.distance.pdist
     sklearn.metrics.pairwise_distances
 
+    Examples
+    --------
+    Distances can be written to a file instead of being held in memory:
+
+    >>> import os, tempfile
+    >>> from skbio.diversity import beta_diversity
+    >>> data = [[23, 64, 14, 0, 0, 3, 1],
+    ...         [0, 3, 35, 42, 0, 12, 1],
+    ...         [0, 5, 5, 0, 40, 40, 0]]
+    >>> path = os.path.join(tempfile.mkdtemp(), 'braycurtis.npy')
+    >>> dm = beta_diversity('braycurtis', data, ids=['A', 'B', 'C'], out=path)
+    >>> print(round(dm['A', 'B'], 4))
+    0.7879
+
+    The file can later be opened again without reading it into memory:
+
+    >>> import numpy as np
+    >>> from skbio import DistanceMatrix
+    >>> dm = DistanceMatrix(np.load(path, mmap_mode='r'), ['A', 'B', 'C'],
+    ...                     validate=False)
+
+    Storing the distances in condensed form halves the size of the file, and
+    the distance matrix keeps them in this form:
+
+    >>> dm = beta_diversity('braycurtis', data, ids=['A', 'B', 'C'], out=path,
+    ...                     condensed=True)
+    >>> dm = DistanceMatrix(np.load(path, mmap_mode='r'), ['A', 'B', 'C'],
+    ...                     validate=False, condensed=True)
+
     """
+    if out is not None and pairwise_func is not None:
+        raise ValueError("``out`` cannot be combined with ``pairwise_func``.")
+
     if validate:
         counts = _validate_counts_matrix(counts, ids=ids)
 
+    n = counts.shape[0]
     if 0 in counts.shape:
         # if the input counts are empty, return an empty DistanceMatrix.
         # this check is not necessary for scipy.spatial.distance.pdist but
         # it is necessary for sklearn.metrics.pairwise_distances where the
         # latter raises an exception over empty data.
-        return DistanceMatrix(np.zeros((len(ids), len(ids))), ids)
+        if out is None:
+            return DistanceMatrix(np.zeros((len(ids), len(ids))), ids,
+                                  condensed=condensed)
+        return _write_distance_rows(
+            lambda start, stop: np.zeros(_condensed_offset(n, stop) -
+                                         _condensed_offset(n, start)),
+            n, ids, out, _out_block_size, condensed)
 
     if metric == 'unweighted_unifrac':
         otu_ids, tree, kwargs = _get_phylogenetic_kwargs(counts, **kwargs)
+        if pairwise_func is None:
+            # all pairs are computed by a compiled kernel
+            if kwargs:
+                raise TypeError("Unexpected keyword argument(s) for %s: %s" %
+                                (metric, ", ".join(sorted(kwargs))))
+            counts_by_node, _, branch_lengths = _setup_multiple_unifrac(
+                counts, otu_ids, tree, validate, dense=False)
+            rows = _unweighted_unifrac_rows_by_node(counts_by_node,
+                                                    branch_lengths)
+            return _write_distance_rows(rows, n, ids, out, _out_block_size,
+                                        condensed)
         metric, counts_by_node = _setup_multiple_unweighted_unifrac(
             counts, otu_ids=otu_ids, tree=tree, validate=validate)
         counts = counts_by_node
@@ -360,6 +609,17 @@ def beta_diversity(metric, counts, ids=None, validate=True, pairwise_func=None,
         normalized = kwargs.pop('normalized',
                                 _normalize_weighted_unifrac_by_default)
         otu_ids, tree, kwargs = _get_phylogenetic_kwargs(counts, **kwargs)
+        if pairwise_func is None:
+            if kwargs:
+                raise TypeError("Unexpected keyword argument(s) for %s: %s" %
+                                (metric, ", ".join(sorted(kwargs))))
+            counts_by_node, tree_index, branch_lengths = \
+                _setup_multiple_unifrac(counts, otu_ids, tree, validate,
+                                        dense=False)
+            rows = _weighted_unifrac_rows_by_node(
+                counts_by_node, tree_index, branch_lengths, normalized)
+            return _write_distance_rows(rows, n, ids, out, _out_block_size,
+                                        condensed)
         metric, counts_by_node = _setup_multiple_weighted_unifrac(
             counts, otu_ids=otu_ids, tree=tree, normalized=normalized,
             validate=validate)
@@ -374,8 +634,153 @@ def beta_diversity(metric, counts, ids=None, validate=True, pairwise_func=None,
         # example one of the SciPy metrics
         pass
 
+    if out is not None:
+        def rows(start, stop):
+            distances = sklearn.metrics.pairwise_distances(
+                counts[start:stop], counts[start:], metric=metric, **kwargs)
+            return np.concatenate([distances[i, i + 1:]
+                                   for i in range(stop - start)])
+        return _write_distance_rows(rows, n, ids, out, _out_block_size,
+                                    condensed)
+
     if pairwise_func is None:
         pairwise_func = sklearn.metrics.pairwise_distances
 
     distances = pairwise_func(counts, metric=metric, **kwargs)
-    return DistanceMatrix(distances, ids)
+    return DistanceMatrix(distances, ids, condensed=condensed)
+
+
+@experimental(as_of="0.5.5")
+def beta_diversity_multi(metrics, counts, ids=None, validate=True,
+                         pairwise_func=None, otu_ids=None, tree=None,
+                         metric_kwargs=None):
+    """Compute several beta diversity metrics between all pairs of samples
+
+    This is equivalent to calling ``beta_diversity`` once per metric, but
+    ``counts`` (and ``otu_ids`` and ``tree``, if provided) are only validated
+    once, and the tree is only indexed once for all UniFrac metrics.
+
+    Parameters
+    ----------
+    metrics : iterable of str or callable
+        The pairwise distance functions to apply. See ``beta_diversity`` for
+        details.
+    counts : 2D array_like of ints or floats or 2D pandas DataFrame
+        Matrix containing count/abundance data where each row contains counts
+        of OTUs in a given sample. See ``beta_diversity`` for details.
+    ids : iterable of strs, optional
+        Identifiers for each sample in ``counts``. By default, samples will be
+        assigned integer identifiers in the order that they were provided
+        (where the type of the identifiers will be ``str``).
+    validate : bool, optional
+        If `False`, validation of the input won't be performed. See
+        ``beta_diversity`` for details.
+    pairwise_func : callable, optional
+        The function to use for computing pairwise distances. See
+        ``beta_diversity`` for details.
+    otu_ids : list, np.array, optional
+        Vector of OTU ids corresponding to tip names in ``tree``. Required
+        for phylogenetic metrics.
+    tree : skbio.TreeNode, optional
+        Tree relating the OTUs in ``otu_ids``. Required for phylogenetic
+        metrics.
+    metric_kwargs : dict, optional
+        Metric-specific parameters, as a dict mapping the name of a metric to
+        a dict of its parameters.
+
+    Returns
+    -------
+    dict of skbio.DistanceMatrix
+        Distances between all pairs of samples for each metric, keyed by the
+        name of the metric (the function name for callables).
+
+    Raises
+    ------
+    ValueError, MissingNodeError, DuplicateNodeError
+        If validation fails. Exact error will depend on what was invalid.
+        If a metric is provided more than once.
+    TypeError
+        If invalid method-specific parameters are provided.
+
+    See Also
+    --------
+    beta_diversity
+    alpha_diversity_multi
+
+    Examples
+    --------
+    >>> from skbio.diversity import beta_diversity_multi
+    >>> data = [[23, 64, 14, 0, 0, 3, 1],
+    ...         [0, 3, 35, 42, 0, 12, 1],
+    ...         [0, 5, 5, 0, 40, 40, 0]]
+    >>> dms = beta_diversity_multi(['braycurtis', 'euclidean'], data,
+    ...                            ids=['A', 'B', 'C'])
+    >>> sorted(dms)
+    ['braycurtis', 'euclidean']
+    >>> print(round(dms['braycurtis']['A', 'B'], 4))
+    0.7879
+
+    """
+    metrics = list(metrics)
+    names = _get_metric_names(metrics)
+    if metric_kwargs is None:
+        metric_kwargs = {}
+
+    if validate:
+        counts = _validate_counts_matrix(counts, ids=ids)
+
+    phylogenetic_kwargs = {}
+    if otu_ids is not None:
+        phylogenetic_kwargs['otu_ids'] = otu_ids
+    if tree is not None:
+        phylogenetic_kwargs['tree'] = tree
+
+    unifrac_metrics = ('unweighted_unifrac', 'weighted_unifrac')
+    unifrac_setup = None
+    if (validate and 0 not in np.shape(counts) and
+            any(metric in unifrac_metrics for metric in metrics)):
+        otu_ids, tree, _ = _get_phylogenetic_kwargs(counts,
+                                                    **phylogenetic_kwargs)
+        _validate_otu_ids_and_tree(counts[0], otu_ids, tree)
+
+    results = {}
+    for metric, name in zip(metrics, names):
+        kwargs = dict(metric_kwargs.get(name, {}))
+        if metric not in unifrac_metrics:
+            results[name] = beta_diversity(metric, counts, ids,
+                                           validate=False,
+                                           pairwise_func=pairwise_func,
+                                           **kwargs)
+            continue
+
+        kwargs.update(phylogenetic_kwargs)
+        if pairwise_func is not None or 0 in np.shape(counts):
+            results[name] = beta_diversity(metric, counts, ids,
+                                           validate=False,
+                                           pairwise_func=pairwise_func,
+                                           **kwargs)
+            continue
+
+        if metric == 'weighted_unifrac':
+            normalized = kwargs.pop('normalized',
+                                    _normalize_weighted_unifrac_by_default)
+        otu_ids, tree, kwargs = _get_phylogenetic_kwargs(counts, **kwargs)
+        if kwargs:
+            raise TypeError("Unexpected keyword argument(s) for %s: %s" %
+                            (metric, ", ".join(sorted(kwargs))))
+
+        if unifrac_setup is None:
+            # the tree is indexed once and shared by all UniFrac metrics
+            unifrac_setup = _setup_multiple_unifrac(
+                counts, otu_ids, tree, validate=False, dense=False)
+        counts_by_node, tree_index, branch_lengths = unifrac_setup
+
+        if metric == 'unweighted_unifrac':
+            distances = _unweighted_unifrac_pdist_by_node(counts_by_node,
+                                                          branch_lengths)
+        else:
+            distances = _weighted_unifrac_pdist_by_node(
+                counts_by_node, tree_index, branch_lengths, normalized)
+        results[name] = DistanceMatrix(distances, ids)
+
+    return results
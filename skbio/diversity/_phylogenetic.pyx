@@ -14,55 +14,6 @@ DTYPE = np.int64
 ctypedef np.int64_t DTYPE_t
 
 
-@cython.boundscheck(False)
-@cython.wraparound(False)
-def _tip_distances(np.ndarray[np.double_t, ndim=1] a, object t,
-                   np.ndarray[DTYPE_t, ndim=1] tip_indices):
-    """Sets each tip to its distance from the root
-
-    Parameters
-    ----------
-    a : np.ndarray of double
-        A matrix in which each row corresponds to a node in ``t``.
-    t : skbio.tree.TreeNode
-        The tree that corresponds to the rows in ``a``.
-    tip_indices : np.ndarray of int
-        The index positions in ``a`` of the tips in ``t``.
-
-    Returns
-    -------
-    np.ndarray of double
-        A matrix in which each row corresponds to a node in ``t``, Only the
-        rows that correspond to tips are nonzero, and the values in these rows
-        are the distance from that tip to the root of the tree.
-    """
-    cdef:
-        object n
-        Py_ssize_t i, p_i, n_rows
-        np.ndarray[np.double_t, ndim=1] mask
-        np.ndarray[np.double_t, ndim=1] tip_ds = a.copy()
-
-    # preorder reduction over the tree to gather distances at the tips
-    n_rows = tip_ds.shape[0]
-    for n in t.preorder(include_self=False):
-        i = n.id
-        p_i = n.parent.id
-
-        tip_ds[i] += tip_ds[p_i]
-
-    # construct a mask that represents the locations of the tips
-    mask = np.zeros(n_rows, dtype=np.double)
-    for i in range(tip_indices.shape[0]):
-        mask[tip_indices[i]] = 1.0
-
-    # apply the mask such that tip_ds only includes values which correspond to
-    # the tips of the tree.
-    for i in range(n_rows):
-        tip_ds[i] *= mask[i]
-
-    return tip_ds
-
-
 @cython.boundscheck(False)
 @cython.wraparound(False)
 cdef _traverse_reduce(np.ndarray[DTYPE_t, ndim=2] child_index,
@@ -141,21 +92,24 @@ cdef _traverse_reduce(np.ndarray[DTYPE_t, ndim=2] child_index,
 @cython.boundscheck(False)
 @cython.wraparound(False)
 def _nodes_by_counts(np.ndarray counts,
-                     np.ndarray tip_ids,
-                     dict indexed):
+                     np.ndarray[DTYPE_t, ndim=1] otu_nodes,
+                     np.ndarray[DTYPE_t, ndim=2] child_index,
+                     Py_ssize_t n_nodes):
     """Construct the count array, and the counts up the tree
 
     Parameters
     ----------
     counts : np.array of int
         A 1D or 2D vector in which each row corresponds to the observed counts
-        in an environment. The rows are expected to be in order with respect to
-        `tip_ids`.
-    tip_ids : np.array of str
-        A vector of tip names that correspond to the columns in the `counts`
-        matrix.
-    indexed : dict
-        The result of `index_tree`.
+        in an environment. The columns are expected to be in order with
+        respect to `otu_nodes`.
+    otu_nodes : np.array of int
+        The index of the node of the tree corresponding to each column in the
+        `counts` matrix.
+    child_index : np.array of int
+        The child index of the tree, as described in `_traverse_reduce`.
+    n_nodes : int
+        The number of nodes in the tree.
 
     Returns
     -------
@@ -164,52 +118,567 @@ def _nodes_by_counts(np.ndarray counts,
 
     """
     cdef:
-        np.ndarray nodes, observed_ids
         np.ndarray[DTYPE_t, ndim=2] count_array, counts_t
-        np.ndarray[DTYPE_t, ndim=1] observed_indices, otus_in_nodes
+        np.ndarray[DTYPE_t, ndim=1] observed_indices
         Py_ssize_t i, j
-        set observed_ids_set
-        object n
-        dict node_lookup
         DTYPE_t n_count_vectors, n_count_otus
 
-    nodes = indexed['name']
-
     # allow counts to be a vector
     counts = np.atleast_2d(counts)
     counts = counts.astype(DTYPE)
 
-    # determine observed IDs. It may be possible to unroll these calls to
-    # squeeze a little more performance
-    observed_indices = counts.sum(0).nonzero()[0]
-    observed_ids = tip_ids[observed_indices]
-    observed_ids_set = set(observed_ids)
-
-    # construct mappings of the observed to their positions in the node array
-    node_lookup = {}
-    for i in range(nodes.shape[0]):
-        n = nodes[i]
-        if n in observed_ids_set:
-            node_lookup[n] = i
-
-    # determine the positions of the observed IDs in nodes
-    otus_in_nodes = np.zeros(observed_ids.shape[0], dtype=DTYPE)
-    for i in range(observed_ids.shape[0]):
-        n = observed_ids[i]
-        otus_in_nodes[i] = node_lookup[n]
+    # determine observed OTUs
+    observed_indices = counts.sum(0).nonzero()[0].astype(DTYPE)
 
     # count_array has a row per node (not tip) and a column per env.
     n_count_vectors = counts.shape[0]
-    count_array = np.zeros((nodes.shape[0], n_count_vectors), dtype=DTYPE)
+    count_array = np.zeros((n_nodes, n_count_vectors), dtype=DTYPE)
 
     # populate the counts array with the counts of each observation in each
     # env
     counts_t = counts.transpose()
-    n_count_otus = otus_in_nodes.shape[0]
+    n_count_otus = observed_indices.shape[0]
     for i in range(n_count_otus):
         for j in range(n_count_vectors):
-            count_array[otus_in_nodes[i], j] = counts_t[observed_indices[i], j]
+            count_array[otu_nodes[observed_indices[i]], j] = \
+                counts_t[observed_indices[i], j]
 
-    _traverse_reduce(indexed['child_index'], count_array)
+    _traverse_reduce(child_index, count_array)
 
     return count_array
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def _unweighted_unifrac_all_pairs(np.uint8_t[:, ::1] presence,
+                                  double[::1] branch_lengths,
+                                  Py_ssize_t tile=64,
+                                  Py_ssize_t row_start=0,
+                                  Py_ssize_t row_end=-1):
+    """Compute unweighted UniFrac between all pairs of samples
+
+    Parameters
+    ----------
+    presence : np.ndarray of uint8
+        A matrix in which each row corresponds to a sample and each column
+        to a node of the tree. Nonzero values indicate that the node is
+        observed in the sample.
+    branch_lengths : np.ndarray of double
+        The branch length of each node (column) in ``presence``.
+    tile : int, optional
+        The number of samples per side of the square tiles of sample pairs
+        that are computed together. The rows of ``presence`` used by a tile
+        remain in cache while the tile is computed.
+    row_start, row_end : int, optional
+        Only compute the distances of the samples in the rows ``row_start``
+        to ``row_end`` (exclusive) to the samples that follow them. By
+        default, all pairs of samples are computed.
+
+    Returns
+    -------
+    np.ndarray of double
+        The distances in condensed form, as defined by
+        ``scipy.spatial.distance.squareform``. If only a block of rows is
+        computed, the part of the condensed form corresponding to these
+        rows.
+
+    Notes
+    -----
+    The distances are computed without holding the GIL.
+    """
+    cdef:
+        Py_ssize_t n_samples = presence.shape[0]
+        Py_ssize_t n_nodes = presence.shape[1]
+        Py_ssize_t n_tiles, ti, tj, i, j, k
+        Py_ssize_t i_start, i_end, j_start, j_end, offset
+        double unique, observed
+        np.uint8_t u, v
+        np.ndarray[np.double_t, ndim=1] result
+        double[::1] out
+
+    if tile < 1:
+        raise ValueError("``tile`` must be at least 1.")
+    if row_end < 0:
+        row_end = n_samples
+    if not 0 <= row_start <= row_end <= n_samples:
+        raise ValueError("Invalid block of rows: %d to %d." %
+                         (row_start, row_end))
+
+    # the condensed form stores the pairs of each row contiguously, so the
+    # pairs of a block of rows start at the offset of its first row
+    offset = n_samples * row_start - row_start * (row_start + 1) // 2
+    result = np.zeros(n_samples * row_end - row_end * (row_end + 1) // 2 -
+                      offset, dtype=np.double)
+    out = result
+
+    n_tiles = (n_samples + tile - 1) // tile
+
+    with nogil:
+        for ti in range(row_start // tile, n_tiles):
+            i_start = max(ti * tile, row_start)
+            i_end = min((ti + 1) * tile, row_end)
+            if i_start >= i_end:
+                break
+            for tj in range(ti, n_tiles):
+                j_end = min((tj + 1) * tile, n_samples)
+                for i in range(i_start, i_end):
+                    j_start = max(tj * tile, i + 1)
+                    for j in range(j_start, j_end):
+                        unique = 0.0
+                        observed = 0.0
+                        for k in range(n_nodes):
+                            u = presence[i, k]
+                            v = presence[j, k]
+                            if u or v:
+                                observed += branch_lengths[k]
+                                if not (u and v):
+                                    unique += branch_lengths[k]
+
+                        # handle special case to avoid division by zero
+                        if observed != 0.0:
+                            out[n_samples * i - i * (i + 1) // 2 +
+                                j - i - 1 - offset] = unique / observed
+
+    return result
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def _weighted_unifrac_all_pairs(double[:, ::1] proportions,
+                                double[::1] branch_lengths,
+                                double[::1] totals,
+                                double[::1] corrections,
+                                bint normalized=False,
+                                Py_ssize_t tile=64,
+                                Py_ssize_t row_start=0,
+                                Py_ssize_t row_end=-1):
+    """Compute weighted UniFrac between all pairs of samples
+
+    Parameters
+    ----------
+    proportions : np.ndarray of double
+        A matrix in which each row corresponds to a sample and each column
+        to a node of the tree. Values are the proportional abundance of the
+        node in the sample (or zero if the sample has no counts).
+    branch_lengths : np.ndarray of double
+        The branch length of each node (column) in ``proportions``.
+    totals : np.ndarray of double
+        The total count of each sample.
+    corrections : np.ndarray of double
+        The branch length correction of each sample, i.e. the sum of its
+        proportional abundances weighted by their distance to the root. Only
+        used if ``normalized``.
+    normalized : bool, optional
+        Whether to normalize the distances by the sum of the corrections of
+        the pair of samples.
+    tile : int, optional
+        The number of samples per side of the square tiles of sample pairs
+        that are computed together.
+    row_start, row_end : int, optional
+        Only compute the distances of the samples in the rows ``row_start``
+        to ``row_end`` (exclusive) to the samples that follow them. By
+        default, all pairs of samples are computed.
+
+    Returns
+    -------
+    np.ndarray of double
+        The distances in condensed form, as defined by
+        ``scipy.spatial.distance.squareform``. If only a block of rows is
+        computed, the part of the condensed form corresponding to these
+        rows.
+
+    Notes
+    -----
+    The branch length correction of a pair of samples is the sum of the
+    corrections of each sample, so it only needs to be computed once per
+    sample.
+    """
+    cdef:
+        Py_ssize_t n_samples = proportions.shape[0]
+        Py_ssize_t n_nodes = proportions.shape[1]
+        Py_ssize_t n_tiles, ti, tj, i, j, k
+        Py_ssize_t i_start, i_end, j_start, j_end, offset
+        double diff, wu
+        np.ndarray[np.double_t, ndim=1] result
+        double[::1] out
+
+    if tile < 1:
+        raise ValueError("``tile`` must be at least 1.")
+    if row_end < 0:
+        row_end = n_samples
+    if not 0 <= row_start <= row_end <= n_samples:
+        raise ValueError("Invalid block of rows: %d to %d." %
+                         (row_start, row_end))
+
+    # the condensed form stores the pairs of each row contiguously, so the
+    # pairs of a block of rows start at the offset of its first row
+    offset = n_samples * row_start - row_start * (row_start + 1) // 2
+    result = np.zeros(n_samples * row_end - row_end * (row_end + 1) // 2 -
+                      offset, dtype=np.double)
+    out = result
+
+    n_tiles = (n_samples + tile - 1) // tile
+
+    with nogil:
+        for ti in range(row_start // tile, n_tiles):
+            i_start = max(ti * tile, row_start)
+            i_end = min((ti + 1) * tile, row_end)
+            if i_start >= i_end:
+                break
+            for tj in range(ti, n_tiles):
+                j_end = min((tj + 1) * tile, n_samples)
+                for i in range(i_start, i_end):
+                    j_start = max(tj * tile, i + 1)
+                    for j in range(j_start, j_end):
+                        if normalized and totals[i] == 0.0 and \
+                                totals[j] == 0.0:
+                            # handle special case to avoid division by zero
+                            continue
+
+                        wu = 0.0
+                        for k in range(n_nodes):
+                            diff = proportions[i, k] - proportions[j, k]
+                            if diff < 0:
+                                diff = -diff
+                            wu += branch_lengths[k] * diff
+
+                        if normalized:
+                            wu /= corrections[i] + corrections[j]
+
+                        out[n_samples * i - i * (i + 1) // 2 +
+                            j - i - 1 - offset] = wu
+
+    return result
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _nodes_by_counts_sparse(Py_ssize_t[::1] indptr,
+                            Py_ssize_t[::1] indices,
+                            DTYPE_t[::1] data,
+                            Py_ssize_t[::1] otu_nodes,
+                            Py_ssize_t[::1] parents):
+    """Construct the counts up the tree from a CSR counts matrix
+
+    Parameters
+    ----------
+    indptr, indices, data : np.ndarray
+        The CSR representation of a counts matrix in which each row
+        corresponds to a sample and each column to an OTU.
+    otu_nodes : np.ndarray of intp
+        The index of the tip in the tree corresponding to each OTU (column).
+    parents : np.ndarray of intp
+        The index of the parent of each node, or -1 for the root. Nodes are
+        expected to be indexed in postorder, so that the index of a node is
+        less than the index of its parent.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        The CSR representation (``indptr``, ``indices``, ``data``) of a
+        matrix in which each row corresponds to a sample and each column to a
+        node of the tree. Only the nodes with a nonzero count are stored, and
+        the indices of each row are sorted.
+
+    Notes
+    -----
+    For each sample, the nodes on the paths from its observed OTUs to the
+    root are collected, stopping as soon as a node that was already collected
+    is reached. The collected nodes are then visited in postorder, adding the
+    count of each node to its parent.
+    """
+    cdef:
+        Py_ssize_t n_samples = indptr.shape[0] - 1
+        Py_ssize_t n_nodes = parents.shape[0]
+        Py_ssize_t i, j, k, node, n_touched
+        np.ndarray[np.intp_t, ndim=1] out_indptr
+        np.ndarray[np.intp_t, ndim=1] touched_arr, row_indices
+        np.ndarray[DTYPE_t, ndim=1] row_data
+        np.intp_t[::1] touched
+        DTYPE_t[::1] acc = np.zeros(n_nodes, dtype=DTYPE)
+        np.uint8_t[::1] seen = np.zeros(n_nodes, dtype=np.uint8)
+        list out_indices = []
+        list out_data = []
+
+    out_indptr = np.zeros(n_samples + 1, dtype=np.intp)
+    touched_arr = np.empty(n_nodes, dtype=np.intp)
+    touched = touched_arr
+
+    for i in range(n_samples):
+        n_touched = 0
+        for j in range(indptr[i], indptr[i + 1]):
+            node = otu_nodes[indices[j]]
+            acc[node] += data[j]
+
+            # walk towards the root until reaching a node already collected
+            while node != -1 and not seen[node]:
+                seen[node] = 1
+                touched[n_touched] = node
+                n_touched += 1
+                node = parents[node]
+
+        # postorder: children are visited before their parents
+        touched_arr[:n_touched].sort()
+        for k in range(n_touched):
+            node = touched[k]
+            if parents[node] != -1:
+                acc[parents[node]] += acc[node]
+
+        row_indices = touched_arr[:n_touched].copy()
+        row_data = np.empty(n_touched, dtype=DTYPE)
+        for k in range(n_touched):
+            node = touched[k]
+            row_data[k] = acc[node]
+            acc[node] = 0
+            seen[node] = 0
+
+        out_indices.append(row_indices)
+        out_data.append(row_data)
+        out_indptr[i + 1] = out_indptr[i] + n_touched
+
+    if n_samples == 0:
+        return (out_indptr, np.zeros(0, dtype=np.intp),
+                np.zeros(0, dtype=DTYPE))
+
+    return out_indptr, np.concatenate(out_indices), np.concatenate(out_data)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def _unweighted_unifrac_all_pairs_sparse(Py_ssize_t[::1] indptr,
+                                         Py_ssize_t[::1] indices,
+                                         double[::1] branch_lengths,
+                                         Py_ssize_t tile=64,
+                                         Py_ssize_t row_start=0,
+                                         Py_ssize_t row_end=-1):
+    """Compute unweighted UniFrac between all pairs of sparse samples
+
+    Parameters
+    ----------
+    indptr, indices : np.ndarray of intp
+        The CSR structure of a matrix in which each row corresponds to a
+        sample and each column to a node of the tree. Stored entries indicate
+        that the node is observed in the sample. The indices of each row must
+        be sorted.
+    branch_lengths : np.ndarray of double
+        The branch length of each node.
+    tile : int, optional
+        The number of samples per side of the square tiles of sample pairs
+        that are computed together.
+    row_start, row_end : int, optional
+        Only compute the distances of the samples in the rows ``row_start``
+        to ``row_end`` (exclusive) to the samples that follow them. By
+        default, all pairs of samples are computed.
+
+    Returns
+    -------
+    np.ndarray of double
+        The distances in condensed form, as defined by
+        ``scipy.spatial.distance.squareform``. If only a block of rows is
+        computed, the part of the condensed form corresponding to these
+        rows.
+
+    Notes
+    -----
+    The observed branch length of each sample is computed once. For a pair
+    of samples, only the branch length of the nodes observed in both is
+    computed, by merging their sorted indices, as the observed and unique
+    branch lengths of the pair follow from it.
+    """
+    cdef:
+        Py_ssize_t n_samples = indptr.shape[0] - 1
+        Py_ssize_t n_tiles, ti, tj, i, j, a, b, a_end, b_end
+        Py_ssize_t i_start, i_end, j_start, j_end, offset
+        double shared, observed
+        np.ndarray[np.double_t, ndim=1] result
+        double[::1] out
+        double[::1] lengths = np.zeros(max(n_samples, 0), dtype=np.double)
+
+    if tile < 1:
+        raise ValueError("``tile`` must be at least 1.")
+    if row_end < 0:
+        row_end = n_samples
+    if not 0 <= row_start <= row_end <= n_samples:
+        raise ValueError("Invalid block of rows: %d to %d." %
+                         (row_start, row_end))
+
+    # the condensed form stores the pairs of each row contiguously, so the
+    # pairs of a block of rows start at the offset of its first row
+    offset = n_samples * row_start - row_start * (row_start + 1) // 2
+    result = np.zeros(n_samples * row_end - row_end * (row_end + 1) // 2 -
+                      offset, dtype=np.double)
+    out = result
+    n_tiles = (n_samples + tile - 1) // tile
+
+    with nogil:
+        for i in range(n_samples):
+            for a in range(indptr[i], indptr[i + 1]):
+                lengths[i] += branch_lengths[indices[a]]
+
+        for ti in range(row_start // tile, n_tiles):
+            i_start = max(ti * tile, row_start)
+            i_end = min((ti + 1) * tile, row_end)
+            if i_start >= i_end:
+                break
+            for tj in range(ti, n_tiles):
+                j_end = min((tj + 1) * tile, n_samples)
+                for i in range(i_start, i_end):
+                    j_start = max(tj * tile, i + 1)
+                    for j in range(j_start, j_end):
+                        shared = 0.0
+                        a = indptr[i]
+                        a_end = indptr[i + 1]
+                        b = indptr[j]
+                        b_end = indptr[j + 1]
+                        while a < a_end and b < b_end:
+                            if indices[a] < indices[b]:
+                                a += 1
+                            elif indices[a] > indices[b]:
+                                b += 1
+                            else:
+                                shared += branch_lengths[indices[a]]
+                                a += 1
+                                b += 1
+
+                        observed = lengths[i] + lengths[j] - shared
+
+                        # handle special case to avoid division by zero
+                        if observed != 0.0:
+                            out[n_samples * i - i * (i + 1) // 2 +
+                                j - i - 1 - offset] = \
+                                (observed - shared) / observed
+
+    return result
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def _weighted_unifrac_all_pairs_sparse(Py_ssize_t[::1] indptr,
+                                       Py_ssize_t[::1] indices,
+                                       double[::1] proportions,
+                                       double[::1] branch_lengths,
+                                       double[::1] totals,
+                                       double[::1] corrections,
+                                       bint normalized=False,
+                                       Py_ssize_t tile=64,
+                                       Py_ssize_t row_start=0,
+                                       Py_ssize_t row_end=-1):
+    """Compute weighted UniFrac between all pairs of sparse samples
+
+    Parameters
+    ----------
+    indptr, indices, proportions : np.ndarray
+        The CSR representation of a matrix in which each row corresponds to a
+        sample and each column to a node of the tree. Values are the
+        proportional abundance of the node in the sample. The indices of each
+        row must be sorted.
+    branch_lengths : np.ndarray of double
+        The branch length of each node.
+    totals : np.ndarray of double
+        The total count of each sample.
+    corrections : np.ndarray of double
+        The branch length correction of each sample. Only used if
+        ``normalized``.
+    normalized : bool, optional
+        Whether to normalize the distances by the sum of the corrections of
+        the pair of samples.
+    tile : int, optional
+        The number of samples per side of the square tiles of sample pairs
+        that are computed together.
+    row_start, row_end : int, optional
+        Only compute the distances of the samples in the rows ``row_start``
+        to ``row_end`` (exclusive) to the samples that follow them. By
+        default, all pairs of samples are computed.
+
+    Returns
+    -------
+    np.ndarray of double
+        The distances in condensed form, as defined by
+        ``scipy.spatial.distance.squareform``. If only a block of rows is
+        computed, the part of the condensed form corresponding to these
+        rows.
+
+    Notes
+    -----
+    Since ``|u - v| = u + v - 2 * min(u, v)`` for non-negative ``u`` and
+    ``v``, only the nodes observed in both samples of a pair need to be
+    visited once the branch length weighted sum of the proportions of each
+    sample is known.
+    """
+    cdef:
+        Py_ssize_t n_samples = indptr.shape[0] - 1
+        Py_ssize_t n_tiles, ti, tj, i, j, a, b, a_end, b_end
+        Py_ssize_t i_start, i_end, j_start, j_end, offset
+        double shared, wu
+        np.ndarray[np.double_t, ndim=1] result
+        double[::1] out
+        double[::1] weighted = np.zeros(max(n_samples, 0), dtype=np.double)
+
+    if tile < 1:
+        raise ValueError("``tile`` must be at least 1.")
+    if row_end < 0:
+        row_end = n_samples
+    if not 0 <= row_start <= row_end <= n_samples:
+        raise ValueError("Invalid block of rows: %d to %d." %
+                         (row_start, row_end))
+
+    # the condensed form stores the pairs of each row contiguously, so the
+    # pairs of a block of rows start at the offset of its first row
+    offset = n_samples * row_start - row_start * (row_start + 1) // 2
+    result = np.zeros(n_samples * row_end - row_end * (row_end + 1) // 2 -
+                      offset, dtype=np.double)
+    out = result
+    n_tiles = (n_samples + tile - 1) // tile
+
+    with nogil:
+        for i in range(n_samples):
+            for a in range(indptr[i], indptr[i + 1]):
+                weighted[i] += branch_lengths[indices[a]] * proportions[a]
+
+        for ti in range(row_start // tile, n_tiles):
+            i_start = max(ti * tile, row_start)
+            i_end = min((ti + 1) * tile, row_end)
+            if i_start >= i_end:
+                break
+            for tj in range(ti, n_tiles):
+                j_end = min((tj + 1) * tile, n_samples)
+                for i in range(i_start, i_end):
+                    j_start = max(tj * tile, i + 1)
+                    for j in range(j_start, j_end):
+                        if normalized and totals[i] == 0.0 and \
+                                totals[j] == 0.0:
+                            # handle special case to avoid division by zero
+                            continue
+
+                        shared = 0.0
+                        a = indptr[i]
+                        a_end = indptr[i + 1]
+                        b = indptr[j]
+                        b_end = indptr[j + 1]
+                        while a < a_end and b < b_end:
+                            if indices[a] < indices[b]:
+                                a += 1
+                            elif indices[a] > indices[b]:
+                                b += 1
+                            else:
+                                shared += branch_lengths[indices[a]] * \
+                                    min(proportions[a], proportions[b])
+                                a += 1
+                                b += 1
+
+                        wu = weighted[i] + weighted[j] - 2 * shared
+                        if wu < 0.0:
+                            # rounding error for (nearly) identical samples
+                            wu = 0.0
+
+                        if normalized:
+                            wu /= corrections[i] + corrections[j]
+
+                        out[n_samples * i - i * (i + 1) // 2 +
+                            j - i - 1 - offset] = wu
+
+    return result
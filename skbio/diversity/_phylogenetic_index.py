@@ -0,0 +1,329 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import os
+
+import numpy as np
+
+from skbio._base import SkbioObject
+from skbio.tree import ArrayTree, MissingNodeError
+from skbio.util._decorator import experimental, classonlymethod
+
+
+class PhylogeneticIndex(SkbioObject):
+    """Array representation of a tree for phylogenetic diversity metrics
+
+    Phylogenetic diversity metrics (Faith's PD and UniFrac) only need a few
+    arrays describing the tree. Computing these arrays walks the whole tree,
+    which for large trees can take longer than computing the metric itself.
+    A ``PhylogeneticIndex`` computes them once so that they can be reused
+    across calls, and can be saved to disk and loaded again without the
+    tree. It can be passed as ``tree`` to all phylogenetic diversity metrics.
+
+    Nodes are numbered as by ``TreeNode.index_tree``: the children of a node
+    have consecutive indices, the index of a node is always greater than the
+    indices of its descendants, and the root is the last node.
+
+    Parameters
+    ----------
+    parents : 1D array_like of int
+        Index of the parent of each node. The parent of the root is ``-1``.
+    lengths : 1D array_like of float
+        Branch length of each node. Missing branch lengths are ``nan``.
+    child_index : 2D array_like of int
+        One row per internal node, in increasing order of the node indices,
+        containing the index of the node and the indices of its first and last
+        child.
+    tip_indices : 1D array_like of int
+        Indices of the tips of the tree, in increasing order.
+    tip_names : 1D array_like of str
+        Names of the tips in ``tip_indices``. Unnamed tips have an empty name.
+    tip_order : 1D array_like of int, optional
+        Permutation that sorts ``tip_names``. It is computed if not provided.
+
+    See Also
+    --------
+    skbio.TreeNode.to_array
+    skbio.diversity.alpha.faith_pd
+    skbio.diversity.beta.unweighted_unifrac
+    skbio.diversity.beta.weighted_unifrac
+
+    Notes
+    -----
+    Tip names are looked up with a binary search on the sorted tip names, so
+    no hash table has to be built when an index is loaded from disk.
+
+    Examples
+    --------
+    >>> from io import StringIO
+    >>> from skbio import TreeNode
+    >>> from skbio.diversity import PhylogeneticIndex, alpha_diversity
+    >>> tree = TreeNode.read(StringIO('((a:1,b:2)c:3,d:4)root;'))
+    >>> index = PhylogeneticIndex.from_tree(tree)
+    >>> print(index)
+    PhylogeneticIndex with 5 nodes and 3 tips
+    >>> index.node_ids(['d', 'a'])
+    array([3, 0])
+
+    The index can then be used in place of the tree:
+
+    >>> alpha_diversity('faith_pd', [[1, 0, 2], [0, 1, 0]],
+    ...                 otu_ids=['a', 'b', 'd'], tree=index)
+    0    8.0
+    1    5.0
+    dtype: float64
+
+    """
+    _arrays = ('parents', 'lengths', 'child_index', 'tip_indices',
+               'tip_names', 'tip_order')
+
+    @experimental(as_of="0.5.5")
+    def __init__(self, parents, lengths, child_index, tip_indices, tip_names,
+                 tip_order=None):
+        self.parents = np.asanyarray(parents, dtype=np.int64)
+        self.lengths = np.asanyarray(lengths, dtype=float)
+        self.child_index = np.asanyarray(child_index,
+                                         dtype=np.int64).reshape(-1, 3)
+        self.tip_indices = np.asanyarray(tip_indices, dtype=np.int64)
+        self.tip_names = np.asanyarray(tip_names, dtype=str)
+        if tip_order is None:
+            tip_order = np.argsort(self.tip_names, kind='mergesort')
+        self.tip_order = np.asanyarray(tip_order, dtype=np.int64)
+
+        if self.lengths.shape != self.parents.shape:
+            raise ValueError("``parents`` and ``lengths`` must have the same "
+                             "length.")
+        if not (self.tip_indices.shape == self.tip_names.shape ==
+                self.tip_order.shape):
+            raise ValueError("``tip_indices``, ``tip_names`` and "
+                             "``tip_order`` must have the same length.")
+
+        self._tip_distances = None
+
+    @classonlymethod
+    @experimental(as_of="0.5.5")
+    def from_tree(cls, tree):
+        """Index a tree
+
+        Parameters
+        ----------
+        tree : skbio.TreeNode or skbio.tree.ArrayTree
+            The tree to index, from this node down. An ``ArrayTree`` is
+            indexed without building ``TreeNode`` objects.
+
+        Returns
+        -------
+        PhylogeneticIndex
+            The index of ``tree``.
+
+        """
+        if isinstance(tree, ArrayTree):
+            return cls._from_array_tree(tree)
+
+        tree_index = tree.to_array(attrs=[('length', float)])
+        lengths = tree_index['length']
+        child_index = tree_index['child_index'].reshape(-1, 3)
+
+        parents = np.full(len(lengths), -1, dtype=np.int64)
+        is_tip = np.ones(len(lengths), dtype=bool)
+        for node, start, end in child_index:
+            parents[start:end + 1] = node
+            is_tip[node] = False
+
+        tip_indices = np.flatnonzero(is_tip)
+        id_index = tree_index['id_index']
+        tip_names = [id_index[i].name for i in tip_indices]
+        tip_names = ['' if name is None else name for name in tip_names]
+
+        return cls(parents, lengths, child_index, tip_indices, tip_names)
+
+    @classmethod
+    def _from_array_tree(cls, tree):
+        """Index an ``ArrayTree``
+
+        The children of the nodes are numbered as by ``TreeNode.assign_ids``:
+        the children of each node in postorder, and the root last.
+
+        """
+        num_nodes = len(tree)
+        nodes = np.arange(num_nodes)
+        parents = tree.parents
+        postorder_ranks = np.empty(num_nodes, dtype=np.int64)
+        postorder_ranks[tree.postorder()] = nodes
+        children = nodes[1:][np.lexsort((nodes[1:],
+                                         postorder_ranks[parents[1:]]))]
+        ids = np.empty(num_nodes, dtype=np.int64)
+        ids[children] = nodes[:-1]
+        ids[:1] = num_nodes - 1
+
+        new_parents = np.full(num_nodes, -1, dtype=np.int64)
+        new_parents[ids[1:]] = ids[parents[1:]]
+        lengths = np.empty(num_nodes)
+        lengths[ids] = tree.lengths
+
+        internal = np.flatnonzero(tree.first_children >= 0)
+        num_children = np.bincount(parents[1:], minlength=num_nodes)[internal]
+        first_children = ids[tree.first_children[internal]]
+        child_index = np.column_stack((ids[internal], first_children,
+                                       first_children + num_children - 1))
+        child_index = child_index[np.argsort(child_index[:, 0])]
+
+        tips = np.flatnonzero(tree.first_children < 0)
+        tip_order = np.argsort(ids[tips])
+        tip_names = ['' if name is None else name
+                     for name in tree.names[tips[tip_order]]]
+
+        return cls(new_parents, lengths, child_index, ids[tips[tip_order]],
+                   tip_names)
+
+    @classonlymethod
+    @experimental(as_of="0.5.5")
+    def read(cls, path, mmap_mode=None):
+        """Load an index written by ``PhylogeneticIndex.write``
+
+        Parameters
+        ----------
+        path : str or file-like
+            Path of a ``.npz`` file, or of a directory of ``.npy`` files.
+        mmap_mode : {None, 'r', 'r+', 'c'}, optional
+            Memory-map the arrays of the index instead of reading them into
+            memory. Only supported for directories of ``.npy`` files. See
+            ``numpy.load`` for the meaning of each mode.
+
+        Returns
+        -------
+        PhylogeneticIndex
+            The loaded index.
+
+        Raises
+        ------
+        ValueError
+            If ``mmap_mode`` is provided for a ``.npz`` file.
+
+        """
+        if isinstance(path, str) and os.path.isdir(path):
+            arrays = {name: np.load(os.path.join(path, name + '.npy'),
+                                    mmap_mode=mmap_mode)
+                      for name in cls._arrays}
+        else:
+            if mmap_mode is not None:
+                raise ValueError("``.npz`` files cannot be memory-mapped. "
+                                 "Write the index with format='npy' instead.")
+            with np.load(path) as npz:
+                arrays = {name: npz[name] for name in cls._arrays}
+
+        return cls(**arrays)
+
+    @experimental(as_of="0.5.5")
+    def write(self, path, format='npz'):
+        """Save the index to disk
+
+        Parameters
+        ----------
+        path : str or file-like
+            Where to save the index. A directory is created for
+            ``format='npy'``.
+        format : {'npz', 'npy'}, optional
+            ``'npz'`` saves all arrays in a single file. ``'npy'`` saves each
+            array to its own ``.npy`` file in the directory ``path``, which
+            allows ``PhylogeneticIndex.read`` to memory-map them.
+
+        Raises
+        ------
+        ValueError
+            If ``format`` is not ``'npz'`` or ``'npy'``.
+
+        """
+        arrays = {name: getattr(self, name) for name in self._arrays}
+        if format == 'npz':
+            np.savez(path, **arrays)
+        elif format == 'npy':
+            os.makedirs(path, exist_ok=True)
+            for name, array in arrays.items():
+                np.save(os.path.join(path, name + '.npy'), array)
+        else:
+            raise ValueError("Unknown format %r. Available formats: 'npz', "
+                             "'npy'." % format)
+
+    def __str__(self):
+        return "PhylogeneticIndex with %d nodes and %d tips" % (
+            len(self), len(self.tip_indices))
+
+    def __len__(self):
+        return len(self.parents)
+
+    @property
+    @experimental(as_of="0.5.5")
+    def branch_lengths(self):
+        """Branch length of each node, where missing lengths are zero"""
+        return np.nan_to_num(self.lengths)
+
+    @experimental(as_of="0.5.5")
+    def node_ids(self, names):
+        """Look up the index of tips by name
+
+        Parameters
+        ----------
+        names : iterable of str
+            Names of tips.
+
+        Returns
+        -------
+        np.ndarray of int
+            The index of each tip in ``names``.
+
+        Raises
+        ------
+        MissingNodeError
+            If a name doesn't correspond to a tip name.
+
+        """
+        names = np.asarray(list(names), dtype=str)
+        sorted_names = self.tip_names[self.tip_order]
+        positions = np.searchsorted(sorted_names, names)
+        positions = np.minimum(positions, max(len(sorted_names) - 1, 0))
+        found = ((names != '') & (len(sorted_names) > 0) &
+                 (sorted_names[positions] == names))
+        if not found.all():
+            missing = names[~found]
+            raise MissingNodeError("All ``otu_ids`` must be present as tip "
+                                   "names in ``tree``. ``otu_ids`` not "
+                                   "corresponding to tip names (n=%d): %s" %
+                                   (len(missing), " ".join(missing)))
+        return self.tip_indices[self.tip_order[positions]]
+
+    @experimental(as_of="0.5.5")
+    def tip_distances(self):
+        """Distance from each tip to the root
+
+        Returns
+        -------
+        np.ndarray of float
+            A vector with an entry for each node in the tree. Entries of tips
+            contain the distance of the tip to the root. Other entries are
+            zero.
+
+        """
+        if self._tip_distances is None:
+            distances = self.branch_lengths
+            parents = self.parents.copy()
+            if len(parents) > 0:
+                root = len(parents) - 1
+                distances[root] = 0.0
+                parents[root] = root
+                # each step adds the distance to the current ancestor, and
+                # jumps to the ancestor of that ancestor, so that the number
+                # of steps is logarithmic in the depth of the tree
+                while (parents != root).any():
+                    distances = distances + distances[parents]
+                    parents = parents[parents]
+
+            tip_distances = np.zeros(len(distances))
+            tip_distances[self.tip_indices] = distances[self.tip_indices]
+            self._tip_distances = tip_distances
+        return self._tip_distances
@@ -10,9 +10,12 @@ import collections
 
 import numpy as np
 import pandas as pd
+import scipy.sparse
 
-from skbio.tree import DuplicateNodeError, MissingNodeError
-from skbio.diversity._phylogenetic import _nodes_by_counts
+from skbio.tree import ArrayTree, DuplicateNodeError, MissingNodeError
+from skbio.diversity._phylogenetic import (_nodes_by_counts,
+                                           _nodes_by_counts_sparse)
+from skbio.diversity._phylogenetic_index import PhylogeneticIndex
 
 
 def _validate_counts_vector(counts, suppress_cast=False):
@@ -38,7 +41,9 @@ def _validate_counts_matrix(counts, ids=None, suppress_cast=False):
     # handle case of where counts is a single vector by making it a matrix.
     # this has to be done before forcing counts into an ndarray because we
     # don't yet know that all of the entries are of equal length
-    if isinstance(counts, pd.core.frame.DataFrame):
+    if scipy.sparse.issparse(counts):
+        return _validate_sparse_counts_matrix(counts, ids=ids)
+    elif isinstance(counts, pd.core.frame.DataFrame):
         if ids is not None and len(counts.index) != len(ids):
             raise ValueError(
                 "Number of rows in ``counts``"
@@ -62,6 +67,13 @@ def _validate_counts_matrix(counts, ids=None, suppress_cast=False):
                 "to number of provided ``ids``."
             )
 
+        if counts.ndim == 2 and counts.dtype.kind in 'biuf':
+            # a regular numeric matrix can be validated in one pass
+            if (counts < 0).any():
+                raise ValueError(
+                    "Counts vector cannot contain negative values.")
+            return counts
+
         lens = []
         for v in counts:
             results.append(_validate_counts_vector(v, suppress_cast))
@@ -73,13 +85,74 @@ def _validate_counts_matrix(counts, ids=None, suppress_cast=False):
         return np.asarray(results)
 
 
+def _validate_sparse_counts_matrix(counts, ids=None):
+    """Validate a scipy.sparse counts matrix, returning it in CSR format.
+
+    Only the stored values are inspected. Explicitly stored zeros are
+    removed so that the stored values are exactly the observed OTUs.
+
+    """
+    counts = counts.tocsr()
+
+    if ids is not None and counts.shape[0] != len(ids):
+        raise ValueError(
+            "Number of rows in ``counts`` must be equal "
+            "to number of provided ``ids``."
+        )
+    if not np.all(np.isreal(counts.data)):
+        raise ValueError("Counts vector must contain real-valued entries.")
+    if (counts.data < 0).any():
+        raise ValueError("Counts vector cannot contain negative values.")
+
+    if (counts.data == 0).any():
+        # don't modify the caller's matrix
+        counts = counts.copy()
+        counts.eliminate_zeros()
+
+    return counts
+
+
+def _sparse_rows(counts, nonzero_only=False):
+    """Generate the rows of a sparse counts matrix as 1-D arrays.
+
+    Parameters
+    ----------
+    counts : scipy.sparse matrix
+        Counts matrix, where each row contains the counts of a sample.
+    nonzero_only : bool, optional
+        If ``True``, only the nonzero counts of each row are generated (or a
+        single zero if a row has no counts). This is only correct for metrics
+        that do not depend on the number or positions of zero counts. If
+        ``False``, each row is expanded into a dense vector.
+
+    """
+    counts = counts.tocsr()
+    n_otus = counts.shape[1]
+    for start, end in zip(counts.indptr[:-1], counts.indptr[1:]):
+        if nonzero_only:
+            if start == end:
+                yield np.zeros(1, dtype=counts.dtype)
+            else:
+                yield counts.data[start:end]
+        else:
+            row = np.zeros(n_otus, dtype=counts.dtype)
+            row[counts.indices[start:end]] = counts.data[start:end]
+            yield row
+
+
 def _validate_otu_ids_and_tree(counts, otu_ids, tree):
+    if isinstance(tree, ArrayTree):
+        tree = PhylogeneticIndex.from_tree(tree)
+    if isinstance(tree, PhylogeneticIndex):
+        return _validate_otu_ids_and_index(counts, otu_ids, tree)
+
     len_otu_ids = len(otu_ids)
     set_otu_ids = set(otu_ids)
     if len_otu_ids != len(set_otu_ids):
         raise ValueError("``otu_ids`` cannot contain duplicated ids.")
 
-    if len(counts) != len_otu_ids:
+    # counts may be a row of a sparse matrix, which does not support len()
+    if np.shape(counts)[-1] != len_otu_ids:
         raise ValueError("``otu_ids`` must be the same length as ``counts`` "
                          "vector(s).")
 
@@ -117,20 +190,90 @@ def _validate_otu_ids_and_tree(counts, otu_ids, tree):
                                 " ".join(missing_tip_names)))
 
 
+def _validate_otu_ids_and_index(counts, otu_ids, tree_index):
+    len_otu_ids = len(otu_ids)
+    if len_otu_ids != len(set(otu_ids)):
+        raise ValueError("``otu_ids`` cannot contain duplicated ids.")
+
+    if np.shape(counts)[-1] != len_otu_ids:
+        raise ValueError("``otu_ids`` must be the same length as ``counts`` "
+                         "vector(s).")
+
+    n_nodes = len(tree_index)
+    if n_nodes < 2:
+        raise ValueError("``tree`` must contain more than just a root node.")
+
+    # the root is the last node, so its children are in the last row
+    root, first_child, last_child = tree_index.child_index[-1]
+    if last_child - first_child + 1 > 2:
+        raise ValueError("``tree`` must be rooted.")
+
+    named_tips = tree_index.tip_names[tree_index.tip_names != '']
+    if len(np.unique(named_tips)) != len(named_tips):
+        raise DuplicateNodeError("All tip names must be unique.")
+    if np.isnan(tree_index.lengths[:root]).any():
+        raise ValueError("All non-root nodes in ``tree`` must have a branch "
+                         "length.")
+
+    # raises MissingNodeError for otu_ids which are not tip names
+    tree_index.node_ids(otu_ids)
+
+
+def _get_phylogenetic_index(tree):
+    """Return ``tree`` if it's a PhylogeneticIndex, or index it otherwise"""
+    if isinstance(tree, PhylogeneticIndex):
+        return tree
+    return PhylogeneticIndex.from_tree(tree)
+
+
 def _vectorize_counts_and_tree(counts, otu_ids, tree):
     """ Index tree and convert counts to np.array in corresponding order
+
+    ``tree`` can be a ``TreeNode``, an ``ArrayTree`` or a
+    ``PhylogeneticIndex``, which is used as is. If ``counts`` is a
+    scipy.sparse matrix, the counts of each node are returned as a CSR
+    matrix with a row per sample and sorted column indices.
     """
-    tree_index = tree.to_array(nan_length_value=0.0)
-    otu_ids = np.asarray(otu_ids)
+    tree_index = _get_phylogenetic_index(tree)
+    otu_nodes = tree_index.node_ids(otu_ids)
+    branch_lengths = tree_index.branch_lengths
+
+    if scipy.sparse.issparse(counts):
+        counts_by_node = _sparse_nodes_by_counts(counts, otu_nodes,
+                                                 tree_index)
+        return counts_by_node, tree_index, branch_lengths
+
     counts = np.atleast_2d(counts)
-    counts_by_node = _nodes_by_counts(counts, otu_ids, tree_index)
-    branch_lengths = tree_index['length']
+    counts_by_node = _nodes_by_counts(counts, otu_nodes,
+                                      np.asarray(tree_index.child_index),
+                                      len(tree_index))
 
-    # branch_lengths is just a reference to the array inside of tree_index,
-    # but it's used so much that it's convenient to just pull it out here.
     return counts_by_node.T, tree_index, branch_lengths
 
 
+def _sparse_nodes_by_counts(counts, otu_nodes, tree_index):
+    """Compute the counts of every node of an indexed tree from sparse counts
+
+    Only the nodes on the paths from the observed OTUs of a sample to the root
+    are visited, so the cost is proportional to the number of nonzero node
+    counts rather than to the number of nodes times the number of samples.
+    """
+    counts = counts.tocsr()
+    n_nodes = len(tree_index)
+
+    indptr, indices, data = _nodes_by_counts_sparse(
+        counts.indptr.astype(np.intp), counts.indices.astype(np.intp),
+        counts.data.astype(np.int64), otu_nodes.astype(np.intp),
+        tree_index.parents.astype(np.intp))
+
+    counts_by_node = scipy.sparse.csr_matrix(
+        (data, indices, indptr), shape=(counts.shape[0], n_nodes))
+    # explicit zeros can only be present if validation was skipped
+    counts_by_node.eliminate_zeros()
+
+    return counts_by_node
+
+
 def _get_phylogenetic_kwargs(counts, **kwargs):
     try:
         otu_ids = kwargs.pop('otu_ids')
@@ -0,0 +1,227 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+"""Alpha diversity metrics computed for all samples of a counts matrix at once.
+
+Each function takes a ``_CountsMatrix`` wrapping a 2-D array of counts where
+each row is a sample, and returns a 1-D array with one value per sample,
+matching the result of calling the corresponding per-sample metric in
+``skbio.diversity.alpha`` on each row. The input is expected to have already
+been validated.
+
+"""
+
+import numpy as np
+from scipy.special import gammaln
+
+
+class _CountsMatrix:
+    """Counts matrix with lazily computed per-sample statistics
+
+    Statistics that several metrics depend on (e.g., the total count, the
+    number of singletons or the relative frequencies of each sample) are
+    computed the first time they are needed and reused afterwards, so that
+    computing many metrics on the same matrix doesn't repeat this work.
+
+    """
+    def __init__(self, counts):
+        self.counts = np.asarray(counts)
+        self._cache = {}
+
+    def _cached(self, key, func):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = func()
+            return value
+
+    @property
+    def totals(self):
+        return self._cached('totals', lambda: self.counts.sum(axis=1))
+
+    @property
+    def freqs(self):
+        return self._cached(
+            'freqs', lambda: self.counts / self.totals[:, None])
+
+    @property
+    def observed(self):
+        return self._cached(
+            'observed', lambda: (self.counts != 0).sum(axis=1))
+
+    @property
+    def singles(self):
+        return self._cached('singles', lambda: (self.counts == 1).sum(axis=1))
+
+    @property
+    def doubles(self):
+        return self._cached('doubles', lambda: (self.counts == 2).sum(axis=1))
+
+    @property
+    def sum_of_squares(self):
+        return self._cached(
+            'sum_of_squares', lambda: (self.counts * self.counts).sum(axis=1))
+
+    @property
+    def dominance(self):
+        return self._cached(
+            'dominance', lambda: (self.freqs * self.freqs).sum(axis=1))
+
+    @property
+    def entropy(self):
+        """Shannon entropy of each sample using the natural logarithm"""
+        def entropy():
+            freqs = self.freqs
+            # like the per-sample version, only the nonzero frequencies
+            # contribute (samples without any counts have nan frequencies,
+            # and stay nan)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                terms = np.where(freqs != 0, freqs * np.log(freqs), 0)
+            return -terms.sum(axis=1)
+        return self._cached('entropy', entropy)
+
+    @property
+    def sorted_counts(self):
+        return self._cached(
+            'sorted_counts', lambda: np.sort(self.counts, axis=1))
+
+
+def _berger_parker_d(counts):
+    return counts.counts.max(axis=1) / counts.totals
+
+
+def _brillouin_d(counts):
+    n = counts.totals
+    # gammaln(0 + 1) is 0, so the zero counts don't contribute to the sum
+    return (gammaln(n + 1) - gammaln(counts.counts + 1).sum(axis=1)) / n
+
+
+def _dominance(counts):
+    return counts.dominance
+
+
+def _doubles(counts):
+    return counts.doubles
+
+
+def _enspie(counts):
+    return 1 / counts.dominance
+
+
+def _gini_index(counts, method='rectangles'):
+    if method not in ('rectangles', 'trapezoids'):
+        raise ValueError("Method '%s' not implemented. Available methods: "
+                         "'rectangles', 'trapezoids'." % method)
+    sorted_counts = counts.sorted_counts
+    y = sorted_counts.cumsum(axis=1) / sorted_counts.sum(axis=1)[:, None]
+    dx = 1 / sorted_counts.shape[1]
+    if method == 'trapezoids':
+        area = dx * (y[:, -1] / 2 + y[:, :-1].sum(axis=1))
+    else:
+        area = dx * y.sum(axis=1)
+    return 1 - 2 * area
+
+
+def _goods_coverage(counts):
+    return 1 - (counts.singles / counts.totals)
+
+
+def _heip_e(counts):
+    return (np.exp(counts.entropy) - 1) / (counts.observed - 1)
+
+
+def _kempton_taylor_q(counts, lower_quantile=0.25, upper_quantile=0.75):
+    sorted_counts = counts.sorted_counts
+    n = sorted_counts.shape[1]
+    lower = int(np.ceil(n * lower_quantile))
+    upper = int(n * upper_quantile)
+    return (upper - lower) / np.log(sorted_counts[:, upper] /
+                                    sorted_counts[:, lower])
+
+
+def _margalef(counts):
+    return (counts.observed - 1) / np.log(counts.totals)
+
+
+def _mcintosh_d(counts):
+    u = np.sqrt(counts.sum_of_squares)
+    n = counts.totals
+    return (n - u) / (n - np.sqrt(n))
+
+
+def _mcintosh_e(counts):
+    numerator = np.sqrt(counts.sum_of_squares)
+    n = counts.totals
+    s = counts.observed
+    denominator = np.sqrt((n - s + 1) ** 2 + s - 1)
+    return numerator / denominator
+
+
+def _menhinick(counts):
+    return counts.observed / np.sqrt(counts.totals)
+
+
+def _observed_otus(counts):
+    return counts.observed
+
+
+def _pielou_e(counts):
+    return counts.entropy / np.log(counts.observed)
+
+
+def _robbins(counts):
+    return counts.singles / counts.totals
+
+
+def _shannon(counts, base=2):
+    return counts.entropy / np.log(base)
+
+
+def _simpson(counts):
+    return 1 - counts.dominance
+
+
+def _simpson_e(counts):
+    return _enspie(counts) / counts.observed
+
+
+def _singles(counts):
+    return counts.singles
+
+
+def _strong(counts):
+    n = counts.totals
+    s = counts.observed
+    i = np.arange(1, counts.counts.shape[1] + 1)
+    sorted_sum = counts.sorted_counts[:, ::-1].cumsum(axis=1)
+    return (sorted_sum / n[:, None] - (i / s[:, None])).max(axis=1)
+
+
+def _get_alpha_diversity_matrix_metric_map():
+    return {
+        'berger_parker_d': _berger_parker_d,
+        'brillouin_d': _brillouin_d,
+        'dominance': _dominance,
+        'doubles': _doubles,
+        'enspie': _enspie,
+        'gini_index': _gini_index,
+        'goods_coverage': _goods_coverage,
+        'heip_e': _heip_e,
+        'kempton_taylor_q': _kempton_taylor_q,
+        'margalef': _margalef,
+        'mcintosh_d': _mcintosh_d,
+        'mcintosh_e': _mcintosh_e,
+        'menhinick': _menhinick,
+        'observed_otus': _observed_otus,
+        'pielou_e': _pielou_e,
+        'robbins': _robbins,
+        'shannon': _shannon,
+        'simpson': _simpson,
+        'simpson_e': _simpson_e,
+        'singles': _singles,
+        'strong': _strong}
@@ -0,0 +1,94 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+
+import skbio.diversity.alpha
+from skbio.diversity.alpha._matrix import (
+    _CountsMatrix, _get_alpha_diversity_matrix_metric_map)
+
+
+class MatrixTests(TestCase):
+    def setUp(self):
+        self.metric_map = _get_alpha_diversity_matrix_metric_map()
+        self.counts = np.array([[0, 1, 1, 4, 2, 5, 2, 4, 1, 2],
+                                [1, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                                [3, 3, 3, 3, 3, 3, 3, 3, 3, 3],
+                                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                                [0, 2, 0, 1, 0, 7, 0, 0, 120, 1]])
+        self.floats = np.array([[4.5, 6.7, 3.4, 15., 18., 3.5, 6.7, 14.1],
+                                [0.1, 0.0, 2.5, 1.0, 0.0, 0.3, 2.0, 1.0]])
+
+    def assert_matches_per_sample(self, counts, name, **kwargs):
+        per_sample = getattr(skbio.diversity.alpha, name)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            exp = np.array([per_sample(row, **kwargs) for row in counts])
+            obs = self.metric_map[name](_CountsMatrix(counts), **kwargs)
+        npt.assert_allclose(obs, exp, rtol=1e-12, atol=0)
+        self.assertEqual(obs.shape, (counts.shape[0],))
+        self.assertEqual(obs.dtype.kind, exp.dtype.kind)
+
+    def test_metrics(self):
+        for name in self.metric_map:
+            self.assert_matches_per_sample(self.counts, name)
+
+    def test_metrics_floats(self):
+        for name in self.metric_map:
+            self.assert_matches_per_sample(self.floats, name)
+
+    def test_metric_kwargs(self):
+        for base in (2, np.e, 10):
+            self.assert_matches_per_sample(self.counts, 'shannon', base=base)
+        for method in ('rectangles', 'trapezoids'):
+            self.assert_matches_per_sample(self.floats, 'gini_index',
+                                           method=method)
+        self.assert_matches_per_sample(self.floats, 'kempton_taylor_q',
+                                       lower_quantile=0.3,
+                                       upper_quantile=0.9)
+
+    def test_no_samples(self):
+        counts = np.empty((0, 4), dtype=int)
+        for name in self.metric_map:
+            if name == 'berger_parker_d':
+                # maximum of an empty axis
+                continue
+            obs = self.metric_map[name](_CountsMatrix(counts))
+            self.assertEqual(obs.shape, (0,))
+
+    def test_unknown_gini_method(self):
+        with self.assertRaisesRegex(ValueError, "'foo' not implemented"):
+            self.metric_map['gini_index'](_CountsMatrix(self.floats),
+                                          method='foo')
+
+    def test_unexpected_kwargs(self):
+        with self.assertRaises(TypeError):
+            self.metric_map['observed_otus'](_CountsMatrix(self.counts),
+                                             not_a_real_kwarg=1)
+
+    def test_shared_statistics(self):
+        counts = _CountsMatrix(self.counts)
+        totals = counts.totals
+        npt.assert_array_equal(totals, [22, 1, 30, 0, 131])
+        # statistics are computed once and reused
+        self.assertIs(counts.totals, totals)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            entropy = counts.entropy
+            self.metric_map['pielou_e'](counts)
+            self.metric_map['heip_e'](counts)
+        self.assertIs(counts.entropy, entropy)
+
+    def test_all_names_are_alpha_metrics(self):
+        for name in self.metric_map:
+            self.assertIn(name, skbio.diversity.alpha.__all__)
+
+
+if __name__ == '__main__':
+    main()
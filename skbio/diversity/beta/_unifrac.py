@@ -9,12 +9,15 @@
 import functools
 
 import numpy as np
+import scipy.sparse
 
 from skbio.util._decorator import experimental
 from skbio.diversity._util import (_validate_counts_matrix,
                                    _validate_otu_ids_and_tree,
                                    _vectorize_counts_and_tree)
-from skbio.diversity._phylogenetic import _tip_distances
+from skbio.diversity._phylogenetic import (
+    _unweighted_unifrac_all_pairs, _weighted_unifrac_all_pairs,
+    _unweighted_unifrac_all_pairs_sparse, _weighted_unifrac_all_pairs_sparse)
 
 
 # The default value indicating whether normalization should be applied
@@ -146,7 +149,7 @@ def unweighted_unifrac(u_counts, v_counts, otu_ids, tree, validate=True):
         _setup_pairwise_unifrac(u_counts, v_counts, otu_ids, tree, validate,
                                 normalized=False, unweighted=True)
     return _unweighted_unifrac(u_node_counts, v_node_counts,
-                               tree_index['length'])
+                               tree_index.branch_lengths)
 
 
 @experimental(as_of="0.4.1")
@@ -279,12 +282,10 @@ def weighted_unifrac(u_counts, v_counts, otu_ids, tree,
     u_node_counts, v_node_counts, u_total_count, v_total_count, tree_index =\
         _setup_pairwise_unifrac(u_counts, v_counts, otu_ids, tree, validate,
                                 normalized=normalized, unweighted=False)
-    branch_lengths = tree_index['length']
+    branch_lengths = tree_index.branch_lengths
 
     if normalized:
-        tip_indices = _get_tip_indices(tree_index)
-        node_to_root_distances = _tip_distances(branch_lengths, tree,
-                                                tip_indices)
+        node_to_root_distances = tree_index.tip_distances()
         return _weighted_unifrac_normalized(u_node_counts, v_node_counts,
                                             u_total_count, v_total_count,
                                             branch_lengths,
@@ -444,13 +445,16 @@ def _weighted_unifrac_normalized(u_node_counts, v_node_counts, u_total_count,
     return u / c
 
 
-def _setup_multiple_unifrac(counts, otu_ids, tree, validate):
+def _setup_multiple_unifrac(counts, otu_ids, tree, validate, dense=True):
     if validate:
         _validate_otu_ids_and_tree(counts[0], otu_ids, tree)
 
     counts_by_node, tree_index, branch_lengths = \
         _vectorize_counts_and_tree(counts, otu_ids, tree)
 
+    if dense and scipy.sparse.issparse(counts_by_node):
+        counts_by_node = counts_by_node.toarray()
+
     return counts_by_node, tree_index, branch_lengths
 
 
@@ -519,11 +523,10 @@ def _setup_multiple_weighted_unifrac(counts, otu_ids, tree, normalized,
     """
     counts_by_node, tree_index, branch_lengths = \
         _setup_multiple_unifrac(counts, otu_ids, tree, validate)
-    tip_indices = _get_tip_indices(tree_index)
+    tip_indices = tree_index.tip_indices
 
     if normalized:
-        node_to_root_distances = _tip_distances(branch_lengths, tree,
-                                                tip_indices)
+        node_to_root_distances = tree_index.tip_distances()
 
         def f(u_node_counts, v_node_counts):
             u_total_count = np.take(u_node_counts, tip_indices).sum()
@@ -545,10 +548,164 @@ def _setup_multiple_weighted_unifrac(counts, otu_ids, tree, normalized,
     return f, counts_by_node
 
 
-def _get_tip_indices(tree_index):
-    tip_indices = np.array([n.id for n in tree_index['id_index'].values()
-                            if n.is_tip()])
-    return tip_indices
+def _unweighted_unifrac_pdist(counts, otu_ids, tree, validate):
+    """ Compute unweighted UniFrac between all pairs of samples
+
+    Parameters
+    ----------
+    counts : 2D array_like of ints or floats
+        Matrix containing count/abundance data where each row contains counts
+        of observations in a given sample.
+    otu_ids: list, np.array
+        Vector of OTU ids corresponding to tip names in ``tree``.
+    tree: skbio.TreeNode
+        Tree relating the OTUs in otu_ids.
+    validate: bool, optional
+        If `False`, validation of the input won't be performed.
+
+    Returns
+    -------
+    np.array of floats
+        Distances between all pairs of samples in condensed form.
+
+    Notes
+    -----
+    Rather than calling a Python function for each pair of samples, the
+    presence of each node in each sample is computed once and all pairs are
+    then computed by a compiled kernel. Nodes which are not observed in any
+    sample, or which have a branch length of zero, do not contribute to any
+    distance and are dropped beforehand.
+
+    """
+    counts_by_node, _, branch_lengths = \
+        _setup_multiple_unifrac(counts, otu_ids, tree, validate, dense=False)
+
+    return _unweighted_unifrac_pdist_by_node(counts_by_node, branch_lengths)
+
+
+def _unweighted_unifrac_pdist_by_node(counts_by_node, branch_lengths):
+    """Compute unweighted UniFrac between all pairs of vectorized samples"""
+    rows = _unweighted_unifrac_rows_by_node(counts_by_node, branch_lengths)
+    return rows(0, counts_by_node.shape[0])
+
+
+def _unweighted_unifrac_rows_by_node(counts_by_node, branch_lengths):
+    """Create a function computing unweighted UniFrac for blocks of rows
+
+    The returned function takes the first and last (exclusive) row of a
+    block of vectorized samples, and returns the distances of these samples
+    to the samples that follow them in condensed form.
+    """
+    if scipy.sparse.issparse(counts_by_node):
+        indptr = counts_by_node.indptr.astype(np.intp)
+        indices = counts_by_node.indices.astype(np.intp)
+
+        def rows(start, stop):
+            return _unweighted_unifrac_all_pairs_sparse(
+                indptr, indices, branch_lengths, row_start=start,
+                row_end=stop)
+        return rows
+
+    presence = counts_by_node > 0
+    keep = presence.any(axis=0) & (branch_lengths != 0)
+    presence = np.ascontiguousarray(presence[:, keep]).view(np.uint8)
+    branch_lengths = np.ascontiguousarray(branch_lengths[keep])
+
+    def rows(start, stop):
+        return _unweighted_unifrac_all_pairs(
+            presence, branch_lengths, row_start=start, row_end=stop)
+    return rows
+
+
+def _weighted_unifrac_pdist(counts, otu_ids, tree, normalized, validate):
+    """ Compute weighted UniFrac between all pairs of samples
+
+    Parameters
+    ----------
+    counts : 2D array_like of ints or floats
+        Matrix containing count/abundance data where each row contains counts
+        of observations in a given sample.
+    otu_ids: list, np.array
+        Vector of OTU ids corresponding to tip names in ``tree``.
+    tree: skbio.TreeNode
+        Tree relating the OTUs in otu_ids.
+    normalized: boolean
+        If ``True``, apply normalization to the distances.
+    validate: bool, optional
+        If `False`, validation of the input won't be performed.
+
+    Returns
+    -------
+    np.array of floats
+        Distances between all pairs of samples in condensed form.
+
+    Notes
+    -----
+    The proportional abundance of each node in each sample, and the branch
+    length correction of each sample used for normalization, are computed
+    once. All pairs are then computed by a compiled kernel.
+
+    """
+    counts_by_node, tree_index, branch_lengths = \
+        _setup_multiple_unifrac(counts, otu_ids, tree, validate, dense=False)
+
+    return _weighted_unifrac_pdist_by_node(counts_by_node, tree_index,
+                                           branch_lengths, normalized)
+
+
+def _weighted_unifrac_pdist_by_node(counts_by_node, tree_index,
+                                    branch_lengths, normalized):
+    """Compute weighted UniFrac between all pairs of vectorized samples"""
+    rows = _weighted_unifrac_rows_by_node(counts_by_node, tree_index,
+                                          branch_lengths, normalized)
+    return rows(0, counts_by_node.shape[0])
+
+
+def _weighted_unifrac_rows_by_node(counts_by_node, tree_index,
+                                   branch_lengths, normalized):
+    """Create a function computing weighted UniFrac for blocks of rows
+
+    See ``_unweighted_unifrac_rows_by_node``.
+    """
+    tip_indices = tree_index.tip_indices
+
+    totals = counts_by_node[:, tip_indices].sum(axis=1)
+    totals = np.asarray(totals, dtype=float).ravel()
+    # samples without any counts keep their (all zero) counts
+    divisors = np.where(totals > 0, totals, 1)
+
+    if scipy.sparse.issparse(counts_by_node):
+        proportions = counts_by_node.astype(float)
+        proportions.data /= np.repeat(divisors, np.diff(proportions.indptr))
+    else:
+        proportions = counts_by_node / divisors[:, None]
+
+    if normalized:
+        node_to_root_distances = tree_index.tip_distances()
+        corrections = proportions @ node_to_root_distances
+    else:
+        corrections = np.zeros(len(totals))
+
+    if scipy.sparse.issparse(proportions):
+        proportions.sort_indices()
+        indptr = proportions.indptr.astype(np.intp)
+        indices = proportions.indices.astype(np.intp)
+
+        def rows(start, stop):
+            return _weighted_unifrac_all_pairs_sparse(
+                indptr, indices, proportions.data, branch_lengths, totals,
+                corrections, normalized, row_start=start, row_end=stop)
+        return rows
+
+    keep = proportions.any(axis=0) & (branch_lengths != 0)
+    proportions = np.ascontiguousarray(proportions[:, keep])
+    branch_lengths = np.ascontiguousarray(branch_lengths[keep])
+
+    def rows(start, stop):
+        return _weighted_unifrac_all_pairs(
+            proportions, branch_lengths, totals, corrections, normalized,
+            row_start=start, row_end=stop)
+    return rows
 
 
 def _weighted_unifrac_branch_correction(node_to_root_distances,
@@ -10,13 +10,21 @@ from io import StringIO
 from unittest import main, TestCase
 
 import numpy as np
+import numpy.testing as npt
+import scipy.sparse
+from scipy.spatial.distance import squareform
 
 from skbio import TreeNode
 from skbio.tree import DuplicateNodeError, MissingNodeError
 from skbio.diversity.beta import unweighted_unifrac, weighted_unifrac
 from skbio.diversity.beta._unifrac import (_unweighted_unifrac,
                                            _weighted_unifrac,
-                                           _weighted_unifrac_branch_correction)
+                                           _weighted_unifrac_branch_correction,
+                                           _unweighted_unifrac_pdist,
+                                           _weighted_unifrac_pdist)
+from skbio.diversity._phylogenetic import (
+    _unweighted_unifrac_all_pairs, _weighted_unifrac_all_pairs,
+    _unweighted_unifrac_all_pairs_sparse, _weighted_unifrac_all_pairs_sparse)
 
 
 class UnifracTests(TestCase):
@@ -683,6 +691,109 @@ class UnifracTests(TestCase):
         self.assertAlmostEqual(
             _weighted_unifrac(m[:, 1], m[:, 2], m1s, m2s, bl)[0], 4.5)
 
+    def test_unweighted_unifrac_pdist(self):
+        b1 = np.vstack([self.b1, np.zeros(5, dtype=int)])
+        obs = squareform(_unweighted_unifrac_pdist(b1, self.oids1, self.t1,
+                                                   validate=True))
+        for i in range(len(b1)):
+            for j in range(len(b1)):
+                exp = unweighted_unifrac(b1[i], b1[j], self.oids1, self.t1)
+                self.assertAlmostEqual(obs[i, j], exp)
+
+    def test_weighted_unifrac_pdist(self):
+        b1 = np.vstack([self.b1, np.zeros(5, dtype=int)])
+        for normalized in (True, False):
+            obs = squareform(_weighted_unifrac_pdist(
+                b1, self.oids1, self.t1, normalized=normalized,
+                validate=True))
+            for i in range(len(b1)):
+                for j in range(len(b1)):
+                    exp = weighted_unifrac(b1[i], b1[j], self.oids1, self.t1,
+                                           normalized=normalized)
+                    self.assertAlmostEqual(obs[i, j], exp)
+
+    def test_unweighted_unifrac_all_pairs_tiles(self):
+        # lengths from ((a:1,b:2):4,(c:3,(d:1,e:1):2):3)
+        m = np.array([[1, 0, 1], [1, 1, 0], [0, 1, 0], [0, 0, 1], [0, 1, 0],
+                      [0, 1, 1], [1, 1, 1], [0, 1, 1], [1, 1, 1]])
+        bl = np.array([1, 2, 1, 1, 3, 2, 4, 3, 0], dtype=float)
+        presence = np.ascontiguousarray(m.T, dtype=np.uint8)
+        exp = np.array([10 / 16.0, 8 / 13.0, 8 / 17.0])
+
+        for tile in (1, 2, 3, 64):
+            obs = _unweighted_unifrac_all_pairs(presence, bl, tile=tile)
+            npt.assert_almost_equal(obs, exp)
+
+    def test_weighted_unifrac_all_pairs_tiles(self):
+        # lengths from ((a:1,b:2):4,(c:3,(d:1,e:1):2):3)
+        bl = np.array([1, 2, 1, 1, 3, 2, 4, 3, 0], dtype=float)
+        m = np.array([[1, 0, 1],  # a
+                      [1, 1, 0],  # b
+                      [0, 1, 0],  # d
+                      [0, 0, 1],  # e
+                      [0, 1, 0],  # c
+                      [0, 1, 1],  # parent of (d, e)
+                      [2, 1, 1],  # parent of a, b
+                      [0, 2, 1],  # parent of c (d, e)
+                      [2, 3, 2]])  # root
+        totals = m[:5].sum(axis=0).astype(float)
+        proportions = np.ascontiguousarray((m / totals).T)
+        corrections = np.zeros(3)
+        exp = np.array([7.5, 6.0, 4.5])
+
+        for tile in (1, 2, 64):
+            obs = _weighted_unifrac_all_pairs(proportions, bl, totals,
+                                              corrections, tile=tile)
+            npt.assert_almost_equal(obs, exp)
+
+    def test_unifrac_pdist_sparse(self):
+        b1 = scipy.sparse.csr_matrix(np.vstack([self.b1,
+                                                np.zeros(5, dtype=int)]))
+        exp = _unweighted_unifrac_pdist(b1.toarray(), self.oids1, self.t1,
+                                        validate=True)
+        obs = _unweighted_unifrac_pdist(b1, self.oids1, self.t1,
+                                        validate=True)
+        npt.assert_almost_equal(obs, exp)
+
+        for normalized in (True, False):
+            exp = _weighted_unifrac_pdist(b1.toarray(), self.oids1, self.t1,
+                                          normalized=normalized,
+                                          validate=True)
+            obs = _weighted_unifrac_pdist(b1, self.oids1, self.t1,
+                                          normalized=normalized,
+                                          validate=True)
+            npt.assert_almost_equal(obs, exp)
+
+    def test_unifrac_all_pairs_sparse_tiles(self):
+        # lengths from ((a:1,b:2):4,(c:3,(d:1,e:1):2):3)
+        m = np.array([[1, 0, 1], [1, 1, 0], [0, 1, 0], [0, 0, 1], [0, 1, 0],
+                      [0, 1, 1], [2, 1, 1], [0, 2, 1], [2, 3, 2]])
+        bl = np.array([1, 2, 1, 1, 3, 2, 4, 3, 0], dtype=float)
+        sparse = scipy.sparse.csr_matrix(m.T)
+        indptr = sparse.indptr.astype(np.intp)
+        indices = sparse.indices.astype(np.intp)
+
+        for tile in (1, 2, 64):
+            obs = _unweighted_unifrac_all_pairs_sparse(indptr, indices, bl,
+                                                       tile=tile)
+            npt.assert_almost_equal(obs, [10 / 16.0, 8 / 13.0, 8 / 17.0])
+
+        totals = m[:5].sum(axis=0).astype(float)
+        proportions = scipy.sparse.csr_matrix((m / totals).T)
+        for tile in (1, 2, 64):
+            obs = _weighted_unifrac_all_pairs_sparse(
+                indptr, indices, proportions.data, bl, totals, np.zeros(3),
+                tile=tile)
+            npt.assert_almost_equal(obs, [7.5, 6.0, 4.5])
+
+    def test_unifrac_all_pairs_no_samples(self):
+        obs = _unweighted_unifrac_all_pairs(np.zeros((0, 3), dtype=np.uint8),
+                                            np.ones(3))
+        self.assertEqual(obs.shape, (0,))
+        obs = _weighted_unifrac_all_pairs(np.zeros((1, 3)), np.ones(3),
+                                          np.zeros(1), np.zeros(1))
+        self.assertEqual(obs.shape, (0,))
+
 
 if __name__ == '__main__':
     main()
@@ -6,16 +6,19 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase, main
 
 import numpy as np
 import numpy.testing as npt
+import scipy.sparse
 
 from skbio import TreeNode, DistanceMatrix
 from skbio.diversity import beta_diversity, block_beta_diversity
 from skbio.diversity._block import (_block_party, _generate_id_blocks,
                                     _pairs_to_compute, _block_compute,
-                                    _block_kwargs, _map, _reduce)
+                                    _block_kwargs, _map, _pool_map,
+                                    _reduce, _scatter_block)
 
 
 class ParallelBetaDiversity(TestCase):
@@ -93,6 +96,28 @@ class ParallelBetaDiversity(TestCase):
         obs = list(_map(func, kwargs))
         self.assertEqual(obs, exp)
 
+    def test_pool_map(self):
+        kwargs = [{'row_ids': 0, 'col_ids': 1, 'id_pairs': 0, 'c': 3},
+                  {'row_ids': 2, 'col_ids': 3, 'id_pairs': 1, 'c': 3}]
+
+        def f(row_ids, col_ids, id_pairs, c):
+            return row_ids + col_ids + id_pairs + c
+
+        exp = [4, 9]
+        obs = sorted(_pool_map(f, kwargs, n_jobs=2, executor='thread'))
+        self.assertEqual(obs, exp)
+
+        with ThreadPoolExecutor(2) as executor:
+            obs = sorted(_pool_map(f, kwargs, executor=executor))
+        self.assertEqual(obs, exp)
+
+        self.assertEqual(list(_pool_map(f, [], executor='thread')), [])
+
+    def test_pool_map_invalid_executor(self):
+        kwargs = [{'row_ids': 0, 'col_ids': 1, 'id_pairs': 0}]
+        with self.assertRaisesRegex(ValueError, 'executor'):
+            list(_pool_map(lambda **kw: 0, kwargs, executor='foo'))
+
     def test_reduce(self):
         dm1 = DistanceMatrix(np.array([[0, 0, 44],
                                        [0, 0, 60],
@@ -114,6 +139,54 @@ class ParallelBetaDiversity(TestCase):
         npt.assert_equal(obs.data, exp.data)
         self.assertEqual(obs.ids, exp.ids)
 
+    def test_reduce_n_ids(self):
+        dm1 = DistanceMatrix(np.array([[0, 0, 44],
+                                       [0, 0, 60],
+                                       [44, 60, 0]]), (2, 3, 4))
+        dm2 = DistanceMatrix(np.array([[0, 123],
+                                       [123, 0]]), (1, 5))
+        exp = DistanceMatrix(np.array([[0, 0, 0, 0, 0, 0, 0],
+                                       [0, 0, 0, 0, 0, 123, 0],
+                                       [0, 0, 0, 0, 44, 0, 0],
+                                       [0, 0, 0, 0, 60, 0, 0],
+                                       [0, 0, 44, 60, 0, 0, 0],
+                                       [0, 123, 0, 0, 0, 0, 0],
+                                       [0, 0, 0, 0, 0, 0, 0]]),
+                             list(range(7)))
+
+        # blocks are consumed as they are generated
+        obs = _reduce((dm for dm in [dm1, dm2]), n_ids=7)
+        npt.assert_equal(obs.data, exp.data)
+        self.assertEqual(obs.ids, exp.ids)
+
+        obs = _reduce((dm for dm in [dm1, dm2]), n_ids=7, condensed=True)
+        self.assertTrue(obs._condensed)
+        npt.assert_equal(obs.condensed_form(), exp.condensed_form())
+        self.assertEqual(obs.ids, exp.ids)
+
+    def test_scatter_block(self):
+        dm = DistanceMatrix(np.array([[0, 1, 2],
+                                      [1, 0, 3],
+                                      [2, 3, 0]]), (0, 2, 3))
+        square = np.zeros((4, 4))
+        _scatter_block(dm, square)
+        npt.assert_equal(square, np.array([[0, 0, 1, 2],
+                                           [0, 0, 0, 0],
+                                           [1, 0, 0, 3],
+                                           [2, 0, 3, 0]]))
+
+        condensed = np.ones(6)
+        _scatter_block(dm, condensed)
+        npt.assert_equal(condensed, np.array([1, 2, 3, 1, 1, 4]))
+
+    def test_scatter_block_unsorted_ids(self):
+        dm = DistanceMatrix(np.array([[0, 1, 2],
+                                      [1, 0, 3],
+                                      [2, 3, 0]]), (3, 0, 2))
+        condensed = np.zeros(6)
+        _scatter_block(dm, condensed)
+        npt.assert_equal(condensed, np.array([0, 3, 1, 0, 0, 2]))
+
     def test_block_beta_diversity(self):
         exp = beta_diversity('unweighted_unifrac', self.table1, self.sids1,
                              tree=self.tree1, otu_ids=self.oids1)
@@ -123,6 +196,58 @@ class ParallelBetaDiversity(TestCase):
         npt.assert_equal(obs.data, exp.data)
         self.assertEqual(obs.ids, exp.ids)
 
+    def test_block_beta_diversity_condensed(self):
+        exp = beta_diversity('unweighted_unifrac', self.table1, self.sids1,
+                             tree=self.tree1, otu_ids=self.oids1)
+        obs = block_beta_diversity('unweighted_unifrac', self.table1,
+                                   self.sids1, otu_ids=self.oids1,
+                                   tree=self.tree1, k=2, condensed=True)
+        self.assertTrue(obs._condensed)
+        npt.assert_equal(obs.condensed_form(), exp.condensed_form())
+        self.assertEqual(obs.ids, exp.ids)
+
+    def test_block_beta_diversity_sparse(self):
+        exp = beta_diversity('unweighted_unifrac', self.table1, self.sids1,
+                             tree=self.tree1, otu_ids=self.oids1)
+        obs = block_beta_diversity('unweighted_unifrac',
+                                   scipy.sparse.csr_matrix(self.table1),
+                                   self.sids1, otu_ids=self.oids1,
+                                   tree=self.tree1, k=2)
+        npt.assert_almost_equal(obs.data, exp.data)
+        self.assertEqual(obs.ids, exp.ids)
+
+    def test_block_beta_diversity_n_jobs(self):
+        counts = np.array([[0, 1, 2, 3, 4, 5],
+                           [1, 2, 3, 4, 5, 0],
+                           [2, 3, 4, 5, 0, 1],
+                           [10, 2, 3, 6, 8, 2],
+                           [9, 9, 2, 2, 3, 4]])
+        ids = list('ABCDE')
+        tree = TreeNode.read(['(((a:1,b:2):1,c:3):2,((d:1,e:1):4,f:5):1);'])
+        otu_ids = list('abcdef')
+
+        for metric in ('unweighted_unifrac', 'weighted_unifrac'):
+            exp = beta_diversity(metric, counts, ids, tree=tree,
+                                 otu_ids=otu_ids)
+            for executor in ('process', 'thread'):
+                obs = block_beta_diversity(metric, counts, ids,
+                                           otu_ids=otu_ids, tree=tree, k=2,
+                                           n_jobs=2, executor=executor)
+                npt.assert_almost_equal(obs.data, exp.data)
+                self.assertEqual(obs.ids, exp.ids)
+
+            with ThreadPoolExecutor(2) as executor:
+                obs = block_beta_diversity(metric, counts, ids,
+                                           otu_ids=otu_ids, tree=tree, k=2,
+                                           executor=executor)
+            npt.assert_almost_equal(obs.data, exp.data)
+
+    def test_block_beta_diversity_n_jobs_with_map_f(self):
+        with self.assertRaisesRegex(ValueError, 'map_f'):
+            block_beta_diversity('unweighted_unifrac', self.table1,
+                                 self.sids1, otu_ids=self.oids1,
+                                 tree=self.tree1, k=2, map_f=_map, n_jobs=2)
+
     def test_generate_id_blocks(self):
         ids = [1, 2, 3, 4, 5]
         exp = [(np.array((0, 1)), np.array((0, 1))),
@@ -7,19 +7,30 @@
 # ----------------------------------------------------------------------------
 
 import io
+import os
+import shutil
+import tempfile
 from unittest import TestCase, main
 
 import pandas as pd
 import numpy as np
 import numpy.testing as npt
+import pandas.util.testing as pdt
+import scipy.sparse
+import scipy.spatial.distance
 
 from skbio import DistanceMatrix, TreeNode
 from skbio.util._testing import assert_series_almost_equal
 from skbio.diversity import (alpha_diversity, beta_diversity,
+                             alpha_diversity_multi, beta_diversity_multi,
                              partial_beta_diversity,
                              get_alpha_diversity_metrics,
                              get_beta_diversity_metrics)
-from skbio.diversity.alpha import faith_pd, observed_otus
+from skbio.diversity.alpha import faith_pd, gini_index, observed_otus
+from skbio.diversity.alpha._matrix import (
+    _get_alpha_diversity_matrix_metric_map)
+import skbio.diversity._driver
+from skbio.diversity._driver import _get_alpha_diversity_metric_map
 from skbio.diversity.beta import unweighted_unifrac, weighted_unifrac
 from skbio.tree import DuplicateNodeError, MissingNodeError
 
@@ -247,6 +258,61 @@ class AlphaDiversityTests(TestCase):
                                  otu_ids=self.oids2)
         assert_series_almost_equal(actual, expected)
 
+    def test_matrix_metrics(self):
+        # metrics computed for the whole matrix match the per-sample metrics
+        metric_map = _get_alpha_diversity_metric_map()
+        for metric in _get_alpha_diversity_matrix_metric_map():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                expected = alpha_diversity(metric_map[metric], self.table2,
+                                           self.sids2)
+                actual = alpha_diversity(metric, self.table2, self.sids2)
+            assert_series_almost_equal(actual, expected)
+
+        expected = alpha_diversity(metric_map['shannon'], self.table1,
+                                   self.sids1, base=10)
+        actual = alpha_diversity('shannon', self.table1, self.sids1, base=10)
+        assert_series_almost_equal(actual, expected)
+
+    def test_sparse(self):
+        sparse = scipy.sparse.csr_matrix(self.table1)
+        for metric in get_alpha_diversity_metrics():
+            kwargs = {}
+            if metric == 'faith_pd':
+                kwargs = {'tree': self.tree1, 'otu_ids': self.oids1}
+            elif metric == 'lladser_ci':
+                kwargs = {'r': 2}
+
+            np.random.seed(0)
+            try:
+                expected = alpha_diversity(metric, self.table1, self.sids1,
+                                           **kwargs)
+            except ValueError:
+                # e.g., ACE is undefined for these samples
+                with self.assertRaises(ValueError):
+                    alpha_diversity(metric, sparse, self.sids1, **kwargs)
+                continue
+            np.random.seed(0)
+            actual = alpha_diversity(metric, sparse, self.sids1, **kwargs)
+            assert_series_almost_equal(actual, expected)
+
+    def test_sparse_empty_sample(self):
+        sparse = scipy.sparse.csr_matrix(self.table2)
+        for metric in ('observed_otus', 'singles', 'margalef'):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                expected = alpha_diversity(metric, self.table2, self.sids2)
+                actual = alpha_diversity(metric, sparse, self.sids2)
+            assert_series_almost_equal(actual, expected)
+
+        expected = alpha_diversity('faith_pd', self.table2, self.sids2,
+                                   tree=self.tree2, otu_ids=self.oids2)
+        actual = alpha_diversity('faith_pd', sparse, self.sids2,
+                                 tree=self.tree2, otu_ids=self.oids2)
+        assert_series_almost_equal(actual, expected)
+
+        with self.assertRaisesRegex(TypeError, 'not_a_real_kwarg'):
+            alpha_diversity('faith_pd', sparse, tree=self.tree2,
+                            otu_ids=self.oids2, not_a_real_kwarg=42.0)
+
     def test_no_ids(self):
         # expected values hand-calculated
         expected = pd.Series([3, 3, 3, 3])
@@ -571,7 +637,9 @@ class BetaDiversityTests(TestCase):
                              otu_ids=self.oids1, tree=self.tree1,
                              normalized=True)
         self.assertEqual(dm1.shape, (3, 3))
-        self.assertEqual(dm1, dm2)
+        # the optimized implementation may differ in the last few bits
+        npt.assert_almost_equal(dm1.data, dm2.data)
+        self.assertEqual(dm1.ids, dm2.ids)
         expected_data = [
             [0.0, 0.128834, 0.085714],
             [0.128834, 0.0, 0.2142857],
@@ -582,6 +650,128 @@ class BetaDiversityTests(TestCase):
                 npt.assert_almost_equal(dm1[id1, id2],
                                         expected_dm[id1, id2], 6)
 
+    def test_sparse_unifrac(self):
+        tree = TreeNode.read(io.StringIO(
+            '(((O1:0.5,O2:0.5):0.5,O3:1.0):1.0,((O4:0.75,O5:0.75):1.25,'
+            '(O6:0.1,O7:2.0):0.5):0.0)root;'))
+        otu_ids = ['O%d' % i for i in range(1, 8)]
+        table = np.vstack([self.table2, np.zeros(7, dtype=int)])
+        ids = self.sids2 + ['G']
+        sparse = scipy.sparse.csc_matrix(table)
+
+        for metric, kwargs in [('unweighted_unifrac', {}),
+                               ('weighted_unifrac', {}),
+                               ('weighted_unifrac', {'normalized': True})]:
+            expected = beta_diversity(metric, table, ids, tree=tree,
+                                      otu_ids=otu_ids, **kwargs)
+            actual = beta_diversity(metric, sparse, ids, tree=tree,
+                                    otu_ids=otu_ids, **kwargs)
+            npt.assert_almost_equal(actual.data, expected.data)
+            self.assertEqual(actual.ids, expected.ids)
+
+    def test_sparse_sklearn_metric(self):
+        expected = beta_diversity('euclidean', self.table2, self.sids2)
+        actual = beta_diversity('euclidean',
+                                scipy.sparse.csr_matrix(self.table2),
+                                self.sids2)
+        npt.assert_almost_equal(actual.data, expected.data)
+
+    def test_out(self):
+        tree = TreeNode.read(io.StringIO(
+            '(((O1:0.5,O2:0.5):0.5,O3:1.0):1.0,((O4:0.75,O5:0.75):1.25,'
+            '(O6:0.1,O7:2.0):0.5):0.0)root;'))
+        otu_ids = ['O%d' % i for i in range(1, 8)]
+        table = np.vstack([self.table2, np.zeros(7, dtype=int)])
+        ids = self.sids2 + ['G']
+        n = len(ids)
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+
+        block_size = skbio.diversity._driver._out_block_size
+        self.addCleanup(setattr, skbio.diversity._driver, '_out_block_size',
+                        block_size)
+        for metric, kwargs in [('cityblock', {}),
+                               ('unweighted_unifrac', {}),
+                               ('weighted_unifrac', {'normalized': True})]:
+            if 'unifrac' in metric:
+                kwargs.update(otu_ids=otu_ids, tree=tree)
+            expected = beta_diversity(metric, table, ids, **kwargs)
+            # blocks of one, two and all rows
+            for size in (n, 2 * n, block_size):
+                skbio.diversity._driver._out_block_size = size
+                for counts in (table, scipy.sparse.csr_matrix(table)):
+                    path = os.path.join(tmpdir, 'dm.npy')
+                    obs = beta_diversity(metric, counts, ids, out=path,
+                                         **kwargs)
+                    npt.assert_almost_equal(obs.data, expected.data)
+                    self.assertEqual(obs.ids, expected.ids)
+                    self.assertFalse(obs.data.flags.writeable)
+                    npt.assert_almost_equal(np.load(path), expected.data)
+
+                    obs = beta_diversity(metric, counts, ids, out=path,
+                                         condensed=True, **kwargs)
+                    npt.assert_almost_equal(obs.data, expected.data)
+                    self.assertTrue(obs._condensed)
+                    npt.assert_almost_equal(np.load(path),
+                                            expected.condensed_form())
+
+                    out = np.ones(n * (n - 1) // 2)
+                    obs = beta_diversity(metric, counts, ids, out=out,
+                                         **kwargs)
+                    npt.assert_almost_equal(obs.data, expected.data)
+                    self.assertTrue(obs._condensed)
+                    self.assertTrue(np.shares_memory(obs.condensed_form(),
+                                                     out))
+                    npt.assert_almost_equal(out,
+                                            expected.condensed_form())
+
+                    out = np.ones((n, n))
+                    obs = beta_diversity(metric, counts, ids, out=out,
+                                         **kwargs)
+                    self.assertTrue(np.shares_memory(obs.data, out))
+                    npt.assert_almost_equal(out, expected.data)
+
+    def test_condensed(self):
+        for metric, kwargs in [('euclidean', {}),
+                               ('unweighted_unifrac',
+                                {'otu_ids': self.oids1, 'tree': self.tree1}),
+                               ('weighted_unifrac',
+                                {'otu_ids': self.oids1, 'tree': self.tree1})]:
+            exp = beta_diversity(metric, self.table1, self.sids1, **kwargs)
+            obs = beta_diversity(metric, self.table1, self.sids1,
+                                 condensed=True, **kwargs)
+            self.assertTrue(obs._condensed)
+            npt.assert_almost_equal(obs.condensed_form(),
+                                    exp.condensed_form())
+            self.assertEqual(obs.ids, exp.ids)
+
+        obs = beta_diversity('euclidean', np.empty((2, 0)), ['a', 'b'],
+                             condensed=True)
+        self.assertTrue(obs._condensed)
+        npt.assert_array_equal(obs.data, np.zeros((2, 2)))
+
+    def test_out_empty(self):
+        out = np.ones((2, 2))
+        obs = beta_diversity('euclidean', np.empty((2, 0)), ['a', 'b'],
+                             out=out)
+        npt.assert_array_equal(obs.data, np.zeros((2, 2)))
+
+    def test_out_invalid(self):
+        with self.assertRaisesRegex(ValueError, 'pairwise_func'):
+            beta_diversity('euclidean', self.table1, self.sids1,
+                           pairwise_func=scipy.spatial.distance.pdist,
+                           out=np.zeros((3, 3)))
+        with self.assertRaisesRegex(ValueError, r'shape \(3, 3\) or \(3,\)'):
+            beta_diversity('euclidean', self.table1, self.sids1,
+                           out=np.zeros((3, 2)))
+        with self.assertRaisesRegex(ValueError, 'int64'):
+            beta_diversity('euclidean', self.table1, self.sids1,
+                           out=np.zeros((3, 3), dtype=np.int64))
+        with self.assertRaisesRegex(TypeError, 'keyword argument'):
+            beta_diversity('unweighted_unifrac', self.table1, self.sids1,
+                           not_a_real_kwarg=42.0, tree=self.tree1,
+                           otu_ids=self.oids1, out=np.zeros((3, 3)))
+
     def test_scipy_kwargs(self):
         # confirm that p can be passed to SciPy's minkowski, and that it
         # gives a different result than not passing it (the off-diagonal
@@ -622,6 +812,132 @@ class BetaDiversityTests(TestCase):
         self.assertEqual(dm1, expected)
 
 
+class AlphaDiversityMultiTests(TestCase):
+    def setUp(self):
+        self.table1 = np.array([[1, 3, 0, 1, 0],
+                                [0, 2, 0, 4, 4],
+                                [0, 0, 6, 2, 1],
+                                [0, 0, 1, 1, 1]])
+        self.sids1 = list('ABCD')
+        self.oids1 = ['OTU%d' % i for i in range(1, 6)]
+        self.tree1 = TreeNode.read(io.StringIO(
+            '(((((OTU1:0.5,OTU2:0.5):0.5,OTU3:1.0):1.0):'
+            '0.0,(OTU4:0.75,OTU5:0.75):1.25):0.0)root;'))
+
+    def test_alpha_diversity_multi(self):
+        metrics = ['observed_otus', 'shannon', 'chao1', 'faith_pd',
+                   'kempton_taylor_q', 'osd', observed_otus]
+        with self.assertRaisesRegex(ValueError, 'only be provided once'):
+            alpha_diversity_multi(metrics, self.table1, self.sids1,
+                                  otu_ids=self.oids1, tree=self.tree1)
+
+        metrics = metrics[:-1] + [gini_index]
+        metric_kwargs = {'shannon': {'base': 10},
+                         'kempton_taylor_q': {'lower_quantile': 0.2},
+                         'faith_pd': {},
+                         'faith_pd_unused': {'not_a_real_kwarg': 42.0}}
+        for table in (self.table1, scipy.sparse.csr_matrix(self.table1)):
+            obs = alpha_diversity_multi(
+                metrics, table, self.sids1, otu_ids=self.oids1,
+                tree=self.tree1, metric_kwargs=metric_kwargs)
+            self.assertEqual(list(obs.columns),
+                             ['observed_otus', 'shannon', 'chao1', 'faith_pd',
+                              'kempton_taylor_q', 'osd', 'gini_index'])
+            self.assertEqual(list(obs.index), self.sids1)
+
+            for metric, name in zip(metrics, obs.columns):
+                kwargs = dict(metric_kwargs.get(name, {}))
+                if name == 'faith_pd':
+                    kwargs.update(otu_ids=self.oids1, tree=self.tree1)
+                exp = alpha_diversity(metric, self.table1, self.sids1,
+                                      **kwargs)
+                if name == 'osd':
+                    self.assertEqual(list(obs[name]), list(exp))
+                else:
+                    assert_series_almost_equal(obs[name].rename(None), exp)
+
+    def test_alpha_diversity_multi_no_ids(self):
+        obs = alpha_diversity_multi(['observed_otus', 'singles'],
+                                    self.table1)
+        exp = pd.DataFrame({'observed_otus': [3, 3, 3, 3],
+                            'singles': [2, 0, 1, 3]},
+                           columns=['observed_otus', 'singles'])
+        pdt.assert_frame_equal(obs, exp)
+
+        obs = alpha_diversity_multi([], self.table1)
+        self.assertEqual(obs.shape, (4, 0))
+
+    def test_alpha_diversity_multi_invalid_input(self):
+        with self.assertRaisesRegex(ValueError, 'negative'):
+            alpha_diversity_multi(['observed_otus'], [[0, 3, -12, 42]])
+
+        with self.assertRaisesRegex(ValueError, '``tree`` is required'):
+            alpha_diversity_multi(['faith_pd'], self.table1,
+                                  otu_ids=self.oids1)
+
+        with self.assertRaises(TypeError):
+            alpha_diversity_multi(
+                ['shannon'], self.table1,
+                metric_kwargs={'shannon': {'not_a_real_kwarg': 42.0}})
+
+
+class BetaDiversityMultiTests(TestCase):
+    def setUp(self):
+        self.table1 = [[1, 5],
+                       [2, 3],
+                       [0, 1]]
+        self.sids1 = list('ABC')
+        self.tree1 = TreeNode.read(io.StringIO(
+            '((O1:0.25, O2:0.50):0.25, O3:0.75)root;'))
+        self.oids1 = ['O1', 'O2']
+
+    def test_beta_diversity_multi(self):
+        metrics = ['unweighted_unifrac', 'weighted_unifrac', 'braycurtis',
+                   'euclidean']
+        metric_kwargs = {'weighted_unifrac': {'normalized': True}}
+        obs = beta_diversity_multi(metrics, self.table1, self.sids1,
+                                   otu_ids=self.oids1, tree=self.tree1,
+                                   metric_kwargs=metric_kwargs)
+        self.assertEqual(sorted(obs), sorted(metrics))
+        for metric in metrics:
+            kwargs = dict(metric_kwargs.get(metric, {}))
+            if 'unifrac' in metric:
+                kwargs.update(otu_ids=self.oids1, tree=self.tree1)
+            exp = beta_diversity(metric, self.table1, self.sids1, **kwargs)
+            npt.assert_almost_equal(obs[metric].data, exp.data)
+            self.assertEqual(obs[metric].ids, exp.ids)
+
+    def test_beta_diversity_multi_pairwise_func(self):
+        obs = beta_diversity_multi(['unweighted_unifrac', 'braycurtis'],
+                                   self.table1, self.sids1,
+                                   pairwise_func=scipy.spatial.distance.pdist,
+                                   otu_ids=self.oids1, tree=self.tree1)
+        exp = beta_diversity('unweighted_unifrac', self.table1, self.sids1,
+                             otu_ids=self.oids1, tree=self.tree1)
+        npt.assert_almost_equal(obs['unweighted_unifrac'].data, exp.data)
+        exp = beta_diversity('braycurtis', self.table1, self.sids1)
+        npt.assert_almost_equal(obs['braycurtis'].data, exp.data)
+
+    def test_beta_diversity_multi_invalid_input(self):
+        with self.assertRaisesRegex(ValueError, '``otu_ids`` is required'):
+            beta_diversity_multi(['weighted_unifrac'], self.table1,
+                                 tree=self.tree1)
+
+        with self.assertRaises(MissingNodeError):
+            beta_diversity_multi(['braycurtis', 'weighted_unifrac'],
+                                 self.table1, tree=self.tree1,
+                                 otu_ids=['O1', 'O4'])
+
+        with self.assertRaisesRegex(TypeError, 'not_a_real_kwarg'):
+            beta_diversity_multi(
+                ['unweighted_unifrac'], self.table1, tree=self.tree1,
+                otu_ids=self.oids1,
+                metric_kwargs={'unweighted_unifrac': {'not_a_real_kwarg': 1}})
+
+        with self.assertRaisesRegex(ValueError, 'only be provided once'):
+            beta_diversity_multi(['braycurtis', 'braycurtis'], self.table1)
+
+
 class MetricGetters(TestCase):
 
     def test_get_alpha_diversity_metrics(self):
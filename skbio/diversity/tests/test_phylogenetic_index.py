@@ -0,0 +1,234 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+import scipy.sparse
+
+from skbio import TreeNode
+from skbio.diversity import (PhylogeneticIndex, alpha_diversity,
+                             beta_diversity, block_beta_diversity)
+from skbio.diversity.alpha import faith_pd
+from skbio.diversity.beta import unweighted_unifrac, weighted_unifrac
+from skbio.tree import ArrayTree, DuplicateNodeError, MissingNodeError
+
+
+class PhylogeneticIndexTests(TestCase):
+    def setUp(self):
+        self.tree = TreeNode.read(io.StringIO(
+            '(((a:1,b:2)c:3,(d:1,e:1)f:2)g:1,h:4)root;'))
+        self.index = PhylogeneticIndex.from_tree(self.tree)
+        self.otu_ids = ['b', 'a', 'h', 'd', 'e']
+        self.counts = np.array([[0, 1, 0, 0, 3],
+                                [1, 5, 0, 0, 0],
+                                [0, 0, 0, 0, 1],
+                                [10, 1, 2, 7, 1]])
+        self.sids = list('ABCD')
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def assert_index_equal(self, obs, exp):
+        for name in PhylogeneticIndex._arrays:
+            npt.assert_array_equal(getattr(obs, name), getattr(exp, name))
+
+    def test_from_tree(self):
+        # nodes are indexed as a b d e c f g h root
+        npt.assert_array_equal(self.index.parents,
+                               [4, 4, 5, 5, 6, 6, 8, 8, -1])
+        npt.assert_array_equal(self.index.lengths[:-1],
+                               [1, 2, 1, 1, 3, 2, 1, 4])
+        self.assertTrue(np.isnan(self.index.lengths[-1]))
+        npt.assert_array_equal(self.index.branch_lengths,
+                               [1, 2, 1, 1, 3, 2, 1, 4, 0])
+        npt.assert_array_equal(self.index.child_index,
+                               [[4, 0, 1], [5, 2, 3], [6, 4, 5], [8, 6, 7]])
+        npt.assert_array_equal(self.index.tip_indices, [0, 1, 2, 3, 7])
+        npt.assert_array_equal(self.index.tip_names,
+                               ['a', 'b', 'd', 'e', 'h'])
+        self.assertEqual(len(self.index), 9)
+        self.assertEqual(str(self.index),
+                         'PhylogeneticIndex with 9 nodes and 5 tips')
+
+    def test_from_tree_unnamed_tips(self):
+        index = PhylogeneticIndex.from_tree(
+            TreeNode.read(io.StringIO('((a:1,:2):3,b:4);')))
+        npt.assert_array_equal(index.tip_names, ['a', '', 'b'])
+        npt.assert_array_equal(index.node_ids(['b', 'a']), [3, 0])
+        with self.assertRaises(MissingNodeError):
+            index.node_ids([''])
+
+    def test_from_array_tree(self):
+        for newick in ('(((a:1,b:2)c:3,(d:1,e:1)f:2)g:1,h:4)root;',
+                       '((a:1,:2):3,b:4);', '((a,(b,c,d)e,f)g,(h)i,j)k;',
+                       'a;'):
+            tree = TreeNode.read(io.StringIO(newick))
+            self.assert_index_equal(
+                PhylogeneticIndex.from_tree(ArrayTree.from_tree(tree)),
+                PhylogeneticIndex.from_tree(tree))
+
+    def test_init_invalid_input(self):
+        with self.assertRaisesRegex(ValueError, 'same length'):
+            PhylogeneticIndex([1, -1], [1.0], [[1, 0, 0]], [0], ['a'])
+        with self.assertRaisesRegex(ValueError, 'same length'):
+            PhylogeneticIndex([1, -1], [1.0, 0.0], [[1, 0, 0]], [0],
+                              ['a', 'b'])
+
+    def test_node_ids(self):
+        npt.assert_array_equal(self.index.node_ids(self.otu_ids),
+                               [1, 0, 7, 2, 3])
+        npt.assert_array_equal(self.index.node_ids([]), [])
+        with self.assertRaisesRegex(MissingNodeError, r'\(n=2\)'):
+            self.index.node_ids(['a', 'c', 'zzz'])
+
+    def test_tip_distances(self):
+        npt.assert_array_equal(self.index.tip_distances(),
+                               [5, 6, 4, 4, 0, 0, 0, 4, 0])
+        self.assertIs(self.index.tip_distances(), self.index.tip_distances())
+
+        index = PhylogeneticIndex.from_tree(
+            TreeNode.read(io.StringIO('a;')))
+        npt.assert_array_equal(index.tip_distances(), [0])
+
+    def test_tip_distances_deep_tree(self):
+        # a caterpillar tree with 100 levels
+        newick = 'x0:1'
+        for i in range(1, 100):
+            newick = '(%s,x%d:1):1' % (newick, i)
+        tree = TreeNode.read(io.StringIO(newick + ';'))
+        index = PhylogeneticIndex.from_tree(tree)
+        distances = index.tip_distances()[index.node_ids(['x0', 'x50'])]
+        npt.assert_array_equal(distances, [99, 50])
+
+    def test_write_read_npz(self):
+        path = os.path.join(self.tmpdir, 'index.npz')
+        self.index.write(path)
+        self.assert_index_equal(PhylogeneticIndex.read(path), self.index)
+
+        fh = io.BytesIO()
+        self.index.write(fh)
+        fh.seek(0)
+        self.assert_index_equal(PhylogeneticIndex.read(fh), self.index)
+
+        with self.assertRaisesRegex(ValueError, 'cannot be memory-mapped'):
+            PhylogeneticIndex.read(path, mmap_mode='r')
+
+    def test_write_read_npy(self):
+        path = os.path.join(self.tmpdir, 'index')
+        self.index.write(path, format='npy')
+        obs = PhylogeneticIndex.read(path, mmap_mode='r')
+        self.assert_index_equal(obs, self.index)
+        self.assertIsInstance(obs.parents, np.memmap)
+        self.assertIsInstance(obs.tip_names, np.memmap)
+
+    def test_write_unknown_format(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown format'):
+            self.index.write(os.path.join(self.tmpdir, 'index'),
+                             format='foo')
+
+    def test_metrics(self):
+        path = os.path.join(self.tmpdir, 'index')
+        self.index.write(path, format='npy')
+        mmapped = PhylogeneticIndex.read(path, mmap_mode='r')
+
+        u, v = self.counts[0], self.counts[3]
+        for index in (self.index, mmapped):
+            self.assertAlmostEqual(faith_pd(u, self.otu_ids, index),
+                                   faith_pd(u, self.otu_ids, self.tree))
+            self.assertAlmostEqual(
+                unweighted_unifrac(u, v, self.otu_ids, index),
+                unweighted_unifrac(u, v, self.otu_ids, self.tree))
+            for normalized in (True, False):
+                self.assertAlmostEqual(
+                    weighted_unifrac(u, v, self.otu_ids, index,
+                                     normalized=normalized),
+                    weighted_unifrac(u, v, self.otu_ids, self.tree,
+                                     normalized=normalized))
+
+    def test_drivers(self):
+        for counts in (self.counts, scipy.sparse.csr_matrix(self.counts)):
+            exp = alpha_diversity('faith_pd', counts, self.sids,
+                                  otu_ids=self.otu_ids, tree=self.tree)
+            obs = alpha_diversity('faith_pd', counts, self.sids,
+                                  otu_ids=self.otu_ids, tree=self.index)
+            npt.assert_almost_equal(obs.values, exp.values)
+
+            for metric, kwargs in [('unweighted_unifrac', {}),
+                                   ('weighted_unifrac', {}),
+                                   ('weighted_unifrac', {'normalized': True})]:
+                exp = beta_diversity(metric, counts, self.sids,
+                                     otu_ids=self.otu_ids, tree=self.tree,
+                                     **kwargs)
+                obs = beta_diversity(metric, counts, self.sids,
+                                     otu_ids=self.otu_ids, tree=self.index,
+                                     **kwargs)
+                npt.assert_almost_equal(obs.data, exp.data)
+
+            for metric in ('unweighted_unifrac', 'weighted_unifrac'):
+                exp = beta_diversity(metric, counts, self.sids,
+                                     otu_ids=self.otu_ids, tree=self.tree)
+                obs = block_beta_diversity(metric, counts, self.sids,
+                                           otu_ids=self.otu_ids,
+                                           tree=self.index, k=2)
+                npt.assert_almost_equal(obs.data, exp.data)
+
+    def test_drivers_array_tree(self):
+        tree = ArrayTree.from_tree(self.tree)
+        exp = alpha_diversity('faith_pd', self.counts, self.sids,
+                              otu_ids=self.otu_ids, tree=self.tree)
+        obs = alpha_diversity('faith_pd', self.counts, self.sids,
+                              otu_ids=self.otu_ids, tree=tree)
+        npt.assert_almost_equal(obs.values, exp.values)
+
+        for metric in ('unweighted_unifrac', 'weighted_unifrac'):
+            exp = beta_diversity(metric, self.counts, self.sids,
+                                 otu_ids=self.otu_ids, tree=self.tree)
+            obs = beta_diversity(metric, self.counts, self.sids,
+                                 otu_ids=self.otu_ids, tree=tree)
+            npt.assert_almost_equal(obs.data, exp.data)
+            # each block is computed on a sheared ArrayTree
+            obs = block_beta_diversity(metric, self.counts, self.sids,
+                                       otu_ids=self.otu_ids, tree=tree, k=2)
+            npt.assert_almost_equal(obs.data, exp.data)
+
+        with self.assertRaisesRegex(ValueError, 'branch length'):
+            faith_pd([1, 1], ['a', 'b'], ArrayTree.from_tree(
+                TreeNode.read(io.StringIO('((a:1,b)c:1,d:1);'))))
+
+    def test_validation(self):
+        def faith(newick, otu_ids=('a', 'b')):
+            index = PhylogeneticIndex.from_tree(
+                TreeNode.read(io.StringIO(newick)))
+            return faith_pd([1, 1], list(otu_ids), index)
+
+        self.assertAlmostEqual(faith('(a:1,b:2)root;'), 3.0)
+        with self.assertRaisesRegex(ValueError, 'more than just a root'):
+            faith('a;', otu_ids=['a', 'b'])
+        with self.assertRaisesRegex(ValueError, 'rooted'):
+            faith('(a:1,b:2,c:3);')
+        with self.assertRaisesRegex(ValueError, 'branch length'):
+            faith('((a:1,b)c:1,d:1);')
+        with self.assertRaises(DuplicateNodeError):
+            faith('((a:1,b:1):1,a:1);')
+        with self.assertRaises(MissingNodeError):
+            faith('(a:1,c:2);')
+        with self.assertRaisesRegex(ValueError, 'duplicated'):
+            faith('(a:1,b:2);', otu_ids=['a', 'a'])
+        with self.assertRaisesRegex(ValueError, 'same length'):
+            faith('(a:1,b:2);', otu_ids=['a'])
+
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,14 @@ from unittest import TestCase, main
 import numpy as np
 import pandas as pd
 import numpy.testing as npt
+import scipy.sparse
 
 from skbio import TreeNode
 from skbio.diversity._util import (_validate_counts_vector,
                                    _validate_counts_matrix,
                                    _validate_otu_ids_and_tree,
-                                   _vectorize_counts_and_tree)
+                                   _vectorize_counts_and_tree,
+                                   _sparse_rows)
 from skbio.tree import DuplicateNodeError, MissingNodeError
 
 
@@ -103,6 +105,42 @@ class ValidationTests(TestCase):
         npt.assert_array_equal(obs[1], np.array([0, 0, 2, 1, 3]))
         npt.assert_array_equal(obs[2], np.array([1, 1, 1, 1, 1]))
 
+    def test_validate_counts_matrix_sparse(self):
+        data = scipy.sparse.coo_matrix(np.array([[0, 1, 1, 0, 2],
+                                                 [0, 0, 2, 1, 3]]))
+        obs = _validate_counts_matrix(data, ids=['a', 'b'])
+        self.assertTrue(scipy.sparse.isspmatrix_csr(obs))
+        npt.assert_array_equal(obs.toarray(), data.toarray())
+
+        with self.assertRaisesRegex(ValueError, 'Number of rows'):
+            _validate_counts_matrix(data, ids=['a'])
+
+        with self.assertRaisesRegex(ValueError, 'negative'):
+            _validate_counts_matrix(
+                scipy.sparse.csr_matrix(np.array([[0, -1], [1, 0]])))
+
+    def test_validate_counts_matrix_sparse_explicit_zeros(self):
+        data = scipy.sparse.csr_matrix((np.array([1, 0, 2]),
+                                        np.array([0, 1, 2]),
+                                        np.array([0, 2, 3])), shape=(2, 3))
+        obs = _validate_counts_matrix(data)
+        self.assertEqual(obs.nnz, 2)
+        npt.assert_array_equal(obs.toarray(), data.toarray())
+        # the input is left untouched
+        self.assertEqual(data.nnz, 3)
+
+    def test_sparse_rows(self):
+        data = scipy.sparse.csr_matrix(np.array([[0, 1, 0, 3],
+                                                 [0, 0, 0, 0],
+                                                 [2, 0, 0, 0]]))
+        obs = list(_sparse_rows(data))
+        npt.assert_equal(obs, [np.array([0, 1, 0, 3]), np.array([0, 0, 0, 0]),
+                               np.array([2, 0, 0, 0])])
+
+        obs = list(_sparse_rows(data, nonzero_only=True))
+        npt.assert_equal(obs, [np.array([1, 3]), np.array([0]),
+                               np.array([2])])
+
     def test_validate_counts_matrix_suppress_cast(self):
         # suppress_cast is passed through to _validate_counts_vector
         obs = _validate_counts_matrix(
@@ -250,6 +288,25 @@ class ValidationTests(TestCase):
         exp_counts = np.array([[0, 1, 10], [1, 5, 1], [1, 6, 11], [1, 6, 11]])
         npt.assert_equal(count_array, exp_counts.T)
 
+    def test_vectorize_counts_and_tree_sparse(self):
+        t = TreeNode.read(io.StringIO(
+            "(((a:1, b:2)c:3, (d:1, e:1)f:2)g:1, h:4)root;"))
+        counts = np.array([[0, 1, 0, 0, 3],
+                           [1, 5, 0, 0, 0],
+                           [0, 0, 0, 0, 0],
+                           [10, 1, 2, 7, 1]])
+        otu_ids = np.array(['b', 'a', 'h', 'd', 'e'])
+        exp, exp_indexed, exp_lengths = \
+            _vectorize_counts_and_tree(counts, otu_ids, t)
+        obs, indexed, branch_lengths = _vectorize_counts_and_tree(
+            scipy.sparse.csr_matrix(counts), otu_ids, t)
+        self.assertTrue(scipy.sparse.isspmatrix_csr(obs))
+        self.assertTrue(obs.has_sorted_indices)
+        npt.assert_equal(obs.toarray(), exp)
+        npt.assert_equal(branch_lengths, exp_lengths)
+        # only observed nodes are stored
+        self.assertEqual(obs.nnz, (exp > 0).sum())
+
 
 if __name__ == "__main__":
     main()
@@ -15,6 +15,7 @@ see the associated documentation.
 .. autosummary::
    :toctree: generated/
 
+   binary_dm
    blast6
    blast7
    clustal
@@ -56,6 +57,7 @@ User exceptions and warnings
    UnrecognizedFormatError
    IOSourceError
    FileFormatError
+   BinaryDMFormatError
    BLAST7FormatError
    ClustalFormatError
    EMBLFormatError
@@ -198,12 +200,11 @@ not know how you want to serialize an object. OO interfaces define a default
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
-from importlib import import_module
-
 from ._warning import FormatIdentificationWarning, ArgumentOverrideWarning
 from ._exception import (UnrecognizedFormatError, FileFormatError,
-                         BLAST7FormatError, ClustalFormatError,
-                         FASTAFormatError, GenBankFormatError, IOSourceError,
+                         BinaryDMFormatError, BLAST7FormatError,
+                         ClustalFormatError, FASTAFormatError,
+                         GenBankFormatError, IOSourceError,
                          FASTQFormatError, LSMatFormatError, NewickFormatError,
                          OrdinationFormatError, PhylipFormatError,
                          QSeqFormatError, QUALFormatError,
@@ -218,6 +219,7 @@ __all__ = ['write', 'read', 'sniff', 'open', 'io_registry', 'create_format',
            'UnrecognizedFormatError', 'IOSourceError',
 
            'FileFormatError',
+           'BinaryDMFormatError',
            'BLAST7FormatError',
            'ClustalFormatError',
            'EMBLFormatError',
@@ -234,28 +236,28 @@ __all__ = ['write', 'read', 'sniff', 'open', 'io_registry', 'create_format',
            'StockholmFormatError']
 
 
-# Necessary to import each file format module to have them added to the I/O
-# registry. We use import_module instead of a typical import to avoid flake8
-# unused import errors.
-import_module('skbio.io.format.blast6')
-import_module('skbio.io.format.blast7')
-import_module('skbio.io.format.clustal')
-import_module('skbio.io.format.embl')
-import_module('skbio.io.format.fasta')
-import_module('skbio.io.format.fastq')
-import_module('skbio.io.format.lsmat')
-import_module('skbio.io.format.newick')
-import_module('skbio.io.format.ordination')
-import_module('skbio.io.format.phylip')
-import_module('skbio.io.format.qseq')
-import_module('skbio.io.format.genbank')
-import_module('skbio.io.format.gff3')
-import_module('skbio.io.format.stockholm')
-
-# This is meant to be a handy indicator to the user that they have done
-# something wrong.
-import_module('skbio.io.format.emptyfile')
-
-# Now that all of our I/O has loaded, we can add the object oriented methods
-# (read and write) to each class which has registered I/O operations.
-io_registry.monkey_patch()
+# Each file format module adds its formats to the I/O registry when it is
+# imported. The modules are only imported when one of their formats is looked
+# up, or when every format is needed (e.g., to sniff a file), so that
+# importing skbio.io does not import every file format module along with the
+# objects they read and write. The read and write methods of these objects
+# are monkey-patched by the registry when they are first accessed.
+io_registry._defer_formats({
+    'binary_dm': 'skbio.io.format.binary_dm',
+    'blast+6': 'skbio.io.format.blast6',
+    'blast+7': 'skbio.io.format.blast7',
+    'clustal': 'skbio.io.format.clustal',
+    'embl': 'skbio.io.format.embl',
+    'fasta': 'skbio.io.format.fasta',
+    'fastq': 'skbio.io.format.fastq',
+    'lsmat': 'skbio.io.format.lsmat',
+    'newick': 'skbio.io.format.newick',
+    'ordination': 'skbio.io.format.ordination',
+    'phylip': 'skbio.io.format.phylip',
+    'qseq': 'skbio.io.format.qseq',
+    'genbank': 'skbio.io.format.genbank',
+    'gff3': 'skbio.io.format.gff3',
+    'stockholm': 'skbio.io.format.stockholm',
+    # This is meant to be a handy indicator to the user that they have done
+    # something wrong.
+    '<emptyfile>': 'skbio.io.format.emptyfile'})
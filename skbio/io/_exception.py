@@ -37,6 +37,11 @@ class GFF3FormatError(FileFormatError):
     pass
 
 
+class BinaryDMFormatError(FileFormatError):
+    """Raised when a ``binary_dm`` formatted file cannot be parsed."""
+    pass
+
+
 class BLAST7FormatError(FileFormatError):
     """Raised when a ``blast7`` formatted file cannot be parsed."""
     pass
@@ -11,10 +11,7 @@ import gzip
 import bz2
 import tempfile
 import itertools
-
-import requests
-from cachecontrol import CacheControl
-from cachecontrol.caches import FileCache
+from urllib.parse import urlparse
 
 from skbio.io import IOSourceError
 from ._fileobject import (IterableStringWriterIO, IterableStringReaderIO,
@@ -101,9 +98,15 @@ class HTTPSource(IOSource):
     def can_read(self):
         return (
             isinstance(self.file, str) and
-            requests.compat.urlparse(self.file).scheme in {'http', 'https'})
+            urlparse(self.file).scheme in {'http', 'https'})
 
     def get_reader(self):
+        # requests is only imported when a URL is read, as it is slow to
+        # import
+        import requests
+        from cachecontrol import CacheControl
+        from cachecontrol.caches import FileCache
+
         sess = CacheControl(requests.Session(),
                             cache=FileCache(tempfile.gettempdir()))
         req = sess.get(self.file)
@@ -0,0 +1,236 @@
+"""
+Binary dissimilarity matrix format (:mod:`skbio.io.format.binary_dm`)
+=====================================================================
+
+.. currentmodule:: skbio.io.format.binary_dm
+
+The binary dissimilarity matrix format (``binary_dm``) stores the IDs of a
+dissimilarity or distance matrix in a small header, followed by the
+dissimilarities as raw 64-bit floats. Unlike ``lsmat``, no text needs to be
+parsed when reading a file: only the header is read, and the dissimilarities
+are memory-mapped from the file, so that reading a matrix takes time
+proportional to the number of IDs rather than to the size of the matrix.
+
+Format Support
+--------------
+**Has Sniffer: Yes**
+
++------+------+---------------------------------------------------------------+
+|Reader|Writer|                          Object Class                         |
++======+======+===============================================================+
+|Yes   |Yes   |:mod:`skbio.stats.distance.DissimilarityMatrix`                |
++------+------+---------------------------------------------------------------+
+|Yes   |Yes   |:mod:`skbio.stats.distance.DistanceMatrix`                     |
++------+------+---------------------------------------------------------------+
+
+Format Specification
+--------------------
+A file in this format is made of the following parts, in this order:
+
+1. The magic string ``b'\\x93SKBIODM'`` (8 bytes).
+2. The major and minor version of the format as two unsigned bytes
+   (currently ``1`` and ``0``).
+3. The length of the header in bytes, as a little-endian unsigned 32-bit
+   integer.
+4. The header: a JSON object encoded in UTF-8, padded with spaces and
+   terminated by a newline so that the dissimilarities start at an offset
+   that is a multiple of 64 bytes. The header contains the following keys:
+
+   * ``ids``: the list of IDs of the matrix
+   * ``form``: either ``'square'``, if the dissimilarities are stored as
+     a square matrix in row-major order, or ``'condensed'``, if only the
+     upper triangle of the matrix (excluding the diagonal) is stored, in
+     condensed form as defined by `scipy.spatial.distance.squareform`.
+     The condensed form can only be used for distance matrices, and halves
+     the size of the file.
+   * ``dtype``: the type of the dissimilarities, always ``'<f8'``
+     (little-endian 64-bit floats)
+
+5. The dissimilarities.
+
+.. note:: When reading from a file on disk (rather than, e.g., a compressed
+   file or an in-memory buffer), the dissimilarities are memory-mapped
+   read-only and are only read from disk when they are accessed. A square
+   matrix is used as is without being copied. A condensed matrix is read into
+   a ``DistanceMatrix`` that stores its distances in condensed form without
+   copying them, while it is expanded to square form in memory when read into
+   a ``DissimilarityMatrix``.
+
+Format Parameters
+-----------------
+When reading, the ``validate`` parameter (``False`` by default) controls
+whether the dissimilarities are validated (e.g., for the symmetry and
+hollowness of a ``DistanceMatrix``). Validating requires reading the whole
+matrix, so it is skipped by default, and only the IDs and the size of the
+matrix are checked.
+
+When writing a ``DistanceMatrix``, the ``condensed`` parameter (``False`` by
+default) selects whether the distances are stored in condensed form.
+
+Examples
+--------
+>>> import io
+>>> from skbio import DistanceMatrix
+>>> dm = DistanceMatrix([[0, 1, 2], [1, 0, 3], [2, 3, 0]], ['a', 'b', 'c'])
+>>> fh = io.BytesIO()
+>>> _ = dm.write(fh, format='binary_dm', condensed=True)
+>>> _ = fh.seek(0)
+>>> DistanceMatrix.read(fh, format='binary_dm') == dm
+True
+
+"""
+
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import io
+import json
+import struct
+
+import numpy as np
+
+from skbio.stats.distance import DissimilarityMatrix, DistanceMatrix
+from skbio.io import create_format, BinaryDMFormatError
+
+
+binary_dm = create_format('binary_dm', encoding='binary')
+
+_MAGIC = b'\x93SKBIODM'
+_VERSION = (1, 0)
+_DTYPE = np.dtype('<f8')
+_ALIGNMENT = 64
+# magic string, version and length of the header
+_PREAMBLE = struct.Struct('<8sBBI')
+# number of rows written at a time
+_WRITE_ROWS = 1024
+
+
+@binary_dm.sniffer()
+def _binary_dm_sniffer(fh):
+    return fh.read(len(_MAGIC)) == _MAGIC, {}
+
+
+@binary_dm.reader(DissimilarityMatrix)
+def _binary_dm_to_dissimilarity_matrix(fh, validate=False):
+    return _binary_dm_to_matrix(DissimilarityMatrix, fh, validate)
+
+
+@binary_dm.reader(DistanceMatrix)
+def _binary_dm_to_distance_matrix(fh, validate=False):
+    return _binary_dm_to_matrix(DistanceMatrix, fh, validate)
+
+
+@binary_dm.writer(DissimilarityMatrix)
+def _dissimilarity_matrix_to_binary_dm(obj, fh):
+    _matrix_to_binary_dm(obj, fh, condensed=False)
+
+
+@binary_dm.writer(DistanceMatrix)
+def _distance_matrix_to_binary_dm(obj, fh, condensed=False):
+    _matrix_to_binary_dm(obj, fh, condensed)
+
+
+def _binary_dm_to_matrix(cls, fh, validate):
+    preamble = fh.read(_PREAMBLE.size)
+    if len(preamble) != _PREAMBLE.size:
+        raise BinaryDMFormatError("File is too short to contain a header.")
+    magic, major, minor, header_length = _PREAMBLE.unpack(preamble)
+    if magic != _MAGIC:
+        raise BinaryDMFormatError("File does not start with the magic string "
+                                  "of the binary_dm format.")
+    if major != _VERSION[0]:
+        raise BinaryDMFormatError("Unsupported version of the binary_dm "
+                                  "format: %d.%d." % (major, minor))
+
+    try:
+        header = json.loads(fh.read(header_length).decode('utf-8'))
+        ids = [str(id_) for id_ in header['ids']]
+        form = header['form']
+        dtype = np.dtype(header['dtype'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise BinaryDMFormatError("Invalid header: %s" % e)
+
+    n = len(ids)
+    if form == 'square':
+        shape = (n, n)
+    elif form == 'condensed':
+        shape = (n * (n - 1) // 2,)
+    else:
+        raise BinaryDMFormatError("Unknown form of the dissimilarities: %r."
+                                  % form)
+    if dtype != _DTYPE:
+        raise BinaryDMFormatError("Unsupported dtype of the "
+                                  "dissimilarities: %r." % header['dtype'])
+
+    offset = _PREAMBLE.size + header_length
+    size = int(np.prod(shape)) * dtype.itemsize
+    raw = _get_file(fh)
+    if raw is not None and size > 0:
+        file_size = raw.seek(0, io.SEEK_END)
+        if file_size < offset + size:
+            raise BinaryDMFormatError(
+                "Expected %d bytes of dissimilarities, but found %d." %
+                (size, max(file_size - offset, 0)))
+        data = np.memmap(raw, dtype=dtype, mode='r', offset=offset,
+                         shape=shape)
+    else:
+        buffer = fh.read(size)
+        if len(buffer) != size:
+            raise BinaryDMFormatError(
+                "Expected %d bytes of dissimilarities, but found %d." %
+                (size, len(buffer)))
+        data = np.frombuffer(buffer, dtype=dtype).reshape(shape)
+
+    if cls is DistanceMatrix and form == 'condensed':
+        return cls(data, ids, validate=validate, condensed=True)
+    return cls(data, ids, validate=validate)
+
+
+def _get_file(fh):
+    """Return the file on disk underlying a filehandle, if any
+
+    Compressed files and in-memory buffers can't be memory-mapped, so None is
+    returned for them.
+    """
+    while not isinstance(fh, io.FileIO):
+        fh = getattr(fh, 'raw', None)
+        if fh is None:
+            return None
+    return fh
+
+
+def _matrix_to_binary_dm(obj, fh, condensed):
+    header = {'ids': list(obj.ids),
+              'form': 'condensed' if condensed else 'square',
+              'dtype': _DTYPE.str}
+    header = json.dumps(header).encode('utf-8')
+    # pad the header so that the dissimilarities are aligned
+    padding = -(_PREAMBLE.size + len(header) + 1) % _ALIGNMENT
+    header += b' ' * padding + b'\n'
+
+    fh.write(_PREAMBLE.pack(_MAGIC, _VERSION[0], _VERSION[1], len(header)))
+    fh.write(header)
+
+    if condensed and obj._condensed:
+        # the distances are already stored in condensed form
+        data = obj.condensed_form()
+        step = _WRITE_ROWS ** 2
+        for start in range(0, data.size, step):
+            fh.write(data[start:start + step].astype(_DTYPE).tobytes())
+        return
+
+    n = obj.shape[0]
+    columns = np.arange(n)
+    for start in range(0, n, _WRITE_ROWS):
+        # build the rows from the stored dissimilarities, whatever their form
+        rows = obj._take(np.arange(start, min(start + _WRITE_ROWS, n)),
+                         columns)
+        if condensed:
+            rows = np.concatenate([row[start + i + 1:]
+                                   for i, row in enumerate(rows)])
+        fh.write(np.ascontiguousarray(rows, dtype=_DTYPE).tobytes())
@@ -0,0 +1,162 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import gzip
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+
+import skbio.io
+from skbio import DistanceMatrix
+from skbio.io import BinaryDMFormatError
+from skbio.io.format.binary_dm import (
+    _binary_dm_to_dissimilarity_matrix, _binary_dm_to_distance_matrix,
+    _dissimilarity_matrix_to_binary_dm, _distance_matrix_to_binary_dm,
+    _binary_dm_sniffer, _PREAMBLE, _ALIGNMENT)
+from skbio.stats.distance import (DissimilarityMatrix, DistanceMatrixError,
+                                  randdm)
+
+
+class BinaryDMTests(TestCase):
+    def setUp(self):
+        self.dm_1x1 = DistanceMatrix([[0.0]], ['a'])
+        self.dm_3x3 = DistanceMatrix([[0.0, 0.01, 4.2],
+                                      [0.01, 0.0, 12.0],
+                                      [4.2, 12.0, 0.0]],
+                                     ['a', 'b', 'c d'])
+        self.dm_asym = DissimilarityMatrix([[0.0, 1.0], [-2.0, 0.0]],
+                                           ['a', 'b'])
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, writer, obj, **kwargs):
+        fh = io.BytesIO()
+        writer(obj, fh, **kwargs)
+        fh.seek(0)
+        return fh
+
+    def test_roundtrip_distance_matrix(self):
+        for dm in (self.dm_1x1, self.dm_3x3, randdm(10)):
+            for condensed in (True, False):
+                fh = self.write(_distance_matrix_to_binary_dm, dm,
+                                condensed=condensed)
+                obs = _binary_dm_to_distance_matrix(fh)
+                self.assertEqual(obs, dm)
+                self.assertIsInstance(obs, DistanceMatrix)
+
+                fh.seek(0)
+                obs = _binary_dm_to_dissimilarity_matrix(fh)
+                self.assertEqual(obs, DissimilarityMatrix(dm))
+                self.assertNotIsInstance(obs, DistanceMatrix)
+
+    def test_roundtrip_dissimilarity_matrix(self):
+        fh = self.write(_dissimilarity_matrix_to_binary_dm, self.dm_asym)
+        self.assertEqual(_binary_dm_to_dissimilarity_matrix(fh),
+                         self.dm_asym)
+
+        # the data is only validated if requested
+        fh.seek(0)
+        obs = _binary_dm_to_distance_matrix(fh)
+        npt.assert_array_equal(obs.data, self.dm_asym.data)
+        fh.seek(0)
+        with self.assertRaises(DistanceMatrixError):
+            _binary_dm_to_distance_matrix(fh, validate=True)
+
+    def test_header_alignment(self):
+        for ids in (['a'], ['a' * 100, 'b']):
+            dm = DistanceMatrix(np.zeros((len(ids),) * 2), ids)
+            data = self.write(_distance_matrix_to_binary_dm, dm).getvalue()
+            self.assertEqual((len(data) - 8 * len(ids) ** 2) % 64, 0)
+
+    def test_read_memmap(self):
+        path = os.path.join(self.tmpdir, 'dm.bin')
+        self.dm_3x3.write(path, format='binary_dm')
+
+        obs = DistanceMatrix.read(path)
+        self.assertEqual(obs, self.dm_3x3)
+        self.assertIsInstance(obs.data.base, np.memmap)
+        self.assertFalse(obs.data.flags.writeable)
+
+        # condensed matrices are stored in condensed form by DistanceMatrix
+        self.dm_3x3.write(path, format='binary_dm', condensed=True)
+        with open(path, 'rb') as fh:
+            header_length = _PREAMBLE.unpack(fh.read(_PREAMBLE.size))[-1]
+        offset = _PREAMBLE.size + header_length
+        self.assertEqual(offset % _ALIGNMENT, 0)
+        self.assertEqual(os.path.getsize(path), offset + 3 * 8)
+        obs = DistanceMatrix.read(path)
+        self.assertEqual(obs, self.dm_3x3)
+        self.assertIsInstance(obs.condensed_form().base, np.memmap)
+        self.assertEqual(DissimilarityMatrix.read(path, format='binary_dm'),
+                         DissimilarityMatrix(self.dm_3x3))
+
+    def test_write_condensed_storage(self):
+        dm = randdm(5)
+        condensed = DistanceMatrix(dm, condensed=True)
+        for c in (True, False):
+            exp = self.write(_distance_matrix_to_binary_dm, dm, condensed=c)
+            obs = self.write(_distance_matrix_to_binary_dm, condensed,
+                             condensed=c)
+            self.assertEqual(obs.getvalue(), exp.getvalue())
+
+    def test_read_compressed(self):
+        path = os.path.join(self.tmpdir, 'dm.bin.gz')
+        data = self.write(_distance_matrix_to_binary_dm, self.dm_3x3)
+        with gzip.open(path, 'wb') as fh:
+            fh.write(data.getvalue())
+        self.assertEqual(DistanceMatrix.read(path), self.dm_3x3)
+
+    def test_sniffer(self):
+        fh = self.write(_distance_matrix_to_binary_dm, self.dm_3x3)
+        self.assertEqual(_binary_dm_sniffer(fh), (True, {}))
+        self.assertEqual(_binary_dm_sniffer(io.BytesIO(b'\ta\tb\n')),
+                         (False, {}))
+        self.assertEqual(_binary_dm_sniffer(io.BytesIO()), (False, {}))
+
+        fh.seek(0)
+        self.assertEqual(skbio.io.sniff(fh), ('binary_dm', {}))
+
+    def test_read_invalid(self):
+        valid = self.write(_distance_matrix_to_binary_dm,
+                           self.dm_3x3).getvalue()
+        header_end = valid.index(b'\n') + 1
+
+        def read(data):
+            return _binary_dm_to_distance_matrix(io.BytesIO(data))
+
+        with self.assertRaisesRegex(BinaryDMFormatError, 'too short'):
+            read(b'')
+        with self.assertRaisesRegex(BinaryDMFormatError, 'magic'):
+            read(b'x' + valid[1:])
+        with self.assertRaisesRegex(BinaryDMFormatError, 'version.*2.0'):
+            read(valid[:8] + b'\x02' + valid[9:])
+        with self.assertRaisesRegex(BinaryDMFormatError, 'Invalid header'):
+            read(valid[:16] + b'{' + valid[17:])
+        with self.assertRaisesRegex(BinaryDMFormatError, 'Unknown form'):
+            read(valid.replace(b'"square"', b'"sqvare"'))
+        with self.assertRaisesRegex(BinaryDMFormatError, 'dtype'):
+            read(valid.replace(b'"<f8"', b'"<f4"'))
+        with self.assertRaisesRegex(BinaryDMFormatError, '72 bytes.*64'):
+            read(valid[:-8])
+
+        path = os.path.join(self.tmpdir, 'dm.bin')
+        with open(path, 'wb') as fh:
+            fh.write(valid[:header_end + 8])
+        with self.assertRaisesRegex(BinaryDMFormatError, '72 bytes.*8'):
+            DistanceMatrix.read(path, format='binary_dm')
+
+
+if __name__ == '__main__':
+    main()
@@ -168,6 +168,7 @@ The following are not yet used but should be avoided as well:
 # ----------------------------------------------------------------------------
 
 from warnings import warn
+from importlib import import_module
 import types
 import traceback
 import itertools
@@ -203,6 +204,11 @@ class IORegistry:
         self._binary_formats = {}
         self._text_formats = {}
         self._lookups = (self._binary_formats, self._text_formats)
+        # Names of the formats which are added to the registry by importing
+        # a module, mapped to the name of this module. The module is only
+        # imported when the format is first needed.
+        self._deferred_formats = {}
+        self._monkey_patched = False
 
     @stable(as_of="0.4.0")
     def create_format(self, *args, **kwargs):
@@ -235,6 +241,8 @@ class IORegistry:
         # See comment in the constructor for an explanation for why this split
         # occurs.
         name = format_object.name
+        # A deferred format is loaded first, so that it is not shadowed.
+        self._load_formats([name])
         if name in self._binary_formats or name in self._text_formats:
             raise DuplicateRegistrationError("A format already exists with"
                                              " that name: %s" % name)
@@ -244,6 +252,46 @@ class IORegistry:
         else:
             self._text_formats[name] = format_object
 
+    def _defer_formats(self, modules):
+        """Add formats which are loaded by importing a module when needed.
+
+        Parameters
+        ----------
+        modules : dict
+            Maps the name of each format to the name of the module which adds
+            it to the registry when it is imported.
+
+        """
+        self._deferred_formats.update(modules)
+
+    def _load_formats(self, format_names=None):
+        """Import the modules of deferred formats.
+
+        Parameters
+        ----------
+        format_names : iterable of str, optional
+            The names of the formats to load. Names which are not deferred are
+            ignored. If None, every deferred format is loaded.
+
+        """
+        if format_names is None:
+            format_names = list(self._deferred_formats)
+        modules = []
+        for name in format_names:
+            module = self._deferred_formats.get(name)
+            if module is not None and module not in modules:
+                modules.append(module)
+        if not modules:
+            return
+        # The formats are no longer deferred once their module is imported,
+        # even if the module is already being imported (i.e., if the module
+        # was imported directly).
+        self._deferred_formats = {name: module for name, module
+                                  in self._deferred_formats.items()
+                                  if module not in modules}
+        for module in modules:
+            import_module(module)
+
     @stable(as_of="0.4.0")
     def get_sniffer(self, format_name):
         """Locate the sniffer for a format.
@@ -259,6 +307,7 @@ class IORegistry:
             The sniffer associated with `format_name`
 
         """
+        self._load_formats([format_name])
         for lookup in self._lookups:
             if format_name in lookup:
                 return lookup[format_name].sniffer_function
@@ -307,6 +356,7 @@ class IORegistry:
         return self._get_rw(format_name, cls, 'writers')
 
     def _get_rw(self, format_name, cls, lookup_name):
+        self._load_formats([format_name])
         for lookup in self._lookups:
             if format_name in lookup:
                 format_lookup = getattr(lookup[format_name], lookup_name)
@@ -353,6 +403,7 @@ class IORegistry:
         return list(self._iter_rw_formats(cls, 'writers'))
 
     def _iter_rw_formats(self, cls, lookup_name):
+        self._load_formats()
         for lookup in self._lookups:
             for format in lookup.values():
                 if cls in getattr(format, lookup_name):
@@ -390,6 +441,9 @@ class IORegistry:
             raise TypeError(
                 "Cannot provide `newline` keyword argument when sniffing.")
 
+        # every format needs to be tried
+        self._load_formats()
+
         # By resolving the input here, we have the oppurtunity to reuse the
         # file (which is potentially ephemeral). Each sniffer will also resolve
         # the file, but that call will short-circuit and won't claim
@@ -572,6 +626,7 @@ class IORegistry:
         return reader, kwargs
 
     def _get_possible_readers(self, fmt):
+        self._load_formats([fmt])
         for lookup in self._lookups:
             if fmt in lookup:
                 return list(lookup[fmt].readers)
@@ -630,6 +685,9 @@ class IORegistry:
         The actual functionality will be a pass-through to `skbio.io.read`
         and `skbio.io.write` respectively.
         """
+        self._load_formats()
+        self._monkey_patched = True
+
         reads = set()
         writes = set()
         for lookup in self._lookups:
@@ -11,6 +11,7 @@ import io
 import itertools
 import os
 import unittest
+from unittest import mock
 import warnings
 import types
 from tempfile import mkstemp
@@ -1908,6 +1909,81 @@ class TestMonkeyPatch(RegistryTest):
         fh.close()
 
 
+class TestDeferredFormats(RegistryTest):
+    def setUp(self):
+        super(TestDeferredFormats, self).setUp()
+        self.registry._defer_formats({'format1': 'module1',
+                                      'format2': 'module2',
+                                      'format3': 'module2'})
+        self.imported = []
+        patcher = mock.patch('skbio.io.registry.import_module',
+                             side_effect=self.import_module)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def import_module(self, name):
+        # mimic the import of a module which registers formats
+        self.imported.append(name)
+        if name == 'module1':
+            format1 = self.registry.create_format('format1')
+
+            @format1.sniffer()
+            def format1_sniffer(fh):
+                return '1' in fh.readline(), {}
+
+            @format1.reader(MockClassA)
+            def format1_reader(fh):
+                return MockClassA([1])
+        else:
+            format2 = self.registry.create_format('format2')
+            self.registry.create_format('format3')
+
+            @format2.reader(MockClassA)
+            def format2_reader(fh):
+                return MockClassA([2])
+
+    def test_get_reader_loads_format(self):
+        self.assertEqual(self.imported, [])
+        reader = self.registry.get_reader('format1', MockClassA)
+        self.assertEqual(reader([]), MockClassA([1]))
+        self.assertEqual(self.imported, ['module1'])
+
+        # the module is only imported once, even if it has several formats
+        self.assertIsNotNone(self.registry.get_reader('format2', MockClassA))
+        self.assertIsNone(self.registry.get_sniffer('format3'))
+        self.assertIsNone(self.registry.get_writer('format2', MockClassA))
+        self.assertEqual(self.imported, ['module1', 'module2'])
+
+    def test_read_loads_format(self):
+        with io.open(self.fp1, mode='w') as fh:
+            fh.write('1\n')
+
+        obs = self.registry.read(self.fp1, format='format1', into=MockClassA)
+        self.assertEqual(obs, MockClassA([1]))
+        self.assertEqual(self.imported, ['module1'])
+
+        # every format is needed to sniff a file
+        self.assertEqual(self.registry.sniff(self.fp1), ('format1', {}))
+        self.assertEqual(self.imported, ['module1', 'module2'])
+
+    def test_list_formats_loads_all_formats(self):
+        self.assertEqual(self.registry.list_read_formats(MockClassA),
+                         ['format1', 'format2'])
+        self.assertEqual(self.imported, ['module1', 'module2'])
+
+    def test_monkey_patch_loads_all_formats(self):
+        self.registry.monkey_patch()
+        self.assertEqual(self.imported, ['module1', 'module2'])
+
+    def test_add_deferred_format(self):
+        with self.assertRaises(DuplicateRegistrationError):
+            self.registry.create_format('format3')
+        self.assertEqual(self.imported, ['module2'])
+
+        self.registry.create_format('format4')
+        self.assertEqual(self.imported, ['module2'])
+
+
 class TestModuleFunctions(unittest.TestCase):
 
     def test_sniff_matches(self):
@@ -11,6 +11,7 @@ import copy
 import functools
 
 from ._intersection import IntervalTree
+from skbio._base import _IOMethod
 from skbio.util._decorator import experimental, classonlymethod
 
 
@@ -506,6 +507,9 @@ fuzzy=[(False, False)], metadata={'gene': 'sagB'})
 
     """
     default_write_format = 'gff3'
+    # monkey-patched by the I/O registry when first accessed
+    read = _IOMethod('read')
+    write = _IOMethod('write')
 
     def __init__(self, upper_bound, copy_from=None):
         self._upper_bound = upper_bound
@@ -39,6 +39,19 @@ Functions
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+from importlib import import_module
+
 from ._subsample import subsample_counts, isubsample
 
 __all__ = ['subsample_counts', 'isubsample']
+
+# The subpackages are only imported when they are first accessed (see
+# skbio/__init__.py).
+_subpackages = {'distance', 'evolve', 'ordination', 'gradient', 'power',
+                'composition'}
+
+
+def __getattr__(name):
+    if name in _subpackages:
+        return import_module('skbio.stats.' + name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,212 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from skbio.util._misc import resolve_n_jobs
+
+
+# number of permutations per batch for statistics computed one permutation at
+# a time
+_DEFAULT_BATCH_SIZE = 100
+# relative tolerance under which statistics are considered tied
+_RTOL = 1e-12
+
+
+def _permutation_test(stat_function, sizes, permutations,
+                      alternative='greater', seed=None, batch_size=None,
+                      n_jobs=1, alpha=None, cumulative=False):
+    """Run a Monte Carlo permutation test.
+
+    Parameters
+    ----------
+    stat_function : callable
+        Function computing the test statistics of a batch of permutations. It
+        is passed one two-dimensional array of ints per element of `sizes`,
+        where each row is a permutation of ``range(size)``, and returns a
+        one-dimensional array with one statistic per row. The observed
+        statistic is computed by passing the identity permutations.
+    sizes : int or tuple of int
+        Number of objects in each permutation.
+    permutations : int
+        Number of permutations.
+    alternative : {'greater', 'less', 'two-sided'}
+        Which permuted statistics are at least as extreme as the observed
+        statistic: those that are greater, those that are less, or those that
+        are greater in absolute value.
+    seed : int, numpy.random.RandomState or numpy.random.Generator, optional
+        Source of the permutations. If ``None``, the permutations are drawn
+        from numpy's global random state in the calling thread, in order, so
+        that ``numpy.random.seed`` makes the results reproducible. Otherwise,
+        each batch of permutations is drawn in the thread computing it from
+        an independent stream spawned from `seed`, so that the results only
+        depend on `seed` and `batch_size`, and not on `n_jobs`.
+    batch_size : int, optional
+        Number of permutations passed to `stat_function` at once.
+    n_jobs : int, optional
+        Number of threads computing batches of permutations.
+    alpha : float, optional
+        If provided, permutations stop as soon as it is decided whether the
+        p-value computed from all `permutations` would be less than or equal
+        to `alpha`. The p-value is then computed from the permutations done
+        so far, which is on the same side of `alpha`.
+    cumulative : bool, optional
+        If ``True`` and `seed` is ``None``, each permutation is applied to the
+        previous one rather than to the identity, as successive in-place
+        shuffles of the same array do. This does not change the distribution
+        of the permutations.
+
+    Returns
+    -------
+    float
+        Observed test statistic.
+    float
+        p-value, or ``np.nan`` if `permutations` is zero.
+    ndarray
+        Test statistics of the permutations that were computed.
+
+    """
+    if permutations < 0:
+        raise ValueError(
+            "Number of permutations must be greater than or equal to zero.")
+    if alternative not in ('greater', 'less', 'two-sided'):
+        raise ValueError("Invalid alternative hypothesis '%s'." % alternative)
+    if isinstance(sizes, int):
+        sizes = (sizes,)
+    if batch_size is None:
+        batch_size = _DEFAULT_BATCH_SIZE
+
+    stat = stat_function(*[np.arange(size)[np.newaxis]
+                           for size in sizes])[0]
+    if permutations == 0:
+        return stat, np.nan, np.empty(0)
+
+    counts = [min(batch_size, permutations - start)
+              for start in range(0, permutations, batch_size)]
+    if seed is None:
+        batches = _draw_legacy_batches(sizes, counts, cumulative)
+        compute = _star(stat_function)
+    else:
+        streams = _seed_sequence(seed).spawn(len(counts))
+        batches = zip(streams, counts)
+        compute = _star(_draw_and_compute, stat_function, sizes)
+
+    perm_stats = []
+    num_extreme = 0
+    done = 0
+    for batch_stats in _imap_threads(compute, batches, n_jobs):
+        batch_stats = np.asarray(batch_stats, dtype=np.float64)
+        perm_stats.append(batch_stats)
+        num_extreme += _count_extreme(batch_stats, stat, alternative)
+        done += len(batch_stats)
+        if alpha is not None and done < permutations:
+            # bounds of the p-value if all permutations were done
+            lower = (num_extreme + 1) / (permutations + 1)
+            upper = (num_extreme + permutations - done + 1) / (
+                permutations + 1)
+            if lower > alpha or upper <= alpha:
+                break
+
+    p_value = (num_extreme + 1) / (done + 1)
+    return stat, p_value, np.concatenate(perm_stats)
+
+
+def _batched(func):
+    """Turn a function of one permutation per size into a batched one."""
+    def batched(*orders):
+        return np.array([func(*order) for order in zip(*orders)],
+                        dtype=np.float64)
+    return batched
+
+
+def _count_extreme(perm_stats, stat, alternative):
+    """Count the permuted statistics at least as extreme as `stat`.
+
+    Statistics that only differ from `stat` by rounding errors count as ties,
+    so that permutations equivalent to the observed data are counted whatever
+    the order in which their statistic was computed.
+
+    """
+    if alternative == 'two-sided':
+        perm_stats, stat = np.absolute(perm_stats), np.absolute(stat)
+    ties = np.isclose(perm_stats, stat, rtol=_RTOL, atol=0)
+    if alternative == 'less':
+        return ((perm_stats <= stat) | ties).sum()
+    else:
+        return ((perm_stats >= stat) | ties).sum()
+
+
+def _seed_sequence(seed):
+    """Return a ``numpy.random.SeedSequence`` from `seed`."""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(seed.integers(2 ** 63))
+    if isinstance(seed, np.random.RandomState):
+        return np.random.SeedSequence(seed.randint(2 ** 63, dtype=np.int64))
+    return np.random.SeedSequence(seed)
+
+
+def _draw_legacy_batches(sizes, counts, cumulative):
+    """Draw batches of permutations from numpy's global random state.
+
+    The permutations of all sizes are drawn for each permutation in turn,
+    which is the order in which the statistical methods used to draw them.
+
+    """
+    previous = [np.arange(size) for size in sizes]
+    for count in counts:
+        batch = [np.empty((count, size), dtype=np.intp) for size in sizes]
+        for i in range(count):
+            for j, size in enumerate(sizes):
+                order = np.random.permutation(size)
+                if cumulative:
+                    order = previous[j] = previous[j][order]
+                batch[j][i] = order
+        yield batch
+
+
+def _draw_and_compute(stat_function, sizes, stream, count):
+    rng = np.random.default_rng(stream)
+    batch = [np.empty((count, size), dtype=np.intp) for size in sizes]
+    for i in range(count):
+        for j, size in enumerate(sizes):
+            batch[j][i] = rng.permutation(size)
+    return stat_function(*batch)
+
+
+def _star(func, *args):
+    """Return a function calling `func` with `args` and an unpacked item."""
+    def starred(item):
+        return func(*args, *item)
+    return starred
+
+
+def _imap_threads(func, iterable, n_jobs):
+    """Map `func` over `iterable` on `n_jobs` threads, yielding in order.
+
+    Items are only taken from `iterable` as results are consumed, so that at
+    most twice as many items as threads are in flight at any time.
+
+    """
+    n_jobs = resolve_n_jobs(n_jobs)
+    if n_jobs == 1:
+        yield from map(func, iterable)
+        return
+
+    with ThreadPoolExecutor(n_jobs) as executor:
+        pending = deque()
+        for item in iterable:
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+            pending.append(executor.submit(func, item))
+        while pending:
+            yield pending.popleft().result()
@@ -9,14 +9,21 @@
 from functools import partial
 
 import numpy as np
+from scipy.spatial.distance import squareform
 from scipy.stats import rankdata
 
-from ._base import (_preprocess_input, _run_monte_carlo_stats, _build_results)
+from ._base import (_preprocess_input, _run_monte_carlo_stats, _build_results,
+                    _group_indicators)
 from skbio.util._decorator import experimental
 
+# maximum number of elements of the group indicator matrix of a batch of
+# permutations
+_BATCH_ELEMENTS = 2 ** 22
+
 
 @experimental(as_of="0.4.0")
-def anosim(distance_matrix, grouping, column=None, permutations=999):
+def anosim(distance_matrix, grouping, column=None, permutations=999,
+           seed=None, n_jobs=1, alpha=None):
     """Test for significant differences between groups using ANOSIM.
 
     Analysis of Similarities (ANOSIM) is a non-parametric method that tests
@@ -58,6 +65,18 @@ def anosim(distance_matrix, grouping, column=None, permutations=999):
         significance. Must be greater than or equal to zero. If zero,
         statistical significance calculations will be skipped and the p-value
         will be ``np.nan``.
+    seed : int, numpy.random.RandomState or numpy.random.Generator, optional
+        Seed of the permutations. If ``None`` (the default), the permutations
+        are drawn from NumPy's global random state (see ``numpy.random.seed``).
+        Otherwise, the results only depend on `seed`, and not on `n_jobs`.
+    n_jobs : int, optional
+        Number of threads computing the permutations. ``-1`` uses all
+        available CPUs.
+    alpha : float, optional
+        Significance level at which to stop permuting early. If provided, no
+        more permutations are done once it is certain whether the p-value is
+        at most `alpha`, and the p-value is computed from the permutations
+        done so far (reported as ``number of permutations``).
 
     Returns
     -------
@@ -173,32 +192,37 @@ def anosim(distance_matrix, grouping, column=None, permutations=999):
     divisor = sample_size * ((sample_size - 1) / 4)
     ranked_dists = rankdata(distances, method='average')
 
-    test_stat_function = partial(_compute_r_stat, tri_idxs, ranked_dists,
-                                 divisor)
-    stat, p_value = _run_monte_carlo_stats(test_stat_function, grouping,
-                                           permutations)
+    # The number of pairs of objects within groups and the sum of all ranks
+    # don't depend on the permutation of the grouping.
+    group_sizes = np.bincount(grouping)
+    num_within = (group_sizes * (group_sizes - 1)).sum() / 2
+    num_between = len(ranked_dists) - num_within
+    rank_sum = ranked_dists.sum()
+    ranked_dists = squareform(ranked_dists, force='tomatrix', checks=False)
+
+    # Bound the size of the group indicator matrix of a batch.
+    batch_size = max(1, _BATCH_ELEMENTS // (sample_size * num_groups))
+    test_stat_function = partial(_compute_r_stats, num_groups, ranked_dists,
+                                 num_within, num_between, rank_sum, divisor)
+    stat, p_value, permutations = _run_monte_carlo_stats(
+        test_stat_function, grouping, permutations, batch_size, n_jobs, seed,
+        alpha)
 
     return _build_results('ANOSIM', 'R', sample_size, num_groups, stat,
                           p_value, permutations)
 
 
-def _compute_r_stat(tri_idxs, ranked_dists, divisor, grouping):
-    """Compute ANOSIM R statistic (between -1 and +1)."""
-    # Create a matrix where True means that the two objects are in the same
-    # group. This ufunc requires that grouping is a numeric vector (e.g., it
-    # won't work with a grouping vector of strings).
-    grouping_matrix = np.equal.outer(grouping, grouping)
-
-    # Extract upper triangle from the grouping matrix. It is important to
-    # extract the values in the same order that the distances are extracted
-    # from the distance matrix (see ranked_dists). Extracting the upper
-    # triangle (excluding the diagonal) preserves this order.
-    grouping_tri = grouping_matrix[tri_idxs]
-
-    # within
-    r_W = np.mean(ranked_dists[grouping_tri])
+def _compute_r_stats(num_groups, ranked_dists, num_within, num_between,
+                     rank_sum, divisor, groupings):
+    """Compute ANOSIM R statistics (between -1 and +1) for a batch."""
+    num_groupings = groupings.shape[0]
+    indicators = _group_indicators(groupings, num_groups)
 
-    # between
-    r_B = np.mean(ranked_dists[np.invert(grouping_tri)])
+    # Sum the ranks within each group, where each pair of objects is counted
+    # twice.
+    within = (indicators * (ranked_dists @ indicators)).sum(axis=0)
+    within = within.reshape(num_groupings, num_groups).sum(axis=1) / 2
 
+    r_W = within / num_within
+    r_B = (rank_sum - within) / num_between
     return (r_B - r_W) / divisor
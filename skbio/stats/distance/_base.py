@@ -9,14 +9,13 @@
 import itertools
 from copy import deepcopy
 
-from IPython.core.pylabtools import print_figure
-from IPython.core.display import Image, SVG
 import numpy as np
 import pandas as pd
 from scipy.spatial.distance import squareform
 
 from skbio._base import SkbioObject
 from skbio.stats._misc import _pprint_strs
+from skbio.stats._permutation import _permutation_test, _batched
 from skbio.util import find_duplicates
 from skbio.util._decorator import experimental, classonlymethod
 from skbio.util._misc import resolve_key
@@ -69,6 +68,11 @@ class DissimilarityMatrix(SkbioObject):
         rows/cols in `data`. If ``None`` (the default), IDs will be
         monotonically-increasing integers cast as strings, with numbering
         starting from zero, e.g., ``('0', '1', '2', '3', ...)``.
+    validate : bool, optional
+        If ``False``, only the shape and ``dtype`` of `data` and the IDs are
+        validated, and the dissimilarities themselves are not inspected
+        (e.g., for hollowness or symmetry). This avoids reading all of `data`,
+        which can be useful if it is memory-mapped from a file.
 
     See Also
     --------
@@ -78,6 +82,9 @@ class DissimilarityMatrix(SkbioObject):
     Notes
     -----
     The dissimilarities are stored in redundant (square-form) format [1]_.
+    A two-dimensional ``numpy.ndarray`` with a float ``dtype``, such as a
+    ``numpy.memmap`` of a ``.npy`` file opened with
+    ``numpy.load(path, mmap_mode='r')``, is used without being copied.
 
     The data are not checked for symmetry, nor guaranteed/assumed to be
     symmetric.
@@ -92,7 +99,7 @@ class DissimilarityMatrix(SkbioObject):
     _matrix_element_name = 'dissimilarity'
 
     @experimental(as_of="0.4.0")
-    def __init__(self, data, ids=None):
+    def __init__(self, data, ids=None, validate=True):
         if isinstance(data, DissimilarityMatrix):
             ids = data.ids if ids is None else ids
             data = data.data
@@ -103,7 +110,10 @@ class DissimilarityMatrix(SkbioObject):
             ids = (str(i) for i in range(data.shape[0]))
         ids = tuple(ids)
 
-        self._validate(data, ids)
+        if validate:
+            self._validate(data, ids)
+        else:
+            self._validate_shape(data, ids)
 
         self._data = data
         self._ids = ids
@@ -193,7 +203,7 @@ class DissimilarityMatrix(SkbioObject):
     @ids.setter
     def ids(self, ids_):
         ids_ = tuple(ids_)
-        self._validate(self.data, ids_)
+        self._validate_ids(ids_, self.shape[0])
         self._ids = ids_
         self._id_index = self._index_list(self._ids)
 
@@ -201,7 +211,7 @@ class DissimilarityMatrix(SkbioObject):
     @experimental(as_of="0.4.0")
     def dtype(self):
         """Data type of the dissimilarities."""
-        return self.data.dtype
+        return self._data.dtype
 
     @property
     @experimental(as_of="0.4.0")
@@ -214,7 +224,8 @@ class DissimilarityMatrix(SkbioObject):
         entries will always be equal.
 
         """
-        return self.data.shape
+        n = len(self._ids)
+        return n, n
 
     @property
     @experimental(as_of="0.4.0")
@@ -226,7 +237,7 @@ class DissimilarityMatrix(SkbioObject):
         Equivalent to ``self.shape[0] * self.shape[1]``.
 
         """
-        return self.data.size
+        return self.shape[0] * self.shape[1]
 
     @property
     @experimental(as_of="0.4.0")
@@ -363,8 +374,25 @@ class DissimilarityMatrix(SkbioObject):
                     pass
             ids = found_ids
 
-        filtered_data = self._data[idxs][:, idxs]
-        return self.__class__(filtered_data, ids)
+        return self._reindex(idxs, ids)
+
+    def _reindex(self, idxs, ids):
+        """Return a new matrix made of the rows/columns at `idxs`
+
+        The new matrix is of the same type as `self`, and its IDs are `ids`.
+
+        """
+        return self.__class__(self._data[idxs][:, idxs], ids)
+
+    def _take(self, rows, cols):
+        """Return the dissimilarities between the `rows` and the `cols`
+
+        `rows` and `cols` are arrays of indices. A two-dimensional array with
+        one row per element of `rows` and one column per element of `cols` is
+        returned.
+
+        """
+        return self._data[np.ix_(rows, cols)]
 
     def _stable_order(self, ids):
         """Obtain a stable ID order with respect to self
@@ -534,22 +562,15 @@ class DissimilarityMatrix(SkbioObject):
 
         i = []
         j = []
-
-        # np.hstack([]) throws a ValueError. However, np.hstack([np.array([])])
-        # is valid and returns an empty array. Accordingly, an empty array is
-        # included here so that np.hstack works in the event that either i_ids
-        # or j_ids is empty.
-        values = [np.array([])]
         for i_idx in i_indices:
             i.extend([self.ids[i_idx]] * j_length)
             j.extend(j_labels)
 
-            subset = self._data[i_idx, j_indices]
-            values.append(subset)
+        values = self._take(i_indices, j_indices).ravel()
 
         i = pd.Series(i, name='i')
         j = pd.Series(j, name='j')
-        values = pd.Series(np.hstack(values), name='value')
+        values = pd.Series(values, name='value')
 
         return pd.concat([i, j, values], axis=1)
 
@@ -632,6 +653,7 @@ class DissimilarityMatrix(SkbioObject):
         """Display heatmap in IPython Notebook as PNG.
 
         """
+        from IPython.core.display import Image
         return Image(self._repr_png_(), embed=True)
 
     @property
@@ -640,10 +662,12 @@ class DissimilarityMatrix(SkbioObject):
         """Display heatmap in IPython Notebook as SVG.
 
         """
+        from IPython.core.display import SVG
         return SVG(self._repr_svg_())
 
     def _figure_data(self, format):
         import matplotlib.pyplot as plt
+        from IPython.core.pylabtools import print_figure
         fig = self.plot()
         data = print_figure(fig, format)
         # We MUST close the figure, otherwise IPython's display machinery
@@ -849,6 +873,15 @@ class DissimilarityMatrix(SkbioObject):
         Otherwise, the invalid dissimilarity matrix could be used after the
         exception is caught and handled.
 
+        """
+        self._validate_shape(data, ids)
+
+    def _validate_shape(self, data, ids):
+        """Validate the shape and dtype of the data array, and the IDs.
+
+        Performs the checks of `_validate` that don't require reading the
+        data.
+
         """
         if 0 in data.shape:
             raise DissimilarityMatrixError("Data must be at least 1x1 in "
@@ -863,17 +896,21 @@ class DissimilarityMatrix(SkbioObject):
         if data.dtype != np.double:
             raise DissimilarityMatrixError("Data must contain only floating "
                                            "point values.")
+        self._validate_ids(ids, data.shape[0])
+
+    def _validate_ids(self, ids, num_objects):
+        """Validate the IDs of a matrix of `num_objects` objects."""
         duplicates = find_duplicates(ids)
         if duplicates:
             formatted_duplicates = ', '.join(repr(e) for e in duplicates)
             raise DissimilarityMatrixError("IDs must be unique. Found the "
                                            "following duplicate IDs: %s" %
                                            formatted_duplicates)
-        if len(ids) != data.shape[0]:
+        if len(ids) != num_objects:
             raise DissimilarityMatrixError("The number of IDs (%d) must match "
                                            "the number of rows/columns in the "
                                            "data (%d)." %
-                                           (len(ids), data.shape[0]))
+                                           (len(ids), num_objects))
 
     def _index_list(self, list_):
         return {id_: idx for idx, id_ in enumerate(list_)}
@@ -891,16 +928,40 @@ class DistanceMatrix(DissimilarityMatrix):
     requirement that the matrix data is symmetric. There are additional methods
     made available that take advantage of this symmetry.
 
+    Parameters
+    ----------
+    data : array_like or DissimilarityMatrix
+        Square, hollow, symmetric two-dimensional ``numpy.ndarray`` of
+        distances (floats), or a one-dimensional vector of distances in
+        condensed form, as for `DissimilarityMatrix`.
+    ids : sequence of str, optional
+        Sequence of strings to be used as object IDs, as for
+        `DissimilarityMatrix`.
+    validate : bool, optional
+        If ``False``, the distances themselves are not inspected (e.g., for
+        hollowness or symmetry), as for `DissimilarityMatrix`.
+    condensed : bool, optional
+        If ``True``, only the distances in condensed form are stored, which
+        halves the memory used by the distance matrix. A one-dimensional
+        ``numpy.ndarray`` of distances with a float ``dtype`` is stored
+        without being copied.
+
     See Also
     --------
     DissimilarityMatrix
 
     Notes
     -----
-    The distances are stored in redundant (square-form) format [1]_. To
-    facilitate use with other scientific Python routines (e.g., scipy), the
-    distances can be retrieved in condensed (vector-form) format using
-    `condensed_form`.
+    By default, the distances are stored in redundant (square-form) format
+    [1]_. To facilitate use with other scientific Python routines (e.g.,
+    scipy), the distances can be retrieved in condensed (vector-form) format
+    using `condensed_form`.
+
+    If ``condensed=True``, the distances are instead stored in condensed
+    format. Looking up distances by ID, `filter`, `within`, `between`,
+    `condensed_form`, `permute` and `to_series` (and thus the statistical
+    methods built on them) use the condensed distances directly, while
+    `data` and `redundant_form` build a new square matrix on each access.
 
     `DistanceMatrix` only requires that the distances it stores are symmetric.
     Checks are *not* performed to ensure the other three metric properties
@@ -918,6 +979,134 @@ class DistanceMatrix(DissimilarityMatrix):
     # Override here, used in superclass __str__
     _matrix_element_name = 'distance'
 
+    @experimental(as_of="0.5.5")
+    def __init__(self, data, ids=None, validate=True, condensed=False):
+        if not condensed:
+            super(DistanceMatrix, self).__init__(data, ids, validate)
+            self._condensed = False
+            return
+
+        if isinstance(data, DistanceMatrix):
+            ids = data.ids if ids is None else ids
+            data = data.condensed_form()
+        elif isinstance(data, DissimilarityMatrix):
+            ids = data.ids if ids is None else ids
+            data = data.data
+        data = np.asarray(data, dtype='float')
+        if data.ndim != 1:
+            # validate the square matrix before condensing it
+            square = DistanceMatrix(data, ids, validate)
+            data = square.condensed_form()
+            ids = square.ids
+
+        num_objects = _condensed_num_objects(data)
+        if ids is None:
+            ids = (str(i) for i in range(num_objects))
+        ids = tuple(ids)
+
+        self._validate_ids(ids, num_objects)
+        if validate and np.isnan(data).any():
+            raise DistanceMatrixError(
+                "Data must be symmetric and cannot contain NaNs.")
+
+        self._data = data
+        self._condensed = True
+        self._ids = ids
+        self._id_index = self._index_list(self._ids)
+
+    @property
+    @experimental(as_of="0.4.0")
+    def data(self):
+        """Array of distances.
+
+        A square, hollow, symmetric two-dimensional ``numpy.ndarray`` of
+        distances (floats). A copy is *not* returned, unless the distances
+        are stored in condensed form, in which case a new array is built on
+        each access.
+
+        Notes
+        -----
+        This property is not writeable.
+
+        """
+        if self._condensed:
+            return squareform(self._data, force='tomatrix', checks=False)
+        return self._data
+
+    @experimental(as_of="0.4.0")
+    def transpose(self):
+        """Return the transpose of the distance matrix.
+
+        Notes
+        -----
+        As a distance matrix is symmetric, this is a deep copy of the distance
+        matrix.
+
+        Returns
+        -------
+        DistanceMatrix
+            Transpose of the distance matrix. Will be the same type as `self`.
+
+        """
+        return self.copy()
+
+    @experimental(as_of="0.4.0")
+    def copy(self):
+        """Return a deep copy of the distance matrix.
+
+        The copy stores its distances in the same form as `self`.
+
+        Returns
+        -------
+        DistanceMatrix
+            Deep copy of the distance matrix. Will be the same type as `self`.
+
+        """
+        return self.__class__(self._data.copy(), deepcopy(self.ids),
+                              validate=False, condensed=self._condensed)
+
+    @experimental(as_of="0.4.0")
+    def __getitem__(self, index):
+        """Slice into distance data by object ID or numpy indexing.
+
+        See `DissimilarityMatrix.__getitem__` for the forms of `index`.
+
+        Notes
+        -----
+        If the distances are stored in condensed form, lookups by ID(s) are
+        served from the condensed distances, and a new array is returned for a
+        single ID. Other indices are applied to `data`.
+
+        """
+        if not self._condensed:
+            return super(DistanceMatrix, self).__getitem__(index)
+        if isinstance(index, str):
+            return self._take([self.index(index)],
+                              np.arange(self.shape[0]))[0]
+        elif self._is_id_pair(index):
+            return self._take([self.index(index[0])],
+                              [self.index(index[1])])[0, 0]
+        else:
+            return self.data.__getitem__(index)
+
+    def _reindex(self, idxs, ids):
+        if not self._condensed:
+            return super(DistanceMatrix, self)._reindex(idxs, ids)
+        ids = tuple(ids)
+        self._validate_ids(ids, len(idxs))
+        data = _condensed_subset(self._data, self.shape[0], idxs)
+        return self.__class__(data, ids, validate=False, condensed=True)
+
+    def _take(self, rows, cols):
+        if not self._condensed:
+            return super(DistanceMatrix, self)._take(rows, cols)
+        rows, cols = np.broadcast_arrays(*np.ix_(rows, cols))
+        result = np.zeros(rows.shape)
+        off_diagonal = rows != cols
+        result[off_diagonal] = self._data[_condensed_index(
+            rows[off_diagonal], cols[off_diagonal], self.shape[0])]
+        return result
+
     @classonlymethod
     @experimental(as_of="0.4.1")
     def from_iterable(cls, iterable, metric, key=None, keys=None,
@@ -996,13 +1185,17 @@ class DistanceMatrix(DissimilarityMatrix):
         Condensed format is described in [1]_.
 
         The conversion is not a constant-time operation, though it should be
-        relatively quick to perform.
+        relatively quick to perform. If the distances are stored in condensed
+        form, no conversion is needed and the stored array is returned
+        without being copied.
 
         References
         ----------
         .. [1] http://docs.scipy.org/doc/scipy/reference/spatial.distance.html
 
         """
+        if self._condensed:
+            return self._data
         return squareform(self._data, force='tovector', checks=False)
 
     @experimental(as_of="0.4.0")
@@ -1039,12 +1232,14 @@ class DistanceMatrix(DissimilarityMatrix):
 
         """
         order = np.random.permutation(self.shape[0])
-        permuted = self._data[order][:, order]
 
+        if condensed and self._condensed:
+            return _condensed_subset(self._data, self.shape[0], order)
+        permuted = self._reindex(order, self.ids)
         if condensed:
-            return squareform(permuted, force='tovector', checks=False)
+            return permuted.condensed_form()
         else:
-            return self.__class__(permuted, self.ids)
+            return permuted
 
     def _validate(self, data, ids):
         """Validate the data array and IDs.
@@ -1170,6 +1365,105 @@ def randdm(num_objects, ids=None, constructor=None, random_fn=None):
     return constructor(data, ids)
 
 
+# helper functions for condensed distance matrices
+
+def _condensed_num_objects(condensed):
+    """Return the number of objects of a vector of condensed distances."""
+    if condensed.ndim != 1:
+        raise DistanceMatrixError("Condensed distances must have exactly one "
+                                  "dimension.")
+    num_objects = int(round((1 + np.sqrt(1 + 8 * condensed.size)) / 2))
+    if num_objects * (num_objects - 1) // 2 != condensed.size:
+        raise DistanceMatrixError("The number of condensed distances (%d) "
+                                  "does not correspond to a whole number of "
+                                  "objects." % condensed.size)
+    return num_objects
+
+
+def _condensed_index(i, j, num_objects):
+    """Return the positions of the distances between `i` and `j`.
+
+    The positions are in the condensed form of a matrix of `num_objects`
+    objects. `i` and `j` are arrays of indices that must differ elementwise.
+
+    """
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    return num_objects * i - i * (i + 1) // 2 + j - i - 1
+
+
+def _condensed_subset(condensed, num_objects, idxs):
+    """Return the condensed distances between the objects at `idxs`."""
+    idxs = np.asarray(idxs, dtype=int)
+    rows, cols = np.triu_indices(len(idxs), k=1)
+    return condensed[_condensed_index(idxs[rows], idxs[cols], num_objects)]
+
+
+def _condensed_offset(n, i):
+    """Position in condensed form of the first distance of the ``i``-th row
+
+    The distances of each row to the rows that follow it are stored
+    contiguously in condensed form, so the distances of the rows ``i`` to
+    ``j`` (exclusive) are stored between the offsets of ``i`` and ``j``.
+    """
+    return n * i - i * (i + 1) // 2
+
+
+def _write_distance_rows(rows, n, ids, out, block_size, condensed=False):
+    """Compute all distances between ``n`` samples block by block
+
+    ``rows`` takes the first and last (exclusive) row of a block of samples
+    and returns the distances of these samples to the samples that follow
+    them, in condensed form. Blocks of about ``block_size`` distances are
+    computed, and each block is written into ``out`` before the next one is
+    computed. If ``out`` is a path, a ``.npy`` file storing the distances in
+    condensed form if ``condensed`` is True, or in square form otherwise, is
+    created there. The resulting ``DistanceMatrix`` uses ``out`` without
+    copying it, in the same form. If ``out`` is None, all distances are
+    computed at once, and stored in condensed form if ``condensed`` is True.
+    """
+    if out is None:
+        return DistanceMatrix(rows(0, n), ids, condensed=condensed)
+
+    path = None
+    if not isinstance(out, np.ndarray):
+        path = out
+        shape = (_condensed_offset(n, n),) if condensed else (n, n)
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=np.double,
+                                        shape=shape)
+    elif (out.dtype != np.double or
+            out.shape not in ((n, n), (_condensed_offset(n, n),))):
+        raise ValueError("``out`` must be an array of floats of shape "
+                         "(%d, %d) or (%d,), not %s of shape %r." %
+                         (n, n, _condensed_offset(n, n), out.dtype,
+                          out.shape))
+
+    block_rows = max(1, block_size // max(n, 1))
+    for start in range(0, n, block_rows):
+        stop = min(start + block_rows, n)
+        distances = rows(start, stop)
+        if out.ndim == 1:
+            out[_condensed_offset(n, start):
+                _condensed_offset(n, stop)] = distances
+            continue
+
+        end = 0
+        for i in range(start, stop):
+            begin, end = end, end + n - i - 1
+            out[i, i + 1:] = distances[begin:end]
+        # the lower triangle of the block of rows mirrors the upper triangle
+        # of the rows which precede it, or of the block itself
+        out[start:stop, :start] = out[:start, start:stop].T
+        upper = np.triu(out[start:stop, start:stop], 1)
+        out[start:stop, start:stop] = upper + upper.T
+
+    if isinstance(out, np.memmap):
+        out.flush()
+    if path is not None:
+        del out
+        out = np.load(path, mmap_mode='r')
+    return DistanceMatrix(out, ids, validate=False, condensed=(out.ndim == 1))
+
+
 # helper functions for anosim and permanova
 
 def _preprocess_input(distance_matrix, grouping, column):
@@ -1263,25 +1557,47 @@ def _df_to_vector(distance_matrix, df, column):
     return grouping.tolist()
 
 
-def _run_monte_carlo_stats(test_stat_function, grouping, permutations):
-    """Run stat test and compute significance with Monte Carlo permutations."""
-    if permutations < 0:
-        raise ValueError(
-            "Number of permutations must be greater than or equal to zero.")
+def _run_monte_carlo_stats(test_stat_function, grouping, permutations,
+                           batch_size=None, n_jobs=1, seed=None, alpha=None):
+    """Run stat test and compute significance with Monte Carlo permutations.
 
-    stat = test_stat_function(grouping)
+    If `batch_size` is provided, `test_stat_function` is vectorized: it takes
+    a two-dimensional array with one grouping per row and returns one
+    statistic per row. It is then called on batches of up to `batch_size`
+    permuted groupings. Otherwise, it takes a single grouping.
 
-    p_value = np.nan
-    if permutations > 0:
-        perm_stats = np.empty(permutations, dtype=np.float64)
+    See `skbio.stats._permutation._permutation_test` for `n_jobs`, `seed` and
+    `alpha`. The number of permutations that were computed is returned along
+    with the statistic and the p-value.
+
+    """
+    grouping = np.asarray(grouping)
+    if batch_size is None:
+        stat_function = _batched(lambda order: test_stat_function(
+            grouping[order]))
+    else:
+        def stat_function(orders):
+            return test_stat_function(grouping[orders])
 
-        for i in range(permutations):
-            perm_grouping = np.random.permutation(grouping)
-            perm_stats[i] = test_stat_function(perm_grouping)
+    stat, p_value, perm_stats = _permutation_test(
+        stat_function, len(grouping), permutations, seed=seed,
+        batch_size=batch_size, n_jobs=n_jobs, alpha=alpha)
+    return stat, p_value, len(perm_stats)
 
-        p_value = ((perm_stats >= stat).sum() + 1) / (permutations + 1)
 
-    return stat, p_value
+def _group_indicators(groupings, num_groups):
+    """Return a matrix with one column per group of each grouping.
+
+    `groupings` is a two-dimensional array with one grouping per row. Column
+    ``i * num_groups + j`` of the returned matrix marks with 1 the objects in
+    group ``j`` of grouping ``i``.
+
+    """
+    num_groupings, sample_size = groupings.shape
+    columns = groupings + num_groups * np.arange(num_groupings)[:, np.newaxis]
+    indicators = np.zeros((sample_size, num_groupings * num_groups))
+    indicators[np.arange(sample_size), columns] = 1
+    return indicators
 
 
 def _build_results(method_name, test_stat_name, sample_size, num_groups, stat,
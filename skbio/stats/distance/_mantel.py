@@ -6,20 +6,26 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+from functools import partial
 from itertools import combinations
 
 import numpy as np
 import pandas as pd
 import scipy.special
-from scipy.stats import pearsonr, spearmanr
+from scipy.stats import pearsonr, rankdata, spearmanr
 
 from skbio.stats.distance import DistanceMatrix
+from skbio.stats.distance._base import _condensed_index
+from skbio.stats._permutation import _permutation_test, _seed_sequence
 from skbio.util._decorator import experimental
 
+# maximum number of permuted distances gathered at once
+_BATCH_ELEMENTS = 2 ** 20
+
 
 @experimental(as_of="0.4.0")
 def mantel(x, y, method='pearson', permutations=999, alternative='two-sided',
-           strict=True, lookup=None):
+           strict=True, lookup=None, seed=None, n_jobs=1, alpha=None):
     """Compute correlation between distance matrices using the Mantel test.
 
     The Mantel test compares two distance matrices by computing the correlation
@@ -102,6 +108,18 @@ def mantel(x, y, method='pearson', permutations=999, alternative='two-sided',
         already match between the distance matrices, this parameter is not
         necessary. This parameter is disallowed if `x` and `y` are
         ``array_like``.
+    seed : int, numpy.random.RandomState or numpy.random.Generator, optional
+        Seed of the permutations. If ``None`` (the default), the permutations
+        are drawn from NumPy's global random state (see ``numpy.random.seed``).
+        Otherwise, the results only depend on `seed`, and not on `n_jobs`.
+    n_jobs : int, optional
+        Number of threads computing the permutations. ``-1`` uses all
+        available CPUs.
+    alpha : float, optional
+        Significance level at which to stop permuting early. If provided, no
+        more permutations are done once it is certain whether the p-value is
+        at most `alpha`, and the p-value is computed from the permutations
+        done so far.
 
     Returns
     -------
@@ -144,6 +162,13 @@ def mantel(x, y, method='pearson', permutations=999, alternative='two-sided',
     be ``np.nan`` if one or both of the inputs does not have any variation
     (i.e. the distances are all constant) and ``method='spearman'``.
 
+    The distances of `x` and `y` are ranked (if ``method='spearman'``) and
+    standardized once. The correlation coefficient of a permutation is then
+    the dot product of the standardized distances of `y` with those of `x`
+    reordered by the permutation, which is computed for batches of
+    permutations at once. Permuted coefficients within rounding error of the
+    original coefficient are counted as ties.
+
     References
     ----------
     .. [1] Legendre, P. and Legendre, L. (2012) Numerical Ecology. 3rd English
@@ -250,19 +275,32 @@ def mantel(x, y, method='pearson', permutations=999, alternative='two-sided',
     ``array_like`` because there is no notion of IDs.
 
     """
-    if method == 'pearson':
-        corr_func = pearsonr
-    elif method == 'spearman':
-        corr_func = spearmanr
-    else:
-        raise ValueError("Invalid correlation method '%s'." % method)
+    _check_parameters(method, permutations, alternative)
+    return _mantel(x, y, method, permutations, alternative, strict, lookup,
+                   seed, n_jobs, alpha)
 
+
+def _check_parameters(method, permutations, alternative):
+    if method not in ('pearson', 'spearman'):
+        raise ValueError("Invalid correlation method '%s'." % method)
     if permutations < 0:
         raise ValueError("Number of permutations must be greater than or "
                          "equal to zero.")
     if alternative not in ('two-sided', 'greater', 'less'):
         raise ValueError("Invalid alternative hypothesis '%s'." % alternative)
 
+
+def _mantel(x, y, method, permutations, alternative, strict, lookup, seed,
+            n_jobs, alpha, cache=None, keys=(None, None)):
+    """Run a Mantel test on validated parameters.
+
+    If `cache` is a ``dict``, the standardized distances of `x` (resp. `y`)
+    are stored in it under the first (resp. second) element of `keys`, and
+    reused when the same key and IDs are seen again.
+
+    """
+    corr_func = pearsonr if method == 'pearson' else spearmanr
+
     x, y = _order_dms(x, y, strict=strict, lookup=lookup)
 
     n = x.shape[0]
@@ -278,26 +316,57 @@ def mantel(x, y, method='pearson', permutations=999, alternative='two-sided',
     if permutations == 0 or np.isnan(orig_stat):
         p_value = np.nan
     else:
-        perm_gen = (corr_func(x.permute(condensed=True), y_flat)[0]
-                    for _ in range(permutations))
-        permuted_stats = np.fromiter(perm_gen, np.float, count=permutations)
+        x_std = _standardize(x, x_flat, method, cache, keys[0])
+        y_std = _standardize(y, y_flat, method, cache, keys[1])
+        batch_size = max(1, _BATCH_ELEMENTS // len(x_flat))
+        stat_function = partial(_permuted_corrs, x_std, y_std,
+                                np.triu_indices(n, k=1), n)
+        _, p_value, _ = _permutation_test(stat_function, n, permutations,
+                                          alternative, seed, batch_size,
+                                          n_jobs, alpha)
 
-        if alternative == 'two-sided':
-            count_better = (np.absolute(permuted_stats) >=
-                            np.absolute(orig_stat)).sum()
-        elif alternative == 'greater':
-            count_better = (permuted_stats >= orig_stat).sum()
-        else:
-            count_better = (permuted_stats <= orig_stat).sum()
+    return orig_stat, p_value, n
 
-        p_value = (count_better + 1) / (permutations + 1)
 
-    return orig_stat, p_value, n
+def _standardize(dm, flat, method, cache, key):
+    """Standardize condensed distances so that correlations are dot products.
+
+    The distances are ranked first for Spearman correlations. As permuting
+    the objects of a distance matrix only reorders its condensed distances,
+    their ranks, mean and norm don't need to be computed again.
+
+    """
+    if cache is not None:
+        key = (key, dm.ids)
+        if key in cache:
+            return cache[key]
+
+    if method == 'spearman':
+        flat = rankdata(flat)
+    flat = flat - flat.mean()
+    flat = flat / np.sqrt(flat @ flat)
+
+    if cache is not None:
+        cache[key] = flat
+    return flat
+
+
+def _permuted_corrs(x_std, y_std, tri_idxs, n, orders):
+    """Correlate `y_std` with `x_std` for each reordering of the objects of x.
+
+    Each row of `orders` gives the new order of the objects of x. The
+    reordered condensed distances of x are gathered for all rows at once.
+
+    """
+    rows, cols = tri_idxs
+    idxs = _condensed_index(orders[:, rows], orders[:, cols], n)
+    return x_std[idxs] @ y_std
 
 
 @experimental(as_of="0.4.0")
 def pwmantel(dms, labels=None, method='pearson', permutations=999,
-             alternative='two-sided', strict=True, lookup=None):
+             alternative='two-sided', strict=True, lookup=None, seed=None,
+             n_jobs=1, alpha=None):
     """Run Mantel tests for every pair of given distance matrices.
 
     Runs a Mantel test for each pair of distance matrices and collates the
@@ -328,6 +397,17 @@ def pwmantel(dms, labels=None, method='pearson', permutations=999,
         Handling of nonmatching IDs. See ``mantel`` function for more details.
     lookup : dict, optional
         Map existing IDs to new IDs. See ``mantel`` function for more details.
+    seed : int, numpy.random.RandomState or numpy.random.Generator, optional
+        Seed of the permutations. If ``None`` (the default), the permutations
+        are drawn from NumPy's global random state. Otherwise, each pairwise
+        test draws its permutations from its own random stream derived from
+        `seed`. See ``mantel`` function for more details.
+    n_jobs : int, optional
+        Number of threads computing the permutations of each pairwise test.
+        See ``mantel`` function for more details.
+    alpha : float, optional
+        Significance level at which each pairwise test stops permuting early.
+        See ``mantel`` function for more details.
 
     Returns
     -------
@@ -350,6 +430,10 @@ def pwmantel(dms, labels=None, method='pearson', permutations=999,
     of memory consumption as it only loads two matrices at a time as opposed to
     loading all distance matrices into memory.
 
+    Otherwise, the ranked (if ``method='spearman'``) and standardized
+    distances of each distance matrix are computed once and reused by all the
+    tests it is part of, as long as its IDs are the same in these tests.
+
     Examples
     --------
     Import the functionality we'll use in the following examples:
@@ -386,6 +470,7 @@ def pwmantel(dms, labels=None, method='pearson', permutations=999,
     """
     num_dms = len(dms)
 
+    _check_parameters(method, permutations, alternative)
     if num_dms < 2:
         raise ValueError("Must provide at least two distance matrices.")
 
@@ -404,16 +489,23 @@ def pwmantel(dms, labels=None, method='pearson', permutations=999,
                      ('permutations', int), ('alternative', object)]
     results = np.empty(num_combs, dtype=results_dtype)
 
-    for i, pair in enumerate(combinations(zip(labels, dms), 2)):
-        (xlabel, x), (ylabel, y) = pair
+    # Standardized distances are reused between tests, except when reading
+    # from files, to keep only two distance matrices in memory at a time.
+    cache = None if any(isinstance(dm, str) for dm in dms) else {}
+    if seed is None:
+        seeds = [None] * num_combs
+    else:
+        seeds = _seed_sequence(seed).spawn(num_combs)
+    for i, pair in enumerate(combinations(enumerate(zip(labels, dms)), 2)):
+        (xidx, (xlabel, x)), (yidx, (ylabel, y)) = pair
         if isinstance(x, str):
             x = DistanceMatrix.read(x)
         if isinstance(y, str):
             y = DistanceMatrix.read(y)
 
-        stat, p_val, n = mantel(x, y, method=method, permutations=permutations,
-                                alternative=alternative, strict=strict,
-                                lookup=lookup)
+        stat, p_val, n = _mantel(x, y, method, permutations, alternative,
+                                 strict, lookup, seeds[i], n_jobs, alpha,
+                                 cache, (xidx, yidx))
 
         results[i] = (xlabel, ylabel, stat, p_val, n, method, permutations,
                       alternative)
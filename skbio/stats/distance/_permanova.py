@@ -9,13 +9,20 @@
 from functools import partial
 
 import numpy as np
+from scipy.spatial.distance import squareform
 
-from ._base import (_preprocess_input, _run_monte_carlo_stats, _build_results)
+from ._base import (_preprocess_input, _run_monte_carlo_stats, _build_results,
+                    _group_indicators)
 from skbio.util._decorator import experimental
 
+# maximum number of elements of the group indicator matrix of a batch of
+# permutations
+_BATCH_ELEMENTS = 2 ** 22
+
 
 @experimental(as_of="0.4.0")
-def permanova(distance_matrix, grouping, column=None, permutations=999):
+def permanova(distance_matrix, grouping, column=None, permutations=999,
+              seed=None, n_jobs=1, alpha=None):
     """Test for significant differences between groups using PERMANOVA.
 
     Permutational Multivariate Analysis of Variance (PERMANOVA) is a
@@ -58,6 +65,18 @@ def permanova(distance_matrix, grouping, column=None, permutations=999):
         significance. Must be greater than or equal to zero. If zero,
         statistical significance calculations will be skipped and the p-value
         will be ``np.nan``.
+    seed : int, numpy.random.RandomState or numpy.random.Generator, optional
+        Seed of the permutations. If ``None`` (the default), the permutations
+        are drawn from NumPy's global random state (see ``numpy.random.seed``).
+        Otherwise, the results only depend on `seed`, and not on `n_jobs`.
+    n_jobs : int, optional
+        Number of threads used to compute the pseudo-F statistics of batches
+        of permutations. ``-1`` uses all available CPUs.
+    alpha : float, optional
+        Significance level at which to stop permuting early. If provided, no
+        more permutations are done once it is certain whether the p-value is
+        at most `alpha`, and the p-value is computed from the permutations
+        done so far (reported as ``number of permutations``).
 
     Returns
     -------
@@ -76,6 +95,12 @@ def permanova(distance_matrix, grouping, column=None, permutations=999):
 
     The p-value will be ``np.nan`` if `permutations` is zero.
 
+    The pseudo-F statistics of many permutations are computed at once: the
+    squared distances are multiplied by a matrix indicating the group of each
+    object under each permutation, so that the within-group sums of squares
+    of a whole batch of permutations are obtained from a single matrix
+    product.
+
     References
     ----------
     .. [1] Anderson, Marti J. "A new method for non-parametric multivariate
@@ -94,42 +119,34 @@ def permanova(distance_matrix, grouping, column=None, permutations=999):
 
     # Calculate number of objects in each group.
     group_sizes = np.bincount(grouping)
-    s_T = (distances ** 2).sum() / sample_size
-
-    test_stat_function = partial(_compute_f_stat, sample_size, num_groups,
-                                 tri_idxs, distances, group_sizes, s_T)
-    stat, p_value = _run_monte_carlo_stats(test_stat_function, grouping,
-                                           permutations)
+    squared_distances = distances ** 2
+    s_T = squared_distances.sum() / sample_size
+    squared_distances = squareform(squared_distances, force='tomatrix',
+                                   checks=False)
+
+    # Bound the size of the group indicator matrix of a batch.
+    batch_size = max(1, _BATCH_ELEMENTS // (sample_size * num_groups))
+    test_stat_function = partial(_compute_f_stats, sample_size, num_groups,
+                                 squared_distances, group_sizes, s_T)
+    stat, p_value, permutations = _run_monte_carlo_stats(
+        test_stat_function, grouping, permutations, batch_size, n_jobs, seed,
+        alpha)
 
     return _build_results('PERMANOVA', 'pseudo-F', sample_size, num_groups,
                           stat, p_value, permutations)
 
 
-def _compute_f_stat(sample_size, num_groups, tri_idxs, distances, group_sizes,
-                    s_T, grouping):
-    """Compute PERMANOVA pseudo-F statistic."""
-    # Create a matrix where objects in the same group are marked with the group
-    # index (e.g. 0, 1, 2, etc.). objects that are not in the same group are
-    # marked with -1.
-    grouping_matrix = -1 * np.ones((sample_size, sample_size), dtype=int)
-    for group_idx in range(num_groups):
-        within_indices = _index_combinations(
-            np.where(grouping == group_idx)[0])
-        grouping_matrix[within_indices] = group_idx
+def _compute_f_stats(sample_size, num_groups, squared_distances, group_sizes,
+                     s_T, groupings):
+    """Compute PERMANOVA pseudo-F statistics for a batch of groupings."""
+    num_groupings = groupings.shape[0]
+    indicators = _group_indicators(groupings, num_groups)
 
-    # Extract upper triangle (in same order as distances were extracted
-    # from full distance matrix).
-    grouping_tri = grouping_matrix[tri_idxs]
-
-    # Calculate s_W for each group, accounting for different group sizes.
-    s_W = 0
-    for i in range(num_groups):
-        s_W += (distances[grouping_tri == i] ** 2).sum() / group_sizes[i]
+    # Sum the squared distances within each group, where each pair of objects
+    # is counted twice, and weight each group by its size.
+    within = (indicators * (squared_distances @ indicators)).sum(axis=0)
+    s_W = (within.reshape(num_groupings, num_groups) /
+           (2 * group_sizes)).sum(axis=1)
 
     s_A = s_T - s_W
     return (s_A / (num_groups - 1)) / (s_W / (sample_size - num_groups))
-
-
-def _index_combinations(indices):
-    # Modified from http://stackoverflow.com/a/11144716
-    return np.tile(indices, len(indices)), np.repeat(indices, len(indices))
@@ -9,20 +9,22 @@
 from functools import partial
 
 import numpy as np
-from scipy.stats import f_oneway
-from scipy.spatial.distance import cdist
 
 import hdmedians as hd
 
 from ._base import (_preprocess_input, _run_monte_carlo_stats, _build_results)
 
-from skbio.stats.ordination import pcoa
 from skbio.util._decorator import experimental
 
+# maximum number of permuted groupings in a batch of permutations, times the
+# number of objects
+_BATCH_ELEMENTS = 2 ** 22
+
 
 @experimental(as_of="0.5.2")
 def permdisp(distance_matrix, grouping, column=None, test='median',
-             permutations=999):
+             permutations=999, seed=None, n_jobs=1, alpha=None,
+             ordination=None):
     """Test for Homogeneity of Multivariate Groups Disperisons using Marti
     Anderson's PERMDISP2 procedure.
 
@@ -61,6 +63,23 @@ def permdisp(distance_matrix, grouping, column=None, test='median',
         significance. Must be greater than or equal to zero. If zero,
         statistical significance calculations will be skipped and the p-value
         will be ``np.nan``.
+    seed : int, numpy.random.RandomState or numpy.random.Generator, optional
+        Seed of the permutations. If ``None`` (the default), the permutations
+        are drawn from NumPy's global random state (see ``numpy.random.seed``).
+        Otherwise, the results only depend on `seed`, and not on `n_jobs`.
+    n_jobs : int, optional
+        Number of threads computing the permutations. ``-1`` uses all
+        available CPUs.
+    alpha : float, optional
+        Significance level at which to stop permuting early. If provided, no
+        more permutations are done once it is certain whether the p-value is
+        at most `alpha`, and the p-value is computed from the permutations
+        done so far (reported as ``number of permutations``).
+    ordination : OrdinationResults, optional
+        Principal coordinates of `distance_matrix`, as computed by ``pcoa``,
+        e.g. to reuse them across several tests of the same distance matrix.
+        Its samples must be indexed by the IDs in `distance_matrix`. If not
+        provided, ``pcoa`` is run on `distance_matrix`.
 
     Returns
     -------
@@ -90,6 +109,9 @@ def permdisp(distance_matrix, grouping, column=None, test='median',
         If all of the values in the grouping vector are unique
     KeyError
         If there are ids in grouping that are not in distance_matrix
+    ValueError
+        If the samples of `ordination` are not the objects in
+        `distance_matrix`
 
     See Also
     --------
@@ -102,6 +124,12 @@ def permdisp(distance_matrix, grouping, column=None, test='median',
     results found in vegan's betadisper, however due to floating point
     variability the F-statistic results may vary slightly.
 
+    The distance of each object to the centroid or spatial median of its group
+    is computed once, from the principal coordinates of the objects. The
+    permutation test then permutes these distances among the groups, so that
+    the F-statistics of batches of permutations are computed from the sums of
+    the permuted distances in each group.
+
     See [1]_ for the original method reference, as well as
     ``vegan::betadisper``, available in R's vegan package [2]_.
 
@@ -139,7 +167,7 @@ def permdisp(distance_matrix, grouping, column=None, test='median',
     sample size                      6
     number of groups                 2
     test statistic             1.03296
-    p-value                       0.35
+    p-value                       0.46
     number of permutations          99
     Name: PERMDISP results, dtype: object
 
@@ -175,7 +203,7 @@ def permdisp(distance_matrix, grouping, column=None, test='median',
     sample size                      6
     number of groups                 2
     test statistic             3.67082
-    p-value                   0.428571
+    p-value                   0.285714
     number of permutations           6
     Name: PERMDISP results, dtype: object
 
@@ -221,45 +249,81 @@ def permdisp(distance_matrix, grouping, column=None, test='median',
     if test not in ['centroid', 'median']:
         raise ValueError('Test must be centroid or median')
 
-    ordination = pcoa(distance_matrix)
-    samples = ordination.samples
-
     sample_size, num_groups, grouping, tri_idxs, distances = _preprocess_input(
         distance_matrix, grouping, column)
 
-    test_stat_function = partial(_compute_groups, samples, test)
-
-    stat, p_value = _run_monte_carlo_stats(test_stat_function, grouping,
-                                           permutations)
+    if ordination is None:
+        # skbio.stats.ordination imports skbio.stats.distance, so it is
+        # imported here to avoid a circular import
+        from skbio.stats.ordination import pcoa
+        ordination = pcoa(distance_matrix)
+    samples = ordination.samples
+    if (len(samples.index) != sample_size or
+            set(samples.index) != set(distance_matrix.ids)):
+        raise ValueError("The samples of the ordination must be the objects "
+                         "in the distance matrix.")
+    samples = samples.loc[list(distance_matrix.ids)]
+
+    centroid_distances = _compute_centroid_distances(samples.values, test,
+                                                     grouping)
+
+    batch_size = max(1, _BATCH_ELEMENTS // sample_size)
+    test_stat_function = partial(_compute_f_stats, centroid_distances,
+                                 np.bincount(grouping))
+    stat, p_value, permutations = _run_monte_carlo_stats(
+        test_stat_function, grouping, permutations, batch_size, n_jobs, seed,
+        alpha)
 
     return _build_results('PERMDISP', 'F-value', sample_size, num_groups,
                           stat, p_value, permutations)
 
 
 def _compute_groups(samples, test_type, grouping):
-
-    groups = []
-
-    samples['grouping'] = grouping
-    if test_type == 'centroid':
-        centroids = samples.groupby('grouping').aggregate('mean')
-    elif test_type == 'median':
-        centroids = samples.groupby('grouping').aggregate(_config_med)
-
-    for label, df in samples.groupby('grouping'):
-        groups.append(cdist(df.values[:, :-1], [centroids.loc[label].values],
-                            metric='euclidean'))
-
-    stat, _ = f_oneway(*groups)
-    stat = stat[0]
-
-    return stat
+    """Compute the PERMDISP F-statistic of a grouping of `samples`."""
+    grouping = np.unique(np.asarray(grouping, dtype=object).astype(str),
+                         return_inverse=True)[1]
+    centroid_distances = _compute_centroid_distances(np.asarray(samples),
+                                                     test_type, grouping)
+    return _compute_f_stats(centroid_distances, np.bincount(grouping),
+                            grouping[np.newaxis])[0]
+
+
+def _compute_centroid_distances(coordinates, test_type, grouping):
+    """Compute the distance of each object to the center of its group."""
+    centers = np.empty_like(coordinates)
+    for group in range(grouping.max() + 1):
+        in_group = grouping == group
+        if test_type == 'centroid':
+            centers[in_group] = coordinates[in_group].mean(axis=0)
+        elif test_type == 'median':
+            centers[in_group] = _config_med(coordinates[in_group])
+    return np.linalg.norm(coordinates - centers, axis=1)
+
+
+def _compute_f_stats(centroid_distances, group_sizes, groupings):
+    """Compute one-way ANOVA F-statistics for a batch of groupings."""
+    num_groupings, sample_size = groupings.shape
+    num_groups = len(group_sizes)
+
+    # Sum the distances in each group of each grouping.
+    columns = groupings + num_groups * np.arange(num_groupings)[:, np.newaxis]
+    group_sums = np.bincount(
+        columns.ravel(), minlength=num_groupings * num_groups,
+        weights=np.broadcast_to(centroid_distances, groupings.shape).ravel())
+    group_sums = group_sums.reshape(num_groupings, num_groups)
+
+    correction = centroid_distances.sum() ** 2 / sample_size
+    ss_total = (centroid_distances ** 2).sum() - correction
+    ss_between = (group_sums ** 2 / group_sizes).sum(axis=1) - correction
+    ss_within = ss_total - ss_between
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((ss_between / (num_groups - 1)) /
+                (ss_within / (sample_size - num_groups)))
 
 
 def _config_med(x):
     """
-    slice the vector up to the last value to exclude grouping column
-    and transpose the vector to be compatible with hd.geomedian
+    transpose the vector to be compatible with hd.geomedian
     """
-    X = x.values[:, :-1]
-    return np.array(hd.geomedian(X.T))
+    return np.array(hd.geomedian(x.T))
@@ -9,13 +9,14 @@
 import io
 from functools import partial
 from unittest import TestCase, main
+from unittest.mock import patch
 
 import numpy as np
 import pandas as pd
 from pandas.util.testing import assert_series_equal
 
 from skbio import DistanceMatrix
-from skbio.stats.distance import anosim
+from skbio.stats.distance import anosim, randdm
 
 
 class TestANOSIM(TestCase):
@@ -114,6 +115,33 @@ class TestANOSIM(TestCase):
         obs = anosim(self.dm_unequal, self.grouping_unequal_relabeled)
         self.assert_series_equal(obs, exp)
 
+    def test_batches(self):
+        # the results don't depend on how permutations are batched
+        dm = randdm(30)
+        grouping = np.arange(30) % 4
+        np.random.seed(0)
+        exp = anosim(dm, grouping)
+
+        with patch('skbio.stats.distance._anosim._BATCH_ELEMENTS', 250):
+            np.random.seed(0)
+            self.assert_series_equal(anosim(dm, grouping), exp)
+            np.random.seed(0)
+            self.assert_series_equal(anosim(dm, grouping, n_jobs=3), exp)
+
+    def test_seed(self):
+        exp = anosim(self.dm_unequal, self.grouping_unequal, seed=42)
+        for n_jobs in (1, 2):
+            obs = anosim(self.dm_unequal, self.grouping_unequal, seed=42,
+                         n_jobs=n_jobs)
+            self.assert_series_equal(obs, exp)
+
+    def test_early_stopping(self):
+        with patch('skbio.stats.distance._anosim._BATCH_ELEMENTS', 180):
+            obs = anosim(self.dm_unequal, self.grouping_unequal, seed=42,
+                         alpha=0.05)
+        self.assertLess(obs['number of permutations'], 999)
+        self.assertGreater(obs['p-value'], 0.05)
+
 
 if __name__ == '__main__':
     main()
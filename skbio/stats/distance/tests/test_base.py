@@ -7,6 +7,9 @@
 # ----------------------------------------------------------------------------
 
 import io
+import os
+import shutil
+import tempfile
 from unittest import TestCase, main
 
 import matplotlib as mpl
@@ -742,6 +745,111 @@ class DistanceMatrixTests(DissimilarityMatrixTestData):
         with self.assertRaisesRegex(DistanceMatrixError, r'NaNs'):
             DistanceMatrix([[0.0, np.nan], [np.nan, 0.0]], ['a', 'b'])
 
+    def test_init_no_validation(self):
+        # only the data is not validated
+        data = [[0.0, 2.0], [1.0, 0.0]]
+        dm = DistanceMatrix(data, ['a', 'b'], validate=False)
+        npt.assert_array_equal(dm.data, data)
+        with self.assertRaises(DissimilarityMatrixError):
+            DistanceMatrix(data, ['a', 'a'], validate=False)
+        with self.assertRaises(DissimilarityMatrixError):
+            DistanceMatrix([[1, 2, 3]], ['a'], validate=False)
+
+    def test_init_memmap(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'dm.npy')
+        np.save(path, self.dm_3x3.data)
+
+        data = np.load(path, mmap_mode='r')
+        dm = DistanceMatrix(data, ['a', 'b', 'c'], validate=False)
+        self.assertTrue(np.shares_memory(dm.data, data))
+        self.assertEqual(dm, self.dm_3x3)
+
+    def test_init_condensed(self):
+        for dm, condensed in zip(self.dms, self.dm_condensed_forms):
+            for data in (dm, dm.data, condensed):
+                obs = DistanceMatrix(data, dm.ids, condensed=True)
+                self.assertEqual(obs, dm)
+                self.assertEqual(obs.shape, dm.shape)
+                self.assertEqual(obs.size, dm.size)
+                self.assertEqual(obs.dtype, np.float64)
+                npt.assert_array_equal(obs.condensed_form(), condensed)
+                npt.assert_array_equal(obs.redundant_form(), dm.data)
+
+        # the condensed distances are not copied
+        data = np.array([1.0, 2.0, 3.0])
+        obs = DistanceMatrix(data, condensed=True)
+        self.assertIs(obs.condensed_form(), data)
+        self.assertEqual(obs.ids, ('0', '1', '2'))
+        obs = DistanceMatrix(obs, condensed=True)
+        self.assertIs(obs.condensed_form(), data)
+
+    def test_init_condensed_invalid_input(self):
+        with self.assertRaisesRegex(DistanceMatrixError, 'whole number'):
+            DistanceMatrix([1.0, 2.0], condensed=True)
+        with self.assertRaisesRegex(DistanceMatrixError, 'NaNs'):
+            DistanceMatrix([np.nan], condensed=True)
+        DistanceMatrix([np.nan], condensed=True, validate=False)
+        with self.assertRaises(DissimilarityMatrixError):
+            DistanceMatrix([1.0], ['a', 'a'], condensed=True)
+        with self.assertRaises(DissimilarityMatrixError):
+            DistanceMatrix([1.0], ['a'], condensed=True)
+        # square data is validated before being condensed
+        with self.assertRaises(DistanceMatrixError):
+            DistanceMatrix([[0.0, 2.0], [1.0, 0.0]], condensed=True)
+
+    def test_condensed_storage(self):
+        dm = randdm(6, ids=list('abcdef'))
+        condensed = DistanceMatrix(dm, condensed=True)
+
+        self.assertEqual(condensed['c', 'e'], dm['c', 'e'])
+        self.assertEqual(condensed['e', 'e'], 0.0)
+        npt.assert_array_equal(condensed['d'], dm['d'])
+        npt.assert_array_equal(condensed[1:3], dm[1:3])
+        with self.assertRaises(MissingIDError):
+            condensed['x']
+
+        for ids in (['f', 'a', 'c'], ['b'], list('abcdef')):
+            obs = condensed.filter(ids)
+            self.assertEqual(obs, dm.filter(ids))
+            self.assertTrue(obs._condensed)
+        with self.assertRaises(DissimilarityMatrixError):
+            condensed.filter(['a', 'a'])
+        with self.assertRaises(DissimilarityMatrixError):
+            condensed.filter([])
+
+        pdt.assert_frame_equal(condensed.within(['a', 'd', 'e']),
+                               dm.within(['a', 'd', 'e']))
+        pdt.assert_frame_equal(condensed.between(['a', 'f'], ['b', 'c']),
+                               dm.between(['a', 'f'], ['b', 'c']))
+        pdt.assert_series_equal(condensed.to_series(), dm.to_series())
+
+        for obs in (condensed.copy(), condensed.T):
+            self.assertEqual(obs, dm)
+            self.assertTrue(obs._condensed)
+            self.assertFalse(np.shares_memory(obs.condensed_form(),
+                                              condensed.condensed_form()))
+
+        condensed.ids = list('uvwxyz')
+        self.assertEqual(condensed['v', 'w'], dm['b', 'c'])
+
+    def test_condensed_storage_permute(self):
+        dm = randdm(5)
+        condensed = DistanceMatrix(dm, condensed=True)
+
+        np.random.seed(0)
+        exp = dm.permute(condensed=True)
+        np.random.seed(0)
+        npt.assert_array_equal(condensed.permute(condensed=True), exp)
+
+        np.random.seed(0)
+        exp = dm.permute()
+        np.random.seed(0)
+        obs = condensed.permute()
+        self.assertEqual(obs, exp)
+        self.assertTrue(obs._condensed)
+
     def test_from_iterable_no_key(self):
         iterable = (x for x in range(4))
 
@@ -1091,16 +1199,36 @@ class CategoricalStatsHelperFunctionTests(TestCase):
 
     def test_run_monte_carlo_stats_with_permutations(self):
         obs = _run_monte_carlo_stats(lambda e: 42, self.grouping, 50)
-        npt.assert_equal(obs, (42, 1.0))
+        npt.assert_equal(obs, (42, 1.0, 50))
 
     def test_run_monte_carlo_stats_no_permutations(self):
         obs = _run_monte_carlo_stats(lambda e: 42, self.grouping, 0)
-        npt.assert_equal(obs, (42, np.nan))
+        npt.assert_equal(obs, (42, np.nan, 0))
 
     def test_run_monte_carlo_stats_invalid_permutations(self):
         with self.assertRaises(ValueError):
             _run_monte_carlo_stats(lambda e: 42, self.grouping, -1)
 
+    def test_run_monte_carlo_stats_batches(self):
+        grouping = np.array([0, 0, 1, 1, 1, 2])
+
+        def stat(grouping):
+            return (grouping * np.arange(len(grouping))).sum()
+
+        np.random.seed(0)
+        exp = _run_monte_carlo_stats(stat, grouping, 20)
+
+        def batch_stat(groupings):
+            self.assertEqual(groupings.ndim, 2)
+            self.assertLessEqual(len(groupings), 3)
+            return np.array([stat(g) for g in groupings])
+
+        for n_jobs in (1, 2):
+            np.random.seed(0)
+            obs = _run_monte_carlo_stats(batch_stat, grouping, 20,
+                                         batch_size=3, n_jobs=n_jobs)
+            npt.assert_equal(obs, exp)
+
 
 if __name__ == '__main__':
     main()
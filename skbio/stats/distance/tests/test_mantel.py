@@ -11,11 +11,14 @@ from unittest import TestCase, main
 import numpy as np
 import numpy.testing as npt
 import pandas as pd
+from scipy.stats import pearsonr, spearmanr
 
 from skbio import DistanceMatrix
 from skbio.stats.distance import (DissimilarityMatrixError,
-                                  DistanceMatrixError, mantel, pwmantel)
-from skbio.stats.distance._mantel import _order_dms
+                                  DistanceMatrixError, mantel, pwmantel,
+                                  randdm)
+from skbio.stats.distance._mantel import (_order_dms, _permuted_corrs,
+                                          _standardize)
 from skbio.util import get_data_path, assert_data_frame_almost_equal
 
 
@@ -221,6 +224,20 @@ class MantelTests(MantelTestData):
         self.assertAlmostEqual(obs[1], 0.322)
         self.assertEqual(obs[2], 3)
 
+    def test_seed(self):
+        x, y = self.veg_dm_vegan, self.env_dm_vegan
+        exp = mantel(x, y, permutations=99, seed=42)
+        for n_jobs in (1, 2):
+            obs = mantel(x, y, permutations=99, seed=42, n_jobs=n_jobs)
+            self.assertEqual(obs, exp)
+
+    def test_early_stopping(self):
+        exp = mantel(self.minx, self.miny, seed=0)
+        obs = mantel(self.minx, self.miny, seed=np.random.default_rng(0),
+                     alpha=0.05)
+        self.assertEqual(obs[0], exp[0])
+        self.assertGreater(obs[1], 0.05)
+
     def test_vegan_example(self):
         np.random.seed(0)
 
@@ -368,6 +385,37 @@ class PairwiseMantelTests(MantelTestData):
             obs,
             self.exp_results_minimal_with_labels)
 
+    def test_seed(self):
+        dms = (self.minx_dm, self.miny_dm, self.minz_dm)
+        exp = pwmantel(dms, permutations=99, seed=42)
+        for n_jobs in (1, 2):
+            obs = pwmantel(dms, permutations=99, seed=42, n_jobs=n_jobs)
+            assert_data_frame_almost_equal(obs, exp)
+
+        # each pairwise test has its own stream, as mantel with the
+        # corresponding spawned seed
+        seeds = np.random.SeedSequence(42).spawn(3)
+        for (x, y), pair_seed, stat, p_value in zip(
+                ((0, 1), (0, 2), (1, 2)), seeds, exp['statistic'],
+                exp['p-value']):
+            obs = mantel(dms[x], dms[y], permutations=99, seed=pair_seed)
+            self.assertAlmostEqual(obs[0], stat)
+            self.assertEqual(obs[1], p_value)
+
+    def test_early_stopping(self):
+        dms = (self.minx_dm, self.miny_dm, self.minz_dm)
+        exp = pwmantel(dms, seed=0)
+        obs = pwmantel(dms, seed=0, alpha=0.05)
+        npt.assert_almost_equal(obs['statistic'].values,
+                                exp['statistic'].values)
+
+        seeds = np.random.SeedSequence(0).spawn(3)
+        for (x, y), pair_seed, p_value in zip(
+                ((0, 1), (0, 2), (1, 2)), seeds, obs['p-value']):
+            exp = mantel(dms[x], dms[y], seed=pair_seed, alpha=0.05)
+            self.assertEqual(p_value, exp[1])
+            self.assertGreater(p_value, 0.05)
+
     def test_duplicate_dms(self):
         obs = pwmantel((self.minx_dm, self.minx_dm, self.minx_dm),
                        alternative='less')
@@ -475,6 +523,34 @@ class PairwiseMantelTests(MantelTestData):
         assert_data_frame_almost_equal(obs, self.exp_results_all_dms)
 
 
+class PermutedCorrelationsTests(TestCase):
+    def test_permuted_corrs(self):
+        x, y = randdm(8), randdm(8)
+        orders = np.array([np.random.RandomState(i).permutation(8)
+                           for i in range(5)])
+        tri_idxs = np.triu_indices(8, k=1)
+
+        for method, corr_func in (('pearson', pearsonr),
+                                  ('spearman', spearmanr)):
+            x_std = _standardize(x, x.condensed_form(), method, None, None)
+            y_std = _standardize(y, y.condensed_form(), method, None, None)
+            obs = _permuted_corrs(x_std, y_std, tri_idxs, 8, orders)
+            exp = [corr_func(x.filter(np.array(x.ids)[order]).condensed_form(),
+                             y.condensed_form())[0] for order in orders]
+            npt.assert_allclose(obs, exp)
+
+    def test_standardize_cache(self):
+        x = randdm(5)
+        cache = {}
+        obs = _standardize(x, x.condensed_form(), 'pearson', cache, 0)
+        self.assertAlmostEqual(obs.mean(), 0)
+        self.assertAlmostEqual(obs @ obs, 1)
+        self.assertIs(
+            _standardize(x, x.condensed_form(), 'pearson', cache, 0), obs)
+        self.assertIsNot(
+            _standardize(x, x.condensed_form(), 'pearson', cache, 1), obs)
+
+
 class OrderDistanceMatricesTests(MantelTestData):
     def setUp(self):
         super(OrderDistanceMatricesTests, self).setUp()
@@ -9,13 +9,14 @@
 import io
 from functools import partial
 from unittest import TestCase, main
+from unittest.mock import patch
 
 import numpy as np
 import pandas as pd
 from pandas.util.testing import assert_series_equal
 
 from skbio import DistanceMatrix
-from skbio.stats.distance import permanova
+from skbio.stats.distance import permanova, randdm
 
 
 class TestPERMANOVA(TestCase):
@@ -114,6 +115,50 @@ class TestPERMANOVA(TestCase):
         obs = permanova(self.dm_unequal, self.grouping_unequal_relabeled)
         self.assert_series_equal(obs, exp)
 
+    def test_call_n_jobs(self):
+        exp = pd.Series(
+            index=self.exp_index,
+            data=['PERMANOVA', 'pseudo-F', 6, 3, 0.578848, 0.645, 999],
+            name='PERMANOVA results')
+
+        for n_jobs in (2, -1):
+            np.random.seed(0)
+            obs = permanova(self.dm_unequal, self.grouping_unequal,
+                            n_jobs=n_jobs)
+            self.assert_series_equal(obs, exp)
+
+    def test_call_batches(self):
+        # the results don't depend on how permutations are batched
+        dm = randdm(30)
+        grouping = np.arange(30) % 4
+        np.random.seed(0)
+        exp = permanova(dm, grouping)
+
+        with patch('skbio.stats.distance._permanova._BATCH_ELEMENTS', 250):
+            np.random.seed(0)
+            self.assert_series_equal(permanova(dm, grouping), exp)
+            np.random.seed(0)
+            self.assert_series_equal(permanova(dm, grouping, n_jobs=3), exp)
+
+    def test_call_seed(self):
+        exp = permanova(self.dm_unequal, self.grouping_unequal, seed=42)
+        for n_jobs in (1, 2):
+            obs = permanova(self.dm_unequal, self.grouping_unequal,
+                            seed=np.random.RandomState(42).randint(2 ** 63),
+                            n_jobs=n_jobs)
+            self.assertEqual(obs['test statistic'], exp['test statistic'])
+            obs = permanova(self.dm_unequal, self.grouping_unequal, seed=42,
+                            n_jobs=n_jobs)
+            self.assert_series_equal(obs, exp)
+
+    def test_call_early_stopping(self):
+        # batches of 10 permutations
+        with patch('skbio.stats.distance._permanova._BATCH_ELEMENTS', 180):
+            obs = permanova(self.dm_unequal, self.grouping_unequal, seed=0,
+                            alpha=0.05)
+        self.assertLess(obs['number of permutations'], 999)
+        self.assertGreater(obs['p-value'], 0.05)
+
 
 if __name__ == '__main__':
     main()
@@ -8,6 +8,7 @@
 
 from functools import partial
 from unittest import TestCase, main
+from unittest.mock import patch
 
 import numpy as np
 import numpy.testing as npt
@@ -18,8 +19,8 @@ import hdmedians as hd
 
 from skbio import DistanceMatrix
 from skbio.stats.ordination import pcoa
-from skbio.stats.distance import permdisp
-from skbio.stats.distance._permdisp import _compute_groups
+from skbio.stats.distance import permdisp, randdm
+from skbio.stats.distance._permdisp import _compute_groups, _compute_f_stats
 from skbio.util import get_data_path
 
 
@@ -168,7 +169,7 @@ class testPERMDISP(TestCase):
     def test_centroid_normal(self):
         exp = pd.Series(index=self.exp_index,
                         data=['PERMDISP', 'F-value', 9, 2, 0.244501519876,
-                              0.63, 99],
+                              0.66, 99],
                         name='PERMDISP results')
 
         grouping = ['Control', 'Control', 'Control', 'Control', 'Control',
@@ -184,7 +185,7 @@ class testPERMDISP(TestCase):
 
         exp = pd.Series(index=self.exp_index,
                         data=['PERMDISP', 'F-value', 9, 2, 0.139475441876,
-                              0.61, 99],
+                              0.72, 99],
                         name='PERMDISP results')
 
         np.random.seed(0)
@@ -193,6 +194,51 @@ class testPERMDISP(TestCase):
 
         self.assert_series_equal(obs, exp)
 
+    def test_ordination(self):
+        ordination = pcoa(self.unifrac_dm)
+        np.random.seed(0)
+        exp = permdisp(self.unifrac_dm, self.unif_grouping, permutations=99)
+        np.random.seed(0)
+        obs = permdisp(self.unifrac_dm, self.unif_grouping, permutations=99,
+                       ordination=ordination)
+        self.assert_series_equal(obs, exp)
+
+        # the samples are matched to the distance matrix by ID
+        ordination.samples = ordination.samples.iloc[::-1]
+        np.random.seed(0)
+        obs = permdisp(self.unifrac_dm, self.unif_grouping, permutations=99,
+                       ordination=ordination)
+        self.assert_series_equal(obs, exp)
+
+        with self.assertRaises(ValueError):
+            permdisp(self.eq_mat, self.grouping_eq, ordination=ordination)
+
+    def test_batches(self):
+        # the results don't depend on how permutations are batched
+        dm = randdm(30)
+        grouping = np.arange(30) % 4
+        np.random.seed(0)
+        exp = permdisp(dm, grouping, test='centroid')
+
+        with patch('skbio.stats.distance._permdisp._BATCH_ELEMENTS', 250):
+            np.random.seed(0)
+            obs = permdisp(dm, grouping, test='centroid')
+            self.assert_series_equal(obs, exp)
+            np.random.seed(0)
+            obs = permdisp(dm, grouping, test='centroid', n_jobs=3)
+            self.assert_series_equal(obs, exp)
+
+    def test_compute_f_stats(self):
+        distances = np.array([1.0, 2.5, 0.5, 3.0, 2.0, 4.0, 1.5])
+        groupings = np.array([[0, 0, 1, 1, 1, 2, 2],
+                              [2, 1, 0, 1, 2, 0, 1],
+                              [1, 2, 1, 0, 0, 1, 2]])
+        obs = _compute_f_stats(distances, np.array([2, 3, 2]), groupings)
+        exp = [f_oneway(*[distances[grouping == group]
+                          for group in range(3)])[0]
+               for grouping in groupings]
+        npt.assert_almost_equal(obs, exp)
+
     def test_not_distance_matrix(self):
         dm = []
         grouping = ['Control', 'Control', 'Control', 'Control', 'Control',
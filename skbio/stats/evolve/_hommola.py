@@ -6,15 +6,19 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+from functools import partial
+
 import numpy as np
 from scipy.stats import pearsonr
 
 from skbio import DistanceMatrix
+from skbio.stats._permutation import _permutation_test, _batched
 from skbio.util._decorator import experimental
 
 
 @experimental(as_of="0.4.0")
-def hommola_cospeciation(host_dist, par_dist, interaction, permutations=999):
+def hommola_cospeciation(host_dist, par_dist, interaction, permutations=999,
+                         seed=None, n_jobs=1, alpha=None):
     """Perform Hommola et al (2009) host/parasite cospeciation test.
 
     This test for host/parasite cospeciation is as described in [1]_. This test
@@ -74,6 +78,18 @@ def hommola_cospeciation(host_dist, par_dist, interaction, permutations=999):
         Number of permutations used to compute p-value. Must be greater than or
         equal to zero. If zero, statistical significance calculations will be
         skipped and the p-value will be ``np.nan``.
+    seed : int, numpy.random.RandomState or numpy.random.Generator, optional
+        Seed of the permutations. If ``None`` (the default), the permutations
+        are drawn from NumPy's global random state (see ``numpy.random.seed``).
+        Otherwise, the results only depend on `seed`, and not on `n_jobs`.
+    n_jobs : int, optional
+        Number of threads computing the permutations. ``-1`` uses all
+        available CPUs.
+    alpha : float, optional
+        Significance level at which to stop permuting early. If provided, no
+        more permutations are done once it is certain whether the p-value is
+        at most `alpha`, and the p-value is computed from the permutations
+        done so far, which are returned in `perm_stats`.
 
     Returns
     -------
@@ -177,34 +193,29 @@ def hommola_cospeciation(host_dist, par_dist, interaction, permutations=999):
     # calculate the observed correlation coefficient for these hosts/symbionts
     corr_coeff = pearsonr(x, y)[0]
 
-    # now do permutatitons. initialize index lists of the appropriate size
-    mp = np.arange(num_pars)
-    mh = np.arange(num_hosts)
-
-    # initialize list of shuffled correlation vals
-    perm_stats = np.empty(permutations)
-
     if permutations == 0 or np.isnan(corr_coeff):
         p_value = np.nan
-        perm_stats.fill(np.nan)
+        perm_stats = np.full(permutations, np.nan)
     else:
-        for i in range(permutations):
-            # generate a shuffled list of indexes for each permutation. this
-            # effectively randomizes which host is associated with which
-            # symbiont, but maintains the distribution of genetic distances
-            np.random.shuffle(mp)
-            np.random.shuffle(mh)
+        # each permutation shuffles the indexes of parasites and hosts. this
+        # effectively randomizes which host is associated with which
+        # symbiont, but maintains the distribution of genetic distances
+        stat_function = _batched(partial(
+            _permuted_corr, pars_k_labels, pars_t_labels, par_dist.data,
+            hosts_k_labels, hosts_t_labels, host_dist.data))
+        _, p_value, perm_stats = _permutation_test(
+            stat_function, (num_pars, num_hosts), permutations, seed=seed,
+            n_jobs=n_jobs, alpha=alpha, cumulative=True)
 
-            # get pairwise distances in shuffled order
-            y_p = _get_dist(pars_k_labels, pars_t_labels, par_dist.data, mp)
-            x_p = _get_dist(hosts_k_labels, hosts_t_labels, host_dist.data, mh)
-
-            # calculate shuffled correlation coefficient
-            perm_stats[i] = pearsonr(x_p, y_p)[0]
+    return corr_coeff, p_value, perm_stats
 
-        p_value = ((perm_stats >= corr_coeff).sum() + 1) / (permutations + 1)
 
-    return corr_coeff, p_value, perm_stats
+def _permuted_corr(pars_k_labels, pars_t_labels, par_dists, hosts_k_labels,
+                   hosts_t_labels, host_dists, mp, mh):
+    """Correlate the distances of interaction edges in shuffled order."""
+    y_p = _get_dist(pars_k_labels, pars_t_labels, par_dists, mp)
+    x_p = _get_dist(hosts_k_labels, hosts_t_labels, host_dists, mh)
+    return pearsonr(x_p, y_p)[0]
 
 
 def _get_dist(k_labels, t_labels, dists, index):
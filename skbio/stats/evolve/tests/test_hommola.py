@@ -113,6 +113,15 @@ class HommolaCospeciationTests(unittest.TestCase):
         self.assertAlmostEqual(r_hommola, r_mantel)
         npt.assert_equal(p_hommola, p_mantel)
 
+    def test_seed(self):
+        exp = hommola_cospeciation(self.hdist, self.pdist, self.interact, 99,
+                                   seed=42)
+        self.assertEqual(len(exp[2]), 99)
+        obs = hommola_cospeciation(self.hdist, self.pdist, self.interact, 99,
+                                   seed=42, n_jobs=2)
+        self.assertEqual(obs[:2], exp[:2])
+        npt.assert_array_equal(obs[2], exp[2])
+
     def test_zero_permutations(self):
         obs_r, obs_p, obs_perm_stats = hommola_cospeciation(
             self.hdist, self.pdist, self.interact, 0)
@@ -17,6 +17,7 @@ Ordination Functions
    ca
    pcoa
    pcoa_biplot
+   pcoa_project
    cca
    rda
 
@@ -132,11 +133,11 @@ References
 from ._redundancy_analysis import rda
 from ._correspondence_analysis import ca
 from ._canonical_correspondence_analysis import cca
-from ._principal_coordinate_analysis import pcoa, pcoa_biplot
+from ._principal_coordinate_analysis import pcoa, pcoa_biplot, pcoa_project
 from ._ordination_results import OrdinationResults
 from ._utils import (mean_and_std, scale, svd_rank, corr, e_matrix, f_matrix,
                      center_distance_matrix)
 
-__all__ = ['ca', 'rda', 'cca', 'pcoa', 'pcoa_biplot', 'OrdinationResults',
-           'mean_and_std', 'scale', 'svd_rank', 'corr',
+__all__ = ['ca', 'rda', 'cca', 'pcoa', 'pcoa_biplot', 'pcoa_project',
+           'OrdinationResults', 'mean_and_std', 'scale', 'svd_rank', 'corr',
            'e_matrix', 'f_matrix', 'center_distance_matrix']
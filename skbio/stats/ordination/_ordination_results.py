@@ -9,8 +9,6 @@
 import functools
 
 import numpy as np
-from IPython.core.pylabtools import print_figure
-from IPython.core.display import Image, SVG
 
 from skbio._base import SkbioObject
 from skbio.stats._misc import _pprint_strs
@@ -384,16 +382,19 @@ class OrdinationResults(SkbioObject):
     @experimental(as_of="0.4.0")
     def png(self):
         """Display basic 3-D scatterplot in IPython Notebook as PNG."""
+        from IPython.core.display import Image
         return Image(self._repr_png_(), embed=True)
 
     @property
     @experimental(as_of="0.4.0")
     def svg(self):
         """Display basic 3-D scatterplot in IPython Notebook as SVG."""
+        from IPython.core.display import SVG
         return SVG(self._repr_svg_())
 
     def _figure_data(self, format):
         import matplotlib.pyplot as plt
+        from IPython.core.pylabtools import print_figure
         fig = self.plot()
         data = print_figure(fig, format)
         # We MUST close the figure, otherwise IPython's display machinery
@@ -12,6 +12,7 @@ from numpy import dot, hstack
 from numpy.linalg import qr, svd
 from numpy.random import standard_normal
 from scipy.linalg import eigh
+from scipy.sparse.linalg import LinearOperator, eigsh
 from warnings import warn
 
 from skbio.stats.distance import DistanceMatrix
@@ -19,6 +20,9 @@ from skbio.util._decorator import experimental
 from ._ordination_results import OrdinationResults
 from ._utils import center_distance_matrix, scale
 
+# maximum number of distances read at once by the Lanczos method
+_BLOCK_ELEMENTS = 2 ** 22
+
 
 @experimental(as_of="0.4.0")
 def pcoa(distance_matrix, method="eigh", number_of_dimensions=0,
@@ -52,6 +56,9 @@ def pcoa(distance_matrix, method="eigh", number_of_dimensions=0,
         eigenvectors and eigenvalues for all dimensions. The alternate
         method, `fsvd`, uses faster heuristic eigendecomposition but loses
         accuracy. The magnitude of accuracy lost is dependent on dataset.
+        The `lanczos` method uses SciPy's `eigsh` (ARPACK) to compute only the
+        largest `number_of_dimensions` eigenvalues and eigenvectors, without
+        ever building the centered distance matrix (see Notes).
     number_of_dimensions : int, optional
         Dimensions to reduce the distance matrix to. This number determines
         how many eigenvectors and eigenvalues will be returned.
@@ -66,21 +73,25 @@ def pcoa(distance_matrix, method="eigh", number_of_dimensions=0,
         speed gain, and only the number specified by `number_of_dimensions`
         will be returned. Specifying a value of `0`, the default, will
         set `number_of_dimensions` equal to the number of dimensions of the
-        specified `distance_matrix`.
+        specified `distance_matrix`. With `lanczos`, a number of dimensions
+        less than the number of samples must be specified.
     inplace : bool, optional
         If true, centers a distance matrix in-place in a manner that reduces
-        memory consumption.
+        memory consumption. Ignored by `lanczos`, which doesn't center the
+        distance matrix.
 
     Returns
     -------
     OrdinationResults
         Object that stores the PCoA results, including eigenvalues, the
         proportion explained by each of them, and transformed sample
-        coordinates.
+        coordinates. New samples can be projected onto these coordinates with
+        ``pcoa_project``.
 
     See Also
     --------
     OrdinationResults
+    pcoa_project
 
     Notes
     -----
@@ -92,23 +103,46 @@ def pcoa(distance_matrix, method="eigh", number_of_dimensions=0,
         However, a warning is raised whenever negative eigenvalues
         appear, allowing the user to decide if they can be safely
         ignored.
-    """
-    distance_matrix = DistanceMatrix(distance_matrix)
 
-    # Center distance matrix, a requirement for PCoA here
-    matrix_data = center_distance_matrix(distance_matrix.data, inplace=inplace)
+    The `lanczos` method multiplies vectors by the centered distance matrix
+    :math:`-\frac{1}{2} J D^{(2)} J`, where :math:`D^{(2)}` holds the squared
+    distances and :math:`J` is the centering matrix, by reading the distances
+    a block of rows at a time. Its memory usage is therefore proportional to
+    the number of samples times `number_of_dimensions`, on top of the
+    distance matrix itself, which can be memory-mapped (e.g., read from a
+    ``binary_dm`` file) or stored in condensed form. As with `fsvd`, the
+    proportions explained are relative to the sum of all the eigenvalues,
+    including any negative ones.
+    """
+    if not isinstance(distance_matrix, DistanceMatrix):
+        distance_matrix = DistanceMatrix(distance_matrix)
+    num_samples = distance_matrix.shape[0]
+
+    # Mean of the squared distances from each sample, which is needed to
+    # project new samples onto the principal coordinates.
+    squared_distance_means = _squared_distance_means(distance_matrix)
+
+    if method == "lanczos":
+        if not 0 < number_of_dimensions < num_samples:
+            raise ValueError('PCoA with the lanczos method requires a number '
+                             'of dimensions greater than zero and less than '
+                             'the number of samples ({}).'.format(num_samples))
+    else:
+        # Center distance matrix, a requirement for PCoA here
+        matrix_data = center_distance_matrix(distance_matrix.data,
+                                             inplace=inplace)
 
     # If no dimension specified, by default will compute all eigenvectors
     # and eigenvalues
     if number_of_dimensions == 0:
-        if method == "fsvd" and matrix_data.shape[0] > 10:
+        if method == "fsvd" and num_samples > 10:
             warn("FSVD: since no value for number_of_dimensions is specified, "
                  "PCoA for all dimensions will be computed, which may "
                  "result in long computation time if the original "
                  "distance matrix is large.", RuntimeWarning)
 
         # distance_matrix is guaranteed to be square
-        number_of_dimensions = matrix_data.shape[0]
+        number_of_dimensions = num_samples
     elif number_of_dimensions < 0:
         raise ValueError('Invalid operation: cannot reduce distance matrix '
                          'to negative dimensions using PCoA. Did you intend '
@@ -129,6 +163,10 @@ def pcoa(distance_matrix, method="eigh", number_of_dimensions=0,
         eigvals, eigvecs = _fsvd(matrix_data, number_of_dimensions)
         long_method_name = "Approximate Principal Coordinate Analysis " \
                            "using FSVD"
+    elif method == "lanczos":
+        eigvals, eigvecs = _lanczos(distance_matrix, number_of_dimensions)
+        long_method_name = "Truncated Principal Coordinate Analysis " \
+                           "using Lanczos"
     else:
         raise ValueError(
             "PCoA eigendecomposition method {} not supported.".format(method))
@@ -181,6 +219,10 @@ def pcoa(distance_matrix, method="eigh", number_of_dimensions=0,
         # computing the trace of the centered distance matrix.
         # See proof outlined here: https://goo.gl/VAYiXx
         sum_eigenvalues = np.trace(matrix_data)
+    elif method == "lanczos":
+        # The diagonal of the centered distance matrix sums to the sum of the
+        # squared distances divided by twice the number of samples.
+        sum_eigenvalues = squared_distance_means.sum() / 2
     else:
         # Calculate proportions the usual way
         sum_eigenvalues = np.sum(eigvals)
@@ -204,7 +246,7 @@ def pcoa(distance_matrix, method="eigh", number_of_dimensions=0,
     coordinates = eigvecs * np.sqrt(eigvals)
 
     axis_labels = ["PC%d" % i for i in range(1, number_of_dimensions + 1)]
-    return OrdinationResults(
+    results = OrdinationResults(
         short_method_name="PCoA",
         long_method_name=long_method_name,
         eigvals=pd.Series(eigvals, index=axis_labels),
@@ -212,6 +254,9 @@ def pcoa(distance_matrix, method="eigh", number_of_dimensions=0,
                              columns=axis_labels),
         proportion_explained=pd.Series(proportion_explained,
                                        index=axis_labels))
+    results._squared_distance_means = pd.Series(squared_distance_means,
+                                                index=distance_matrix.ids)
+    return results
 
 
 def _fsvd(centered_distance_matrix, number_of_dimensions=10):
@@ -338,6 +383,79 @@ def _fsvd(centered_distance_matrix, number_of_dimensions=10):
     return eigenvalues, eigenvectors
 
 
+def _squared_distance_blocks(distance_matrix):
+    """Yield blocks of consecutive rows of squared distances.
+
+    Each block is yielded as a ``(start, stop, squared_distances)`` tuple,
+    with at most ``_BLOCK_ELEMENTS`` squared distances, so that a
+    memory-mapped or condensed distance matrix is never fully read in memory.
+
+    """
+    num_samples = distance_matrix.shape[0]
+    rows_per_block = max(1, _BLOCK_ELEMENTS // num_samples)
+    idxs = np.arange(num_samples)
+    for start in range(0, num_samples, rows_per_block):
+        stop = min(start + rows_per_block, num_samples)
+        if distance_matrix._condensed:
+            block = distance_matrix._take(idxs[start:stop], idxs)
+        else:
+            block = np.array(distance_matrix._data[start:stop], dtype=float)
+        yield start, stop, np.square(block, out=block)
+
+
+def _squared_distance_means(distance_matrix):
+    """Compute the mean squared distance from each sample."""
+    means = np.empty(distance_matrix.shape[0])
+    for start, stop, squared in _squared_distance_blocks(distance_matrix):
+        means[start:stop] = squared.mean(axis=1)
+    return means
+
+
+def _lanczos(distance_matrix, number_of_dimensions):
+    """Compute the largest eigenvalues of a centered distance matrix.
+
+    The centered distance matrix is never built: ARPACK is given an operator
+    which centers its input vectors, multiplies them by the squared distances
+    one block of rows at a time, and centers the result.
+
+    Parameters
+    ----------
+    distance_matrix : DistanceMatrix
+        A distance matrix.
+    number_of_dimensions : int
+        Number of eigenvalues and eigenvectors to compute, less than the
+        number of samples.
+
+    Returns
+    -------
+    eigenvalues : np.array
+        The largest eigenvalues, in ascending order.
+    eigenvectors : np.array
+        The corresponding eigenvectors, one per column.
+
+    """
+    num_samples = distance_matrix.shape[0]
+
+    def centered_product(vectors):
+        vectors = vectors - vectors.mean(axis=0)
+        product = np.empty(vectors.shape)
+        for start, stop, squared in _squared_distance_blocks(distance_matrix):
+            product[start:stop] = squared @ vectors
+        product /= -2
+        return product - product.mean(axis=0)
+
+    operator = LinearOperator((num_samples, num_samples),
+                              matvec=centered_product,
+                              rmatvec=centered_product,
+                              matmat=centered_product, dtype=float)
+
+    # The vector of ones is an eigenvector of the centered distance matrix,
+    # with eigenvalue zero, so it is a poor starting vector. A fixed random one
+    # makes the results reproducible.
+    v0 = np.random.RandomState(0).uniform(-1, 1, num_samples)
+    return eigsh(operator, k=number_of_dimensions, which='LA', v0=v0)
+
+
 @experimental(as_of="0.5.3")
 def pcoa_biplot(ordination, y):
     """Compute the projection of descriptors into a PCoA matrix
@@ -398,3 +516,108 @@ def pcoa_biplot(ordination, y):
     ordination.features.fillna(0.0, inplace=True)
 
     return ordination
+
+
+@experimental(as_of="0.5.5")
+def pcoa_project(ordination, distances, distance_matrix=None):
+    r"""Project new samples onto the principal coordinates of a PCoA
+
+    The coordinates of the new samples are computed from their distances to
+    the samples of the ordination with Gower's add-a-point formula [1]_, so
+    that the ordination is extended without a new eigendecomposition.
+
+    Parameters
+    ----------
+    ordination : OrdinationResults
+        Principal coordinates analysis of dimensions (n, c), e.g. as returned
+        by ``pcoa`` or read from a file.
+    distances : DataFrame
+        Distances from the new samples to the samples of `ordination`, of
+        dimensions (m, n). The rows are the new samples, and the columns are
+        labelled with the IDs of the samples of `ordination`.
+    distance_matrix : DistanceMatrix, optional
+        Distance matrix between the samples of `ordination`, from which it
+        was computed. It is required unless `ordination` was returned by
+        ``pcoa``, which stores the mean squared distance from each sample
+        (this is not serialized, so an ordination read from a file needs
+        it).
+
+    Returns
+    -------
+    DataFrame
+        Coordinates of the new samples in the ordination space, of dimensions
+        (m, c), indexed like the rows of `distances`.
+
+    Raises
+    ------
+    ValueError
+        If `ordination` is not a principal coordinates analysis, if
+        `distance_matrix` is required but missing, or if the columns of
+        `distances` or the IDs of `distance_matrix` are not its samples.
+
+    See Also
+    --------
+    pcoa
+
+    Notes
+    -----
+    The coordinate of a new sample on the axis :math:`j` is
+
+    .. math::
+
+        y_j = \frac{1}{2 \lambda_j} \sum_i x_{ij} (r_i - d_i^2)
+
+    where :math:`\lambda_j` is the eigenvalue of the axis, :math:`x_{ij}` is
+    the coordinate of the sample :math:`i` of the ordination on this axis,
+    :math:`d_i` is the distance from the new sample to the sample :math:`i`,
+    and :math:`r_i` is the mean squared distance from the sample :math:`i` to
+    the samples of the ordination. A sample of the ordination is projected
+    onto its own coordinates, and the coordinates on axes with a zero
+    eigenvalue are zero.
+
+    References
+    ----------
+    .. [1] Gower, J. C. "Adding a point to vector diagrams in multivariate
+       analysis." Biometrika 55.3 (1968): 582-585.
+    """
+    if (ordination.short_method_name != '' and
+            ordination.short_method_name != 'PCoA'):
+        raise ValueError('New samples can only be projected onto a PCoA.')
+
+    coordinates = ordination.samples
+    if distance_matrix is not None:
+        if not isinstance(distance_matrix, DistanceMatrix):
+            distance_matrix = DistanceMatrix(distance_matrix)
+        if set(distance_matrix.ids) != set(coordinates.index):
+            raise ValueError('The distance matrix must be between the samples '
+                             'of the ordination.')
+        squared_distance_means = pd.Series(
+            _squared_distance_means(distance_matrix),
+            index=distance_matrix.ids)
+    else:
+        squared_distance_means = getattr(ordination,
+                                         '_squared_distance_means', None)
+        if squared_distance_means is None:
+            raise ValueError('The distance matrix of the ordination is '
+                             'required to project new samples onto a PCoA '
+                             'which was not computed by pcoa (e.g., read '
+                             'from a file).')
+
+    if set(distances.columns) != set(coordinates.index):
+        raise ValueError('The distances must be to the samples of the '
+                         'ordination.')
+
+    # align the distances and the mean squared distances with the samples
+    squared_distances = distances.reindex(
+        columns=coordinates.index).values ** 2
+    squared_distance_means = squared_distance_means.reindex(
+        coordinates.index).values
+
+    eigvals = ordination.eigvals.values
+    projected = ((squared_distance_means - squared_distances) / 2).dot(
+        coordinates.values)
+    projected = np.divide(projected, eigvals, out=np.zeros_like(projected),
+                          where=eigvals > 0)
+
+    return pd.DataFrame(data=projected, index=distances.index.copy(),
+                        columns=coordinates.columns.copy())
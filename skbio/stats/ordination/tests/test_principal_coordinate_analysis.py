@@ -6,15 +6,23 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import io
+import os
+import tempfile
+
 import numpy as np
 import numpy.testing as npt
 import pandas as pd
+import pandas.util.testing as pdt
 from copy import deepcopy
 from unittest import TestCase, main
+from unittest.mock import patch
 
 from skbio import DistanceMatrix, OrdinationResults
 from skbio.stats.distance import DissimilarityMatrixError
-from skbio.stats.ordination import pcoa, pcoa_biplot
+from scipy.spatial.distance import cdist, pdist, squareform
+
+from skbio.stats.ordination import pcoa, pcoa_biplot, pcoa_project
 from skbio.util import get_data_path, assert_ordination_results_equal
 
 
@@ -120,6 +128,50 @@ class TestPCoA(TestCase):
                                    r"no value for number_of_dimensions"):
             pcoa(dm_big, method="fsvd", number_of_dimensions=0)
 
+    def test_lanczos(self):
+        dm = DistanceMatrix.read(get_data_path('PCoA_sample_data_3'))
+        expected_results = pcoa(dm, method="eigh", number_of_dimensions=3)
+
+        results = pcoa(dm, method="lanczos", number_of_dimensions=3)
+        self.assertEqual(results.long_method_name,
+                         "Truncated Principal Coordinate Analysis using "
+                         "Lanczos")
+        assert_ordination_results_equal(results, expected_results,
+                                        ignore_directionality=True,
+                                        ignore_method_names=True)
+
+        # distances stored in condensed form or read a few rows at a time
+        condensed = DistanceMatrix(dm, condensed=True)
+        assert_ordination_results_equal(
+            pcoa(condensed, method="lanczos", number_of_dimensions=3),
+            results)
+        with patch('skbio.stats.ordination._principal_coordinate_analysis.'
+                   '_BLOCK_ELEMENTS', 20):
+            assert_ordination_results_equal(
+                pcoa(dm, method="lanczos", number_of_dimensions=3), results)
+            assert_ordination_results_equal(
+                pcoa(condensed, method="lanczos", number_of_dimensions=3),
+                results)
+
+        for number_of_dimensions in (0, -1, dm.shape[0]):
+            with self.assertRaises(ValueError):
+                pcoa(dm, method="lanczos",
+                     number_of_dimensions=number_of_dimensions)
+
+    def test_lanczos_memory_mapped(self):
+        dm = DistanceMatrix.read(get_data_path('PCoA_sample_data_3'))
+        expected_results = pcoa(dm, method="lanczos", number_of_dimensions=3)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'dm.npy')
+            np.save(path, dm.data)
+            data = np.load(path, mmap_mode='r')
+            results = pcoa(DistanceMatrix(data, dm.ids, validate=False),
+                           method="lanczos", number_of_dimensions=3)
+            del data
+
+        assert_ordination_results_equal(results, expected_results)
+
     def test_extensive(self):
         eigvals = [0.3984635, 0.36405689, 0.28804535, 0.27479983,
                    0.19165361, 0.0]
@@ -297,5 +349,72 @@ class TestPCoABiplot(TestCase):
                                         ignore_method_names=True)
 
 
+class TestPCoAProject(TestCase):
+    def setUp(self):
+        self.dm = DistanceMatrix.read(get_data_path('PCoA_sample_data_3'))
+        self.ordination = pcoa(self.dm)
+        self.distances = pd.DataFrame(self.dm.data, index=self.dm.ids,
+                                      columns=self.dm.ids)
+
+    def test_reference_samples(self):
+        # the samples of the ordination are projected onto themselves,
+        # whatever the order of the columns of the distances
+        for ordination in (self.ordination,
+                           pcoa(self.dm, method='lanczos',
+                                number_of_dimensions=3)):
+            distances = self.distances.iloc[::-1, ::-1]
+            obs = pcoa_project(ordination, distances)
+            pdt.assert_frame_equal(obs.loc[list(self.dm.ids)],
+                                   ordination.samples)
+
+    def test_euclidean(self):
+        # with euclidean distances, the distances from the projected samples
+        # to the samples of the ordination are the original distances
+        points = np.random.RandomState(0).rand(20, 3)
+        new_points = np.random.RandomState(1).rand(4, 3)
+        ids = ['s%d' % i for i in range(20)]
+        ordination = pcoa(DistanceMatrix(squareform(pdist(points)), ids))
+        distances = cdist(new_points, points)
+
+        obs = pcoa_project(ordination, pd.DataFrame(
+            distances, index=['a', 'b', 'c', 'd'], columns=ids))
+        self.assertEqual(obs.index.tolist(), ['a', 'b', 'c', 'd'])
+        self.assertEqual(obs.columns.tolist(),
+                         ordination.samples.columns.tolist())
+        npt.assert_almost_equal(
+            cdist(obs.values, ordination.samples.values), distances)
+
+    def test_mismatching_samples(self):
+        with self.assertRaisesRegex(ValueError, r'samples of the ordination'):
+            pcoa_project(self.ordination, self.distances.iloc[:, 1:])
+
+    def test_not_a_pcoa(self):
+        self.ordination.short_method_name = 'RDA'
+        with self.assertRaisesRegex(ValueError, r'only be projected onto a '
+                                                'PCoA'):
+            pcoa_project(self.ordination, self.distances)
+
+    def test_from_serialized_results(self):
+        fh = io.StringIO()
+        self.ordination.write(fh)
+        fh.seek(0)
+        results = OrdinationResults.read(fh)
+        with self.assertRaisesRegex(ValueError, r'distance matrix .* is '
+                                                'required'):
+            pcoa_project(results, self.distances)
+
+        # the distance matrix can be in any order; the axis labels are not
+        # serialized
+        exp = pcoa_project(self.ordination, self.distances)
+        for dm in (self.dm, self.dm.filter(self.dm.ids[::-1])):
+            obs = pcoa_project(results, self.distances, distance_matrix=dm)
+            self.assertEqual(obs.index.tolist(), exp.index.tolist())
+            npt.assert_almost_equal(obs.values, exp.values)
+
+        with self.assertRaisesRegex(ValueError, r'between the samples'):
+            pcoa_project(results, self.distances,
+                         distance_matrix=self.dm.filter(self.dm.ids[1:]))
+
+
 if __name__ == "__main__":
     main()
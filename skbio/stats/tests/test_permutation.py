@@ -0,0 +1,161 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+
+from skbio.stats._permutation import _permutation_test, _batched
+
+
+def _first_position(orders):
+    # the position of 0 in each permutation
+    return np.argmin(orders, axis=1).astype(float)
+
+
+class PermutationTestTests(TestCase):
+    def test_observed_statistic(self):
+        stat, p_value, perm_stats = _permutation_test(_first_position, 5, 0)
+        self.assertEqual(stat, 0)
+        self.assertTrue(np.isnan(p_value))
+        self.assertEqual(perm_stats.shape, (0,))
+
+    def test_alternatives(self):
+        np.random.seed(0)
+        stat, p_value, perm_stats = _permutation_test(_first_position, 5, 99)
+        self.assertEqual(p_value, 1.0)
+        self.assertEqual(len(perm_stats), 99)
+
+        np.random.seed(0)
+        _, p_value, perm_stats = _permutation_test(_first_position, 5, 99,
+                                                   alternative='less')
+        exp = ((perm_stats == 0).sum() + 1) / 100
+        self.assertEqual(p_value, exp)
+
+        def centered(orders):
+            return _first_position(orders) - 2
+
+        np.random.seed(0)
+        _, p_value, perm_stats = _permutation_test(centered, 5, 99,
+                                                   alternative='two-sided')
+        exp = ((np.absolute(perm_stats) >= 2).sum() + 1) / 100
+        self.assertEqual(p_value, exp)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            _permutation_test(_first_position, 5, -1)
+        with self.assertRaises(ValueError):
+            _permutation_test(_first_position, 5, 10, alternative='foo')
+
+    def test_global_random_state(self):
+        # permutations are drawn like np.random.permutation, in order
+        np.random.seed(0)
+        exp = [np.argmin(np.random.permutation(5)) for _ in range(10)]
+
+        for batch_size, n_jobs in ((None, 1), (3, 1), (3, 2), (1, -1)):
+            np.random.seed(0)
+            _, _, obs = _permutation_test(_first_position, 5, 10,
+                                          batch_size=batch_size,
+                                          n_jobs=n_jobs)
+            npt.assert_array_equal(obs, exp)
+
+    def test_cumulative(self):
+        np.random.seed(0)
+        order = np.arange(5)
+        exp = []
+        for _ in range(10):
+            np.random.shuffle(order)
+            exp.append(np.argmin(order))
+
+        np.random.seed(0)
+        _, _, obs = _permutation_test(_first_position, 5, 10,
+                                      cumulative=True)
+        npt.assert_array_equal(obs, exp)
+
+    def test_seed(self):
+        _, _, exp = _permutation_test(_first_position, 10, 50, seed=42,
+                                      batch_size=7)
+        self.assertEqual(len(exp), 50)
+
+        for n_jobs in (2, -1):
+            _, _, obs = _permutation_test(_first_position, 10, 50, seed=42,
+                                          batch_size=7, n_jobs=n_jobs)
+            npt.assert_array_equal(obs, exp)
+
+        # the global random state is not used
+        np.random.seed(0)
+        _, _, obs = _permutation_test(_first_position, 10, 50, seed=42,
+                                      batch_size=7)
+        npt.assert_array_equal(obs, exp)
+        self.assertEqual(np.random.randint(1000), 684)
+
+        _, _, obs = _permutation_test(_first_position, 10, 50, seed=43,
+                                      batch_size=7)
+        self.assertFalse(np.array_equal(obs, exp))
+
+    def test_seed_random_states(self):
+        for make_rng in (np.random.RandomState, np.random.default_rng):
+            _, _, exp = _permutation_test(_first_position, 10, 20,
+                                          seed=make_rng(1))
+            _, _, obs = _permutation_test(_first_position, 10, 20,
+                                          seed=make_rng(1))
+            npt.assert_array_equal(obs, exp)
+
+    def test_multiple_sizes(self):
+        def stat_function(a, b):
+            self.assertEqual(a.shape[1], 3)
+            self.assertEqual(b.shape[1], 4)
+            return a[:, 0] + b[:, 0]
+
+        stat, _, perm_stats = _permutation_test(stat_function, (3, 4), 20,
+                                                seed=0)
+        self.assertEqual(stat, 0)
+        self.assertTrue((perm_stats >= 0).all())
+        self.assertTrue((perm_stats <= 5).all())
+
+    def test_early_stopping(self):
+        # nonsignificant: every permuted statistic is as extreme
+        _, p_value, perm_stats = _permutation_test(
+            lambda orders: np.zeros(len(orders)), 5, 999, batch_size=10,
+            seed=0, alpha=0.05)
+        self.assertEqual(len(perm_stats), 50)
+        self.assertEqual(p_value, 1.0)
+
+        # significant: no permuted statistic is as extreme, which is only
+        # decided after almost all permutations
+        def stat_function(orders):
+            return -np.absolute(orders - np.arange(orders.shape[1])).sum(
+                axis=1)
+
+        _, p_value, perm_stats = _permutation_test(
+            stat_function, 20, 99, batch_size=10, seed=0, alpha=0.05)
+        self.assertEqual(len(perm_stats), 99)
+        _, p_value, perm_stats = _permutation_test(
+            stat_function, 20, 99, batch_size=10, seed=0, alpha=0.5)
+        self.assertEqual(len(perm_stats), 50)
+        self.assertEqual(p_value, 1 / 51)
+
+    def test_rounding_ties(self):
+        # statistics equal up to rounding errors are ties
+        def stat_function(orders):
+            return np.where(orders[:, 0] == 0, 0.3, 0.1 + 0.2)
+
+        for alternative in ('greater', 'less', 'two-sided'):
+            _, p_value, _ = _permutation_test(stat_function, 3, 9, seed=0,
+                                              alternative=alternative)
+            self.assertEqual(p_value, 1.0)
+
+    def test_batched(self):
+        func = _batched(lambda a, b: a[0] * 10 + b[0])
+        obs = func(np.array([[0, 1], [1, 0]]), np.array([[2, 3], [3, 2]]))
+        npt.assert_array_equal(obs, [2.0, 13.0])
+
+
+if __name__ == '__main__':
+    main()
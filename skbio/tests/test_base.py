@@ -8,6 +8,7 @@
 
 import unittest
 
+from skbio import DNA
 from skbio._base import SkbioObject, ElasticLines
 
 
@@ -19,6 +20,22 @@ class TestSkbioObject(unittest.TestCase):
         with self.assertRaises(TypeError):
             Foo()
 
+    def test_io_methods(self):
+        class Foo(SkbioObject):
+            def __str__(self):
+                return 'foo'
+
+        # the read and write methods of classes with registered readers and
+        # writers are monkey-patched when first accessed
+        self.assertIn('fasta', DNA.read.__doc__)
+        self.assertIn('fasta', DNA.write.__doc__)
+        self.assertEqual(DNA('ACGT').write([]), ['>\n', 'ACGT\n'])
+
+        self.assertFalse(hasattr(Foo, 'read'))
+        self.assertFalse(hasattr(Foo(), 'write'))
+        with self.assertRaisesRegex(AttributeError, "'Foo'.*'read'"):
+            Foo.read
+
 
 class TestElasticLines(unittest.TestCase):
     def setUp(self):
@@ -0,0 +1,77 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import json
+import subprocess
+import sys
+import unittest
+
+import skbio
+
+
+def _run(code):
+    """Run `code` in a new interpreter and return the modules it imported.
+
+    The time taken by the imports is measured by the ``ImportSuite``
+    benchmarks rather than here.
+    """
+    script = (
+        "import json, sys\n"
+        "before = set(sys.modules)\n"
+        "%s\n"
+        "print(json.dumps(sorted(set(sys.modules) - before)))\n"
+        % code)
+    output = subprocess.check_output([sys.executable, '-c', script])
+    return set(json.loads(output.decode().splitlines()[-1]))
+
+
+@unittest.skipIf(sys.version_info < (3, 7),
+                 'Objects are imported lazily from Python 3.7')
+class TestLazyImports(unittest.TestCase):
+    # Modules which are slow to import, and which a script that only reads a
+    # FASTA file should not have to import
+    slow_modules = {'IPython', 'matplotlib', 'requests', 'scipy.stats',
+                    'skbio.diversity', 'skbio.tree', 'skbio.stats.distance',
+                    'skbio.io.format.newick'}
+
+    def test_import(self):
+        modules = _run('import skbio')
+        self.assertFalse(
+            {m for m in modules if m.startswith('skbio.')} - {'skbio'})
+        self.assertNotIn('numpy', modules)
+
+    def test_read_fasta(self):
+        modules = _run(
+            "import skbio\n"
+            "list(skbio.io.read(['>seq1\\n', 'ACGT\\n'], format='fasta'))")
+        self.assertIn('skbio.io.format.fasta', modules)
+        self.assertFalse(modules & self.slow_modules)
+
+    def test_import_subpackages_first(self):
+        # subpackages are no longer imported in a fixed order by skbio, so
+        # each of them must be importable first
+        for subpackage in ('skbio.stats.ordination', 'skbio.stats.distance',
+                           'skbio.diversity', 'skbio.tree',
+                           'skbio.alignment'):
+            modules = _run('import %s' % subpackage)
+            self.assertIn(subpackage, modules)
+
+    def test_lazy_attributes(self):
+        self.assertIs(skbio.DNA, skbio.sequence.DNA)
+        self.assertIs(skbio.read, skbio.io.read)
+        self.assertIs(skbio.stats.evolve, sys.modules['skbio.stats.evolve'])
+        for name in skbio.__all__:
+            self.assertIn(name, dir(skbio))
+        with self.assertRaisesRegex(AttributeError, 'no attribute'):
+            skbio.foo
+        with self.assertRaisesRegex(AttributeError, 'no attribute'):
+            skbio.stats.foo
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,220 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import numpy as np
+cimport numpy as np
+cimport cython
+
+
+def _set_logical_row_sums(dm, row_sums, order, m):
+    """Sum the first ``m`` rows of ``dm`` afresh, in logical order
+
+    The columns are summed in the same order as the rows of the distance
+    matrix that was rebuilt after each join, so the sums are exactly the
+    same.
+    """
+    order = np.asarray(order)[:m]
+    logical_dm = np.asarray(dm)[np.ix_(order, order)]
+    np.asarray(row_sums)[order] = logical_dm.sum(axis=1)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def _nj_joins(double[:, ::1] dm, bint disallow_negative_branch_length):
+    """Compute the sequence of joins of neighbor joining
+
+    Parameters
+    ----------
+    dm : np.ndarray of double
+        Square, symmetric and hollow distance matrix between ``n`` (at least
+        3) objects. It is overwritten.
+    disallow_negative_branch_length : bool
+        Whether negative branch lengths, and negative distances from a new
+        node to the other nodes, are set to zero.
+
+    Returns
+    -------
+    joins : np.ndarray of int64
+        Matrix of dimensions ``(n - 3, 2)``. Row ``k`` holds the two nodes
+        joined in node ``n + k``, where nodes ``0`` to ``n - 1`` are the
+        objects of ``dm``.
+    lengths : np.ndarray of double
+        Matrix of dimensions ``(n - 3, 2)``, the lengths of the branches from
+        node ``n + k`` to the two nodes it joins.
+    last_nodes : np.ndarray of int64
+        The three nodes left after all joins, which are connected to a last
+        internal node.
+    last_lengths : np.ndarray of double
+        The lengths of the branches from the last internal node to
+        ``last_nodes``.
+
+    Notes
+    -----
+    The distances between the ``m`` nodes left are kept in the first ``m``
+    rows and columns of ``dm``, so no matrix is allocated after the first
+    join: the node created by a join takes the row of one of the joined
+    nodes, and the last row takes the row of the other one. The row sums are
+    updated rather than recomputed, until four nodes are left. Both pairs of
+    nodes that split four nodes in two then have the same Q value, so which
+    one is joined only depends on rounding. The row sums are summed afresh
+    from then on, so that this is decided as when the distance matrix was
+    rebuilt after each join.
+
+    The nodes are also kept in a logical order, where a new node comes first,
+    followed by the other nodes in their previous order. It determines which
+    pair of nodes is joined when several pairs have the lowest Q value: the
+    pair closest to the top left of the logically ordered matrix, then the
+    one with the lowest row, is joined. This is the order that was used when
+    the distance matrix was rebuilt after each join.
+
+    The pairs are scanned without holding the GIL.
+    """
+    cdef:
+        Py_ssize_t n = dm.shape[0]
+        Py_ssize_t m, step, p, q, k, a, b, u, freed, last
+        Py_ssize_t i, j, best_i, best_j, best_p, best_q, count
+        double q_value, best_q_value, d_ab, d_uk, len_a, len_b
+        double[::1] row_sums
+        np.int64_t[::1] nodes, order, position
+        np.int64_t[:, ::1] joins_view
+        double[:, ::1] lengths_view
+
+    if n < 3 or dm.shape[1] != n:
+        raise ValueError("Distance matrix must be square and at least 3x3.")
+
+    joins = np.empty((n - 3, 2), dtype=np.int64)
+    lengths = np.empty((n - 3, 2), dtype=np.double)
+    joins_view = joins
+    lengths_view = lengths
+
+    row_sums = np.asarray(dm).sum(axis=1)
+    # node in each row, logical order of the rows and position of each row in
+    # this order
+    nodes = np.arange(n, dtype=np.int64)
+    order = np.arange(n, dtype=np.int64)
+    position = np.arange(n, dtype=np.int64)
+
+    with nogil:
+        for step in range(n - 3):
+            m = n - step
+            if m == 4:
+                with gil:
+                    _set_logical_row_sums(dm, row_sums, order, m)
+
+            # find the pair with the lowest Q value, where i and j are the
+            # logical positions of the pair (i > j)
+            best_q_value = 0.0
+            best_i = -1
+            best_j = -1
+            best_p = -1
+            best_q = -1
+            for p in range(1, m):
+                for q in range(p):
+                    q_value = (m - 2) * dm[p, q] - (row_sums[p] +
+                                                    row_sums[q])
+                    if best_i >= 0 and q_value > best_q_value:
+                        continue
+                    i = position[p]
+                    j = position[q]
+                    if i < j:
+                        i, j = j, i
+                    if (best_i < 0 or q_value < best_q_value or
+                            i * i + j * j < best_i * best_i + best_j * best_j
+                            or (i * i + j * j == best_i * best_i +
+                                best_j * best_j and i < best_i)):
+                        best_q_value = q_value
+                        best_i = i
+                        best_j = j
+                        best_p = p
+                        best_q = q
+
+            # the node at the highest logical position comes first
+            if position[best_p] == best_i:
+                a = best_p
+                b = best_q
+            else:
+                a = best_q
+                b = best_p
+
+            # distances from the joined nodes to the new node
+            d_ab = dm[a, b]
+            len_a = 0.5 * d_ab + (row_sums[a] - row_sums[b]) / (2 * (m - 2))
+            if disallow_negative_branch_length and len_a < 0:
+                len_a = 0
+            len_b = d_ab - len_a
+            if disallow_negative_branch_length and len_b < 0:
+                len_b = 0
+            joins_view[step, 0] = nodes[a]
+            joins_view[step, 1] = nodes[b]
+            lengths_view[step, 0] = len_a
+            lengths_view[step, 1] = len_b
+
+            # distances from the other nodes to the new node, which takes the
+            # lowest of the two rows
+            u = min(a, b)
+            freed = max(a, b)
+            row_sums[u] = 0
+            for k in range(m):
+                if k == a or k == b:
+                    continue
+                d_uk = 0.5 * (dm[a, k] + dm[b, k] - d_ab)
+                if disallow_negative_branch_length and d_uk < 0:
+                    d_uk = 0
+                row_sums[k] += d_uk - dm[a, k] - dm[b, k]
+                row_sums[u] += d_uk
+                dm[u, k] = d_uk
+                dm[k, u] = d_uk
+            dm[u, u] = 0
+            nodes[u] = n + step
+
+            # the new node comes first in the logical order
+            count = 0
+            for k in range(m):
+                if order[k] != a and order[k] != b:
+                    order[count] = order[k]
+                    count += 1
+            for k in range(count, 0, -1):
+                order[k] = order[k - 1]
+            order[0] = u
+
+            # move the last row to the row that was freed
+            last = m - 1
+            if freed != last:
+                for k in range(last):
+                    dm[freed, k] = dm[last, k]
+                    dm[k, freed] = dm[k, last]
+                dm[freed, freed] = 0
+                row_sums[freed] = row_sums[last]
+                nodes[freed] = nodes[last]
+                for k in range(last):
+                    if order[k] == last:
+                        order[k] = freed
+                        break
+            for k in range(last):
+                position[order[k]] = k
+
+    # the three nodes left, in logical order
+    _set_logical_row_sums(dm, row_sums, order, 3)
+    a = order[1]
+    b = order[2]
+    u = order[0]
+    d_ab = dm[a, b]
+    len_a = 0.5 * d_ab + (row_sums[a] - row_sums[b]) / 2
+    if disallow_negative_branch_length and len_a < 0:
+        len_a = 0
+    len_b = d_ab - len_a
+    if disallow_negative_branch_length and len_b < 0:
+        len_b = 0
+    d_uk = 0.5 * (dm[a, u] + dm[b, u] - d_ab)
+    if disallow_negative_branch_length and d_uk < 0:
+        d_uk = 0
+
+    last_nodes = np.array([nodes[a], nodes[u], nodes[b]], dtype=np.int64)
+    last_lengths = np.array([len_a, d_uk, len_b], dtype=np.double)
+    return joins, lengths, last_nodes, last_lengths
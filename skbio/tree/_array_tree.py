@@ -0,0 +1,677 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import warnings
+
+import numpy as np
+
+from skbio._base import SkbioObject
+from skbio.stats.distance._base import _write_distance_rows
+from skbio.util import RepresentationWarning
+from skbio.util._decorator import experimental, classonlymethod
+from ._exception import MissingNodeError
+from ._tree import TreeNode, _tip_distance_rows
+from . import _tree
+
+
+def _pointer_jump(pointers, values):
+    """Accumulate values along pointers until a fixed point is reached.
+
+    ``pointers`` must lead every node to a node which points to itself, and
+    whose value is zero, without cycles. Returns the node reached from each
+    node, and the sum of the values of the nodes on the way, including the
+    starting node. The number of steps is logarithmic in the length of the
+    longest path.
+
+    """
+    while True:
+        jumped = pointers[pointers]
+        if np.array_equal(jumped, pointers):
+            return pointers, values
+        values = values + values[pointers]
+        pointers = jumped
+
+
+def _read_only(array):
+    """Return a read-only view of an array."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class ArrayTree(SkbioObject):
+    """Immutable array representation of a tree
+
+    A ``TreeNode`` is a Python object per node, so a tree with millions of
+    tips uses gigabytes of memory and is traversed at Python speed. An
+    ``ArrayTree`` stores the topology and the attributes of the nodes in
+    arrays instead, so that it is compact and that traversals, shearing and
+    distance computations are performed with NumPy.
+
+    Nodes are numbered in preorder: the root is node ``0``, a node comes
+    before its descendants, and the descendants of a node are the nodes that
+    follow it up to the end of its subtree. The children of a node are in the
+    order of their indices.
+
+    Parameters
+    ----------
+    parents : 1D array_like of int
+        Index of the parent of each node, which is lower than the index of the
+        node. The parent of the root is ``-1``.
+    lengths : 1D array_like of float, optional
+        Branch length of each node. Missing branch lengths are ``nan``. All
+        branch lengths are missing by default.
+    supports : 1D array_like of float, optional
+        Support value of each node. Missing support values are ``nan``. All
+        support values are missing by default.
+    names : 1D array_like of str, optional
+        Name of each node. Missing names are ``None``. All names are missing
+        by default.
+
+    Attributes
+    ----------
+    parents
+    first_children
+    next_siblings
+    lengths
+    supports
+    names
+
+    Raises
+    ------
+    ValueError
+        If the nodes are not numbered in preorder, or if the attributes do not
+        have an entry per node.
+
+    See Also
+    --------
+    TreeNode
+
+    Notes
+    -----
+    ``first_children`` and ``next_siblings`` are derived from ``parents``: the
+    first child of a node is its child with the lowest index, and the next
+    sibling of a node is the child of its parent with the next index (``-1``
+    if there is none). The arrays of an ``ArrayTree`` are read-only.
+
+    Examples
+    --------
+    >>> from skbio import TreeNode
+    >>> from skbio.tree import ArrayTree
+    >>> tree = ArrayTree.from_tree(
+    ...     TreeNode.read(["((a:1,b:2)c:3,(d:4,e:5)f:6)root;"]))
+    >>> print(tree)
+    ArrayTree with 7 nodes and 4 tips
+    >>> tree.parents
+    array([-1,  0,  1,  1,  0,  4,  4])
+    >>> tree.names[tree.postorder()]
+    array(['a', 'b', 'c', 'd', 'e', 'f', 'root'], dtype=object)
+
+    Operations of ``TreeNode`` have vectorized counterparts, which identify
+    nodes by their index:
+
+    >>> tree.lowest_common_ancestor(['a', 'b'])
+    1
+    >>> print(tree.shear(['a', 'b', 'd']).to_tree())
+    ((a:1.0,b:2.0)c:3.0,d:10.0)root;
+    <BLANKLINE>
+
+    """
+
+    @experimental(as_of="0.5.5")
+    def __init__(self, parents, lengths=None, supports=None, names=None):
+        parents = np.array(parents, dtype=np.int64, ndmin=1)
+        num_nodes = len(parents)
+        nodes = np.arange(num_nodes)
+        if parents.ndim != 1 or (num_nodes > 0 and parents[0] != -1):
+            raise ValueError("``parents`` must be a vector whose first entry, "
+                             "the parent of the root, is -1.")
+        if ((parents[1:] < 0) | (parents[1:] >= nodes[1:])).any():
+            raise ValueError("The parent of each node must have a lower "
+                             "index than the node.")
+
+        if lengths is None:
+            lengths = np.full(num_nodes, np.nan)
+        if supports is None:
+            supports = np.full(num_nodes, np.nan)
+        if names is None:
+            names = np.full(num_nodes, None, dtype=object)
+        lengths = np.asarray(lengths, dtype=float)
+        supports = np.asarray(supports, dtype=float)
+        names = np.asarray(names, dtype=object)
+        if not (lengths.shape == supports.shape == names.shape ==
+                parents.shape):
+            raise ValueError("``lengths``, ``supports`` and ``names`` must "
+                             "have an entry per node.")
+
+        # children grouped by parent, in increasing order
+        children = nodes[1:][np.argsort(parents[1:], kind='mergesort')]
+        same_parent = parents[children[1:]] == parents[children[:-1]]
+        first_children = np.full(num_nodes, -1, dtype=np.int64)
+        next_siblings = np.full(num_nodes, -1, dtype=np.int64)
+        next_siblings[children[:-1][same_parent]] = children[1:][same_parent]
+        firsts = children[np.r_[True, ~same_parent][:len(children)]]
+        first_children[parents[firsts]] = firsts
+
+        # number of ancestors of each node
+        pointers = np.where(parents >= 0, parents, 0)
+        _, depths = _pointer_jump(pointers, (parents >= 0).astype(np.int64))
+
+        # the subtree of a node ends at its next sibling, or else where the
+        # subtree of its parent ends
+        has_end = next_siblings >= 0
+        if num_nodes > 0:
+            has_end[0] = True
+        pointers = np.where(has_end, nodes, pointers)
+        reached, _ = _pointer_jump(pointers, np.zeros(num_nodes))
+        ends = next_siblings[reached]
+        ends[ends < 0] = num_nodes
+        if (ends[parents[1:]] <= nodes[1:]).any():
+            raise ValueError("The nodes must be numbered in preorder, so that "
+                             "the descendants of each node directly follow "
+                             "it.")
+
+        self._parents = _read_only(parents)
+        self._first_children = _read_only(first_children)
+        self._next_siblings = _read_only(next_siblings)
+        self._lengths = _read_only(lengths)
+        self._supports = _read_only(supports)
+        self._names = _read_only(names)
+        self._depths = depths
+        self._ends = ends
+        self._name_index = None
+
+    @classonlymethod
+    @experimental(as_of="0.5.5")
+    def from_tree(cls, tree):
+        """Convert a ``TreeNode`` to an ``ArrayTree``
+
+        Parameters
+        ----------
+        tree : TreeNode
+            The tree to convert, from this node down.
+
+        Returns
+        -------
+        ArrayTree
+            The converted tree. Missing lengths and supports are ``nan``.
+
+        """
+        parents, lengths, supports, names = [], [], [], []
+        stack = [(tree, -1)]
+        while stack:
+            node, parent = stack.pop()
+            index = len(parents)
+            parents.append(parent)
+            lengths.append(node.length)
+            supports.append(node.support)
+            names.append(node.name)
+            stack.extend((child, index) for child in reversed(node.children))
+
+        names_array = np.empty(len(names), dtype=object)
+        names_array[:] = names
+        return cls(parents, np.array(lengths, dtype=float),
+                   np.array(supports, dtype=float), names_array)
+
+    @experimental(as_of="0.5.5")
+    def to_tree(self):
+        """Convert to a ``TreeNode``
+
+        Returns
+        -------
+        TreeNode
+            The root of the converted tree. Missing lengths and supports are
+            ``None``.
+
+        """
+        # missing lengths and supports are None
+        attributes = []
+        for values in (self._lengths, self._supports):
+            objects = values.astype(object)
+            objects[np.isnan(values)] = None
+            attributes.append(objects.tolist())
+        nodes = [TreeNode(name, length, support)
+                 for name, length, support in zip(self._names.tolist(),
+                                                  *attributes)]
+        for node, parent in zip(nodes[1:], self._parents[1:].tolist()):
+            node.parent = nodes[parent]
+            nodes[parent].children.append(node)
+        return nodes[0] if nodes else TreeNode()
+
+    def __str__(self):
+        return "ArrayTree with %d nodes and %d tips" % (
+            len(self), len(self.tips()))
+
+    def __len__(self):
+        return len(self._parents)
+
+    @property
+    @experimental(as_of="0.5.5")
+    def parents(self):
+        """Index of the parent of each node (``-1`` for the root)"""
+        return self._parents
+
+    @property
+    @experimental(as_of="0.5.5")
+    def first_children(self):
+        """Index of the first child of each node (``-1`` for tips)"""
+        return self._first_children
+
+    @property
+    @experimental(as_of="0.5.5")
+    def next_siblings(self):
+        """Index of the next sibling of each node (``-1`` for last children)
+        """
+        return self._next_siblings
+
+    @property
+    @experimental(as_of="0.5.5")
+    def lengths(self):
+        """Branch length of each node (``nan`` if missing)"""
+        return self._lengths
+
+    @property
+    @experimental(as_of="0.5.5")
+    def supports(self):
+        """Support value of each node (``nan`` if missing)"""
+        return self._supports
+
+    @property
+    @experimental(as_of="0.5.5")
+    def names(self):
+        """Name of each node (``None`` if missing)"""
+        return self._names
+
+    @experimental(as_of="0.5.5")
+    def depths(self):
+        """Number of ancestors of each node
+
+        Returns
+        -------
+        np.ndarray of int
+            The number of ancestors of each node, which is zero for the root.
+
+        """
+        return self._depths.copy()
+
+    @experimental(as_of="0.5.5")
+    def subtree_sizes(self):
+        """Number of nodes in the subtree of each node
+
+        Returns
+        -------
+        np.ndarray of int
+            The number of descendants of each node, plus one. The descendants
+            of node ``i`` are the nodes ``i + 1`` to ``i + size - 1``.
+
+        """
+        return self._ends - np.arange(len(self))
+
+    @experimental(as_of="0.5.5")
+    def root_distances(self):
+        """Distance from the root to each node
+
+        Returns
+        -------
+        np.ndarray of float
+            The sum of the branch lengths from each node to the root, where
+            missing branch lengths are zero. The branch length of the root is
+            not included.
+
+        """
+        num_nodes = len(self)
+        lengths = np.nan_to_num(self._lengths)
+        if num_nodes > 0:
+            lengths[0] = 0.0
+        pointers = np.where(self._parents >= 0, self._parents, 0)
+        return _pointer_jump(pointers, lengths)[1]
+
+    @experimental(as_of="0.5.5")
+    def tips(self):
+        """Indices of the tips, from left to right
+
+        Returns
+        -------
+        np.ndarray of int
+            The nodes without children, in increasing order. As with
+            ``TreeNode.tips``, a tree reduced to its root has no tips.
+
+        """
+        tips = np.flatnonzero(self._first_children < 0)
+        return tips[tips > 0]
+
+    @experimental(as_of="0.5.5")
+    def non_tips(self, include_self=False):
+        """Indices of the internal nodes, in postorder
+
+        Parameters
+        ----------
+        include_self : bool, optional
+            Whether to include the root.
+
+        Returns
+        -------
+        np.ndarray of int
+            The nodes with children, in the order of ``TreeNode.non_tips``.
+
+        """
+        order = self.postorder(include_self)
+        return order[self._first_children[order] >= 0]
+
+    @experimental(as_of="0.5.5")
+    def preorder(self, include_self=True):
+        """Indices of the nodes in preorder
+
+        Parameters
+        ----------
+        include_self : bool, optional
+            Whether to include the root.
+
+        Returns
+        -------
+        np.ndarray of int
+            Each node before its descendants, which is the order of the
+            indices.
+
+        """
+        return np.arange(0 if include_self else 1, len(self))
+
+    @experimental(as_of="0.5.5")
+    def postorder(self, include_self=True):
+        """Indices of the nodes in postorder
+
+        Parameters
+        ----------
+        include_self : bool, optional
+            Whether to include the root.
+
+        Returns
+        -------
+        np.ndarray of int
+            Each node after its descendants.
+
+        Notes
+        -----
+        The nodes which come before a node in postorder are the nodes which
+        come before it in preorder, except for its ancestors, and its
+        descendants. The position of each node is therefore computed directly
+        from its depth and the size of its subtree.
+
+        """
+        nodes = np.arange(len(self))
+        order = np.empty_like(nodes)
+        order[nodes - self._depths + self._ends - nodes - 1] = nodes
+        return order if include_self else order[:-1]
+
+    @experimental(as_of="0.5.5")
+    def levelorder(self, include_self=True):
+        """Indices of the nodes in levelorder
+
+        Parameters
+        ----------
+        include_self : bool, optional
+            Whether to include the root.
+
+        Returns
+        -------
+        np.ndarray of int
+            The nodes by increasing depth, from left to right.
+
+        """
+        order = np.argsort(self._depths, kind='mergesort')
+        return order if include_self else order[1:]
+
+    @experimental(as_of="0.5.5")
+    def find(self, names):
+        """Find nodes by name
+
+        Parameters
+        ----------
+        names : iterable of str
+            Names of nodes. As with ``TreeNode.find``, tips are looked up
+            before internal nodes.
+
+        Returns
+        -------
+        np.ndarray of int
+            The index of the node with each name.
+
+        Raises
+        ------
+        MissingNodeError
+            If a name is not the name of a node.
+
+        """
+        if self._name_index is None:
+            name_index = {}
+            tips = self.tips()
+            non_tips = np.flatnonzero(self._first_children >= 0)
+            for nodes in (non_tips[::-1], tips[::-1]):
+                name_index.update(zip(self._names[nodes], nodes.tolist()))
+            name_index.pop(None, None)
+            self._name_index = name_index
+
+        try:
+            return np.array([self._name_index[name] for name in names],
+                            dtype=np.int64)
+        except KeyError as e:
+            raise MissingNodeError("Node %r is not in self" % e.args[0])
+
+    def _nodes(self, nodes):
+        """Return node indices, given as indices or as names."""
+        nodes = list(nodes)
+        if all(isinstance(node, (int, np.integer)) for node in nodes):
+            nodes = np.array(nodes, dtype=np.int64)
+            if ((nodes < 0) | (nodes >= len(self))).any():
+                raise MissingNodeError("Node indices must be between 0 and "
+                                       "%d." % (len(self) - 1))
+            return nodes
+        return self.find(nodes)
+
+    @experimental(as_of="0.5.5")
+    def lowest_common_ancestor(self, tipnames):
+        """Lowest common ancestor for a list of tips
+
+        Parameters
+        ----------
+        tipnames : list of str or int
+            The names or the indices of the nodes of interest.
+
+        Returns
+        -------
+        int
+            The index of the lowest common ancestor of the passed in nodes.
+
+        Raises
+        ------
+        ValueError
+            If no tips could be found in the tree.
+
+        See Also
+        --------
+        TreeNode.lowest_common_ancestor
+
+        Notes
+        -----
+        The lowest common ancestor is the node with the highest index whose
+        subtree contains the nodes with the lowest and highest indices.
+
+        """
+        nodes = self._nodes(tipnames)
+        if len(nodes) == 0:
+            raise ValueError("No tips found.")
+        first, last = nodes.min(), nodes.max()
+        return int(np.flatnonzero(self._ends[:first + 1] > last)[-1])
+
+    @experimental(as_of="0.5.5")
+    def shear(self, names):
+        """Lop off tips until the tree just has the desired tip names.
+
+        Parameters
+        ----------
+        names : Iterable of str
+            The tip names on the tree to keep
+
+        Returns
+        -------
+        ArrayTree
+            The resulting tree
+
+        Raises
+        ------
+        ValueError
+            If the names do not exist in the tree
+
+        See Also
+        --------
+        TreeNode.shear
+
+        Notes
+        -----
+        As with ``TreeNode.shear``, internal nodes left with a single child
+        are removed, and their branch length is added to the branch length of
+        their child. If the root is left with a single child, the child
+        becomes the root. Unlike ``TreeNode.shear``, the child of a removed
+        node takes its place among the children of its new parent, rather than
+        becoming the last child.
+
+        """
+        names = set(names)
+        tips = self.tips()
+        tip_names = self._names[tips].tolist()
+        if not names.issubset(tip_names):
+            raise ValueError("ids are not a subset of the tree.")
+        keep = np.zeros(len(self), dtype=bool)
+        keep[tips] = [name in names for name in tip_names]
+
+        # the number of kept tips in the subtree of each node
+        counts = np.r_[0, np.cumsum(keep)]
+        counts = counts[self._ends] - counts[:-1]
+        keep = counts > 0
+        keep[0] = True
+        num_children = np.bincount(self._parents[1:][keep[1:]],
+                                   minlength=len(self))
+
+        # nodes with a single kept child are removed, and each kept node is
+        # attached to its lowest kept ancestor, with the branch lengths of the
+        # removed nodes in between
+        removed = num_children == 1
+        removed[0] = False
+        nodes = np.arange(len(self))
+        pointers = np.where(removed, self._parents, nodes)
+        lengths = np.where(removed, np.nan_to_num(self._lengths), 0.0)
+        missing = np.where(removed, np.isnan(self._lengths), 0)
+        reached, added = _pointer_jump(pointers, lengths)
+        _, added_missing = _pointer_jump(pointers, missing)
+
+        keep &= ~removed
+        kept = np.flatnonzero(keep)
+        parents = self._parents[kept[1:]]
+        new_parents = reached[parents]
+        new_lengths = self._lengths[kept]
+        # a length is only missing if the lengths of all the removed nodes
+        # which are added to it are missing too
+        num_added = self._depths[parents] - self._depths[new_parents]
+        summed = np.nan_to_num(new_lengths[1:]) + added[parents]
+        all_missing = (np.isnan(new_lengths[1:]) &
+                       (added_missing[parents] == num_added))
+        new_lengths[1:] = np.where(all_missing, np.nan, summed)
+
+        new_index = np.cumsum(keep) - 1
+        new_parents = np.r_[-1, new_index[new_parents]]
+        supports = self._supports[kept]
+        names = self._names[kept]
+        if num_children[0] == 1:
+            # the root adopts the attributes of its only child
+            return self.__class__(
+                np.r_[-1, new_parents[2:] - 1], new_lengths[1:],
+                supports[1:], names[1:])
+        return self.__class__(new_parents, new_lengths, supports, names)
+
+    @experimental(as_of="0.5.5")
+    def tip_tip_distances(self, endpoints=None, out=None, condensed=False):
+        """Returns distance matrix between pairs of tips, and a tip order.
+
+        By default, all pairwise distances are calculated in the tree. If
+        `endpoints` are specified, then only the distances between those tips
+        are computed.
+
+        Parameters
+        ----------
+        endpoints : list of str or int, or None
+            The names or the indices of the tips.
+        out : str or np.ndarray, optional
+            Where to store the distances, if they should not be held in
+            memory, as in ``TreeNode.tip_tip_distances``.
+        condensed : bool, optional
+            If ``True``, only the distances in condensed form are stored, as
+            in ``TreeNode.tip_tip_distances``.
+
+        Returns
+        -------
+        DistanceMatrix
+            The distance matrix.
+
+        Raises
+        ------
+        ValueError
+            If any of the specified `endpoints` are not tips, or if `out` is
+            an array of the wrong shape
+
+        See Also
+        --------
+        TreeNode.tip_tip_distances
+
+        Notes
+        -----
+        If a node does not have an associated length, 0.0 will be used and a
+        ``RepresentationWarning`` will be raised.
+
+        The Euler tour of the tree, which visits each node and then its
+        parent again after each child, is computed from the preorder indices
+        of the nodes, their depths and the sizes of their subtrees.
+
+        """
+        if endpoints is None:
+            tip_order = self.tips()
+        else:
+            tip_order = self._nodes(endpoints)
+            for node in tip_order[self._first_children[tip_order] >= 0]:
+                raise ValueError("Node with name '%s' is not a tip." %
+                                 self._names[node])
+
+        missing = np.isnan(self._lengths[1:])
+        if missing.any():
+            warnings.warn(
+                "`ArrayTree.tip_tip_distances`: %d nodes do not have an "
+                "associated length, so a length of 0.0 will be used." %
+                missing.sum(), RepresentationWarning)
+
+        # the Euler tour visits a node after the nodes before it in preorder,
+        # and after returning to the parent of each of these nodes but its
+        # ancestors
+        nodes = np.arange(len(self))
+        depths = self._depths
+        visits = 2 * nodes - depths
+        returns = (2 * self._ends - 1 - depths)[1:]
+        num_visits = max(2 * len(self) - 1, 0)
+        visit_nodes = np.empty(num_visits, dtype=np.int64)
+        visit_nodes[visits] = nodes
+        visit_nodes[returns] = self._parents[1:]
+
+        rows = _tip_distance_rows(depths[visit_nodes],
+                                  self.root_distances()[visit_nodes],
+                                  visits[tip_order])
+        num_tips = len(tip_order)
+        if out is None and condensed:
+            out = np.empty(num_tips * (num_tips - 1) // 2)
+        elif out is None:
+            out = np.empty((num_tips, num_tips))
+        return _write_distance_rows(rows, num_tips,
+                                    list(self._names[tip_order]), out,
+                                    _tree._tip_distance_block_size, condensed)
@@ -9,7 +9,6 @@
 import warnings
 from operator import or_, itemgetter
 from copy import deepcopy
-from itertools import combinations
 from functools import reduce
 from collections import defaultdict
 
@@ -17,12 +16,16 @@ import numpy as np
 from scipy.stats import pearsonr
 
 from skbio._base import SkbioObject
-from skbio.stats.distance import DistanceMatrix
+from skbio.stats.distance._base import _write_distance_rows
 from ._exception import (NoLengthError, DuplicateNodeError, NoParentError,
                          MissingNodeError, TreeError)
 from skbio.util import RepresentationWarning
 from skbio.util._decorator import experimental, classonlymethod
 
+# The number of tip to tip distances computed at a time by
+# ``TreeNode.tip_tip_distances``
+_tip_distance_block_size = 2 ** 20
+
 
 def distance_from_r(m1, m2):
     r"""Estimates distance as (1-r)/2: neg correl = max distance
@@ -43,6 +46,71 @@ def distance_from_r(m1, m2):
     return (1-pearsonr(m1.data.flat, m2.data.flat)[0])/2
 
 
+def _tip_distance_rows(visit_levels, visit_distances, tip_visits):
+    """Prepare the computation of distances between tips from an Euler tour.
+
+    Parameters
+    ----------
+    visit_levels : array_like of int
+        Number of ancestors of the node at each visit of an Euler tour of a
+        tree.
+    visit_distances : array_like of float
+        Distance from the root to the node at each visit.
+    tip_visits : array_like of int
+        A visit of each tip whose distances are computed.
+
+    Returns
+    -------
+    function
+        Function which takes the first and last (exclusive) tip of a block of
+        `tip_visits`, and returns the distances from these tips to the tips
+        which follow them, in condensed form.
+
+    """
+    visit_levels = np.asarray(visit_levels)
+    visit_distances = np.asarray(visit_distances)
+    num_visits = len(visit_levels)
+
+    # sparse_table[k, i] is the visit with the lowest level among the
+    # 2 ** k visits starting at i
+    num_powers = max(1, num_visits.bit_length())
+    sparse_table = np.zeros((num_powers, num_visits), dtype=np.intp)
+    sparse_table[0] = np.arange(num_visits)
+    for k in range(1, num_powers):
+        half = 2 ** (k - 1)
+        size = num_visits - 2 * half + 1
+        left = sparse_table[k - 1, :size]
+        right = sparse_table[k - 1, half:half + size]
+        sparse_table[k, :size] = np.where(
+            visit_levels[left] <= visit_levels[right], left, right)
+
+    tip_visits = np.asarray(tip_visits, dtype=np.intp)
+    tip_distances = visit_distances[tip_visits]
+    num_tips = len(tip_visits)
+
+    def rows(start, stop):
+        # the lowest common ancestor of two tips is the node with the
+        # lowest level visited between their first visits
+        first = np.minimum.outer(tip_visits[start:stop],
+                                 tip_visits[start:])
+        last = np.maximum.outer(tip_visits[start:stop],
+                                tip_visits[start:])
+        k = np.frexp(last - first + 1)[1] - 1
+        left = sparse_table[k, first]
+        right = sparse_table[k, last - (1 << k) + 1]
+        ancestors = np.where(visit_levels[left] <= visit_levels[right],
+                             left, right)
+        distances = (np.add.outer(tip_distances[start:stop],
+                                  tip_distances[start:]) -
+                     2 * visit_distances[ancestors])
+        # keep the distances to the tips which follow each tip
+        following = (np.arange(start, num_tips) >
+                     np.arange(start, stop)[:, np.newaxis])
+        return distances[following]
+
+    return rows
+
+
 class TreeNode(SkbioObject):
     r"""Representation of a node within a tree
 
@@ -2429,7 +2497,7 @@ class TreeNode(SkbioObject):
         return longest, tips
 
     @experimental(as_of="0.4.0")
-    def tip_tip_distances(self, endpoints=None):
+    def tip_tip_distances(self, endpoints=None, out=None, condensed=False):
         """Returns distance matrix between pairs of tips, and a tip order.
 
         By default, all pairwise distances are calculated in the tree. If
@@ -2440,16 +2508,37 @@ class TreeNode(SkbioObject):
         ----------
         endpoints : list of TreeNode or str, or None
             A list of TreeNode objects or names of TreeNode objects
+        out : str or np.ndarray, optional
+            Where to store the distances, if they should not be held in
+            memory. If a path, a ``.npy`` file storing the distances in square
+            form (or condensed form, see `condensed`) is created at this path.
+            Otherwise, an array of floats of
+            shape ``(n, n)`` or ``(n * (n - 1) // 2,)``, where ``n`` is the
+            number of tips, storing the distances in square or condensed form
+            (typically a ``numpy.memmap``, see
+            ``numpy.lib.format.open_memmap``). The distances are computed and
+            written to ``out`` in blocks of rows, so that only a block of
+            distances is held in memory at a time.
+        condensed : bool, optional
+            If ``True``, the distance matrix only stores the distances in
+            condensed form, which halves the memory it uses (see
+            ``DistanceMatrix``). If `out` is a path, the file stores the
+            distances in condensed form. Ignored if `out` is an array, whose
+            shape determines the form.
 
         Returns
         -------
         DistanceMatrix
-            The distance matrix
+            The distance matrix. If `out` is provided, the distance matrix
+            uses the stored distances without copying them (a path is
+            memory-mapped in read-only mode). Distances stored in condensed
+            form are kept in condensed form (see ``DistanceMatrix``).
 
         Raises
         ------
         ValueError
-            If any of the specified `endpoints` are not tips
+            If any of the specified `endpoints` are not tips, or if `out` is
+            an array of the wrong shape
 
         See Also
         --------
@@ -2461,6 +2550,18 @@ class TreeNode(SkbioObject):
         If a node does not have an associated length, 0.0 will be used and a
         ``RepresentationWarning`` will be raised.
 
+        The distance between two tips is the sum of their distances to the
+        root, minus twice the distance from the root to their lowest common
+        ancestor. The lowest common ancestors of whole blocks of pairs of tips
+        are found at once, as range minimum queries over an Euler tour of the
+        tree answered by a sparse table [1]_.
+
+        References
+        ----------
+        .. [1] Bender, M. A., & Farach-Colton, M. (2000). The LCA problem
+           revisited. In Latin American Symposium on Theoretical Informatics
+           (pp. 88-94). Springer.
+
         Examples
         --------
         >>> from skbio import TreeNode
@@ -2477,9 +2578,8 @@ class TreeNode(SkbioObject):
          [ 15.  16.   9.   0.]]
 
         """
-        all_tips = list(self.tips())
         if endpoints is None:
-            tip_order = all_tips
+            tip_order = list(self.tips())
         else:
             tip_order = [self.find(n) for n in endpoints]
             for n in tip_order:
@@ -2487,57 +2587,59 @@ class TreeNode(SkbioObject):
                     raise ValueError("Node with name '%s' is not a tip." %
                                      n.name)
 
-        # linearize all tips in postorder
-        # .__start, .__stop compose the slice in tip_order.
-        for i, node in enumerate(all_tips):
-            node.__start, node.__stop = i, i + 1
-
-        # the result map provides index in the result matrix
-        result_map = {n.__start: i for i, n in enumerate(tip_order)}
-        num_all_tips = len(all_tips)  # total number of tips
-        num_tips = len(tip_order)  # total number of tips in result
-        result = np.zeros((num_tips, num_tips), float)  # tip by tip matrix
-        distances = np.zeros((num_all_tips), float)  # dist from tip to tip
-
-        def update_result():
-            # set tip_tip distance between tips of different child
-            for child1, child2 in combinations(node.children, 2):
-                for tip1 in range(child1.__start, child1.__stop):
-                    if tip1 not in result_map:
-                        continue
-                    t1idx = result_map[tip1]
-                    for tip2 in range(child2.__start, child2.__stop):
-                        if tip2 not in result_map:
-                            continue
-                        t2idx = result_map[tip2]
-                        result[t1idx, t2idx] = distances[
-                            tip1] + distances[tip2]
-
-        for node in self.postorder():
-            if not node.children:
+        rows = self._tip_tip_distance_rows(tip_order)
+        num_tips = len(tip_order)
+        if out is None and condensed:
+            out = np.empty(num_tips * (num_tips - 1) // 2)
+        elif out is None:
+            out = np.empty((num_tips, num_tips))
+        return _write_distance_rows(rows, num_tips,
+                                    [n.name for n in tip_order], out,
+                                    _tip_distance_block_size, condensed)
+
+    def _tip_tip_distance_rows(self, tip_order):
+        """Prepare the computation of distances between tips.
+
+        Returns a function which takes the first and last (exclusive) tip of
+        a block of `tip_order`, and returns the distances from these tips to
+        the tips which follow them in `tip_order`, in condensed form.
+
+        """
+        # Walk an Euler tour of the tree: every node is visited when it is
+        # first reached, and its parent is visited again after it. The level
+        # (number of ancestors) and the distance from self are recorded for
+        # each visit, and the first visit of each tip is remembered.
+        visit_levels = [0]
+        visit_distances = [0.0]
+        first_visits = {self: 0}
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if stack:
+                    parent = stack[-1][0]
+                    visit_levels.append(len(stack) - 1)
+                    visit_distances.append(
+                        visit_distances[first_visits[parent]])
                 continue
-            # subtree with solved child wedges
-            # can possibly use np.zeros
-            starts, stops = [], []  # to calc ._start and ._stop for curr node
-            for child in node.children:
-                length = child.length
-                if length is None:
-                    warnings.warn(
-                        "`TreeNode.tip_tip_distances`: Node with name %r does "
-                        "not have an associated length, so a length of 0.0 "
-                        "will be used." % child.name, RepresentationWarning)
-                    length = 0.0
-                distances[child.__start:child.__stop] += length
-
-                starts.append(child.__start)
-                stops.append(child.__stop)
-
-            node.__start, node.__stop = min(starts), max(stops)
-
-            if len(node.children) > 1:
-                update_result()
-
-        return DistanceMatrix(result + result.T, [n.name for n in tip_order])
+
+            length = child.length
+            if length is None:
+                warnings.warn(
+                    "`TreeNode.tip_tip_distances`: Node with name %r does "
+                    "not have an associated length, so a length of 0.0 "
+                    "will be used." % child.name, RepresentationWarning)
+                length = 0.0
+            first_visits[child] = len(visit_levels)
+            visit_levels.append(len(stack))
+            visit_distances.append(
+                visit_distances[first_visits[node]] + length)
+            stack.append((child, iter(child.children)))
+
+        tip_visits = [first_visits[n] for n in tip_order]
+        return _tip_distance_rows(visit_levels, visit_distances, tip_visits)
 
     @experimental(as_of="0.4.0")
     def compare_rfd(self, other, proportion=False):
@@ -0,0 +1,218 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+
+from skbio import DistanceMatrix, TreeNode
+from skbio.tree import ArrayTree, MissingNodeError
+from skbio.util import RepresentationWarning
+
+
+class ArrayTreeTests(TestCase):
+    def setUp(self):
+        self.newick = ("((a:1,b:2,(c:0.5)d:0)e:3,((f:0.25,g:1)h:-1,i:4,j:0)"
+                       "k:2,l:7)m;")
+        self.tree = TreeNode.read(io.StringIO(self.newick))
+        self.array_tree = ArrayTree.from_tree(self.tree)
+
+    def test_init(self):
+        tree = ArrayTree([-1, 0, 1, 1, 0], lengths=[np.nan, 1, 2, 3, 4],
+                         names=['r', 'x', 'a', 'b', 'c'])
+        npt.assert_array_equal(tree.parents, [-1, 0, 1, 1, 0])
+        npt.assert_array_equal(tree.first_children, [1, 2, -1, -1, -1])
+        npt.assert_array_equal(tree.next_siblings, [-1, 4, 3, -1, -1])
+        npt.assert_array_equal(tree.lengths, [np.nan, 1, 2, 3, 4])
+        self.assertTrue(np.isnan(tree.supports).all())
+        npt.assert_array_equal(tree.names, ['r', 'x', 'a', 'b', 'c'])
+        self.assertEqual(len(tree), 5)
+        self.assertEqual(str(tree), 'ArrayTree with 5 nodes and 3 tips')
+
+        tree = ArrayTree([-1])
+        self.assertEqual(str(tree), 'ArrayTree with 1 nodes and 0 tips')
+        npt.assert_array_equal(tree.names, [None])
+
+    def test_init_invalid_input(self):
+        with self.assertRaisesRegex(ValueError, 'parent of the root'):
+            ArrayTree([0, 0])
+        with self.assertRaisesRegex(ValueError, 'lower index'):
+            ArrayTree([-1, 0, 2])
+        with self.assertRaisesRegex(ValueError, 'lower index'):
+            ArrayTree([-1, -1])
+        with self.assertRaisesRegex(ValueError, 'preorder'):
+            ArrayTree([-1, 0, 1, 0, 2])
+        with self.assertRaisesRegex(ValueError, 'entry per node'):
+            ArrayTree([-1, 0], lengths=[1.0])
+
+    def test_immutable(self):
+        lengths = np.arange(5.0)
+        tree = ArrayTree([-1, 0, 1, 1, 0], lengths=lengths)
+        for array in (tree.parents, tree.first_children, tree.next_siblings,
+                      tree.lengths, tree.supports, tree.names):
+            with self.assertRaises(ValueError):
+                array[0] = 1
+        # the arrays which are passed in are left writeable
+        lengths[0] = 1.0
+
+    def test_from_tree_to_tree(self):
+        tree = self.array_tree
+        self.assertEqual([n.name for n in self.tree.preorder()],
+                         list(tree.names))
+        npt.assert_array_equal(tree.parents,
+                               [-1, 0, 1, 1, 1, 4, 0, 6, 7, 7, 6, 6, 0])
+        self.assertEqual(str(tree.to_tree()), str(self.tree))
+
+        newick = "((a,b:1[0.5])c[0.9]:2,:3)root:1;"
+        tree = TreeNode.read(io.StringIO(newick))
+        obs = ArrayTree.from_tree(tree).to_tree()
+        self.assertEqual(str(obs), str(tree))
+        for exp_node, obs_node in zip(tree.preorder(), obs.preorder()):
+            self.assertEqual(obs_node.name, exp_node.name)
+            self.assertEqual(obs_node.length, exp_node.length)
+            self.assertEqual(obs_node.support, exp_node.support)
+
+    def test_traversals(self):
+        tree = self.array_tree
+        for method in ('postorder', 'preorder', 'levelorder'):
+            for include_self in (True, False):
+                exp = [n.name for n in getattr(self.tree, method)(
+                    include_self=include_self)]
+                obs = getattr(tree, method)(include_self=include_self)
+                self.assertEqual(list(tree.names[obs]), exp)
+        self.assertEqual(list(tree.names[tree.tips()]),
+                         [n.name for n in self.tree.tips()])
+        for include_self in (True, False):
+            self.assertEqual(
+                list(tree.names[tree.non_tips(include_self=include_self)]),
+                [n.name for n in self.tree.non_tips(
+                    include_self=include_self)])
+
+    def test_depths_sizes_distances(self):
+        tree = self.array_tree
+        npt.assert_array_equal(tree.depths(),
+                               [0, 1, 2, 2, 2, 3, 1, 2, 3, 3, 2, 2, 1])
+        npt.assert_array_equal(tree.subtree_sizes(),
+                               [13, 5, 1, 1, 2, 1, 6, 3, 1, 1, 1, 1, 1])
+        exp = [self.tree.distance(n) for n in self.tree.preorder()]
+        npt.assert_almost_equal(tree.root_distances(), exp)
+
+    def test_find(self):
+        tree = ArrayTree.from_tree(TreeNode.read(io.StringIO(
+            "((a,b)c,(a,d)c)a;")))
+        # tips are looked up before internal nodes
+        npt.assert_array_equal(tree.find(['a', 'c', 'd']), [2, 1, 6])
+        with self.assertRaises(MissingNodeError):
+            tree.find(['x'])
+
+    def test_lowest_common_ancestor(self):
+        for names in (['a', 'c'], ['f', 'g'], ['f', 'i', 'j'], ['c', 'l'],
+                      ['g']):
+            obs = self.array_tree.lowest_common_ancestor(names)
+            exp = self.tree.lowest_common_ancestor(names)
+            self.assertEqual(self.array_tree.names[obs], exp.name)
+        self.assertEqual(self.array_tree.lowest_common_ancestor([8, 10]), 6)
+        # a node is the lowest common ancestor of itself and its descendants
+        self.assertEqual(self.array_tree.lowest_common_ancestor(['h', 'f']),
+                         7)
+
+        with self.assertRaises(ValueError):
+            self.array_tree.lowest_common_ancestor([])
+        with self.assertRaises(MissingNodeError):
+            self.array_tree.lowest_common_ancestor(['a', 'x'])
+        with self.assertRaises(MissingNodeError):
+            self.array_tree.lowest_common_ancestor([1, 13])
+
+    def test_shear(self):
+        tree = self.array_tree
+        obs = tree.shear(['a', 'c', 'f', 'l'])
+        self.assertEqual(str(obs.to_tree()),
+                         "((a:1.0,c:0.5)e:3.0,f:1.25,l:7.0)m;\n")
+
+        # the root adopts the attributes of its only child
+        obs = tree.shear(['f', 'g'])
+        self.assertEqual(str(obs.to_tree()), "(f:0.25,g:1.0)h:1.0;\n")
+        obs = tree.shear(['c'])
+        self.assertEqual(str(obs.to_tree()), "c:3.5;\n")
+        obs = tree.shear([])
+        self.assertEqual(str(obs.to_tree()), "m;\n")
+
+        # a length is missing if all the lengths added to it are missing
+        tree = ArrayTree.from_tree(TreeNode.read(io.StringIO(
+            "(((a)b,c)d,((e)f:1,g)h)root;")))
+        obs = tree.shear(['a', 'e'])
+        self.assertEqual(str(obs.to_tree()), "(a,e:1.0)root;\n")
+
+        with self.assertRaises(ValueError):
+            tree.shear(['a', 'x'])
+        with self.assertRaises(ValueError):
+            tree.shear(['b'])
+
+    def test_tip_tip_distances(self):
+        exp = self.tree.tip_tip_distances()
+        obs = self.array_tree.tip_tip_distances()
+        self.assertEqual(obs.ids, exp.ids)
+        npt.assert_almost_equal(obs.data, exp.data)
+
+        endpoints = ['i', 'c', 'a', 'l', 'g']
+        exp = self.tree.tip_tip_distances(endpoints)
+        for obs_endpoints in (endpoints, self.array_tree.find(endpoints)):
+            obs = self.array_tree.tip_tip_distances(obs_endpoints)
+            self.assertEqual(obs.ids, exp.ids)
+            npt.assert_almost_equal(obs.data, exp.data)
+
+        with self.assertRaises(ValueError):
+            self.array_tree.tip_tip_distances(['a', 'e'])
+
+    def test_tip_tip_distances_missing_length(self):
+        tree = ArrayTree.from_tree(TreeNode.read(io.StringIO(
+            "((a,b:6)c:4,(d,e:0)f);")))
+        exp = TreeNode.read(io.StringIO(
+            "((a:0,b:6)c:4,(d:0,e:0)f:0);")).tip_tip_distances()
+        obs = npt.assert_warns(RepresentationWarning,
+                               tree.tip_tip_distances)
+        self.assertEqual(obs, exp)
+
+    def test_tip_tip_distances_condensed(self):
+        tree = ArrayTree.from_tree(TreeNode.read(io.StringIO(
+            "((a:1,b:2)c:3,(d:4,e:5)f:6)root;")))
+        obs = tree.tip_tip_distances(condensed=True)
+        self.assertEqual(obs, tree.tip_tip_distances())
+        self.assertTrue(obs._condensed)
+
+    def test_tip_tip_distances_out(self):
+        tree = ArrayTree.from_tree(TreeNode.read(io.StringIO(
+            "((a:1,b:2)c:3,(d:4,e:5)f:6)root;")))
+        exp = DistanceMatrix([[0, 3, 14, 15], [3, 0, 15, 16],
+                              [14, 15, 0, 9], [15, 16, 9, 0]], list('abde'))
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+
+        path = os.path.join(tmpdir, 'dm.npy')
+        obs = tree.tip_tip_distances(out=path)
+        self.assertEqual(obs, exp)
+        npt.assert_array_equal(np.load(path), exp.data)
+
+        obs = tree.tip_tip_distances(out=path, condensed=True)
+        self.assertEqual(obs, exp)
+        npt.assert_array_equal(np.load(path), exp.condensed_form())
+
+        out = np.ones(6)
+        obs = tree.tip_tip_distances(out=out)
+        self.assertEqual(obs, exp)
+        self.assertTrue(np.shares_memory(obs.condensed_form(), out))
+        npt.assert_array_equal(out, exp.condensed_form())
+
+
+if __name__ == '__main__':
+    main()
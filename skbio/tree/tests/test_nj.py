@@ -9,10 +9,11 @@
 import io
 from unittest import TestCase, main
 
+import numpy as np
+import numpy.testing as npt
+
 from skbio import DistanceMatrix, TreeNode, nj
-from skbio.tree._nj import (
-    _compute_q, _compute_collapsed_dm, _lowest_index,
-    _pair_members_to_new_node)
+from skbio.tree.__nj import _nj_joins
 
 
 class NjTests(TestCase):
@@ -117,78 +118,72 @@ class NjTests(TestCase):
         expected_str = "(b:2.000000, a:1.000000, c:1.000000);"
         self.assertEqual(nj(dm, result_constructor=str), expected_str)
 
+    def test_nj_four_nodes_tie(self):
+        # when four nodes are left, the two pairs of nodes that split them
+        # have the same Q value up to rounding, and the pair is chosen as the
+        # distance matrix rebuilt after each join did
+        data = [[0.0, 12.92, 9.34, 8.95, 15.13, 7.13],
+                [12.92, 0.0, 8.61, 11.79, 7.19, 17.11],
+                [9.34, 8.61, 0.0, 13.07, 12.59, 9.42],
+                [8.95, 11.79, 13.07, 0.0, 17.67, 11.72],
+                [15.13, 7.19, 12.59, 17.67, 0.0, 13.82],
+                [7.13, 17.11, 9.42, 11.72, 13.82, 0.0]]
+        dm = DistanceMatrix(data, list('abcdef'))
+        expected_str = ("((c:3.235000, (e:4.692500, b:2.497500):3.770000)"
+                        ":2.513750, (f:4.447500, a:2.682500):0.683750, "
+                        "d:6.086250);")
+        self.assertEqual(nj(dm, result_constructor=str), expected_str)
+
     def test_nj_error(self):
         data = [[0, 3],
                 [3, 0]]
         dm = DistanceMatrix(data, list('ab'))
         self.assertRaises(ValueError, nj, dm)
 
-    def test_compute_q(self):
-        expected_data = [[0, -50, -38, -34, -34],
-                         [-50,   0, -38, -34, -34],
-                         [-38, -38,   0, -40, -40],
-                         [-34, -34, -40,   0, -48],
-                         [-34, -34, -40, -48,   0]]
-        expected_ids = list('abcde')
-        expected = DistanceMatrix(expected_data, expected_ids)
-        self.assertEqual(_compute_q(self.dm1), expected)
-
-        data = [[0, 3, 2],
-                [3, 0, 3],
-                [2, 3, 0]]
-        dm = DistanceMatrix(data, list('abc'))
-        # computed this manually
-        expected_data = [[0, -8, -8],
-                         [-8,  0, -8],
-                         [-8, -8,  0]]
-        expected = DistanceMatrix(expected_data, list('abc'))
-        self.assertEqual(_compute_q(dm), expected)
-
-    def test_compute_collapsed_dm(self):
-        expected_data = [[0,  7,  7,  6],
-                         [7,  0,  8,  7],
-                         [7,  8,  0,  3],
-                         [6,  7,  3,  0]]
-        expected_ids = ['x', 'c', 'd', 'e']
-        expected1 = DistanceMatrix(expected_data, expected_ids)
-        self.assertEqual(_compute_collapsed_dm(self.dm1, 'a', 'b', True, 'x'),
-                         expected1)
-
-        # computed manually
-        expected_data = [[0, 4, 3],
-                         [4, 0, 3],
-                         [3, 3, 0]]
-        expected_ids = ['yy', 'd', 'e']
-        expected2 = DistanceMatrix(expected_data, expected_ids)
-        self.assertEqual(
-            _compute_collapsed_dm(expected1, 'x', 'c', True, 'yy'), expected2)
-
-    def test_lowest_index(self):
-        self.assertEqual(_lowest_index(self.dm1), (4, 3))
-        self.assertEqual(_lowest_index(_compute_q(self.dm1)), (1, 0))
-
-    def test_pair_members_to_new_node(self):
-        self.assertEqual(_pair_members_to_new_node(self.dm1, 'a', 'b', True),
-                         (2, 3))
-        self.assertEqual(_pair_members_to_new_node(self.dm1, 'a', 'c', True),
-                         (4, 5))
-        self.assertEqual(_pair_members_to_new_node(self.dm1, 'd', 'e', True),
-                         (2, 1))
-
-    def test_pair_members_to_new_node_zero_branch_length(self):
+    def test_nj_does_not_modify_dm(self):
+        data = self.dm1.data.copy()
+        nj(self.dm1)
+        npt.assert_array_equal(self.dm1.data, data)
+
+    def test_nj_joins(self):
+        joins, lengths, last_nodes, last_lengths = _nj_joins(
+            self.dm1.data.copy(), True)
+        # a and b are joined in node 5, then c and node 5 in node 6
+        npt.assert_array_equal(joins, [[1, 0], [2, 5]])
+        npt.assert_array_equal(lengths, [[3, 2], [4, 3]])
+        npt.assert_array_equal(last_nodes, [3, 6, 4])
+        npt.assert_array_equal(last_lengths, [2, 2, 1])
+
+    def test_nj_joins_ties(self):
+        # every pair has the same Q value, so the first two nodes are joined
+        data = np.ones((4, 4)) - np.eye(4)
+        joins, lengths, last_nodes, last_lengths = _nj_joins(data, True)
+        npt.assert_array_equal(joins, [[1, 0]])
+        npt.assert_array_equal(lengths, [[0.5, 0.5]])
+        npt.assert_array_equal(last_nodes, [2, 4, 3])
+        npt.assert_array_equal(last_lengths, [0.5, 0, 0.5])
+
+    def test_nj_joins_zero_branch_length(self):
         # the values in this example don't really make sense
         # (I'm not sure how you end up with these distances between
         # three sequences), but that doesn't really matter for the sake
         # of this test
-        data = [[0, 4, 2],
-                [4, 0, 38],
-                [2, 38, 0]]
-        ids = ['a', 'b', 'c']
-        dm = DistanceMatrix(data, ids)
-        self.assertEqual(_pair_members_to_new_node(dm, 'a', 'b', True), (0, 4))
+        data = np.array([[0, 4, 2],
+                         [4, 0, 38],
+                         [2, 38, 0]], dtype=float)
+        joins, _, last_nodes, last_lengths = _nj_joins(data.copy(), True)
+        self.assertEqual(joins.shape, (0, 2))
+        npt.assert_array_equal(last_nodes, [1, 0, 2])
+        npt.assert_array_equal(last_lengths, [20, 0, 18])
         # this makes it clear why negative branch lengths don't make sense...
-        self.assertEqual(
-            _pair_members_to_new_node(dm, 'a', 'b', False), (-16, 20))
+        _, _, _, last_lengths = _nj_joins(data.copy(), False)
+        npt.assert_array_equal(last_lengths, [20, -16, 18])
+
+    def test_nj_joins_error(self):
+        with self.assertRaises(ValueError):
+            _nj_joins(np.zeros((2, 2)), True)
+        with self.assertRaises(ValueError):
+            _nj_joins(np.zeros((3, 4)), True)
 
 
 if __name__ == "__main__":
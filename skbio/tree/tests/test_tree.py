@@ -7,6 +7,9 @@
 # ----------------------------------------------------------------------------
 
 import io
+import os
+import shutil
+import tempfile
 from unittest import TestCase, main
 from collections import defaultdict
 
@@ -14,6 +17,7 @@ import numpy as np
 import numpy.testing as npt
 from scipy.stats import pearsonr
 
+import skbio.tree._tree
 from skbio import DistanceMatrix, TreeNode
 from skbio.tree import (DuplicateNodeError, NoLengthError,
                         TreeError, MissingNodeError, NoParentError)
@@ -819,6 +823,86 @@ class TreeTests(TestCase):
         t_dm = npt.assert_warns(RepresentationWarning, t.tip_tip_distances)
         self.assertEqual(t_dm, exp_t_dm)
 
+    def test_tip_tip_distances_pairwise(self):
+        # a multifurcating tree, with a single-child node and negative and
+        # zero lengths
+        t = TreeNode.read(io.StringIO(
+            "((a:1,b:2,(c:0.5)d:0)e:3,((f:0.25,g:1)h:-1,i:4,j:0)k:2,l:7)m;"))
+        tips = list(t.tips())
+        names = [n.name for n in tips]
+        exp = np.array([[n1.distance(n2) for n2 in tips] for n1 in tips])
+        endpoints = ['i', 'c', 'a', 'l', 'g']
+        exp_endpoints = exp[np.ix_([names.index(n) for n in endpoints],
+                                   [names.index(n) for n in endpoints])]
+
+        block_size = skbio.tree._tree._tip_distance_block_size
+        self.addCleanup(setattr, skbio.tree._tree, '_tip_distance_block_size',
+                        block_size)
+        # blocks of one, two and all rows
+        for size in (len(tips), 2 * len(tips), block_size):
+            skbio.tree._tree._tip_distance_block_size = size
+            obs = t.tip_tip_distances()
+            npt.assert_almost_equal(obs.data, exp)
+            self.assertEqual(obs.ids, tuple(names))
+
+            obs = t.tip_tip_distances(endpoints=endpoints)
+            npt.assert_almost_equal(obs.data, exp_endpoints)
+            self.assertEqual(obs.ids, tuple(endpoints))
+
+    def test_tip_tip_distances_subtree(self):
+        t = TreeNode.read(io.StringIO("((a:1,b:2)c:3,(d:4,e:5)f:6)root;"))
+        obs = t.find('f').tip_tip_distances()
+        self.assertEqual(obs, DistanceMatrix([[0, 9], [9, 0]], ['d', 'e']))
+
+        obs = t.find('a').tip_tip_distances(endpoints=['a'])
+        self.assertEqual(obs, DistanceMatrix([[0]], ['a']))
+
+    def test_tip_tip_distances_condensed(self):
+        t = TreeNode.read(io.StringIO("((a:1,b:2)c:3,(d:4,e:5)f:6)root;"))
+        exp = t.tip_tip_distances()
+        obs = t.tip_tip_distances(condensed=True)
+        self.assertEqual(obs, exp)
+        self.assertTrue(obs._condensed)
+
+        # the shape of an output array determines the form
+        obs = t.tip_tip_distances(out=np.ones((4, 4)), condensed=True)
+        self.assertEqual(obs, exp)
+        self.assertFalse(obs._condensed)
+
+    def test_tip_tip_distances_out(self):
+        t = TreeNode.read(io.StringIO("((a:1,b:2)c:3,(d:4,e:5)f:6)root;"))
+        exp = t.tip_tip_distances()
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+
+        path = os.path.join(tmpdir, 'dm.npy')
+        obs = t.tip_tip_distances(out=path)
+        self.assertEqual(obs, exp)
+        self.assertFalse(obs.data.flags.writeable)
+        npt.assert_array_equal(np.load(path), exp.data)
+
+        obs = t.tip_tip_distances(out=path, condensed=True)
+        self.assertEqual(obs, exp)
+        self.assertTrue(obs._condensed)
+        self.assertIsInstance(obs.condensed_form().base, np.memmap)
+        npt.assert_array_equal(np.load(path), exp.condensed_form())
+
+        # condensed distances are used as is, without building a square form
+        out = np.ones(6)
+        obs = t.tip_tip_distances(out=out)
+        self.assertEqual(obs, exp)
+        self.assertTrue(obs._condensed)
+        self.assertTrue(np.shares_memory(obs.condensed_form(), out))
+        npt.assert_array_equal(out, exp.condensed_form())
+
+        out = np.ones((4, 4))
+        obs = t.tip_tip_distances(out=out)
+        self.assertEqual(obs, exp)
+        self.assertTrue(np.shares_memory(obs.data, out))
+
+        with self.assertRaises(ValueError):
+            t.tip_tip_distances(out=np.ones((3, 3)))
+
     def test_neighbors(self):
         """Get neighbors of a node"""
         t = TreeNode.read(io.StringIO("((a,b)c,(d,e)f);"))
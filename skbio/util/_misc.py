@@ -8,6 +8,7 @@
 
 import hashlib
 import inspect
+import os
 from types import FunctionType
 
 from ._decorator import experimental
@@ -74,6 +75,23 @@ class MiniRegistry(dict):
         setattr(obj, name, f2)
 
 
+def resolve_n_jobs(n_jobs):
+    """Resolve `n_jobs` into a positive number of workers.
+
+    ``None`` and ``1`` both mean a single worker. Negative values count back
+    from the number of available CPUs, so ``-1`` uses all of them, ``-2`` all
+    but one, and so on.
+
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs == 0:
+        raise ValueError("`n_jobs` cannot be 0.")
+    if n_jobs < 0:
+        n_jobs = max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return n_jobs
+
+
 def chunk_str(s, n, char):
     """Insert `char` character every `n` characters in string `s`.
 
@@ -12,7 +12,8 @@ import sys
 
 import numpy as np
 import numpy.testing as npt
-import pandas.util.testing as pdt
+# pandas.util.testing is imported by the functions which use it, as it is
+# slow to import
 
 from ._decorator import experimental
 
@@ -146,6 +147,8 @@ def assert_ordination_results_equal(left, right, ignore_method_names=False,
 
 
 def _assert_series_equal(left_s, right_s, ignore_index=False, decimal=7):
+    import pandas.util.testing as pdt
+
     # assert_series_equal doesn't like None...
     if left_s is None or right_s is None:
         assert left_s is None and right_s is None
@@ -159,6 +162,8 @@ def _assert_series_equal(left_s, right_s, ignore_index=False, decimal=7):
 def _assert_frame_equal(left_df, right_df, ignore_index=False,
                         ignore_columns=False, ignore_directionality=False,
                         decimal=7):
+    import pandas.util.testing as pdt
+
     # assert_frame_equal doesn't like None...
     if left_df is None or right_df is None:
         assert left_df is None and right_df is None
@@ -280,6 +285,8 @@ def assert_data_frame_almost_equal(left, right):
     pandas.util.testing.assert_frame_equal
 
     """
+    import pandas.util.testing as pdt
+
     # pass all kwargs to ensure this function has consistent behavior even if
     # `assert_frame_equal`'s defaults change
     pdt.assert_frame_equal(left, right,
@@ -298,6 +305,8 @@ def assert_data_frame_almost_equal(left, right):
 
 
 def assert_series_almost_equal(left, right):
+    import pandas.util.testing as pdt
+
     # pass all kwargs to ensure this function has consistent behavior even if
     # `assert_series_equal`'s defaults change
     pdt.assert_series_equal(left, right,
@@ -315,6 +324,8 @@ def assert_series_almost_equal(left, right):
 
 
 def assert_index_equal(a, b):
+    import pandas.util.testing as pdt
+
     pdt.assert_index_equal(a, b,
                            exact=True,
                            check_names=True,
@@ -7,10 +7,12 @@
 # ----------------------------------------------------------------------------
 
 import io
+import os
 import unittest
 
 from skbio.util import cardinal_to_ordinal, safe_md5, find_duplicates
-from skbio.util._misc import MiniRegistry, chunk_str, resolve_key
+from skbio.util._misc import (MiniRegistry, chunk_str, resolve_key,
+                              resolve_n_jobs)
 
 
 class TestMiniRegistry(unittest.TestCase):
@@ -148,6 +150,23 @@ class ResolveKeyTests(unittest.TestCase):
             resolve_key({'foo': 1}, 'foo')
 
 
+class ResolveNJobsTests(unittest.TestCase):
+    def test_single_worker(self):
+        self.assertEqual(resolve_n_jobs(None), 1)
+        self.assertEqual(resolve_n_jobs(1), 1)
+
+    def test_positive(self):
+        self.assertEqual(resolve_n_jobs(7), 7)
+
+    def test_negative(self):
+        self.assertEqual(resolve_n_jobs(-1), os.cpu_count() or 1)
+        self.assertEqual(resolve_n_jobs(-10000), 1)
+
+    def test_zero(self):
+        with self.assertRaisesRegex(ValueError, 'cannot be 0'):
+            resolve_n_jobs(0)
+
+
 class ChunkStrTests(unittest.TestCase):
     def test_even_split(self):
         self.assertEqual(chunk_str('abcdef', 6, ' '), 'abcdef')